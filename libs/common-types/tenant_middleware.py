@@ -6,18 +6,70 @@ from fastapi.security import HTTPBearer
 import jwt  # type: ignore[import-untyped]
 import httpx
 import asyncio
-from typing import Optional, Dict, Callable, Awaitable, Any
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Callable, Awaitable, Any, Tuple
+from urllib.parse import urlsplit
 import logging
 import os
+import time
+
+try:
+    from prometheus_client import Counter, Gauge
+    prometheus_available = True
+except ImportError:
+    prometheus_available = False
+
+try:
+    import redis.asyncio as aioredis
+    redis_available = True
+except ImportError:
+    redis_available = False
 
 # Configuration
 TENANT_ROUTER_URL = os.getenv("TENANT_ROUTER_URL", "http://tenant-router:8001")
 JWT_SECRET = os.getenv("JWT_SECRET", "a_secure_random_string_for_jwt_signing_!@#$%^")
 JWT_ALGORITHMS = ["HS256"]
+TENANT_URL_CACHE_TTL_SECONDS = float(os.getenv("TENANT_URL_CACHE_TTL_SECONDS", "300"))
+TENANT_URL_CACHE_MAX_ENTRIES = int(os.getenv("TENANT_URL_CACHE_MAX_ENTRIES", "10000"))
+# Канал, в который Tenant Router публикует tenant_id при изменении/удалении конфигурации
+TENANT_INVALIDATION_CHANNEL = os.getenv("TENANT_INVALIDATION_CHANNEL", "tenant:invalidate")
+TENANT_INVALIDATION_REDIS_URL = os.getenv("TENANT_INVALIDATION_REDIS_URL", os.getenv("REDIS_URL", ""))
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
+if prometheus_available:
+    TENANT_POOL_EVENTS = Counter(
+        "tenant_pool_events_total",
+        "Tenant engine pool churn (created/evicted)",
+        ["event", "reason"],
+    )
+    TENANT_POOL_OPEN_ENGINES = Gauge(
+        "tenant_pool_open_engines",
+        "Tenant database engines currently open",
+    )
+    TENANT_URL_CACHE_LOOKUPS = Counter(
+        "tenant_url_cache_lookups_total",
+        "Tenant database URL lookups by result (hit/miss/coalesced)",
+        ["result"],
+    )
+
+
+def _record_pool_event(event: str, reason: str = "") -> None:
+    if prometheus_available:
+        TENANT_POOL_EVENTS.labels(event=event, reason=reason).inc()
+
+
+def _set_open_engines(count: int) -> None:
+    if prometheus_available:
+        TENANT_POOL_OPEN_ENGINES.set(count)
+
+
+def _record_url_lookup(result: str) -> None:
+    if prometheus_available:
+        TENANT_URL_CACHE_LOOKUPS.labels(result=result).inc()
+
 class TenantContext:
     """Контекст текущего tenant для request"""
     def __init__(self, tenant_id: str, database_url: str):
@@ -27,8 +79,61 @@ class TenantContext:
 class TenantMiddleware:
     def __init__(self):
         self.http_client = httpx.AsyncClient()
-        self.tenant_cache: Dict[str, str] = {}  # Кэш tenant_id -> database_url
-        
+        # Кэш tenant_id -> (database_url, expires_at), порядок = LRU
+        self.tenant_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # Незавершенные запросы к Tenant Router (single-flight на промах кэша)
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_coalesced = 0
+        self._invalidation_task: Optional["asyncio.Task[None]"] = None
+
+    async def start_invalidation_listener(self, redis_client: Any = None) -> bool:
+        """Подписка на инвалидации Tenant Router (вызывать из lifespan сервиса)"""
+        if self._invalidation_task is not None:
+            return True
+        if redis_client is None:
+            if not redis_available or not TENANT_INVALIDATION_REDIS_URL:
+                logger.info("Tenant invalidation listener disabled; URLs expire by TTL only")
+                return False
+            redis_client = aioredis.from_url(TENANT_INVALIDATION_REDIS_URL)
+        self._invalidation_task = asyncio.create_task(self._listen_for_invalidations(redis_client))
+        return True
+
+    async def stop_invalidation_listener(self) -> None:
+        if self._invalidation_task is None:
+            return
+        self._invalidation_task.cancel()
+        try:
+            await self._invalidation_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._invalidation_task = None
+
+    async def _listen_for_invalidations(self, redis_client: Any) -> None:
+        """Слушаем канал инвалидации; при потере подписки сбрасываем кэш целиком"""
+        while True:
+            try:
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(TENANT_INVALIDATION_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        tenant_id = message.get("data")
+                        if isinstance(tenant_id, bytes):
+                            tenant_id = tenant_id.decode()
+                        self.invalidate_tenant(str(tenant_id))
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Пока подписки нет, инвалидации могли быть пропущены
+                logger.warning(f"Tenant invalidation subscription lost: {e}")
+                self.tenant_cache.clear()
+                await asyncio.sleep(1.0)
+
     async def __call__(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
         """Основной middleware для определения tenant"""
         
@@ -96,10 +201,59 @@ class TenantMiddleware:
         """Получение URL базы данных для tenant"""
         
         # Проверяем кэш
-        if tenant_id in self.tenant_cache:
-            return self.tenant_cache[tenant_id]
-            
-        # Запрашиваем у Tenant Router
+        cached = self.tenant_cache.get(tenant_id)
+        if cached is not None:
+            database_url, expires_at = cached
+            if expires_at > time.monotonic():
+                self.tenant_cache.move_to_end(tenant_id)
+                self.cache_hits += 1
+                _record_url_lookup("hit")
+                return database_url
+            self.tenant_cache.pop(tenant_id, None)
+
+        # Параллельные запросы холодного tenant ждут один запрос к Tenant Router
+        while (inflight := self._inflight.get(tenant_id)) is not None:
+            self.cache_coalesced += 1
+            _record_url_lookup("coalesced")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Отменён ведущий запрос (клиент отключился), а не мы: пробуем снова
+                task = asyncio.current_task()
+                if not inflight.cancelled() or (task is not None and task.cancelling()):
+                    raise
+
+        self.cache_misses += 1
+        _record_url_lookup("miss")
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._inflight[tenant_id] = future
+        try:
+            database_url = await self._fetch_tenant_database_url(tenant_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # помечаем как прочитанное, если ожидающих нет
+            raise
+        else:
+            future.set_result(database_url)
+            # Инвалидация во время запроса: ответ мог устареть, не кэшируем
+            if self._inflight.get(tenant_id) is future:
+                self._cache_database_url(tenant_id, database_url)
+            return database_url
+        finally:
+            if self._inflight.get(tenant_id) is future:
+                del self._inflight[tenant_id]
+
+    def _cache_database_url(self, tenant_id: str, database_url: str) -> None:
+        self.tenant_cache[tenant_id] = (database_url, time.monotonic() + TENANT_URL_CACHE_TTL_SECONDS)
+        self.tenant_cache.move_to_end(tenant_id)
+        while len(self.tenant_cache) > TENANT_URL_CACHE_MAX_ENTRIES:
+            self.tenant_cache.popitem(last=False)
+
+    async def _fetch_tenant_database_url(self, tenant_id: str) -> str:
+        """Запрос URL у Tenant Router"""
         try:
             response = await self.http_client.get(
                 f"{TENANT_ROUTER_URL}/tenant/{tenant_id}/database-url",
@@ -112,22 +266,46 @@ class TenantMiddleware:
                 raise HTTPException(status_code=503, detail="Tenant routing service unavailable")
                 
             data = response.json()
-            database_url = data["database_url"]
-            
-            # Кэшируем на 5 минут
-            self.tenant_cache[tenant_id] = database_url
-            asyncio.create_task(self._clear_cache_after_delay(tenant_id, 300))
-            
-            return database_url
+            return data["database_url"]
             
         except httpx.RequestError as e:
             logger.error(f"Failed to connect to tenant router: {e}")
             raise HTTPException(status_code=503, detail="Tenant routing service unavailable")
-    
-    async def _clear_cache_after_delay(self, tenant_id: str, delay: int):
-        """Очистка кэша с задержкой"""
-        await asyncio.sleep(delay)
+
+    async def warm_up(self, tenant_ids: list[str]) -> int:
+        """Прогрев кэша одним пакетным запросом к Tenant Router (например, при старте)"""
+        if not tenant_ids:
+            return 0
+        try:
+            response = await self.http_client.post(
+                f"{TENANT_ROUTER_URL}/tenants/database-urls",
+                json={"tenant_ids": tenant_ids},
+                timeout=10.0
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Tenant cache warm-up failed: {e}")
+            return 0
+        database_urls: Dict[str, str] = response.json().get("database_urls", {})
+        for tenant_id, database_url in database_urls.items():
+            self._cache_database_url(tenant_id, database_url)
+        return len(database_urls)
+
+    def invalidate_tenant(self, tenant_id: str) -> None:
+        """Сбросить закэшированный URL tenant (например, после переноса на другой шард)"""
         self.tenant_cache.pop(tenant_id, None)
+        self._inflight.pop(tenant_id, None)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit rate кэша tenant URL"""
+        lookups = self.cache_hits + self.cache_misses + self.cache_coalesced
+        return {
+            "entries": len(self.tenant_cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "coalesced": self.cache_coalesced,
+            "hit_rate": round((self.cache_hits + self.cache_coalesced) / lookups, 4) if lookups else 0.0,
+        }
     
     def _is_valid_tenant_id(self, tenant_id: Optional[str]) -> bool:
         """Валидация формата tenant_id"""
@@ -152,49 +330,231 @@ async def get_tenant_context(request: Request) -> TenantContext:
     
     return request.state.tenant
 
-# Декоратор для tenant-aware database sessions
+# Пулы соединений tenant БД
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class TenantPoolSettings:
+    """Лимиты пулов: LRU по числу engine, idle-close и общий бюджет соединений"""
+    max_engines: int = field(default_factory=lambda: _env_int("TENANT_POOL_MAX_ENGINES", 64))
+    idle_seconds: float = field(default_factory=lambda: _env_float("TENANT_POOL_IDLE_SECONDS", 300.0))
+    pool_size: int = field(default_factory=lambda: _env_int("TENANT_POOL_SIZE", 2))
+    max_overflow: int = field(default_factory=lambda: _env_int("TENANT_POOL_MAX_OVERFLOW", 3))
+    global_connection_budget: int = field(default_factory=lambda: _env_int("TENANT_POOL_GLOBAL_CONNECTIONS", 200))
+    shard_connection_budget: int = field(default_factory=lambda: _env_int("TENANT_POOL_SHARD_CONNECTIONS", 100))
+    acquire_timeout_seconds: float = field(default_factory=lambda: _env_float("TENANT_POOL_ACQUIRE_TIMEOUT", 10.0))
+
+
+@dataclass
+class _TenantPool:
+    database_url: str
+    shard_key: str
+    engine: Any
+    session_factory: Any
+    last_used: float
+    in_use: int = 0
+
+
+def _shard_key(database_url: str) -> str:
+    """Шард = host:port сервера БД (tenant БД одного шарда делят его max_connections)"""
+    parts = urlsplit(database_url)
+    if not parts.hostname:
+        return "local"
+    return f"{parts.hostname}:{parts.port or ''}"
+
+
 class TenantDatabase:
-    """Управление соединениями с tenant-specific базами данных"""
-    
-    def __init__(self):
-        self.connection_pools: Dict[str, Any] = {}
-    
-    async def get_tenant_session(self, tenant_context: TenantContext):
-        """Получение сессии базы данных для конкретного tenant"""
+    """Управление соединениями с tenant-specific базами данных
+
+    Engine создается лениво на tenant и хранится в LRU: при превышении
+    max_engines закрывается давно не использованный (без активных сессий),
+    engine без обращений дольше idle_seconds тоже закрывается. Количество
+    одновременно выданных сессий ограничено глобальным бюджетом и бюджетом
+    шарда, чтобы тысячи tenant не исчерпали max_connections в Postgres.
+    """
+
+    def __init__(self, settings: Optional[TenantPoolSettings] = None, clock: Callable[[], float] = time.monotonic):
+        self.settings = settings or TenantPoolSettings()
+        self._clock = clock
+        self.connection_pools: "OrderedDict[str, _TenantPool]" = OrderedDict()
+        # Пулы, замененные при смене URL во время активных сессий: закрываются после последней
+        self._draining: list[tuple[str, _TenantPool]] = []
+        self._global_budget = asyncio.Semaphore(self.settings.global_connection_budget)
+        self._shard_budgets: Dict[str, asyncio.Semaphore] = {}
+        self._last_idle_sweep = clock()
+        self.engines_created = 0
+        self.engines_evicted: Dict[str, int] = {"lru": 0, "idle": 0, "url_changed": 0}
+
+    def _create_pool(self, database_url: str) -> _TenantPool:
         from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
         from sqlalchemy.orm import sessionmaker
-        
-        tenant_id = tenant_context.tenant_id
-        database_url = tenant_context.database_url
-        
-        # Создаем или получаем connection pool для tenant
-        if tenant_id not in self.connection_pools:
-            engine = create_async_engine(
-                database_url,
-                pool_size=5,
-                max_overflow=10,
-                pool_pre_ping=True,
-                echo=False  # True для debug
-            )
-            
-            # AsyncEngine is compatible with sessionmaker
-            self.connection_pools[tenant_id] = sessionmaker(  # type: ignore[arg-type, misc]
-                bind=engine,  # type: ignore[arg-type]
-                class_=AsyncSession, 
-                expire_on_commit=False,
-                autocommit=False,  # type: ignore[misc]
-                autoflush=True   # type: ignore[misc]
-            )
-            
+
+        engine = create_async_engine(
+            database_url,
+            pool_size=self.settings.pool_size,
+            max_overflow=self.settings.max_overflow,
+            pool_pre_ping=True,
+            echo=False  # True для debug
+        )
+        # AsyncEngine is compatible with sessionmaker
+        session_factory = sessionmaker(  # type: ignore[call-overload, misc]
+            bind=engine,  # type: ignore[arg-type]
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,  # type: ignore[misc]
+            autoflush=True   # type: ignore[misc]
+        )
+        return _TenantPool(database_url, _shard_key(database_url), engine, session_factory, self._clock())
+
+    async def _dispose(self, tenant_id: str, pool: _TenantPool, reason: str) -> None:
+        self.engines_evicted[reason] = self.engines_evicted.get(reason, 0) + 1
+        _record_pool_event("evicted", reason)
+        try:
+            await pool.engine.dispose()
+        except Exception as e:
+            logger.warning(f"Failed to dispose pool for tenant {tenant_id}: {e}")
+        logger.info(f"Closed connection pool for tenant {tenant_id} ({reason})")
+
+    async def _checkout_pool(self, tenant_id: str, database_url: str) -> _TenantPool:
+        """Получить (или создать) пул tenant и отметить его как используемый"""
+        await self.close_idle()
+
+        pool = self.connection_pools.get(tenant_id)
+        if pool is not None and pool.database_url != database_url:
+            # Tenant переехал на другой шард: новые сессии идут в новый пул,
+            # старый закрывается, когда его сессии завершатся
+            del self.connection_pools[tenant_id]
+            if pool.in_use:
+                self._draining.append((tenant_id, pool))
+            else:
+                await self._dispose(tenant_id, pool, "url_changed")
+            pool = None
+
+        created = pool is None
+        if pool is None:
+            pool = self._create_pool(database_url)
+            self.connection_pools[tenant_id] = pool
+            self.engines_created += 1
+            _record_pool_event("created")
             logger.info(f"Created connection pool for tenant {tenant_id}")
-        
-        # Возвращаем сессию
-        Session = self.connection_pools[tenant_id]
-        async with Session() as session:
+        else:
+            self.connection_pools.move_to_end(tenant_id)
+
+        # in_use до вытеснения, чтобы LRU не закрыл только что выданный пул
+        pool.in_use += 1
+        pool.last_used = self._clock()
+        if created:
+            await self._evict_lru()
+        _set_open_engines(len(self.connection_pools))
+        return pool
+
+    async def _release_pool(self, tenant_id: str, pool: _TenantPool) -> None:
+        pool.in_use -= 1
+        pool.last_used = self._clock()
+        if pool.in_use == 0 and any(p is pool for _, p in self._draining):
+            self._draining = [(t, p) for t, p in self._draining if p is not pool]
+            await self._dispose(tenant_id, pool, "url_changed")
+
+    async def _evict_lru(self) -> None:
+        excess = len(self.connection_pools) - self.settings.max_engines
+        if excess <= 0:
+            return
+        for tenant_id in list(self.connection_pools):
+            if excess <= 0:
+                break
+            pool = self.connection_pools[tenant_id]
+            if pool.in_use:
+                continue  # Активные сессии не трогаем, engine закроется позже
+            del self.connection_pools[tenant_id]
+            await self._dispose(tenant_id, pool, "lru")
+            excess -= 1
+
+    async def close_idle(self, force: bool = False) -> int:
+        """Закрыть engine, к которым не обращались дольше idle_seconds"""
+        now = self._clock()
+        if not force and now - self._last_idle_sweep < min(self.settings.idle_seconds, 60.0):
+            return 0
+        self._last_idle_sweep = now
+        closed = 0
+        for tenant_id, pool in list(self.connection_pools.items()):
+            if pool.in_use == 0 and now - pool.last_used >= self.settings.idle_seconds:
+                del self.connection_pools[tenant_id]
+                await self._dispose(tenant_id, pool, "idle")
+                closed += 1
+        if closed:
+            _set_open_engines(len(self.connection_pools))
+        return closed
+
+    def _shard_budget(self, shard_key: str) -> asyncio.Semaphore:
+        budget = self._shard_budgets.get(shard_key)
+        if budget is None:
+            budget = asyncio.Semaphore(self.settings.shard_connection_budget)
+            self._shard_budgets[shard_key] = budget
+        return budget
+
+    async def _acquire_budget(self, semaphore: asyncio.Semaphore) -> None:
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.settings.acquire_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Tenant database connection budget exhausted")
+
+    async def get_tenant_session(self, tenant_context: TenantContext):
+        """Получение сессии базы данных для конкретного tenant"""
+        tenant_id = tenant_context.tenant_id
+        pool = await self._checkout_pool(tenant_id, tenant_context.database_url)
+        shard_budget = self._shard_budget(pool.shard_key)
+        try:
+            await self._acquire_budget(self._global_budget)
             try:
-                yield session
+                await self._acquire_budget(shard_budget)
+                try:
+                    async with pool.session_factory() as session:
+                        try:
+                            yield session
+                        finally:
+                            await session.close()
+                finally:
+                    shard_budget.release()
             finally:
-                await session.close()
+                self._global_budget.release()
+        finally:
+            await self._release_pool(tenant_id, pool)
+
+    async def aclose(self) -> None:
+        """Закрыть все пулы (shutdown)"""
+        pools = list(self.connection_pools.items()) + self._draining
+        self.connection_pools.clear()
+        self._draining = []
+        for tenant_id, pool in pools:
+            try:
+                await pool.engine.dispose()
+            except Exception as e:
+                logger.warning(f"Failed to dispose pool for tenant {tenant_id}: {e}")
+        _set_open_engines(0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика пулов для health/metrics endpoints"""
+        return {
+            "open_engines": len(self.connection_pools),
+            "draining_engines": len(self._draining),
+            "active_sessions": sum(p.in_use for p in self.connection_pools.values())
+            + sum(p.in_use for _, p in self._draining),
+            "engines_created": self.engines_created,
+            "engines_evicted": dict(self.engines_evicted),
+            "shards": sorted({p.shard_key for p in self.connection_pools.values()}),
+        }
 
 # Глобальный экземпляр
 tenant_database = TenantDatabase()
@@ -15,6 +15,28 @@ class TenantMiddleware(BaseHTTPMiddleware):
     def __init__(self) -> None: ...
     async def dispatch(self, request: Request, call_next: Any) -> Response: ...
     async def get_tenant_db_session(self, tenant_id: str, database_url: str) -> AsyncGenerator[AsyncSession, None]: ...
+    async def start_invalidation_listener(self, redis_client: Any = None) -> bool: ...
+    async def stop_invalidation_listener(self) -> None: ...
+    def invalidate_tenant(self, tenant_id: str) -> None: ...
+
+class TenantPoolSettings:
+    max_engines: int
+    idle_seconds: float
+    pool_size: int
+    max_overflow: int
+    global_connection_budget: int
+    shard_connection_budget: int
+    acquire_timeout_seconds: float
+
+class TenantDatabase:
+    settings: TenantPoolSettings
+    def __init__(self, settings: Optional[TenantPoolSettings] = None, clock: Any = ...) -> None: ...
+    def get_tenant_session(self, tenant_context: TenantContext) -> AsyncGenerator[AsyncSession, None]: ...
+    async def close_idle(self, force: bool = False) -> int: ...
+    async def aclose(self) -> None: ...
+    def stats(self) -> Dict[str, Any]: ...
+
+tenant_database: TenantDatabase
 
 async def get_tenant_context() -> TenantContext: ...
 async def get_tenant_db_session() -> AsyncGenerator[AsyncSession, None]: ...
@@ -1,9 +1,10 @@
 from typing import Callable
 
-from fastapi import Depends, Header, HTTPException, status
-from jose import JWTError, jwt
+from fastapi import Depends, Header, HTTPException, Request, status
+from jose import JWTError
 
 from libs.shared_auth.auth_secret_preflight import resolve_auth_secret_key
+from libs.shared_auth.verified_claims import VerifiedClaims, claims_for_request, get_claims_verifier
 
 DEFAULT_ALGORITHM = "HS256"
 
@@ -14,7 +15,31 @@ def build_jwt_auth_dependencies(
 ) -> tuple[Callable[..., str], Callable[..., str]]:
     """Create FastAPI dependencies for bearer token extraction and JWT subject decoding."""
 
-    secret_key = resolve_auth_secret_key(env_var=secret_key_env_var)
+    get_bearer_token, get_verified_claims = build_verified_claims_dependencies(secret_key_env_var, algorithm)
+
+    def get_current_user_id(claims: VerifiedClaims = Depends(get_verified_claims)) -> str:
+        user_id = claims.subject
+        if not user_id or claims.is_internal_call:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication token",
+            )
+        return user_id
+
+    return get_bearer_token, get_current_user_id
+
+
+def build_verified_claims_dependencies(
+    secret_key_env_var: str = "AUTH_SECRET_KEY",
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> tuple[Callable[..., str], Callable[..., VerifiedClaims]]:
+    """Create dependencies for the bearer token and its verified claims.
+
+    The claims dependency decodes the token once per request (see
+    ``verified_claims``), however many other dependencies use it.
+    """
+
+    verifier = get_claims_verifier(resolve_auth_secret_key(env_var=secret_key_env_var), algorithm)
 
     def get_bearer_token(authorization: str | None = Header(default=None)) -> str:
         if not authorization or not authorization.startswith("Bearer "):
@@ -24,29 +49,16 @@ def build_jwt_auth_dependencies(
             )
         return authorization.split(" ", 1)[1]
 
-    def get_current_user_id(token: str = Depends(get_bearer_token)) -> str:
+    def get_verified_claims(request: Request, token: str = Depends(get_bearer_token)) -> VerifiedClaims:
         try:
-            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+            return claims_for_request(request, token, verifier)
         except JWTError as exc:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication token",
             ) from exc
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-        if payload.get("internal_call") is True:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-        return user_id
-
-    return get_bearer_token, get_current_user_id
+    return get_bearer_token, get_verified_claims
 
 
 def build_admin_require_dependency(
@@ -55,9 +67,9 @@ def build_admin_require_dependency(
     required_permission: str | None = None,
 ) -> Callable[..., dict]:
     """SEC.3 — Return a FastAPI dependency that enforces admin/permission check."""
-    secret_key = resolve_auth_secret_key(env_var=secret_key_env_var)
+    verifier = get_claims_verifier(resolve_auth_secret_key(env_var=secret_key_env_var), algorithm)
 
-    def _check(authorization: str | None = Header(default=None)) -> dict:
+    def _check(request: Request, authorization: str | None = Header(default=None)) -> dict:
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,7 +77,7 @@ def build_admin_require_dependency(
             )
         token = authorization.split(" ", 1)[1]
         try:
-            payload: dict = jwt.decode(token, secret_key, algorithms=[algorithm])
+            payload: dict = dict(claims_for_request(request, token, verifier).payload)
         except JWTError as exc:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
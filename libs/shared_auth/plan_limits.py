@@ -14,11 +14,12 @@ import os
 from dataclasses import dataclass
 from typing import Any
 
-from fastapi import Depends, HTTPException, status
-from jose import JWTError, jwt
+from fastapi import Depends, HTTPException, Request, status
+from jose import JWTError
 
 from .auth_secret_preflight import resolve_auth_secret_key
 from .jwt_fastapi import build_jwt_auth_dependencies
+from .verified_claims import ClaimsVerifier, claims_for_request, get_claims_verifier
 
 _get_bearer_token, _ = build_jwt_auth_dependencies()
 
@@ -143,6 +144,11 @@ def _secret_and_algo() -> tuple[str, str]:
     return resolve_auth_secret_key(), "HS256"
 
 
+def _verifier() -> ClaimsVerifier:
+    # Resolved per call: the secret comes from the environment, which tests repoint.
+    return get_claims_verifier(*_secret_and_algo())
+
+
 def _int_claim(payload: dict[str, Any], key: str, default: int) -> int:
     raw = payload.get(key)
     if raw is None:
@@ -233,36 +239,33 @@ def strict_hmrc_fraud_client_context_required_from_payload(payload: dict[str, An
 
 
 def strict_hmrc_fraud_client_context_required(token: str) -> bool:
-    secret, algorithm = _secret_and_algo()
     try:
-        payload: dict[str, Any] = jwt.decode(token, secret, algorithms=[algorithm])
+        payload = _verifier().verify(token).payload
     except JWTError:
         return False
-    return strict_hmrc_fraud_client_context_required_from_payload(payload)
+    return strict_hmrc_fraud_client_context_required_from_payload(dict(payload))
 
 
 def try_plan_limits_from_token(token: str) -> PlanLimits | None:
     """Decode limits without raising (for middleware); invalid token → None."""
-    secret, algorithm = _secret_and_algo()
     try:
-        payload: dict[str, Any] = jwt.decode(token, secret, algorithms=[algorithm])
+        payload = _verifier().verify(token).payload
     except JWTError:
         return None
-    return plan_limits_from_payload(payload)
+    return plan_limits_from_payload(dict(payload))
 
 
-def decode_plan_limits_from_token(token: str) -> PlanLimits:
-    secret, algorithm = _secret_and_algo()
+def decode_plan_limits_from_token(token: str, request: Request | None = None) -> PlanLimits:
     try:
-        payload: dict[str, Any] = jwt.decode(token, secret, algorithms=[algorithm])
+        payload = claims_for_request(request, token, _verifier()).payload
     except JWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token",
         ) from exc
-    return plan_limits_from_payload(payload)
+    return plan_limits_from_payload(dict(payload))
 
 
-async def get_plan_limits(token: str = Depends(_get_bearer_token)) -> PlanLimits:
+async def get_plan_limits(request: Request, token: str = Depends(_get_bearer_token)) -> PlanLimits:
     """FastAPI dependency: subscription limits from JWT (auth-service)."""
-    return decode_plan_limits_from_token(token)
+    return decode_plan_limits_from_token(token, request)
@@ -0,0 +1,131 @@
+"""Tests for the verified-claims cache and the once-per-request decode."""
+import os
+import sys
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+os.environ.setdefault("AUTH_SECRET_KEY", "shared-auth-test-secret")
+SECRET = os.environ["AUTH_SECRET_KEY"]
+
+from libs.shared_auth import verified_claims  # noqa: E402
+from libs.shared_auth.jwt_fastapi import build_admin_require_dependency, build_jwt_auth_dependencies  # noqa: E402
+from libs.shared_auth.plan_limits import PlanLimits, get_plan_limits  # noqa: E402
+from libs.shared_auth.verified_claims import ClaimsVerifier, get_claims_verifier  # noqa: E402
+
+
+class _Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _token(**claims) -> str:
+    return jwt.encode({"sub": "user@example.com", **claims}, SECRET, algorithm="HS256")
+
+
+def test_cache_hits_until_exp_and_rejects_bad_tokens():
+    now = time.time()
+    clock = _Clock(now)
+    verifier = ClaimsVerifier(SECRET, "HS256", max_entries=2, max_ttl_seconds=300, clock=clock)
+    short = _token(exp=int(now) + 60)
+
+    first = verifier.verify(short)
+    assert verifier.verify(short) is first
+    assert first.subject == "user@example.com"
+    with pytest.raises(TypeError):
+        first.payload["sub"] = "someone-else"  # claims are read-only
+
+    clock.now = now + 61  # past the cached exp: the entry is dropped and the token re-decoded
+    assert verifier.verify(short) is not first
+    with pytest.raises(JWTError):
+        verifier.verify(_token(exp=int(now) - 1))
+    with pytest.raises(JWTError):
+        verifier.verify(jwt.encode({"sub": "x"}, "another-secret", algorithm="HS256"))
+
+    for n in range(3):
+        verifier.verify(_token(n=n))
+    assert verifier.stats() == {
+        "entries": 2,
+        "hits": 1,
+        "misses": 5,
+        "invalid": 2,
+        "verify_seconds": verifier.stats()["verify_seconds"],
+    }
+
+
+def test_dependencies_share_one_decode_per_request():
+    get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
+    require_admin = build_admin_require_dependency()
+    app = FastAPI()
+
+    @app.get("/probe")
+    def probe(
+        user_id: str = Depends(get_current_user_id),
+        limits: PlanLimits = Depends(get_plan_limits),
+        admin: dict = Depends(require_admin),
+    ):
+        return {"user_id": user_id, "plan": limits.plan, "role": admin["role"]}
+
+    verifier = get_claims_verifier(SECRET)
+    verifier.clear()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {_token(plan='pro', role='admin', exp=int(time.time()) + 600)}"}
+
+    before = verifier.stats()
+    first = client.get("/probe", headers=headers)
+    second = client.get("/probe", headers=headers)
+    after = verifier.stats()
+
+    assert first.json() == {"user_id": "user@example.com", "plan": "pro", "role": "admin"}
+    assert second.status_code == 200
+    # Three dependencies, two requests: one jwt.decode, one cross-request cache hit.
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+    assert client.get("/probe", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+
+def test_dependency_overhead_microbenchmark():
+    """Per-request cost of the user-id dependency: full decode vs. verified-token cache."""
+
+    class _State:
+        pass
+
+    class _Request:
+        def __init__(self) -> None:
+            self.state = _State()
+
+    rounds = 2000
+    token = _token(exp=int(time.time()) + 600)
+    cold = ClaimsVerifier(SECRET, "HS256", max_entries=0)
+    warm = ClaimsVerifier(SECRET, "HS256")
+
+    def per_request(verifier: ClaimsVerifier) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            request = _Request()
+            # user id, plan limits and admin check all ask for the claims.
+            for _ in range(3):
+                verified_claims.claims_for_request(request, token, verifier)
+        return (time.perf_counter() - started) / rounds
+
+    uncached = per_request(cold)
+    cached = per_request(warm)
+    print(f"\nclaims dependency overhead per request: decode {uncached * 1e6:.1f}us, cached {cached * 1e6:.1f}us")
+
+    assert cold.stats()["misses"] == rounds
+    assert warm.stats() | {"verify_seconds": 0} == {
+        "entries": 1,
+        "hits": rounds - 1,
+        "misses": 1,
+        "invalid": 0,
+        "verify_seconds": 0,
+    }
+    assert cached < uncached
@@ -0,0 +1,200 @@
+"""Verify each bearer token once.
+
+Several dependencies on one route (user id, plan limits, admin check) all need
+the token's claims. ``claims_for_request`` decodes the token on first use and
+keeps the result on ``request.state`` for the rest of that request. Across
+requests, ``ClaimsVerifier`` keeps a bounded LRU of tokens it has already
+verified, keyed by the token's SHA-256 and kept only until the token's ``exp``,
+so a client reusing its access token skips the HMAC check and JSON decode.
+
+Verification and cache counters are exported when ``prometheus_client`` is
+installed; ``ClaimsVerifier.stats()`` reports the same numbers either way.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+
+from jose import JWTError, jwt
+
+try:
+    from prometheus_client import Counter, Histogram
+
+    prometheus_available = True
+except ImportError:
+    prometheus_available = False
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+VERIFIED_TOKEN_CACHE_SIZE = _env_int("SHARED_AUTH_VERIFIED_TOKEN_CACHE_SIZE", 10_000)
+# Tokens without ``exp`` are still re-verified this often.
+VERIFIED_TOKEN_MAX_TTL_SECONDS = _env_int("SHARED_AUTH_VERIFIED_TOKEN_MAX_TTL_SECONDS", 300)
+
+REQUEST_STATE_ATTR = "shared_auth_claims"
+
+if prometheus_available:
+    JWT_VERIFICATIONS_TOTAL = Counter(
+        "shared_auth_jwt_verifications_total",
+        "Bearer token verifications by outcome (cache_hit, verified, invalid).",
+        labelnames=("outcome",),
+    )
+    JWT_VERIFY_SECONDS = Histogram(
+        "shared_auth_jwt_verify_seconds",
+        "Time spent in jwt.decode for tokens not found in the verified-token cache.",
+        buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+    )
+
+
+@dataclass(frozen=True)
+class VerifiedClaims:
+    """Read-only claims of a token whose signature and expiry have been checked."""
+
+    token_hash: str
+    payload: Mapping[str, Any]
+    expires_at: Optional[float]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.payload.get(key, default)
+
+    @property
+    def subject(self) -> Optional[str]:
+        sub = self.payload.get("sub")
+        return str(sub) if sub else None
+
+    @property
+    def is_internal_call(self) -> bool:
+        return self.payload.get("internal_call") is True
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class ClaimsVerifier:
+    """Decodes tokens for one secret/algorithm pair and caches the valid ones until ``exp``."""
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str,
+        *,
+        max_entries: int = VERIFIED_TOKEN_CACHE_SIZE,
+        max_ttl_seconds: int = VERIFIED_TOKEN_MAX_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._secret_key = secret_key
+        self.algorithm = algorithm
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[VerifiedClaims, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalid = 0
+        self.verify_seconds = 0.0
+
+    def verify(self, token: str) -> VerifiedClaims:
+        """Returns the token's claims; raises ``JWTError`` like ``jwt.decode`` does."""
+        key = token_hash(token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if prometheus_available:
+                        JWT_VERIFICATIONS_TOTAL.labels(outcome="cache_hit").inc()
+                    return entry[0]
+                del self._entries[key]
+
+        started = time.perf_counter()
+        try:
+            payload = jwt.decode(token, self._secret_key, algorithms=[self.algorithm])
+        except JWTError:
+            self._record_miss(time.perf_counter() - started, "invalid")
+            raise
+        self._record_miss(time.perf_counter() - started, "verified")
+
+        exp = payload.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else None
+        claims = VerifiedClaims(token_hash=key, payload=MappingProxyType(payload), expires_at=expires_at)
+        cache_until = now + self.max_ttl_seconds
+        if expires_at is not None:
+            cache_until = min(cache_until, expires_at)
+        if cache_until > now and self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = (claims, cache_until)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return claims
+
+    def _record_miss(self, elapsed: float, outcome: str) -> None:
+        with self._lock:
+            self.verify_seconds += elapsed
+            if outcome == "invalid":
+                self.invalid += 1
+            else:
+                self.misses += 1
+        if prometheus_available:
+            JWT_VERIFICATIONS_TOTAL.labels(outcome=outcome).inc()
+            JWT_VERIFY_SECONDS.observe(elapsed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalid": self.invalid,
+                "verify_seconds": round(self.verify_seconds, 6),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_verifiers: dict[tuple[str, str], ClaimsVerifier] = {}
+_verifiers_lock = threading.Lock()
+
+
+def get_claims_verifier(secret_key: str, algorithm: str = "HS256") -> ClaimsVerifier:
+    """Process-wide verifier for a secret, shared by every dependency that uses it."""
+    key = (token_hash(secret_key), algorithm)
+    verifier = _verifiers.get(key)
+    if verifier is None:
+        with _verifiers_lock:
+            verifier = _verifiers.setdefault(key, ClaimsVerifier(secret_key, algorithm))
+    return verifier
+
+
+def claims_for_request(request: Any, token: str, verifier: ClaimsVerifier) -> VerifiedClaims:
+    """Claims for *token*, decoded at most once per request.
+
+    ``request`` may be None (background code); the verifier's cache still applies.
+    """
+    state = getattr(request, "state", None)
+    if state is not None:
+        cached = getattr(state, REQUEST_STATE_ATTR, None)
+        if cached is not None and cached[0] is verifier and cached[1] == token:
+            return cached[2]
+    claims = verifier.verify(token)
+    if state is not None:
+        setattr(state, REQUEST_STATE_ATTR, (verifier, token, claims))
+    return claims
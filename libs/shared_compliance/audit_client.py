@@ -5,7 +5,7 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import httpx
+from libs.shared_http.client import get_upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +24,12 @@ async def post_audit_event(
         return False
     url = f"{base}/audit-events"
     try:
-        async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-            resp = await client.post(
-                url,
-                headers={"Authorization": f"Bearer {bearer_token}"},
-                json={"user_id": user_id, "action": action, "details": details or {}},
-            )
+        resp = await get_upstream_client(url).post(
+            url,
+            headers={"Authorization": f"Bearer {bearer_token}"},
+            json={"user_id": user_id, "action": action, "details": details or {}},
+            timeout=timeout_seconds,
+        )
         if resp.status_code >= 400:
             logger.warning("compliance audit POST %s: %s %s", action, resp.status_code, resp.text[:500])
             return False
@@ -0,0 +1,376 @@
+"""Process-wide pooled HTTP clients for inter-service calls.
+
+One ``httpx.AsyncClient`` is kept per upstream origin (scheme://host:port) so
+calls reuse keep-alive connections instead of paying DNS/TCP/TLS setup on every
+request. Each upstream also gets:
+
+* a circuit breaker that fails fast while the upstream is unhealthy,
+* retries with exponential backoff and full jitter,
+* optional hedging of slow GETs (a second attempt races the first),
+* single-flight coalescing of identical in-flight GETs,
+* latency/error metrics when ``prometheus_client`` is installed.
+
+Clients are bound to the event loop that created them (httpx connections cannot
+be shared across loops), so the registry is keyed by the running loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+import random
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    from prometheus_client import Counter, Histogram
+
+    prometheus_available = True
+except ImportError:
+    prometheus_available = False
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class UpstreamSettings:
+    max_connections: int = field(default_factory=lambda: _env_int("SHARED_HTTP_MAX_CONNECTIONS", 100))
+    max_keepalive_connections: int = field(default_factory=lambda: _env_int("SHARED_HTTP_MAX_KEEPALIVE", 20))
+    keepalive_expiry_seconds: float = field(default_factory=lambda: _env_float("SHARED_HTTP_KEEPALIVE_EXPIRY", 30.0))
+    http2: bool = field(default_factory=lambda: os.getenv("SHARED_HTTP_HTTP2", "false").lower() == "true")
+    timeout_seconds: float = 10.0
+    failure_threshold: int = field(default_factory=lambda: _env_int("SHARED_HTTP_BREAKER_FAILURES", 5))
+    reset_timeout_seconds: float = field(default_factory=lambda: _env_float("SHARED_HTTP_BREAKER_RESET_SECONDS", 30.0))
+    # 0 disables hedging; otherwise a second GET is launched if the first has not
+    # answered after this many seconds.
+    hedge_after_seconds: float = field(default_factory=lambda: _env_float("SHARED_HTTP_HEDGE_AFTER_SECONDS", 0.0))
+    max_backoff_seconds: float = 5.0
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without touching the network while an upstream's breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float, clock: Any = time.monotonic) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probe_in_flight or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+
+if prometheus_available:
+    UPSTREAM_REQUEST_SECONDS = Histogram(
+        "shared_http_upstream_request_seconds",
+        "Latency of inter-service HTTP requests per upstream.",
+        labelnames=("upstream", "method", "outcome"),
+    )
+    UPSTREAM_ERRORS_TOTAL = Counter(
+        "shared_http_upstream_errors_total",
+        "Inter-service HTTP errors per upstream grouped by kind.",
+        labelnames=("upstream", "kind"),
+    )
+    UPSTREAM_COALESCED_TOTAL = Counter(
+        "shared_http_upstream_coalesced_total",
+        "GET requests served by joining an identical in-flight request.",
+        labelnames=("upstream",),
+    )
+
+
+def _observe(upstream: str, method: str, outcome: str, elapsed: float) -> None:
+    if not prometheus_available:
+        return
+    UPSTREAM_REQUEST_SECONDS.labels(upstream=upstream, method=method, outcome=outcome).observe(elapsed)
+    if outcome != "ok":
+        UPSTREAM_ERRORS_TOTAL.labels(upstream=upstream, kind=outcome).inc()
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code >= 500
+
+
+def upstream_origin(url: str) -> str:
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        raise ValueError(f"Absolute URL required for upstream client: {url!r}")
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _coalesce_key(url: str, params: Any, headers: dict[str, str] | None) -> tuple[Any, ...]:
+    if isinstance(params, dict):
+        params_key: Any = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    else:
+        params_key = str(params) if params is not None else None
+    headers_key = tuple(sorted((k.lower(), v) for k, v in (headers or {}).items()))
+    return (url, params_key, headers_key)
+
+
+class UpstreamClient:
+    """Pooled client plus breaker and in-flight table for one upstream origin."""
+
+    def __init__(
+        self,
+        origin: str,
+        settings: UpstreamSettings | None = None,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.origin = origin
+        self.name = urlsplit(origin).netloc
+        self.settings = settings or UpstreamSettings()
+        http2 = self.settings.http2 and importlib.util.find_spec("h2") is not None
+        if self.settings.http2 and not http2:
+            logger.debug("HTTP/2 requested for %s but h2 is not installed; using HTTP/1.1", origin)
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            http2=http2,
+            timeout=self.settings.timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+                keepalive_expiry=self.settings.keepalive_expiry_seconds,
+            ),
+        )
+        self.breaker = CircuitBreaker(self.settings.failure_threshold, self.settings.reset_timeout_seconds)
+        self._inflight: dict[tuple[Any, ...], asyncio.Future[httpx.Response]] = {}
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _send_once(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        # Only one request is let through while half-open, so this one is the probe.
+        is_probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        if not self.breaker.allow_request():
+            _observe(self.name, method, "circuit_open", 0.0)
+            raise CircuitOpenError(f"Circuit open for upstream {self.name}")
+        # Dispatch through the verb methods (client.get/client.post/...) rather than
+        # client.request so existing tests patching httpx.AsyncClient.get keep working.
+        sender = getattr(self._client, method.lower())
+        started = time.perf_counter()
+        try:
+            response: httpx.Response = await sender(url, **kwargs)
+        except httpx.RequestError:
+            self.breaker.record_failure()
+            _observe(self.name, method, "transport_error", time.perf_counter() - started)
+            raise
+        except asyncio.CancelledError:
+            # A cancelled probe (e.g. a hedge loser) must not leave the breaker stuck
+            # half-open; other requests cancelled meanwhile say nothing about health.
+            if is_probe:
+                self.breaker.record_failure()
+            raise
+        elapsed = time.perf_counter() - started
+        if _is_retryable_status(response.status_code):
+            self.breaker.record_failure()
+            _observe(self.name, method, "http_5xx", elapsed)
+        else:
+            self.breaker.record_success()
+            _observe(self.name, method, "ok", elapsed)
+        return response
+
+    async def _send_hedged(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        hedge_after = self.settings.hedge_after_seconds
+        if hedge_after <= 0:
+            return await self._send_once(method, url, **kwargs)
+        first = asyncio.ensure_future(self._send_once(method, url, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+        second = asyncio.ensure_future(self._send_once(method, url, **kwargs))
+        pending = {first, second}
+        last_exc: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        return task.result()
+                    last_exc = exc
+        finally:
+            for task in pending:
+                task.cancel()
+        assert last_exc is not None
+        raise last_exc
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        *,
+        attempts: int = 1,
+        base_delay_seconds: float = 0.25,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send with retries on transport errors and 5xx; the final response is returned as-is."""
+        method = method.upper()
+        hedge = method == "GET"
+        for attempt in range(1, max(1, attempts) + 1):
+            try:
+                if hedge:
+                    response = await self._send_hedged(method, url, **kwargs)
+                else:
+                    response = await self._send_once(method, url, **kwargs)
+            except CircuitOpenError:
+                raise
+            except httpx.RequestError:
+                if attempt >= attempts:
+                    raise
+            else:
+                if attempt >= attempts or not _is_retryable_status(response.status_code):
+                    return response
+            await self._backoff(attempt, base_delay_seconds)
+        raise AssertionError("unreachable")
+
+    async def _backoff(self, attempt: int, base_delay_seconds: float) -> None:
+        cap = min(self.settings.max_backoff_seconds, base_delay_seconds * (2 ** (attempt - 1)))
+        await asyncio.sleep(random.uniform(0, cap))
+
+    async def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        params: Any = None,
+        timeout: float | None = None,
+        attempts: int = 1,
+        base_delay_seconds: float = 0.25,
+        coalesce: bool = True,
+    ) -> httpx.Response:
+        kwargs: dict[str, Any] = {"headers": headers, "params": params}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if not coalesce:
+            return await self.send("GET", url, attempts=attempts, base_delay_seconds=base_delay_seconds, **kwargs)
+
+        key = _coalesce_key(url, params, headers)
+        while (existing := self._inflight.get(key)) is not None:
+            if prometheus_available:
+                UPSTREAM_COALESCED_TOTAL.labels(upstream=self.name).inc()
+            try:
+                return await asyncio.shield(existing)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client went away), not us:
+                # start over, joining a newer request or becoming the leader.
+                task = asyncio.current_task()
+                if not existing.cancelled() or (task is not None and task.cancelling()):
+                    raise
+
+        future: asyncio.Future[httpx.Response] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self.send("GET", url, attempts=attempts, base_delay_seconds=base_delay_seconds, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a failure nobody joined does not log "never retrieved".
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    async def post(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        params: Any = None,
+        timeout: float | None = None,
+        attempts: int = 1,
+        base_delay_seconds: float = 0.25,
+    ) -> httpx.Response:
+        kwargs: dict[str, Any] = {"headers": headers, "json": json, "params": params}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await self.send("POST", url, attempts=attempts, base_delay_seconds=base_delay_seconds, **kwargs)
+
+
+_registry: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, UpstreamClient]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_upstream_client(url: str, settings: UpstreamSettings | None = None) -> UpstreamClient:
+    """Return the shared client for ``url``'s origin on the running event loop."""
+    loop = asyncio.get_running_loop()
+    origin = upstream_origin(url)
+    clients = _registry.setdefault(loop, {})
+    client = clients.get(origin)
+    if client is None or client.is_closed:
+        client = UpstreamClient(origin, settings)
+        clients[origin] = client
+    return client
+
+
+async def aclose_upstream_clients() -> None:
+    """Close every pooled client on the running loop (call from app shutdown)."""
+    loop = asyncio.get_running_loop()
+    clients = _registry.pop(loop, {})
+    await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
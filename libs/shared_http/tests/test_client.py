@@ -0,0 +1,216 @@
+"""Tests for the pooled inter-service HTTP client."""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from libs.shared_http.client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamClient,
+    UpstreamSettings,
+    aclose_upstream_clients,
+    get_upstream_client,
+    upstream_origin,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _settings(**overrides) -> UpstreamSettings:
+    base = dict(failure_threshold=3, reset_timeout_seconds=30.0, hedge_after_seconds=0.0)
+    base.update(overrides)
+    return UpstreamSettings(**base)
+
+
+def test_upstream_origin_normalises_scheme_host_and_port():
+    assert upstream_origin("http://Tax-Engine:80/calculate?x=1") == "http://tax-engine:80"
+    with pytest.raises(ValueError):
+        upstream_origin("/relative/path")
+
+
+def test_circuit_breaker_opens_then_half_opens_with_single_probe():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=10.0, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one probe at a time
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 20.0
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_get_retries_5xx_then_succeeds():
+    calls = {"n": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        if calls["n"] < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        client = UpstreamClient("http://svc", _settings(), transport=httpx.MockTransport(handler))
+        try:
+            response = await client.get("http://svc/x", attempts=3, base_delay_seconds=0.0)
+        finally:
+            await client.aclose()
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert calls["n"] == 3
+
+
+def test_breaker_fails_fast_without_network_when_open():
+    calls = {"n": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        raise httpx.ConnectError("refused", request=request)
+
+    async def run():
+        client = UpstreamClient("http://svc", _settings(failure_threshold=2), transport=httpx.MockTransport(handler))
+        try:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://svc/x", attempts=2, base_delay_seconds=0.0)
+            with pytest.raises(CircuitOpenError):
+                await client.get("http://svc/x", attempts=3, base_delay_seconds=0.0)
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert calls["n"] == 2
+
+
+def test_identical_inflight_gets_are_coalesced():
+    calls = {"n": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"n": calls["n"]})
+
+    async def run():
+        client = UpstreamClient("http://svc", _settings(), transport=httpx.MockTransport(handler))
+        try:
+            same = [client.get("http://svc/x", params={"a": "1"}, headers={"Authorization": "Bearer t"}) for _ in range(5)]
+            other_user = client.get("http://svc/x", params={"a": "1"}, headers={"Authorization": "Bearer u"})
+            return await asyncio.gather(*same, other_user)
+        finally:
+            await client.aclose()
+
+    responses = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+    assert calls["n"] == 2  # one per distinct (url, params, headers)
+
+
+def test_cancelled_leader_does_not_cancel_joined_gets():
+    calls = {"n": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"n": calls["n"]})
+
+    async def run():
+        client = UpstreamClient("http://svc", _settings(), transport=httpx.MockTransport(handler))
+        try:
+            leader = asyncio.create_task(client.get("http://svc/x"))
+            await asyncio.sleep(0.01)
+            joiners = [asyncio.create_task(client.get("http://svc/x")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            responses = await asyncio.gather(*joiners)
+            assert leader.cancelled()
+            return responses
+        finally:
+            await client.aclose()
+
+    responses = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert calls["n"] == 2  # the cancelled leader's request, then one retry shared by the joiners
+
+
+def test_cancelling_a_non_probe_request_does_not_reopen_breaker():
+    clock = _Clock()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    async def run():
+        client = UpstreamClient("http://svc", _settings(), transport=httpx.MockTransport(handler))
+        client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30.0, clock=clock)
+        try:
+            started_closed = asyncio.create_task(client.get("http://svc/slow", coalesce=False))
+            await asyncio.sleep(0.01)
+            client.breaker.record_failure()
+            clock.now = 31.0
+            assert client.breaker.state == CircuitBreaker.HALF_OPEN
+            started_closed.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await started_closed
+            # The probe slot is still free: the cancelled request was not the probe.
+            assert client.breaker.state == CircuitBreaker.HALF_OPEN
+            assert client.breaker.allow_request()
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_hedged_get_returns_faster_attempt():
+    calls = {"n": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        if calls["n"] == 1:
+            await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"attempt": "slow"})
+        return httpx.Response(200, json={"attempt": "hedge"})
+
+    async def run():
+        client = UpstreamClient("http://svc", _settings(hedge_after_seconds=0.01), transport=httpx.MockTransport(handler))
+        try:
+            return await client.get("http://svc/x")
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(run())
+    assert response.json() == {"attempt": "hedge"}
+
+
+def test_registry_reuses_client_per_origin_within_loop():
+    async def run():
+        a = get_upstream_client("http://svc:80/a")
+        b = get_upstream_client("http://svc:80/b?q=1")
+        c = get_upstream_client("http://other:80/a")
+        await aclose_upstream_clients()
+        return a, b, c
+
+    a, b, c = asyncio.run(run())
+    assert a is b
+    assert a is not c
+    assert a.is_closed
@@ -0,0 +1 @@
+"""Versioned tax-rule documents and change notifications between services."""
@@ -0,0 +1,190 @@
+"""Content-hashed rule documents, conditional fetch and push invalidation.
+
+regulatory-service serialises each tax year's rules once into a
+``RulesDocument``: immutable JSON bytes plus a version that is the SHA-256 of
+the canonical (sorted-key) JSON. The version doubles as the strong ETag, so
+consumers revalidate with ``If-None-Match`` and get an empty 304 when nothing
+changed.
+
+When a rule file is (re)loaded with a new version, regulatory-service publishes
+``{"tax_year": ..., "version": ...}`` on ``RULES_CHANGED_CHANNEL``. Consumers
+run a ``RulesChangeListener`` and drop their compiled copy for that year, so in
+steady state they serve rules from memory without any network I/O.
+
+Redis is optional on both sides: without a URL nothing is published and
+consumers fall back to time-based revalidation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+RULES_CHANGED_CHANNEL = os.getenv("RULES_CHANGED_CHANNEL", "regulatory:rules:changed")
+RULES_VERSION_HEADER = "X-Rules-Version"
+
+
+def canonical_json(data: Any) -> bytes:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def rules_version(data: Any) -> str:
+    """Content hash of a rules document; independent of key order and whitespace."""
+    return hashlib.sha256(canonical_json(data)).hexdigest()[:20]
+
+
+def quote_etag(version: str) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` evaluation (weak comparison, RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in if_none_match.split(","))
+
+
+@dataclass(frozen=True)
+class RulesDocument:
+    tax_year: str
+    version: str
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        return quote_etag(self.version)
+
+    @classmethod
+    def from_rules(cls, tax_year: str, data: Mapping[str, Any]) -> "RulesDocument":
+        body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return cls(tax_year=tax_year, version=rules_version(data), body=body)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only deep copy: dicts become mapping proxies, lists tuples, sets frozensets."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def _redis_from_url(url: str) -> Any:
+    import redis.asyncio as redis  # type: ignore[import]
+
+    return redis.from_url(url, decode_responses=True)
+
+
+class RulesChangePublisher:
+    """Publishes rule version changes; a no-op when no Redis URL is configured."""
+
+    def __init__(self, redis_url: str, *, channel: str = RULES_CHANGED_CHANNEL):
+        self.redis_url = redis_url
+        self.channel = channel
+        self._redis: Any = None
+
+    async def publish(self, tax_year: str, version: str) -> int:
+        if not self.redis_url:
+            return 0
+        if self._redis is None:
+            self._redis = _redis_from_url(self.redis_url)
+        message = json.dumps({"tax_year": tax_year, "version": version})
+        try:
+            return int(await self._redis.publish(self.channel, message) or 0)
+        except Exception as exc:
+            logger.warning("rules change for %s not published (%s)", tax_year, exc)
+            return 0
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+class RulesChangeListener:
+    """Background subscriber calling ``on_change(tax_year, version)`` for every notification.
+
+    Reconnects with backoff if Redis goes away; ``on_reconnect`` is called after a
+    (re)subscription so the consumer can drop anything it may have missed.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        on_change: Callable[[str, str], None],
+        *,
+        on_reconnect: Optional[Callable[[], None]] = None,
+        channel: str = RULES_CHANGED_CHANNEL,
+        max_backoff_seconds: float = 30.0,
+    ):
+        self.redis_url = redis_url
+        self.on_change = on_change
+        self.on_reconnect = on_reconnect
+        self.channel = channel
+        self.max_backoff_seconds = max_backoff_seconds
+        self.subscribed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.redis_url and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.subscribed = False
+
+    def handle_message(self, data: Any) -> None:
+        try:
+            payload = json.loads(data)
+            tax_year, version = str(payload["tax_year"]), str(payload["version"])
+        except (TypeError, ValueError, KeyError) as exc:
+            logger.warning("ignoring malformed rules change message %r (%s)", data, exc)
+            return
+        self.on_change(tax_year, version)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            client = _redis_from_url(self.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self.subscribed = True
+                backoff = 1.0
+                if self.on_reconnect is not None:
+                    self.on_reconnect()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle_message(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("rules change subscription lost (%s); retrying in %.0fs", exc, backoff)
+            finally:
+                self.subscribed = False
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff_seconds)
@@ -0,0 +1 @@
+"""Shared async SQLite access layer for services with local state."""
@@ -0,0 +1,260 @@
+"""Async access to a local SQLite file for services that keep small state on disk.
+
+``SQLiteStore`` keeps long-lived connections instead of opening one per call:
+
+* the database runs in WAL mode, so readers never block the writer or each other;
+* reads run concurrently on a small pool of reader connections in worker threads;
+* writes are queued to one writer thread, which drains the queue and commits
+  everything it picked up in a single transaction (group commit). Each queued
+  write runs inside its own SAVEPOINT, so one failing write is rolled back and
+  reported to its caller without affecting the rest of the batch.
+
+Async callers use ``read``/``write`` (or the ``fetchone``/``fetchall``/``execute``
+shortcuts); code already running in a worker thread can use the ``*_sync``
+variants. A write's awaitable resolves only after its batch has committed, so a
+read issued afterwards always sees it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+SQLFunction = Callable[[sqlite3.Connection], T]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+SQLITE_READERS = _env_int("SHARED_SQLITE_READERS", 4)
+SQLITE_WRITE_BATCH = _env_int("SHARED_SQLITE_WRITE_BATCH", 64)
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SHARED_SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+_STOP = object()
+
+
+class SQLiteStore:
+    """One SQLite database with a single writer thread and a pool of readers."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        readers: int = SQLITE_READERS,
+        max_batch: int = SQLITE_WRITE_BATCH,
+        busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS,
+    ):
+        self.path = path
+        self.max_batch = max(max_batch, 1)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.commits = 0
+        self.writes = 0
+        # ":memory:" would give every connection its own database; share one instead.
+        self._memory = path == ":memory:"
+        self._target = f"file:shared-sqlite-{uuid.uuid4().hex}?mode=memory&cache=shared" if self._memory else path
+
+        self._closed = False
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writer_conn = self._open()
+        self._reader_local = threading.local()
+        self._readers = ThreadPoolExecutor(max_workers=max(readers, 1), thread_name_prefix="sqlite-read")
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-write", daemon=True)
+        self._writer.start()
+
+    # --- connections ---
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._target,
+            uri=self._memory,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,  # transactions are managed explicitly
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        if not self._memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _reader_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._reader_local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._reader_local.conn = conn
+        return conn
+
+    # --- writer ---
+
+    def _write_loop(self) -> None:
+        conn = self._writer_conn
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                batch.append(item)
+            try:
+                self._apply(conn, batch)
+            except BaseException as exc:  # noqa: BLE001 - keep the writer alive for later batches
+                logger.exception("sqlite write batch failed (%s writes)", len(batch))
+                if conn.in_transaction:
+                    try:
+                        conn.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+                for _, future in batch:
+                    self._fail(future, exc)
+
+    @staticmethod
+    def _fail(future: Future, exc: BaseException) -> None:
+        """Fail *future* unless it is already resolved or its caller cancelled it."""
+        if future.done():
+            return
+        if future.running() or future.set_running_or_notify_cancel():
+            future.set_exception(exc)
+
+    def _apply(self, conn: sqlite3.Connection, batch: list[tuple[SQLFunction, Future]]) -> None:
+        outcomes: list[tuple[Future, bool, Any]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as exc:
+            for _, future in batch:
+                self._fail(future, exc)
+            return
+        for fn, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT shared_sqlite_write")
+            try:
+                result = fn(conn)
+            except BaseException as exc:  # noqa: BLE001 - handed back to the caller
+                conn.execute("ROLLBACK TO shared_sqlite_write")
+                conn.execute("RELEASE shared_sqlite_write")
+                outcomes.append((future, False, exc))
+            else:
+                conn.execute("RELEASE shared_sqlite_write")
+                outcomes.append((future, True, result))
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.warning("sqlite batch commit failed (%s writes): %s", len(batch), exc)
+            conn.execute("ROLLBACK")
+            outcomes = [(future, False, exc if ok else value) for future, ok, value in outcomes]
+        else:
+            self.commits += 1
+            self.writes += len(outcomes)
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    # --- public API ---
+
+    def submit_write(self, fn: SQLFunction) -> "Future[T]":
+        if self._closed:
+            raise RuntimeError("SQLiteStore is closed")
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def submit_read(self, fn: SQLFunction) -> "Future[T]":
+        if self._closed:
+            raise RuntimeError("SQLiteStore is closed")
+        return self._readers.submit(lambda: fn(self._reader_conn()))
+
+    async def write(self, fn: SQLFunction) -> T:
+        """Run *fn(conn)* on the writer inside the next batch; it must not commit itself."""
+        return await asyncio.wrap_future(self.submit_write(fn))
+
+    async def read(self, fn: SQLFunction) -> T:
+        """Run *fn(conn)* on a reader connection; sees every write that has already resolved."""
+        return await asyncio.wrap_future(self.submit_read(fn))
+
+    def write_sync(self, fn: SQLFunction) -> T:
+        return self.submit_write(fn).result()
+
+    def read_sync(self, fn: SQLFunction) -> T:
+        return self.submit_read(fn).result()
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Write statement; returns the affected row count."""
+        return await self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Row | None:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> list[sqlite3.Row]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout=5)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+class SQLiteStoreHandle:
+    """Lazily opens the store for a path resolved at call time.
+
+    Services read their database path from a module constant that tests repoint;
+    the handle reopens the store whenever that path changes.
+    """
+
+    def __init__(self, resolve_path: Callable[[], str], **store_kwargs: Any):
+        self._resolve_path = resolve_path
+        self._store_kwargs = store_kwargs
+        self._store: SQLiteStore | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> SQLiteStore:
+        path = self._resolve_path()
+        store = self._store
+        if store is not None and store.path == path:
+            return store
+        with self._lock:
+            if self._store is None or self._store.path != path:
+                if self._store is not None:
+                    self._store.close()
+                self._store = SQLiteStore(path, **self._store_kwargs)
+            return self._store
+
+    def close(self) -> None:
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
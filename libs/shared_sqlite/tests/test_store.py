@@ -0,0 +1,135 @@
+"""Tests for the shared WAL-mode SQLite store."""
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from libs.shared_sqlite.store import SQLiteStore, SQLiteStoreHandle
+
+
+def _store(tmp_path, **kwargs) -> SQLiteStore:
+    store = SQLiteStore(str(tmp_path / "store.db"), **kwargs)
+    store.write_sync(lambda conn: conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)"))
+    return store
+
+
+def test_uses_wal_and_reads_see_committed_writes(tmp_path):
+    store = _store(tmp_path)
+
+    async def scenario():
+        await store.execute("INSERT INTO items (name) VALUES (?)", ("a",))
+        return await store.fetchall("SELECT name FROM items")
+
+    rows = asyncio.run(scenario())
+    mode = store.read_sync(lambda conn: conn.execute("PRAGMA journal_mode").fetchone()[0])
+    store.close()
+
+    assert [row["name"] for row in rows] == ["a"]
+    assert mode == "wal"
+
+
+def test_concurrent_writes_are_group_committed_and_failures_isolated(tmp_path):
+    store = _store(tmp_path)
+    gate = threading.Event()
+    # Hold the writer so the following writes queue up and land in one batch.
+    blocker = store.submit_write(lambda conn: gate.wait(5))
+
+    async def scenario():
+        writes = [store.execute("INSERT INTO items (name) VALUES (?)", (f"item-{n}",)) for n in range(50)]
+        writes.append(store.execute("INSERT INTO items (name) VALUES (?)", ("item-0",)))  # duplicate
+        tasks = [asyncio.ensure_future(write) for write in writes]
+        await asyncio.sleep(0.05)
+        commits_before = store.commits
+        gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        count = await store.fetchone("SELECT COUNT(*) AS n FROM items")
+        return results, store.commits - commits_before, count["n"]
+
+    results, commits, count = asyncio.run(scenario())
+    blocker.result()
+    store.close()
+
+    assert count == 50
+    assert isinstance(results[-1], sqlite3.IntegrityError)
+    assert all(result == 1 for result in results[:-1])
+    assert commits <= 2
+
+
+def test_reads_run_concurrently_with_a_pending_write(tmp_path):
+    store = _store(tmp_path, readers=4)
+    store.write_sync(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('seed')"))
+    gate = threading.Event()
+    pending = store.submit_write(lambda conn: (conn.execute("INSERT INTO items (name) VALUES ('late')"), gate.wait(5)))
+
+    async def scenario():
+        return await asyncio.gather(*(store.fetchall("SELECT name FROM items") for _ in range(20)))
+
+    reads = asyncio.run(asyncio.wait_for(scenario(), timeout=2))
+    gate.set()
+    pending.result()
+    store.close()
+
+    # Readers are not blocked by the open write transaction and do not see it.
+    assert all([row["name"] for row in rows] == ["seed"] for rows in reads)
+
+
+def test_handle_reopens_when_path_changes(tmp_path):
+    paths = {"current": str(tmp_path / "one.db")}
+    handle = SQLiteStoreHandle(lambda: paths["current"])
+    first = handle()
+    assert handle() is first
+    paths["current"] = str(tmp_path / "two.db")
+    second = handle()
+    handle.close()
+
+    assert second is not first
+    with pytest.raises(RuntimeError):
+        first.submit_read(lambda conn: None)
+
+
+def test_failed_begin_skips_cancelled_writes_and_writer_survives(tmp_path):
+    store = _store(tmp_path, busy_timeout_ms=50)
+    other = sqlite3.connect(str(tmp_path / "store.db"), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # the writer's BEGIN IMMEDIATE will time out
+
+    cancelled = store.submit_write(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('gone')"))
+    cancelled.cancel()
+    locked = store.submit_write(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('locked')"))
+    with pytest.raises(sqlite3.OperationalError):
+        locked.result(timeout=2)
+    other.execute("ROLLBACK")
+    other.close()
+
+    store.submit_write(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('after')")).result(timeout=2)
+    names = store.read_sync(lambda conn: [row["name"] for row in conn.execute("SELECT name FROM items")])
+    store.close()
+
+    assert cancelled.cancelled()
+    assert names == ["after"]
+
+
+def test_unexpected_batch_error_fails_the_batch_not_the_writer(tmp_path):
+    store = _store(tmp_path)
+    apply = store._apply
+    calls = {"n": 0}
+
+    def flaky_apply(conn, batch):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("writer bug")
+        apply(conn, batch)
+
+    store._apply = flaky_apply  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError, match="writer bug"):
+        store.write_sync(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('lost')"))
+
+    store.submit_write(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('kept')")).result(timeout=2)
+    names = store.read_sync(lambda conn: [row["name"] for row in conn.execute("SELECT name FROM items")])
+    store.close()
+
+    assert names == ["kept"]
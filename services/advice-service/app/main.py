@@ -26,6 +26,7 @@ for parent in Path(__file__).resolve().parents:
         break
 
 from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies
+from libs.shared_http.client import aclose_upstream_clients
 from libs.shared_http.retry import get_json_with_retry
 
 get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
@@ -36,6 +37,12 @@ app = FastAPI(
     version="1.0.0",
 )
 
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -22,6 +22,7 @@ for parent in Path(__file__).resolve().parents:
         break
 
 from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies
+from libs.shared_http.client import aclose_upstream_clients
 from libs.shared_http.retry import get_json_with_retry, post_json_with_retry
 
 DOCUMENTS_REVIEW_QUEUE_URL = os.getenv(
@@ -78,6 +79,11 @@ app = FastAPI(
 )
 
 
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
+
+
 AgentIntent = Literal[
     "readiness_check",
     "ocr_review_assist",
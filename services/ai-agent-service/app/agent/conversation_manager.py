@@ -77,14 +77,10 @@ class ConversationManager:
     ) -> Dict[str, Any]:
         """Get comprehensive conversation context for user"""
 
-        # Get user profile and preferences
-        user_profile = await self.memory_manager.get_user_profile(user_id)  # type: ignore
-
-        # Get recent conversation history
-        recent_conversations = await self.memory_manager.get_recent_conversations(user_id, limit=5)  # type: ignore
-
-        # Get financial context
-        financial_context = await self.memory_manager.get_financial_context(user_id)  # type: ignore
+        # Get user profile, recent conversation history and financial context in one round trip
+        user_profile, recent_conversations, financial_context = (
+            await self.memory_manager.load_turn_context(user_id, history_limit=5)  # type: ignore
+        )
 
         # Determine conversation type
         conversation_type = self._determine_conversation_type(
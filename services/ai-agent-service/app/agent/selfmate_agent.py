@@ -196,10 +196,10 @@ class SelfMateAgent:
         start_time = datetime.now(timezone.utc)
 
         try:
-            # Load user context and history
-            user_profile = await self.memory_manager.get_user_profile(user_id)
-            conversation_history = await self.memory_manager.get_recent_conversations(user_id, limit=10)
-            financial_context = await self.memory_manager.get_financial_context(user_id)
+            # Load user context and history (single pipelined Redis round trip)
+            user_profile, conversation_history, financial_context = (
+                await self.memory_manager.load_turn_context(user_id, history_limit=10)
+            )
 
             # Analyze message intent and extract requirements
             intent = await self._analyze_message_intent(message, language=language, context=context)
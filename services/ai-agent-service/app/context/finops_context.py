@@ -41,19 +41,24 @@ def _current_quarter_key(user_id: str) -> str:
     return f"mtd:quarterly:{user_id}:{ty}:{q}"
 
 
-async def get_finops_context(redis_client: Any, user_id: str) -> dict:
-    """
-    Return a merged financial context dict for *user_id* from FinOps Monitor Redis cache.
+def _decode_hash(raw: Any) -> dict[str, Any]:
+    """Normalise an HGETALL reply (bytes keys/values without decode_responses)."""
+    out: dict[str, Any] = {}
+    for key, value in (raw or {}).items():
+        k = key.decode() if isinstance(key, bytes) else key
+        out[k] = value.decode() if isinstance(value, bytes) else value
+    return out
 
-    Falls back gracefully on any Redis error (returns empty sub-dicts).
-    """
-    try:
-        balance_raw  = await redis_client.hgetall(f"finops:balance:{user_id}") or {}
-        mtd_raw      = await redis_client.hgetall(_current_quarter_key(user_id)) or {}
-    except Exception as exc:
-        log.warning("FinOps Redis read failed for %s: %s", user_id, exc)
-        balance_raw = {}
-        mtd_raw     = {}
+
+def finops_context_keys(user_id: str) -> tuple[str, str]:
+    """Redis hash keys read for *user_id*: (balance, current MTD quarter)."""
+    return f"finops:balance:{user_id}", _current_quarter_key(user_id)
+
+
+def build_finops_context(balance_raw: Any, mtd_raw: Any) -> dict:
+    """Build the merged context dict from already-fetched balance and MTD hashes."""
+    balance_raw = _decode_hash(balance_raw)
+    mtd_raw = _decode_hash(mtd_raw)
 
     income   = float(mtd_raw.get("income",   0))
     expenses = float(mtd_raw.get("expenses", 0))
@@ -75,3 +80,24 @@ async def get_finops_context(redis_client: Any, user_id: str) -> dict:
         },
         "fetched_at": datetime.now(timezone.utc).isoformat(),
     }
+
+
+async def get_finops_context(redis_client: Any, user_id: str) -> dict:
+    """
+    Return a merged financial context dict for *user_id* from FinOps Monitor Redis cache.
+
+    Both hashes are read in a single pipelined round trip.
+    Falls back gracefully on any Redis error (returns empty sub-dicts).
+    """
+    balance_key, mtd_key = finops_context_keys(user_id)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hgetall(balance_key)
+        pipe.hgetall(mtd_key)
+        balance_raw, mtd_raw = await pipe.execute()
+    except Exception as exc:
+        log.warning("FinOps Redis read failed for %s: %s", user_id, exc)
+        balance_raw = {}
+        mtd_raw     = {}
+
+    return build_finops_context(balance_raw, mtd_raw)
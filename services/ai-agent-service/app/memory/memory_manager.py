@@ -3,15 +3,55 @@ Memory Manager for SelfMate AI Agent
 
 Handles short-term and long-term memory, user context, and conversation history.
 Integrates with Redis for fast access and Weaviate for semantic search.
+
+Redis access is batched: a chat turn loads profile, history and financial context
+in one pipelined round trip, writes go through MULTI/EXEC pipelines, and every
+per-user key is recorded in a sorted-set index (score = expiry) so cache
+invalidation never has to walk the keyspace.
 """
 
 import hashlib
-import json
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import redis.asyncio as redis
 
+from ..context.finops_context import build_finops_context, finops_context_keys
+
+PROFILE_TTL_SECONDS = 86400
+FINANCIAL_TTL_SECONDS = 300
+FINANCIAL_UPDATE_TTL_SECONDS = 3600
+SESSION_TTL_SECONDS = 3600
+CONVERSATION_HISTORY_LIMIT = 50
+# The index is refreshed on every write and outlives the longest-lived entry it tracks.
+INDEX_TTL_SECONDS = max(PROFILE_TTL_SECONDS, FINANCIAL_UPDATE_TTL_SECONDS, SESSION_TTL_SECONDS)
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
+
+
+def _loads(raw: Any) -> Any:
+    return orjson.loads(raw)
+
+
+def _profile_key(user_id: str) -> str:
+    return f"profile:{user_id}"
+
+
+def _financial_key(user_id: str) -> str:
+    return f"financial:{user_id}"
+
+
+def _conversations_key(user_id: str) -> str:
+    return f"conversations:{user_id}"
+
+
+def _index_key(user_id: str) -> str:
+    return f"memory:index:{user_id}"
+
 # Weaviate availability check
 weaviate_available = False
 weaviate: Any = None
@@ -194,6 +234,115 @@ class MemoryManager:
         except Exception as e:
             print(f"⚠️ Schema creation warning: {e}")
 
+    # --- Batched Redis helpers ---
+
+    @staticmethod
+    def _index_write(pipe: Any, user_id: str, key: str, ttl_seconds: int) -> None:
+        """Queue index maintenance for an expiring per-user key onto *pipe*."""
+        now = time.time()
+        index_key = _index_key(user_id)
+        pipe.zadd(index_key, {key: now + ttl_seconds})
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        pipe.expire(index_key, INDEX_TTL_SECONDS)
+
+    def _setex_indexed(self, pipe: Any, user_id: str, key: str, ttl_seconds: int, value: Any) -> None:
+        pipe.setex(key, ttl_seconds, _dumps(value))
+        self._index_write(pipe, user_id, key, ttl_seconds)
+
+    @staticmethod
+    def _default_profile(user_id: str) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "user_id": user_id,
+            "business_type": "Self-employed",
+            "annual_revenue": 50000,
+            "concerns": ["tax_optimization", "cash_flow"],
+            "preferences": {
+                "communication_style": "professional",
+                "risk_tolerance": "moderate",
+                "goals": ["grow_revenue", "optimize_taxes"]
+            },
+            "created_at": now,
+            "last_updated": now
+        }
+
+    @staticmethod
+    def _financial_from_finops(user_id: str, finops: Dict[str, Any]) -> Dict[str, Any]:
+        balance  = finops.get("balance", 0.0)
+        mtd      = finops.get("mtd", {})
+        income   = mtd.get("income", 0.0)
+        expenses = mtd.get("expenses", 0.0)
+        profit   = mtd.get("net_profit", 0.0)
+
+        return {
+            "user_id":             user_id,
+            "current_balance":     balance,
+            "monthly_revenue":     income,
+            "monthly_expenses":    expenses,
+            "monthly_profit":      profit,
+            "outstanding_invoices": 0.0,   # populated by invoice_monitor alerts
+            "mtd":                 mtd,
+            "finops_source":       finops.get("source", "unknown"),
+            "metrics": {
+                "profit_margin":         round(profit / income, 4) if income > 0 else 0.0,
+                "mtd_required":          mtd.get("mtd_required", False),
+                "mtd_status":            mtd.get("status", "accumulating"),
+            },
+            "last_updated": finops.get("fetched_at"),
+        }
+
+    async def load_turn_context(
+        self, user_id: str, history_limit: int = 10
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Load (profile, recent conversations, financial context) for a chat turn.
+
+        All reads, including the FinOps Monitor hashes needed on a financial cache
+        miss, go out in one pipelined round trip; cache fills for missing entries
+        are written back in a second pipeline only when something was missing.
+        """
+        if not self.redis_client:
+            return {}, [], {}
+
+        balance_key, mtd_key = finops_context_keys(user_id)
+        try:
+            read = self.redis_client.pipeline(transaction=False)
+            read.get(_profile_key(user_id))
+            read.lrange(_conversations_key(user_id), 0, history_limit - 1)
+            read.get(_financial_key(user_id))
+            read.hgetall(balance_key)
+            read.hgetall(mtd_key)
+            profile_raw, history_raw, financial_raw, balance_raw, mtd_raw = await read.execute()
+        except Exception as e:
+            print(f"❌ Error loading turn context: {e}")
+            return {"user_id": user_id}, [], {}
+
+        conversations = [_loads(item) for item in history_raw or []]
+        fill = self.redis_client.pipeline(transaction=True)
+        needs_fill = False
+
+        if profile_raw:
+            profile = _loads(profile_raw)
+        else:
+            profile = self._default_profile(user_id)
+            self._setex_indexed(fill, user_id, _profile_key(user_id), PROFILE_TTL_SECONDS, profile)
+            needs_fill = True
+
+        if financial_raw:
+            financial = _loads(financial_raw)
+        else:
+            financial = self._financial_from_finops(user_id, build_finops_context(balance_raw, mtd_raw))
+            self._setex_indexed(fill, user_id, _financial_key(user_id), FINANCIAL_TTL_SECONDS, financial)
+            needs_fill = True
+
+        if needs_fill:
+            try:
+                await fill.execute()
+            except Exception as e:
+                print(f"❌ Error caching turn context: {e}")
+
+        return profile, conversations, financial
+
     # --- User Profile Management ---
 
     async def get_user_profile(self, user_id: str) -> Dict[str, Any]:
@@ -203,31 +352,15 @@ class MemoryManager:
 
         try:
             # Try Redis cache first
-            cached_profile = cast(Optional[str], await self.redis_client.get(f"profile:{user_id}"))  # type: ignore
+            cached_profile = await self.redis_client.get(_profile_key(user_id))  # type: ignore
             if cached_profile:
-                return json.loads(cached_profile)
-
-            # Fallback to default profile
-            default_profile: Dict[str, Any] = {
-                "user_id": user_id,
-                "business_type": "Self-employed",
-                "annual_revenue": 50000,
-                "concerns": ["tax_optimization", "cash_flow"],
-                "preferences": {
-                    "communication_style": "professional",
-                    "risk_tolerance": "moderate",
-                    "goals": ["grow_revenue", "optimize_taxes"]
-                },
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
+                return _loads(cached_profile)
 
-            # Cache for 24 hours
-            await self.redis_client.setex(  # type: ignore
-                f"profile:{user_id}",
-                86400,
-                json.dumps(default_profile)
-            )
+            # Fallback to default profile, cached for 24 hours
+            default_profile = self._default_profile(user_id)
+            pipe = self.redis_client.pipeline(transaction=True)
+            self._setex_indexed(pipe, user_id, _profile_key(user_id), PROFILE_TTL_SECONDS, default_profile)
+            await pipe.execute()
 
             return default_profile
 
@@ -244,11 +377,9 @@ class MemoryManager:
             profile_data["last_updated"] = datetime.now(timezone.utc).isoformat()
 
             # Update Redis cache
-            await self.redis_client.setex(  # type: ignore
-                f"profile:{user_id}",
-                86400,
-                json.dumps(profile_data)
-            )
+            pipe = self.redis_client.pipeline(transaction=True)
+            self._setex_indexed(pipe, user_id, _profile_key(user_id), PROFILE_TTL_SECONDS, profile_data)
+            await pipe.execute()
 
             # Store in long-term memory (Weaviate)
             if self.weaviate_client:
@@ -256,8 +387,8 @@ class MemoryManager:
                     data_object={
                         "userId": user_id,
                         "businessType": profile_data.get("business_type", ""),
-                        "preferences": json.dumps(profile_data.get("preferences", {})),
-                        "financialGoals": json.dumps(profile_data.get("goals", [])),
+                        "preferences": _dumps(profile_data.get("preferences", {})).decode(),
+                        "financialGoals": _dumps(profile_data.get("goals", [])).decode(),
                         "riskProfile": profile_data.get("risk_tolerance", "moderate")
                     },
                     class_name="UserProfile",
@@ -280,44 +411,22 @@ class MemoryManager:
             return {}
 
         try:
-            # 1. Try short-lived agent cache (5-min TTL — matches finops-monitor update cadence)
-            cached_context = cast(Optional[str], await self.redis_client.get(f"financial:{user_id}"))  # type: ignore
+            # 1. Short-lived agent cache (5-min TTL — matches finops-monitor update cadence)
+            #    and the FinOps Monitor hashes are read together in one round trip.
+            balance_key, mtd_key = finops_context_keys(user_id)
+            read = self.redis_client.pipeline(transaction=False)
+            read.get(_financial_key(user_id))
+            read.hgetall(balance_key)
+            read.hgetall(mtd_key)
+            cached_context, balance_raw, mtd_raw = await read.execute()
             if cached_context:
-                return json.loads(cached_context)
-
-            # 2. Read live data from FinOps Monitor Redis keys
-            from ..context.finops_context import get_finops_context
-            finops = await get_finops_context(self.redis_client, user_id)
-
-            balance  = finops.get("balance", 0.0)
-            mtd      = finops.get("mtd", {})
-            income   = mtd.get("income", 0.0)
-            expenses = mtd.get("expenses", 0.0)
-            profit   = mtd.get("net_profit", 0.0)
-
-            financial_context: Dict[str, Any] = {
-                "user_id":             user_id,
-                "current_balance":     balance,
-                "monthly_revenue":     income,
-                "monthly_expenses":    expenses,
-                "monthly_profit":      profit,
-                "outstanding_invoices": 0.0,   # populated by invoice_monitor alerts
-                "mtd":                 mtd,
-                "finops_source":       finops.get("source", "unknown"),
-                "metrics": {
-                    "profit_margin":         round(profit / income, 4) if income > 0 else 0.0,
-                    "mtd_required":          mtd.get("mtd_required", False),
-                    "mtd_status":            mtd.get("status", "accumulating"),
-                },
-                "last_updated": finops.get("fetched_at"),
-            }
+                return _loads(cached_context)
 
-            # Cache for 5 minutes
-            await self.redis_client.setex(  # type: ignore
-                f"financial:{user_id}",
-                300,
-                json.dumps(financial_context)
-            )
+            # 2. Build from live FinOps Monitor data and cache for 5 minutes
+            financial_context = self._financial_from_finops(user_id, build_finops_context(balance_raw, mtd_raw))
+            pipe = self.redis_client.pipeline(transaction=True)
+            self._setex_indexed(pipe, user_id, _financial_key(user_id), FINANCIAL_TTL_SECONDS, financial_context)
+            await pipe.execute()
 
             return financial_context
 
@@ -332,11 +441,9 @@ class MemoryManager:
 
         try:
             context["last_updated"] = datetime.now(timezone.utc).isoformat()
-            await self.redis_client.setex(  # type: ignore
-                f"financial:{user_id}",
-                3600,  # 1 hour cache
-                json.dumps(context)
-            )
+            pipe = self.redis_client.pipeline(transaction=True)
+            self._setex_indexed(pipe, user_id, _financial_key(user_id), FINANCIAL_UPDATE_TTL_SECONDS, context)
+            await pipe.execute()
         except Exception as e:
             print(f"❌ Error updating financial context: {e}")
 
@@ -350,7 +457,9 @@ class MemoryManager:
         if not self.redis_client:
             return "en"
         try:
-            lang = cast(Optional[str], await self.redis_client.get(f"user:lang:{user_id}"))  # type: ignore
+            lang = await self.redis_client.get(f"user:lang:{user_id}")  # type: ignore
+            if isinstance(lang, bytes):
+                lang = lang.decode()
             return lang if lang else "en"
         except Exception:
             return "en"
@@ -376,14 +485,13 @@ class MemoryManager:
             return []
 
         try:
-            conversations_result = await self.redis_client.lrange(  # type: ignore
-                f"conversations:{user_id}",
+            conversations = await self.redis_client.lrange(  # type: ignore
+                _conversations_key(user_id),
                 0,
                 limit - 1
             )
-            conversations = cast(List[str], conversations_result)
 
-            return [json.loads(conv) for conv in conversations]
+            return [_loads(conv) for conv in conversations]
 
         except Exception as e:
             print(f"❌ Error getting conversations: {e}")
@@ -409,12 +517,12 @@ class MemoryManager:
                 "metadata": metadata or {}
             }
 
-            # Store in Redis (keep last 50 conversations)
-            self.redis_client.lpush(  # type: ignore
-                f"conversations:{user_id}",
-                json.dumps(conversation)
-            )
-            self.redis_client.ltrim(f"conversations:{user_id}", 0, 49)  # type: ignore
+            # Store in Redis (keep last 50 conversations) atomically in one round trip
+            key = _conversations_key(user_id)
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.lpush(key, _dumps(conversation))
+            pipe.ltrim(key, 0, CONVERSATION_HISTORY_LIMIT - 1)
+            await pipe.execute()
 
             # Store important conversations in Weaviate for semantic search
             if self._is_important_conversation(user_message, agent_response):
@@ -537,9 +645,9 @@ class MemoryManager:
             return
 
         try:
-            self.redis_client.lpush(  # type: ignore
+            await self.redis_client.lpush(  # type: ignore
                 "agent_feedback",
-                json.dumps(feedback_data)
+                _dumps(feedback_data)
             )
 
         except Exception as e:
@@ -552,15 +660,16 @@ class MemoryManager:
         session_id = f"session_{user_id}_{int(datetime.now(timezone.utc).timestamp())}"
 
         if self.redis_client:
-            await self.redis_client.setex(  # type: ignore
+            now = datetime.now(timezone.utc).isoformat()
+            pipe = self.redis_client.pipeline(transaction=True)
+            self._setex_indexed(
+                pipe,
+                user_id,
                 f"session:{session_id}",
-                3600,  # 1 hour session
-                json.dumps({
-                    "user_id": user_id,
-                    "created_at": datetime.now(timezone.utc).isoformat(),
-                    "last_activity": datetime.now(timezone.utc).isoformat()
-                })
+                SESSION_TTL_SECONDS,  # 1 hour session
+                {"user_id": user_id, "created_at": now, "last_activity": now},
             )
+            await pipe.execute()
 
         return session_id
 
@@ -571,7 +680,7 @@ class MemoryManager:
 
         try:
             session_data = await self.redis_client.get(f"session:{session_id}")  # type: ignore
-            return json.loads(session_data) if session_data else None  # type: ignore
+            return _loads(session_data) if session_data else None  # type: ignore
 
         except Exception as e:
             print(f"❌ Error getting session: {e}")
@@ -589,17 +698,18 @@ class MemoryManager:
             return
 
         try:
-            patterns = [
-                f"profile:{user_id}",
-                f"financial:{user_id}",
-                f"conversations:{user_id}",
-                f"session:*{user_id}*"
-            ]
-
-            for pattern in patterns:
-                keys = await self.redis_client.keys(pattern)  # type: ignore
-                if keys:
-                    await self.redis_client.delete(*keys)  # type: ignore
+            # Every per-user key is registered in the index on write, so this is
+            # O(keys for this user) instead of a KEYS scan over the whole keyspace.
+            index_key = _index_key(user_id)
+            indexed = await self.redis_client.zrange(index_key, 0, -1)  # type: ignore
+            keys = {
+                _profile_key(user_id),
+                _financial_key(user_id),
+                _conversations_key(user_id),
+                index_key,
+                *(k.decode() if isinstance(k, bytes) else k for k in indexed),
+            }
+            await self.redis_client.delete(*keys)  # type: ignore
 
         except Exception as e:
             print(f"❌ Error clearing cache: {e}")
@@ -616,7 +726,7 @@ class MemoryManager:
             try:
                 info = await self.redis_client.info()  # type: ignore
                 stats["redis_memory_usage"] = info.get("used_memory_human", "Unknown")  # type: ignore
-                stats["redis_keyspace"] = len(await self.redis_client.keys("*"))  # type: ignore
+                stats["redis_keyspace"] = await self.redis_client.dbsize()  # type: ignore
             except Exception:
                 pass
 
@@ -48,6 +48,11 @@ def mock_memory_manager():
         "current_balance": 5000,
         "monthly_profit": 2000
     })
+    mock_manager.load_turn_context = AsyncMock(return_value=(
+        mock_manager.get_user_profile.return_value,
+        [],
+        mock_manager.get_financial_context.return_value,
+    ))
     mock_manager.store_conversation = AsyncMock(return_value=True)
     mock_manager.create_session = AsyncMock(return_value="test_session_123")
     mock_manager.get_user_language = AsyncMock(return_value="en")
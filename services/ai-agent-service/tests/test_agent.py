@@ -8,6 +8,7 @@ memory integration, and tool usage.
 from typing import Any, Dict
 from unittest.mock import AsyncMock, Mock, patch
 
+import fakeredis
 import pytest
 
 from app.agent.conversation_manager import ConversationManager
@@ -236,9 +237,9 @@ class TestConversationManager:
         """Test getting conversation context"""
         manager = ConversationManager(mock_memory_manager)
 
-        mock_memory_manager.get_user_profile = AsyncMock(return_value={"business_type": "sole_trader"})  # type: ignore
-        mock_memory_manager.get_recent_conversations = AsyncMock(return_value=[])  # type: ignore
-        mock_memory_manager.get_financial_context = AsyncMock(return_value={"balance": 1000})  # type: ignore
+        mock_memory_manager.load_turn_context = AsyncMock(  # type: ignore
+            return_value=({"business_type": "sole_trader"}, [], {"balance": 1000})
+        )
         mock_memory_manager.get_session = AsyncMock(return_value={"turn_count": 0})  # type: ignore
 
         context = await manager.get_conversation_context(test_user_id, test_session_id)
@@ -315,14 +316,8 @@ class TestMemoryManager:
         """Test storing and retrieving user profile"""
         manager = MemoryManager(redis_url="redis://localhost:6379", vector_db_url="http://localhost:8080")
 
-        # Inject a simple in-memory mock redis so no real connection is needed
-        _store: Dict[str, str] = {}
-        mock_redis = AsyncMock()
-        mock_redis.get = AsyncMock(side_effect=lambda key: _store.get(key))
-        mock_redis.setex = AsyncMock(
-            side_effect=lambda key, ttl, val: _store.__setitem__(key, val)
-        )
-        manager.redis_client = mock_redis  # type: ignore
+        # Inject an in-process Redis stand-in so no real connection is needed
+        manager.redis_client = fakeredis.aioredis.FakeRedis()  # type: ignore
 
         profile_data: Dict[str, Any] = {
             "user_id": test_user_id,
@@ -344,6 +339,7 @@ class TestMemoryManager:
     async def test_conversation_storage(self, test_user_id: str):
         """Test conversation storage and retrieval"""
         manager = MemoryManager(redis_url="redis://localhost:6379", vector_db_url="http://localhost:8080")
+        manager.redis_client = fakeredis.aioredis.FakeRedis()  # type: ignore
 
         await manager.store_conversation(  # type: ignore
             user_id=test_user_id,
@@ -354,7 +350,8 @@ class TestMemoryManager:
 
         conversations = await manager.get_recent_conversations(test_user_id, limit=1)  # type: ignore
 
-        assert len(conversations) >= 0  # May be 0 if mock
+        assert len(conversations) == 1
+        assert conversations[0]["user_message"] == "Test message"
 
 
 class TestToolRegistry:
@@ -0,0 +1,121 @@
+"""
+Round-trip benchmark for the MemoryManager Redis layer.
+
+Runs against fakeredis and counts client round trips (single commands plus
+pipeline executions) per chat turn. Run with ``-s`` to see the numbers.
+"""
+
+import time
+from typing import Any
+
+import fakeredis
+import pytest
+
+from app.agent.conversation_manager import ConversationManager
+from app.memory.memory_manager import INDEX_TTL_SECONDS, MemoryManager
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    """FakeRedis that counts network round trips the way a real client would pay them."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.round_trips = 0
+        self.commands: list[str] = []
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        self.round_trips += 1
+        self.commands.append(str(args[0]))
+        return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> Any:
+        pipe = super().pipeline(transaction, shard_hint)
+        original_execute = pipe.execute
+
+        async def execute(raise_on_error: bool = True) -> Any:
+            self.round_trips += 1
+            self.commands.append("PIPELINE")
+            return await original_execute(raise_on_error)
+
+        pipe.execute = execute  # type: ignore[method-assign]
+        return pipe
+
+
+def _manager(redis_client: CountingRedis) -> MemoryManager:
+    manager = MemoryManager(redis_url="redis://localhost:6379", vector_db_url="http://localhost:8080")
+    manager.redis_client = redis_client  # type: ignore
+    return manager
+
+
+async def _chat_turn(conversations: ConversationManager, user_id: str, turn: int) -> None:
+    await conversations.get_conversation_context(user_id)
+    await conversations.memory_manager.store_conversation(
+        user_id=user_id,
+        user_message=f"How much tax do I owe? ({turn})",
+        agent_response="Roughly £1,200 this quarter.",
+    )
+
+
+@pytest.mark.asyncio
+async def test_round_trips_per_chat_turn():
+    redis_client = CountingRedis()
+    conversations = ConversationManager(_manager(redis_client))
+
+    await _chat_turn(conversations, "user-1", 0)
+    cold_trips = redis_client.round_trips
+
+    turns = 200
+    redis_client.round_trips = 0
+    started = time.perf_counter()
+    for turn in range(1, turns + 1):
+        await _chat_turn(conversations, "user-1", turn)
+    elapsed = time.perf_counter() - started
+    warm_trips = redis_client.round_trips / turns
+
+    print(
+        f"\nmemory round trips: cold turn={cold_trips}, warm turn={warm_trips:.2f}, "
+        f"{turns / elapsed:.0f} turns/s on fakeredis"
+    )
+    # Cold: batched read + cache fill + conversation write. Warm: read + write.
+    assert cold_trips == 3
+    assert warm_trips == 2
+    history = await conversations.memory_manager.get_recent_conversations("user-1", limit=100)
+    assert len(history) == 50  # trimmed atomically with every push
+
+
+@pytest.mark.asyncio
+async def test_writes_are_awaited_and_feedback_persisted():
+    redis_client = CountingRedis()
+    manager = _manager(redis_client)
+
+    await manager.store_feedback({"rating": 5, "user_id": "user-1"})
+    await manager.store_conversation("user-1", "hi", "hello")
+
+    assert await redis_client.llen("agent_feedback") == 1
+    assert await redis_client.llen("conversations:user-1") == 1
+
+
+@pytest.mark.asyncio
+async def test_clear_user_cache_uses_index_not_keys_scan():
+    redis_client = CountingRedis()
+    manager = _manager(redis_client)
+
+    await manager.load_turn_context("user-1")
+    session_id = await manager.create_session("user-1")
+    await manager.store_conversation("user-1", "hi", "hello")
+    await manager.set_user_language("user-1", "de")
+    await redis_client.set("profile:user-2", b"{}")
+
+    # The index expires with the entries it tracks; the permanent history list is cleared by name.
+    assert 0 < await redis_client.ttl("memory:index:user-1") <= INDEX_TTL_SECONDS
+    assert await redis_client.zscore("memory:index:user-1", "conversations:user-1") is None
+
+    redis_client.commands.clear()
+    await manager.clear_user_cache("user-1")
+
+    assert "KEYS" not in {c.upper() for c in redis_client.commands}
+    assert await manager.get_session(session_id) is None
+    assert await redis_client.exists("profile:user-1", "financial:user-1", "conversations:user-1") == 0
+    assert await redis_client.exists("profile:user-2") == 1
+    # Language preference is permanent and intentionally survives cache clears.
+    assert await manager.get_user_language("user-1") == "de"
@@ -0,0 +1,440 @@
+"""
+Background job engine for analytics-service.
+
+The ``jobs`` table is the queue: a job is inserted as ``pending`` and a pool of
+worker threads claims pending rows in FIFO order, so jobs queued before a
+restart are picked up again. Workers report progress and check for
+cancellation between chunks; finished jobs keep their result until
+``expires_at`` and are then purged.
+
+Callers waiting on a job (long-poll or event stream) are woken directly by the
+worker that changed it instead of polling the table.
+
+The submitter's bearer token is held in memory only, never in the table, and is
+dropped once the job has read its input; a job recovered after a restart fails
+and asks to be submitted again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from libs.shared_sqlite.store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("ANALYTICS_JOB_WORKERS", "2"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("ANALYTICS_JOB_RESULT_TTL_SECONDS", "86400"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("ANALYTICS_JOB_POLL_INTERVAL_SECONDS", "1"))
+JOB_PURGE_INTERVAL_SECONDS = 60.0
+JOB_THROUGHPUT_WINDOW_SECONDS = 60.0
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+# Columns added after the original table shipped; created on start-up if missing.
+_JOB_COLUMNS: dict[str, str] = {
+    "user_id": "TEXT NOT NULL DEFAULT ''",
+    "parameters_json": "TEXT",
+    "progress": "REAL NOT NULL DEFAULT 0",
+    "stage": "TEXT",
+    "started_at": "TEXT",
+    "expires_at": "REAL",
+    "error": "TEXT",
+    "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class JobCancelled(Exception):
+    """Raised from a checkpoint once the job has been asked to stop."""
+
+
+def create_jobs_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL DEFAULT '',
+            job_type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            finished_at TEXT,
+            result_json TEXT
+        )
+        """
+    )
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+    for name, definition in _JOB_COLUMNS.items():
+        if name not in columns:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+    if "auth_token" in columns:
+        # Earlier versions persisted the caller's bearer token; credentials now stay in memory.
+        conn.execute("UPDATE jobs SET auth_token = NULL WHERE auth_token IS NOT NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status)")
+
+
+def _utcnow_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class JobContext:
+    """What a job runner sees: the job's inputs plus ``checkpoint`` for progress and cancellation."""
+
+    def __init__(self, engine: "JobEngine", row: sqlite3.Row):
+        self._engine = engine
+        self.job_id: str = row["job_id"]
+        self.user_id: str = row["user_id"]
+        self.job_type: str = row["job_type"]
+        self.parameters: dict[str, Any] = json.loads(row["parameters_json"]) if row["parameters_json"] else {}
+        self.auth_token: Optional[str] = engine._credentials_for(self.job_id)
+
+    def release_credentials(self) -> None:
+        """Drop the caller's token once the job no longer needs upstream access."""
+        self.auth_token = None
+        self._engine._forget_credentials(self.job_id)
+
+    async def checkpoint(self, done: int, total: Optional[int], stage: str) -> None:
+        progress = min(done / total, 0.99) if total else 0.0
+        cancel_requested = await self._engine._db().write(self._engine._progress_fn(self.job_id, progress, stage))
+        self._engine._notify(self.job_id)
+        if cancel_requested:
+            raise JobCancelled(self.job_id)
+
+
+JobRunner = Callable[[JobContext], Awaitable[dict[str, Any]]]
+
+
+class JobEngine:
+    """Persisted job queue drained by ``concurrency`` worker threads."""
+
+    def __init__(
+        self,
+        db: Callable[[], SQLiteStore],
+        runner: JobRunner,
+        *,
+        concurrency: int = JOB_WORKERS,
+        result_ttl_seconds: float = JOB_RESULT_TTL_SECONDS,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._db = db
+        self._runner = runner
+        self.concurrency = max(concurrency, 1)
+        self.result_ttl_seconds = result_ttl_seconds
+        self.poll_interval = poll_interval
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._wakeups: "queue.SimpleQueue[None]" = queue.SimpleQueue()
+        self._watchers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = defaultdict(set)
+        self._last_purge = 0.0
+        # Bearer tokens of queued/running jobs, kept in memory only and never written to the table.
+        self._credentials: dict[str, str] = {}
+
+        self._running = 0
+        self._finished: Counter[str] = Counter()
+        self._recent: deque[tuple[float, int, float]] = deque()  # (finished at, rows, seconds)
+
+    # --- lifecycle ---
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            # Nothing is running yet in this process, so "running" rows were orphaned by a restart.
+            self._db().write_sync(
+                lambda conn: conn.execute(
+                    "UPDATE jobs SET status = 'pending', progress = 0, stage = NULL WHERE status = 'running'"
+                )
+            )
+            for n in range(self.concurrency):
+                thread = threading.Thread(target=self._work, name=f"analytics-job-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+            self._stopping.set()
+            for _ in threads:
+                self._wakeups.put(None)
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    # --- queue ---
+
+    async def enqueue(
+        self,
+        *,
+        job_id: str,
+        user_id: str,
+        job_type: str,
+        created_at: str,
+        parameters: Optional[dict[str, Any]] = None,
+        auth_token: Optional[str] = None,
+    ) -> None:
+        if auth_token:
+            with self._lock:
+                self._credentials[job_id] = auth_token
+        try:
+            await self._db().execute(
+                """
+                INSERT INTO jobs (job_id, user_id, job_type, status, created_at, parameters_json)
+                VALUES (?, ?, ?, 'pending', ?, ?)
+                """,
+                (job_id, user_id, job_type, created_at, json.dumps(parameters) if parameters else None),
+            )
+        except BaseException:
+            self._forget_credentials(job_id)
+            raise
+        self.start()
+        self._wakeups.put(None)
+
+    async def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        return await self._db().fetchone(
+            "SELECT * FROM jobs WHERE job_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, self._clock()),
+        )
+
+    async def cancel(self, job_id: str, user_id: str) -> Optional[sqlite3.Row]:
+        """Cancels a pending job at once; a running job stops at its next checkpoint."""
+        now = self._clock()
+
+        def _cancel(conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+            row = conn.execute(
+                "SELECT status FROM jobs WHERE job_id = ? AND user_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (job_id, user_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "pending":
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'cancelled', finished_at = ?, expires_at = ?
+                    WHERE job_id = ?
+                    """,
+                    (_utcnow_iso(), now + self.result_ttl_seconds, job_id),
+                )
+            elif row["status"] == "running":
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            return conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        row = await self._db().write(_cancel)
+        if row is not None:
+            if row["status"] == "cancelled":
+                self._forget_credentials(job_id)
+            self._notify(job_id)
+        return row
+
+    def _credentials_for(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            return self._credentials.get(job_id)
+
+    def _forget_credentials(self, job_id: str) -> None:
+        with self._lock:
+            self._credentials.pop(job_id, None)
+
+    # --- waiting ---
+
+    def _watch(self, job_id: str) -> tuple[asyncio.AbstractEventLoop, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        entry = (loop, loop.create_future())
+        with self._lock:
+            self._watchers[job_id].add(entry)
+        return entry
+
+    def _unwatch(self, job_id: str, entry: tuple[asyncio.AbstractEventLoop, asyncio.Future]) -> None:
+        with self._lock:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(entry)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    def _notify(self, job_id: str) -> None:
+        with self._lock:
+            watchers = self._watchers.pop(job_id, set())
+        for loop, future in watchers:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:  # the waiter's loop has already closed
+                pass
+
+    async def watch(self, job_id: str, timeout: float) -> AsyncIterator[sqlite3.Row]:
+        """Yields the job each time its status, progress or stage changes, until it finishes or *timeout*."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last: Optional[tuple[Any, ...]] = None
+        while True:
+            # Register before reading so a change between the read and the wait is not missed.
+            entry = self._watch(job_id)
+            try:
+                row = await self.get(job_id)
+                if row is None:
+                    return
+                snapshot = (row["status"], row["progress"], row["stage"])
+                if snapshot != last:
+                    last = snapshot
+                    yield row
+                remaining = deadline - loop.time()
+                if row["status"] in TERMINAL_STATUSES or remaining <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(entry[1], remaining)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                self._unwatch(job_id, entry)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[sqlite3.Row]:
+        """Long-poll: the job once it has finished, or its current state after *timeout*."""
+        row = None
+        async for row in self.watch(job_id, timeout):
+            pass
+        return row
+
+    # --- workers ---
+
+    def _work(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    self._purge_expired()
+                    row = self._db().write_sync(self._claim_next)
+                except Exception:  # noqa: BLE001 - keep the worker alive
+                    logger.exception("analytics job worker could not claim a job")
+                    row = None
+                if row is None:
+                    try:
+                        self._wakeups.get(timeout=self.poll_interval)
+                    except queue.Empty:
+                        pass
+                    continue
+                loop.run_until_complete(self._execute(row))
+        finally:
+            loop.close()
+
+    @staticmethod
+    def _claim_next(conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+        # Runs on the store's single writer, so two workers can never claim the same row.
+        row = conn.execute("SELECT job_id FROM jobs WHERE status = 'pending' ORDER BY rowid LIMIT 1").fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, progress = 0, stage = NULL WHERE job_id = ?",
+            (_utcnow_iso(), row["job_id"]),
+        )
+        return conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+
+    @staticmethod
+    def _progress_fn(job_id: str, progress: float, stage: str) -> Callable[[sqlite3.Connection], bool]:
+        def _progress(conn: sqlite3.Connection) -> bool:
+            conn.execute("UPDATE jobs SET progress = ?, stage = ? WHERE job_id = ?", (progress, stage, job_id))
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return bool(row and row["cancel_requested"])
+
+        return _progress
+
+    async def _execute(self, row: sqlite3.Row) -> None:
+        context = JobContext(self, row)
+        self._notify(context.job_id)
+        started = time.monotonic()
+        result: Optional[dict[str, Any]] = None
+        error: Optional[str] = None
+        status = "failed"
+        with self._lock:
+            self._running += 1
+        try:
+            result = await self._runner(context)
+            status = "completed"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as exc:  # noqa: BLE001 - recorded on the job
+            logger.exception("analytics job %s (%s) failed", context.job_id, context.job_type)
+            error = str(exc) or type(exc).__name__
+        finally:
+            context.release_credentials()
+            with self._lock:
+                self._running -= 1
+                self._finished[status] += 1
+                rows = int((result or {}).get("rows_processed", 0))
+                self._recent.append((time.monotonic(), rows, time.monotonic() - started))
+
+        now = self._clock()
+        try:
+            await self._db().execute(
+                """
+                UPDATE jobs
+                SET status = ?, finished_at = ?, expires_at = ?, result_json = ?, error = ?,
+                    progress = CASE WHEN ? = 'completed' THEN 1 ELSE progress END,
+                    stage = NULL, cancel_requested = 0
+                WHERE job_id = ?
+                """,
+                (
+                    status,
+                    _utcnow_iso(),
+                    now + self.result_ttl_seconds,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    status,
+                    context.job_id,
+                ),
+            )
+        except Exception:  # noqa: BLE001 - the job row may have been removed meanwhile
+            logger.exception("analytics job %s: could not store its result", context.job_id)
+        self._notify(context.job_id)
+
+    def _purge_expired(self) -> None:
+        now = self._clock()
+        with self._lock:
+            if now - self._last_purge < JOB_PURGE_INTERVAL_SECONDS:
+                return
+            self._last_purge = now
+        self._db().write_sync(
+            lambda conn: conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        )
+
+    # --- observability ---
+
+    async def metrics(self) -> dict[str, Any]:
+        rows = await self._db().fetchall(
+            "SELECT status, COUNT(*) AS n FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status",
+            (self._clock(),),
+        )
+        by_status = {row["status"]: row["n"] for row in rows}
+        horizon = time.monotonic() - JOB_THROUGHPUT_WINDOW_SECONDS
+        with self._lock:
+            while self._recent and self._recent[0][0] < horizon:
+                self._recent.popleft()
+            recent = list(self._recent)
+            running = self._running
+            finished = dict(self._finished)
+        return {
+            "workers": self.concurrency,
+            "running": running,
+            "queue_depth": by_status.get("pending", 0),
+            "jobs_by_status": by_status,
+            "finished_total": finished,
+            "window_seconds": JOB_THROUGHPUT_WINDOW_SECONDS,
+            "jobs_per_minute": round(len(recent) * 60 / JOB_THROUGHPUT_WINDOW_SECONDS, 2),
+            "rows_per_second": round(sum(rows for _, rows, _ in recent) / JOB_THROUGHPUT_WINDOW_SECONDS, 2),
+            "average_job_seconds": round(sum(s for _, _, s in recent) / len(recent), 3) if recent else None,
+        }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
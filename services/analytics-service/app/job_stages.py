@@ -0,0 +1,319 @@
+"""
+Streaming aggregation stages for analytics jobs.
+
+Transactions are fed to each stage one row at a time, so a job never needs more
+than one chunk of raw rows plus the (small) per-stage aggregates in memory. A
+job type is a tuple of stages; every stage sees the same stream in one pass.
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import statistics
+from collections import Counter, defaultdict
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Sequence
+
+JOB_CHUNK_SIZE = 500
+
+_NON_ALPHA = re.compile(r"[^a-z ]+")
+_SPACES = re.compile(r"\s+")
+
+# (name, min days, max days, occurrences per year)
+RECURRING_CADENCES: tuple[tuple[str, int, int, int], ...] = (
+    ("weekly", 6, 8, 52),
+    ("monthly", 26, 35, 12),
+    ("quarterly", 85, 97, 4),
+    ("annual", 355, 375, 1),
+)
+RECURRING_MIN_OCCURRENCES = 3
+RECURRING_AMOUNT_TOLERANCE = 0.25
+
+
+def _amount(t: dict[str, Any]) -> float:
+    try:
+        return float(t.get("amount") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _txn_date(t: dict[str, Any]) -> datetime.date | None:
+    raw = t.get("date")
+    if raw is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(raw)[:10])
+    except ValueError:
+        return None
+
+
+def _is_bank_row(t: dict[str, Any]) -> bool:
+    pid = str(t.get("provider_transaction_id") or "")
+    return not pid.startswith("receipt-draft-")
+
+
+def _category(t: dict[str, Any]) -> str:
+    return str(t.get("category") or "uncategorized").strip().lower() or "uncategorized"
+
+
+def normalize_merchant(description: str) -> str:
+    """Collapse a bank description to a merchant key: drops digits, references and punctuation."""
+    text = _NON_ALPHA.sub(" ", description.lower())
+    return _SPACES.sub(" ", text).strip()[:40]
+
+
+class AggregationStage:
+    name = "stage"
+
+    def feed(self, t: dict[str, Any], day: datetime.date, amount: float) -> None:
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+class MonthlyPnLStage(AggregationStage):
+    name = "monthly_pnl"
+
+    def __init__(self) -> None:
+        self._months: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+
+    def feed(self, t: dict[str, Any], day: datetime.date, amount: float) -> None:
+        bucket = self._months[day.strftime("%Y-%m")]
+        if amount >= 0:
+            bucket[0] += amount
+        else:
+            bucket[1] += -amount
+        bucket[2] += 1
+
+    def result(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "month": month,
+                "income_gbp": round(income, 2),
+                "expenses_gbp": round(expenses, 2),
+                "net_gbp": round(income - expenses, 2),
+                "transactions": int(count),
+            }
+            for month, (income, expenses, count) in sorted(self._months.items())
+        ]
+
+
+class CategoryTrendStage(AggregationStage):
+    """Monthly spend per category, with the change between the last two months seen."""
+
+    name = "category_trends"
+
+    def __init__(self) -> None:
+        self._spend: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._months: set[str] = set()
+
+    def feed(self, t: dict[str, Any], day: datetime.date, amount: float) -> None:
+        month = day.strftime("%Y-%m")
+        self._months.add(month)
+        if amount < 0:
+            self._spend[_category(t)][month] += -amount
+
+    def result(self) -> list[dict[str, Any]]:
+        months = sorted(self._months)
+        trends: list[dict[str, Any]] = []
+        for category, by_month in self._spend.items():
+            change_percent: float | None = None
+            trend = "flat"
+            if len(months) >= 2:
+                previous, latest = by_month.get(months[-2], 0.0), by_month.get(months[-1], 0.0)
+                if previous > 0:
+                    change_percent = round((latest - previous) / previous * 100, 1)
+                if latest > previous * 1.1:
+                    trend = "rising"
+                elif latest < previous * 0.9:
+                    trend = "falling"
+            trends.append(
+                {
+                    "category": category,
+                    "total_spend_gbp": round(sum(by_month.values()), 2),
+                    "monthly": [
+                        {"month": month, "spend_gbp": round(by_month.get(month, 0.0), 2)} for month in months
+                    ],
+                    "trend": trend,
+                    "change_percent": change_percent,
+                }
+            )
+        trends.sort(key=lambda item: item["total_spend_gbp"], reverse=True)
+        return trends
+
+
+class RecurringPaymentStage(AggregationStage):
+    """Outgoing payments to the same merchant at a steady cadence and a steady amount."""
+
+    name = "recurring_payments"
+
+    def __init__(self) -> None:
+        self._payments: dict[str, list[tuple[datetime.date, float]]] = defaultdict(list)
+        self._labels: dict[str, str] = {}
+
+    def feed(self, t: dict[str, Any], day: datetime.date, amount: float) -> None:
+        if amount >= 0:
+            return
+        description = str(t.get("description") or "")
+        key = normalize_merchant(description)
+        if not key:
+            return
+        self._payments[key].append((day, -amount))
+        self._labels.setdefault(key, description.strip())
+
+    def result(self) -> list[dict[str, Any]]:
+        found: list[dict[str, Any]] = []
+        for key, payments in self._payments.items():
+            if len(payments) < RECURRING_MIN_OCCURRENCES:
+                continue
+            payments.sort()
+            intervals = [(b[0] - a[0]).days for a, b in zip(payments, payments[1:]) if b[0] != a[0]]
+            if len(intervals) < RECURRING_MIN_OCCURRENCES - 1:
+                continue
+            typical_interval = statistics.median(intervals)
+            cadence = next(
+                (c for c in RECURRING_CADENCES if c[1] <= typical_interval <= c[2]),
+                None,
+            )
+            if cadence is None:
+                continue
+            # Most gaps must match the cadence; one missed or early payment is tolerated.
+            matching = sum(1 for days in intervals if cadence[1] <= days <= cadence[2])
+            if matching < len(intervals) - 1:
+                continue
+            amounts = [amount for _, amount in payments]
+            typical_amount = statistics.median(amounts)
+            if typical_amount <= 0 or (max(amounts) - min(amounts)) / typical_amount > RECURRING_AMOUNT_TOLERANCE:
+                continue
+            name, _, _, per_year = cadence
+            last_date = payments[-1][0]
+            average = sum(amounts) / len(amounts)
+            found.append(
+                {
+                    "merchant": self._labels[key],
+                    "cadence": name,
+                    "occurrences": len(payments),
+                    "average_amount_gbp": round(average, 2),
+                    "annual_cost_gbp": round(average * per_year, 2),
+                    "last_date": last_date.isoformat(),
+                    "next_expected_date": (last_date + datetime.timedelta(days=round(typical_interval))).isoformat(),
+                }
+            )
+        found.sort(key=lambda item: item["annual_cost_gbp"], reverse=True)
+        return found
+
+
+class CategorizationModelStage(AggregationStage):
+    """Keyword model: for each description token, how often it appears under each category."""
+
+    name = "categorization_model"
+
+    def __init__(self, keywords_per_category: int = 5) -> None:
+        self.keywords_per_category = keywords_per_category
+        self._tokens: dict[str, Counter[str]] = defaultdict(Counter)
+        self._labelled = 0
+
+    def feed(self, t: dict[str, Any], day: datetime.date, amount: float) -> None:
+        category = _category(t)
+        if category == "uncategorized":
+            return
+        self._labelled += 1
+        for token in set(normalize_merchant(str(t.get("description") or "")).split()):
+            if len(token) >= 3:
+                self._tokens[token][category] += 1
+
+    def result(self) -> dict[str, Any]:
+        keywords: dict[str, list[tuple[str, float, int]]] = defaultdict(list)
+        for token, counts in self._tokens.items():
+            category, hits = counts.most_common(1)[0]
+            total = sum(counts.values())
+            if hits >= 2:
+                keywords[category].append((token, hits / total, hits))
+        return {
+            "labelled_rows": self._labelled,
+            "vocabulary_size": len(self._tokens),
+            "categories": {
+                category: [
+                    {"keyword": token, "precision": round(precision, 3), "support": support}
+                    for token, precision, support in sorted(entries, key=lambda e: (-e[1], -e[2], e[0]))[
+                        : self.keywords_per_category
+                    ]
+                ]
+                for category, entries in sorted(keywords.items())
+            },
+        }
+
+
+JOB_PIPELINES: dict[str, tuple[type[AggregationStage], ...]] = {
+    "run_etl_transactions": (MonthlyPnLStage, CategoryTrendStage, RecurringPaymentStage),
+    "train_categorization_model": (CategorizationModelStage,),
+    "monthly_pnl": (MonthlyPnLStage,),
+    "category_trends": (CategoryTrendStage,),
+    "recurring_payments": (RecurringPaymentStage,),
+}
+
+
+def _in_range(day: datetime.date, start: datetime.date | None, end: datetime.date | None) -> bool:
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def _parse_date(value: Any) -> datetime.date | None:
+    if not value:
+        return None
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+async def _rows(
+    transactions: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]],
+) -> AsyncIterator[dict[str, Any]]:
+    if isinstance(transactions, AsyncIterable):
+        async for t in transactions:
+            yield t
+    else:
+        for t in transactions:
+            yield t
+
+
+async def run_job_pipeline(
+    job_type: str,
+    transactions: Sequence[dict[str, Any]] | Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]],
+    *,
+    parameters: dict[str, Any] | None = None,
+    checkpoint: Callable[[int, int | None, str], Awaitable[None]] | None = None,
+    chunk_size: int = JOB_CHUNK_SIZE,
+) -> dict[str, Any]:
+    """Stream *transactions* through the job type's stages in one pass.
+
+    ``checkpoint(rows_seen, total, stage)`` is awaited after every chunk; it may
+    raise to stop the job (cancellation).
+    """
+    stages = [stage() for stage in JOB_PIPELINES[job_type]]
+    parameters = parameters or {}
+    start, end = _parse_date(parameters.get("start_date")), _parse_date(parameters.get("end_date"))
+    total = len(transactions) if isinstance(transactions, Sequence) else None
+    stage_label = "+".join(stage.name for stage in stages)
+
+    seen = used = 0
+    async for t in _rows(transactions):
+        seen += 1
+        if isinstance(t, dict) and _is_bank_row(t):
+            day = _txn_date(t)
+            if day is not None and _in_range(day, start, end):
+                amount = _amount(t)
+                used += 1
+                for stage in stages:
+                    stage.feed(t, day, amount)
+        if checkpoint is not None and seen % chunk_size == 0:
+            await checkpoint(seen, total, stage_label)
+    if checkpoint is not None:
+        await checkpoint(seen, total, "finalizing")
+
+    result: dict[str, Any] = {
+        "message": f"{job_type} finished successfully.",
+        "rows_processed": used,
+        "rows_skipped": seen - used,
+    }
+    for stage in stages:
+        result[stage.name] = stage.result()
+    return result
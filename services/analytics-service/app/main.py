@@ -1,3 +1,4 @@
+import asyncio
 import csv
 import datetime
 import io
@@ -5,15 +6,13 @@ import json
 import os
 import sqlite3
 import sys
-import threading
-import time
 import uuid
 import zipfile
 from collections import defaultdict, deque
 from datetime import timedelta, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
 
 import httpx
 from jose import JWTError, jwt
@@ -33,9 +32,19 @@ for parent in Path(__file__).resolve().parents:
 
 from libs.shared_auth.jwt_fastapi import build_admin_require_dependency, build_jwt_auth_dependencies
 from libs.shared_auth.plan_limits import plan_limits_from_payload
+from libs.shared_http.client import aclose_upstream_clients
 from libs.shared_http.request_id import RequestIdMiddleware
 from libs.shared_http.retry import get_json_with_retry
+from libs.shared_sqlite.store import SQLiteStoreHandle
 
+from .job_engine import (
+    TERMINAL_STATUSES,
+    JobContext,
+    JobEngine,
+    create_jobs_table,
+)
+from .job_stages import run_job_pipeline
+from .mobile_aggregates import MobileAnalyticsAggregates, MobileWindowTotals
 from .mortgage_affordability import build_affordability_result
 from .mortgage_progress_tracker import (
     build_mortgage_progress_timeline,
@@ -228,8 +237,8 @@ USER_PROFILE_SERVICE_URL = os.getenv(
 MOBILE_ANALYTICS_INGEST_API_KEY = os.getenv(
     "MOBILE_ANALYTICS_INGEST_API_KEY", ""
 ).strip()
-MOBILE_ANALYTICS_MAX_EVENTS = max(
-    100, _parse_positive_int_env("MOBILE_ANALYTICS_MAX_EVENTS", 5000)
+MOBILE_ANALYTICS_RETENTION_DAYS = max(
+    91, _parse_positive_int_env("MOBILE_ANALYTICS_RETENTION_DAYS", 120)
 )
 ANALYTICS_DB_PATH = os.getenv(
     "ANALYTICS_DB_PATH",
@@ -473,18 +482,35 @@ class BusinessIntelligenceDashboard(BaseModel):
 
 
 # Legacy models for backward compatibility
+JobType = Literal[
+    "run_etl_transactions",
+    "train_categorization_model",
+    "monthly_pnl",
+    "category_trends",
+    "recurring_payments",
+]
+
+
 class JobRequest(BaseModel):
-    job_type: Literal["run_etl_transactions", "train_categorization_model"]
+    job_type: JobType
+    # Optional "start_date" / "end_date" (ISO dates) limit the transactions streamed.
     parameters: Optional[Dict[str, Any]] = None
 
 
 class JobStatus(BaseModel):
     job_id: uuid.UUID = Field(default_factory=uuid.uuid4)
     user_id: str
-    job_type: Literal["run_etl_transactions", "train_categorization_model"]
-    status: Literal["pending", "running", "completed", "failed"] = "pending"
+    job_type: JobType
+    status: Literal["pending", "running", "completed", "failed", "cancelled"] = "pending"
+    parameters: Optional[Dict[str, Any]] = None
+    progress: float = 0.0
+    stage: Optional[str] = None
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    started_at: Optional[datetime.datetime] = None
     finished_at: Optional[datetime.datetime] = None
+    expires_at: Optional[datetime.datetime] = None
+    cancel_requested: bool = False
+    error: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
 
 
@@ -539,16 +565,6 @@ class MobileAnalyticsEventIngestRequest(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
-class MobileAnalyticsEventRecord(BaseModel):
-    event_id: uuid.UUID = Field(default_factory=uuid.uuid4)
-    event: str
-    source: str
-    platform: str
-    occurred_at: datetime.datetime
-    received_at: datetime.datetime
-    metadata: Dict[str, Any] = Field(default_factory=dict)
-
-
 class MobileAnalyticsIngestResponse(BaseModel):
     accepted: bool
     stored_events: int
@@ -741,29 +757,24 @@ def _extract_installation_id(metadata: Dict[str, Any]) -> Optional[str]:
     return None
 
 
-def _collect_mobile_window_events(
+async def _load_mobile_window(
     *,
     days: int,
     now_utc: Optional[datetime.datetime] = None,
-) -> tuple[datetime.datetime, list[MobileAnalyticsEventRecord]]:
+) -> tuple[datetime.datetime, MobileWindowTotals]:
     reference_now = now_utc or datetime.datetime.now(datetime.UTC)
     cutoff = reference_now - datetime.timedelta(days=days)
-    return reference_now, [
-        event for event in mobile_analytics_events if event.occurred_at >= cutoff
-    ]
+    # Buckets are daily, so the window starts at the beginning of the cutoff day.
+    return reference_now, await mobile_aggregates.window(cutoff.date())
 
 
 def _build_mobile_funnel_response(
     *,
     days: int,
-    now_utc: Optional[datetime.datetime] = None,
+    generated_at: datetime.datetime,
+    totals: MobileWindowTotals,
 ) -> MobileAnalyticsFunnelResponse:
-    generated_at, window_events = _collect_mobile_window_events(
-        days=days, now_utc=now_utc
-    )
-
-    def count(event_name: str) -> int:
-        return sum(1 for item in window_events if item.event == event_name)
+    count = totals.count
 
     splash_impressions = count("mobile.splash.impression")
     splash_dismissed = count("mobile.splash.dismissed")
@@ -774,23 +785,23 @@ def _build_mobile_funnel_response(
     biometric_successes = count("mobile.biometric.challenge_succeeded")
     push_permission_prompted = count("mobile.push.permission_prompted")
     push_permission_granted = count("mobile.push.permission_granted")
-    push_deep_link_opened = count("mobile.push.deep_link_opened") + count(
-        "mobile.push.deep_link_cold_start"
+    push_deep_link_opened = count(
+        "mobile.push.deep_link_opened", "mobile.push.deep_link_cold_start"
     )
 
-    variant_buckets: dict[str, dict[str, int]] = defaultdict(
-        lambda: {"impressions": 0, "cta_taps": 0, "completions": 0}
-    )
-    for item in window_events:
-        variant_id = _extract_variant_id(item.metadata)
-        if not variant_id:
-            continue
-        if item.event == "mobile.onboarding.impression":
-            variant_buckets[variant_id]["impressions"] += 1
-        elif item.event == "mobile.onboarding.cta_tapped":
-            variant_buckets[variant_id]["cta_taps"] += 1
-        elif item.event == "mobile.onboarding.completed":
-            variant_buckets[variant_id]["completions"] += 1
+    variant_buckets = {
+        variant_id: {
+            "impressions": events.get("mobile.onboarding.impression", 0),
+            "cta_taps": events.get("mobile.onboarding.cta_tapped", 0),
+            "completions": events.get("mobile.onboarding.completed", 0),
+        }
+        for variant_id, events in totals.variant_counts.items()
+    }
+    variant_buckets = {
+        variant_id: bucket
+        for variant_id, bucket in variant_buckets.items()
+        if any(bucket.values())
+    }
 
     variant_points = [
         MobileVariantFunnelPoint(
@@ -812,7 +823,7 @@ def _build_mobile_funnel_response(
     return MobileAnalyticsFunnelResponse(
         window_days=days,
         generated_at=generated_at,
-        total_events=len(window_events),
+        total_events=totals.total_events,
         splash_impressions=splash_impressions,
         splash_dismissed=splash_dismissed,
         onboarding_impressions=onboarding_impressions,
@@ -845,28 +856,17 @@ def _build_mobile_funnel_response(
 def _build_mobile_go_live_gate_response(
     *,
     days: int,
-    now_utc: Optional[datetime.datetime] = None,
+    generated_at: datetime.datetime,
+    totals: MobileWindowTotals,
 ) -> MobileGoLiveGateResponse:
-    generated_at, window_events = _collect_mobile_window_events(
-        days=days, now_utc=now_utc
+    funnel = _build_mobile_funnel_response(
+        days=days, generated_at=generated_at, totals=totals
     )
-    funnel = _build_mobile_funnel_response(days=days, now_utc=generated_at)
-
-    active_installations: set[str] = set()
-    crashing_installations: set[str] = set()
-    crash_events = 0
-    for item in window_events:
-        installation_id = _extract_installation_id(item.metadata)
-        if installation_id:
-            active_installations.add(installation_id)
-        if item.event in MOBILE_GO_LIVE_CRASH_EVENT_NAMES:
-            crash_events += 1
-            if installation_id:
-                crashing_installations.add(installation_id)
-
-    unique_active_installations = len(active_installations)
+
+    crash_events = totals.count(*MOBILE_GO_LIVE_CRASH_EVENT_NAMES)
+    unique_active_installations = totals.active_installations
     if unique_active_installations > 0:
-        crash_installations_count = len(crashing_installations)
+        crash_installations_count = totals.crashing_installations
         if crash_installations_count == 0 and crash_events > 0:
             crash_installations_count = min(crash_events, unique_active_installations)
         crash_free_rate_percent = round(
@@ -1099,54 +1099,31 @@ def _build_mobile_funnel_csv_payload(funnel: MobileAnalyticsFunnelResponse) -> s
 
 # --- "Database" for jobs ---
 
-ANALYTICS_JOB_DURATION_SECONDS: float = float(
-    os.getenv("ANALYTICS_JOB_DURATION_SECONDS", "5")
-)
-db_lock = threading.Lock()
 fake_jobs_db: dict[str, object] = {}
-mobile_analytics_events: deque[MobileAnalyticsEventRecord] = deque(
-    maxlen=MOBILE_ANALYTICS_MAX_EVENTS
-)
 mobile_weekly_snapshots: deque[MobileAnalyticsWeeklySnapshot] = deque(maxlen=104)
 
+# Long-lived WAL connections; follows ANALYTICS_DB_PATH if tests repoint it.
+analytics_db = SQLiteStoreHandle(lambda: ANALYTICS_DB_PATH)
+mobile_aggregates = MobileAnalyticsAggregates(
+    analytics_db, retention_days=MOBILE_ANALYTICS_RETENTION_DAYS
+)
 
-def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(ANALYTICS_DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+JOB_LONG_POLL_MAX_SECONDS = 60.0
+JOB_FETCH_PAGE_SIZE = int(os.getenv("ANALYTICS_JOB_FETCH_PAGE_SIZE", "1000"))
 
 
 def init_analytics_db() -> None:
-    with db_lock:
-        conn = _connect()
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS jobs (
-                job_id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL DEFAULT '',
-                job_type TEXT NOT NULL,
-                status TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                finished_at TEXT,
-                result_json TEXT
-            )
-            """
-        )
-        columns = [
-            row["name"] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()
-        ]
-        if "user_id" not in columns:
-            conn.execute("ALTER TABLE jobs ADD COLUMN user_id TEXT NOT NULL DEFAULT ''")
-        conn.commit()
-        conn.close()
+    analytics_db().write_sync(create_jobs_table)
+    mobile_aggregates.load()
 
 
 def reset_analytics_db_for_tests() -> None:
-    with db_lock:
-        conn = _connect()
-        conn.execute("DELETE FROM jobs")
-        conn.commit()
-        conn.close()
+    analytics_db().write_sync(lambda conn: conn.execute("DELETE FROM jobs"))
+
+
+def reset_mobile_analytics_for_tests() -> None:
+    mobile_aggregates.reset()
+    mobile_weekly_snapshots.clear()
 
 
 def _row_to_job(row: sqlite3.Row) -> JobStatus:
@@ -1155,82 +1132,98 @@ def _row_to_job(row: sqlite3.Row) -> JobStatus:
         user_id=row["user_id"],
         job_type=row["job_type"],
         status=row["status"],
+        parameters=json.loads(row["parameters_json"]) if row["parameters_json"] else None,
+        progress=row["progress"],
+        stage=row["stage"],
         created_at=datetime.datetime.fromisoformat(row["created_at"]),
+        started_at=datetime.datetime.fromisoformat(row["started_at"])
+        if row["started_at"]
+        else None,
         finished_at=datetime.datetime.fromisoformat(row["finished_at"])
         if row["finished_at"]
         else None,
+        expires_at=datetime.datetime.fromtimestamp(row["expires_at"], timezone.utc)
+        if row["expires_at"]
+        else None,
+        cancel_requested=bool(row["cancel_requested"]),
+        error=row["error"],
         result=json.loads(row["result_json"]) if row["result_json"] else None,
     )
 
 
-def save_job(job: JobStatus) -> None:
-    with db_lock:
-        conn = _connect()
-        conn.execute(
-            """
-            INSERT INTO jobs (job_id, user_id, job_type, status, created_at, finished_at, result_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                str(job.job_id),
-                job.user_id,
-                job.job_type,
-                job.status,
-                job.created_at.isoformat(),
-                job.finished_at.isoformat() if job.finished_at else None,
-                json.dumps(job.result) if job.result else None,
-            ),
+async def _iter_job_transactions(context: JobContext) -> AsyncIterator[dict[str, Any]]:
+    """Page through the submitter's transactions so only one page is held at a time."""
+    tx_url = os.getenv("TRANSACTIONS_SERVICE_URL", "").strip()
+    if not tx_url:
+        return
+    if not context.auth_token:
+        # Only happens for jobs recovered after a restart; tokens are never persisted.
+        raise RuntimeError("Job credentials are no longer available; submit the job again.")
+    headers = {"Authorization": f"Bearer {context.auth_token}"}
+    window = {
+        upstream: context.parameters[name]
+        for name, upstream in (("start_date", "from_date"), ("end_date", "to_date"))
+        if context.parameters.get(name)
+    }
+    offset = 0
+    while True:
+        data = await get_json_with_retry(
+            tx_url,
+            headers=headers,
+            params={**window, "offset": offset, "limit": JOB_FETCH_PAGE_SIZE},
+            timeout=30.0,
         )
-        conn.commit()
-        conn.close()
-
-
-def get_job(job_id: uuid.UUID) -> JobStatus | None:
-    with db_lock:
-        conn = _connect()
-        row = conn.execute(
-            "SELECT * FROM jobs WHERE job_id = ?", (str(job_id),)
-        ).fetchone()
-        conn.close()
-    return _row_to_job(row) if row else None
-
-
-def update_job(job: JobStatus) -> None:
-    with db_lock:
-        conn = _connect()
-        conn.execute(
-            """
-            UPDATE jobs
-            SET status = ?, finished_at = ?, result_json = ?
-            WHERE job_id = ?
-            """,
-            (
-                job.status,
-                job.finished_at.isoformat() if job.finished_at else None,
-                json.dumps(job.result) if job.result else None,
-                str(job.job_id),
-            ),
+        if not isinstance(data, list):
+            break
+        for t in data:
+            if isinstance(t, dict):
+                yield t
+        if len(data) < JOB_FETCH_PAGE_SIZE:
+            break
+        offset += JOB_FETCH_PAGE_SIZE
+    context.release_credentials()
+
+
+async def run_analytics_job(context: JobContext) -> dict[str, Any]:
+    return await run_job_pipeline(
+        context.job_type,
+        _iter_job_transactions(context),
+        parameters=context.parameters,
+        checkpoint=context.checkpoint,
+    )
+
+
+job_engine = JobEngine(analytics_db, run_analytics_job)
+
+
+async def _get_user_job(job_id: uuid.UUID, user_id: str) -> sqlite3.Row:
+    row = await job_engine.get(str(job_id))
+    if not row or row["user_id"] != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
         )
-        conn.commit()
-        conn.close()
+    return row
 
 
-def run_job_worker(job_id: uuid.UUID):
-    job = get_job(job_id)
-    if not job:
-        return
+@app.on_event("startup")
+async def start_job_engine() -> None:
+    # Also started lazily by the first POST /jobs; this resumes jobs queued before a restart.
+    job_engine.start()
 
-    job.status = "running"
-    update_job(job)
-    time.sleep(ANALYTICS_JOB_DURATION_SECONDS)
 
-    job.status = "completed"
-    job.finished_at = datetime.datetime.now(timezone.utc)
-    job.result = {
-        "message": f"{job.job_type} finished successfully.",
-        "rows_processed": 15000,
-    }
-    update_job(job)
+@app.on_event("shutdown")
+async def stop_job_engine() -> None:
+    await asyncio.to_thread(job_engine.stop)
+
+
+@app.on_event("shutdown")
+async def flush_mobile_aggregates() -> None:
+    await asyncio.to_thread(mobile_aggregates.flush)
+
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
 
 
 # --- Endpoints ---
@@ -1238,35 +1231,92 @@ def run_job_worker(job_id: uuid.UUID):
 
 @app.post("/jobs", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def trigger_job(
-    request: JobRequest, user_id: str = Depends(get_current_user_id)
+    request: JobRequest,
+    user_id: str = Depends(get_current_user_id),
+    bearer_token: str = Depends(get_bearer_token),
 ):
     """
-    Accepts a new job request and puts it into a 'pending' state.
+    Queues a new job in the 'pending' state; a worker picks it up in FIFO order.
     """
-    new_job = JobStatus(user_id=user_id, job_type=request.job_type)
-    save_job(new_job)
-    threading.Thread(target=run_job_worker, args=(new_job.job_id,), daemon=True).start()
+    new_job = JobStatus(
+        user_id=user_id, job_type=request.job_type, parameters=request.parameters
+    )
+    await job_engine.enqueue(
+        job_id=str(new_job.job_id),
+        user_id=user_id,
+        job_type=new_job.job_type,
+        created_at=new_job.created_at.isoformat(),
+        parameters=request.parameters,
+        auth_token=bearer_token,
+    )
     return new_job
 
 
+@app.get("/jobs/metrics")
+async def get_job_metrics(_admin: dict = Depends(require_analytics_admin)):
+    """
+    Queue depth, running jobs and throughput over the last minute.
+    """
+    return await job_engine.metrics()
+
+
 @app.get("/jobs/{job_id}", response_model=JobStatus)
 async def get_job_status(
-    job_id: uuid.UUID, user_id: str = Depends(get_current_user_id)
+    job_id: uuid.UUID,
+    wait: float = Query(
+        0.0,
+        ge=0.0,
+        le=JOB_LONG_POLL_MAX_SECONDS,
+        description="Long-poll: hold the request up to this many seconds until the job finishes.",
+    ),
+    user_id: str = Depends(get_current_user_id),
 ):
     """
     Retrieves the status of a specific job.
     """
-    job = get_job(job_id)
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
-        )
-    if job.user_id != user_id:
+    row = await _get_user_job(job_id, user_id)
+    if wait > 0 and row["status"] not in TERMINAL_STATUSES:
+        row = await job_engine.wait(str(job_id), wait) or row
+    return _row_to_job(row)
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: uuid.UUID,
+    timeout: float = Query(300.0, gt=0.0, le=3600.0),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Server-sent events: one `job` event per status/progress change, ending when the job finishes.
+    """
+    await _get_user_job(job_id, user_id)
+
+    async def _events():
+        async for row in job_engine.watch(str(job_id), timeout):
+            yield f"event: job\ndata: {_row_to_job(row).model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_job(
+    job_id: uuid.UUID, user_id: str = Depends(get_current_user_id)
+):
+    """
+    Cancels a pending job immediately; a running job stops at its next checkpoint.
+    """
+    row = await _get_user_job(job_id, user_id)
+    if row["status"] in ("completed", "failed"):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {row['status']}",
         )
-
-    return job
+    row = await job_engine.cancel(str(job_id), user_id) or row
+    return _row_to_job(row)
 
 
 @app.get("/mobile/config", response_model=MobileRemoteConfigResponse)
@@ -1295,18 +1345,16 @@ async def ingest_mobile_analytics_event(
     else:
         occurred_at = occurred_at.astimezone(datetime.UTC)
 
-    mobile_analytics_events.append(
-        MobileAnalyticsEventRecord(
-            event=request.event.strip(),
-            source=request.source.strip(),
-            platform=request.platform.strip().lower(),
-            occurred_at=occurred_at,
-            received_at=datetime.datetime.now(datetime.UTC),
-            metadata=request.metadata,
-        )
+    event_name = request.event.strip()
+    mobile_aggregates.record(
+        event_name,
+        occurred_at,
+        variant_id=_extract_variant_id(request.metadata),
+        installation_id=_extract_installation_id(request.metadata),
+        crashed=event_name in MOBILE_GO_LIVE_CRASH_EVENT_NAMES,
     )
     return MobileAnalyticsIngestResponse(
-        accepted=True, stored_events=len(mobile_analytics_events)
+        accepted=True, stored_events=mobile_aggregates.stored_events
     )
 
 
@@ -1318,7 +1366,10 @@ async def get_mobile_analytics_funnel(
     """
     Returns aggregate onboarding/security funnel metrics for the selected lookback window.
     """
-    return _build_mobile_funnel_response(days=days)
+    generated_at, totals = await _load_mobile_window(days=days)
+    return _build_mobile_funnel_response(
+        days=days, generated_at=generated_at, totals=totals
+    )
 
 
 @app.get("/mobile/analytics/funnel/export")
@@ -1330,7 +1381,10 @@ async def export_mobile_analytics_funnel(
     """
     Exports mobile funnel metrics for BI tooling (JSON or CSV).
     """
-    funnel = _build_mobile_funnel_response(days=days)
+    generated_at, totals = await _load_mobile_window(days=days)
+    funnel = _build_mobile_funnel_response(
+        days=days, generated_at=generated_at, totals=totals
+    )
     if export_format == "json":
         return funnel
     csv_payload = _build_mobile_funnel_csv_payload(funnel)
@@ -1354,7 +1408,10 @@ async def create_mobile_weekly_snapshot(
     """
     Captures a weekly mobile funnel snapshot and stores it for operating cadence review.
     """
-    funnel = _build_mobile_funnel_response(days=days)
+    generated_at, totals = await _load_mobile_window(days=days)
+    funnel = _build_mobile_funnel_response(
+        days=days, generated_at=generated_at, totals=totals
+    )
     snapshot = MobileAnalyticsWeeklySnapshot(
         generated_at=datetime.datetime.now(datetime.UTC),
         window_days=days,
@@ -1396,7 +1453,10 @@ async def get_mobile_weekly_cadence_snapshot(
     """
     Returns current-week mobile KPI cadence payload without persisting a snapshot.
     """
-    funnel = _build_mobile_funnel_response(days=days)
+    generated_at, totals = await _load_mobile_window(days=days)
+    funnel = _build_mobile_funnel_response(
+        days=days, generated_at=generated_at, totals=totals
+    )
     return MobileAnalyticsWeeklyCadenceResponse(
         generated_at=datetime.datetime.now(datetime.UTC),
         window_days=days,
@@ -1414,7 +1474,10 @@ async def get_mobile_go_live_gate(
     """
     Evaluates 7-day (or configured window) go-live gate readiness for mobile launch.
     """
-    return _build_mobile_go_live_gate_response(days=days)
+    generated_at, totals = await _load_mobile_window(days=days)
+    return _build_mobile_go_live_gate_response(
+        days=days, generated_at=generated_at, totals=totals
+    )
 
 
 # --- Models for Forecasting ---
@@ -0,0 +1,240 @@
+"""
+Pre-aggregated mobile analytics counters.
+
+Ingestion does not keep raw events. Each event bumps a ``(day, event, variant)``
+counter and marks its installation as active (or crashing) for that day.
+Increments collect in memory and are flushed to SQLite in batches with
+``count = count + delta`` upserts. Reports flush first and then read one row
+per bucket, so their cost depends on the window length and not on traffic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from libs.shared_sqlite.store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+MOBILE_AGGREGATE_FLUSH_EVENTS = 1000
+MOBILE_AGGREGATE_FLUSH_SECONDS = 1.0
+# (day, installation) pairs already written; most events come from installations
+# already seen that day, so they need no installation write at all.
+MOBILE_AGGREGATE_SEEN_INSTALLATIONS = 200_000
+
+
+def create_mobile_aggregate_tables(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mobile_event_counts (
+            day TEXT NOT NULL,
+            event TEXT NOT NULL,
+            variant TEXT NOT NULL DEFAULT '',
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, event, variant)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mobile_installation_days (
+            day TEXT NOT NULL,
+            installation_id TEXT NOT NULL,
+            crashed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, installation_id)
+        )
+        """
+    )
+
+
+@dataclass
+class MobileWindowTotals:
+    event_counts: Counter = field(default_factory=Counter)
+    # variant id -> event name -> count
+    variant_counts: dict[str, Counter] = field(default_factory=dict)
+    active_installations: int = 0
+    crashing_installations: int = 0
+
+    @property
+    def total_events(self) -> int:
+        return sum(self.event_counts.values())
+
+    def count(self, *event_names: str) -> int:
+        return sum(self.event_counts.get(name, 0) for name in event_names)
+
+
+class MobileAnalyticsAggregates:
+    """Write-behind daily counters for mobile events, persisted in the analytics SQLite store."""
+
+    def __init__(
+        self,
+        db: Callable[[], SQLiteStore],
+        *,
+        retention_days: int,
+        flush_events: int = MOBILE_AGGREGATE_FLUSH_EVENTS,
+        flush_seconds: float = MOBILE_AGGREGATE_FLUSH_SECONDS,
+    ):
+        self._db = db
+        self.retention_days = retention_days
+        self.flush_events = flush_events
+        self.flush_seconds = flush_seconds
+        self.stored_events = 0
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._installations: dict[tuple[str, str], bool] = {}
+        self._seen_installations: dict[tuple[str, str], bool] = {}
+        self._pending_events = 0
+        self._last_flush = time.monotonic()
+        self._purged_before: Optional[str] = None
+
+    def load(self) -> None:
+        """Creates the tables and picks up the stored event total (start-up and tests)."""
+
+        def _load(conn) -> int:
+            create_mobile_aggregate_tables(conn)
+            return conn.execute("SELECT COALESCE(SUM(count), 0) FROM mobile_event_counts").fetchone()[0]
+
+        self.stored_events = self._db().write_sync(_load)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._installations.clear()
+            self._seen_installations.clear()
+            self._pending_events = 0
+
+        def _reset(conn) -> None:
+            conn.execute("DELETE FROM mobile_event_counts")
+            conn.execute("DELETE FROM mobile_installation_days")
+
+        self._db().write_sync(_reset)
+        self.stored_events = 0
+
+    def record(
+        self,
+        event: str,
+        occurred_at: datetime.datetime,
+        *,
+        variant_id: Optional[str] = None,
+        installation_id: Optional[str] = None,
+        crashed: bool = False,
+    ) -> None:
+        day = occurred_at.date().isoformat()
+        with self._lock:
+            self._counts[(day, event, variant_id or "")] += 1
+            if installation_id:
+                key = (day, installation_id)
+                seen = self._seen_installations.get(key)
+                if seen is None or (crashed and not seen):
+                    if len(self._seen_installations) >= MOBILE_AGGREGATE_SEEN_INSTALLATIONS:
+                        self._seen_installations.clear()
+                    self._seen_installations[key] = crashed
+                    self._installations[key] = self._installations.get(key, False) or crashed
+            self._pending_events += 1
+            self.stored_events += 1
+            due = (
+                self._pending_events >= self.flush_events
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            )
+        if due:
+            self._submit_flush()
+
+    def _take_pending(self) -> tuple[Counter, dict[tuple[str, str], bool]]:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            installations, self._installations = self._installations, {}
+            self._pending_events = 0
+            self._last_flush = time.monotonic()
+        return counts, installations
+
+    def _flush_fn(self, counts: Counter, installations: dict[tuple[str, str], bool]):
+        purge_before = (
+            datetime.datetime.now(datetime.UTC).date() - datetime.timedelta(days=self.retention_days)
+        ).isoformat()
+
+        def _flush(conn) -> int:
+            """Applies the increments; returns how many stored events the retention purge removed."""
+            if counts:
+                conn.executemany(
+                    """
+                    INSERT INTO mobile_event_counts (day, event, variant, count) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (day, event, variant) DO UPDATE SET count = count + excluded.count
+                    """,
+                    [(day, event, variant, n) for (day, event, variant), n in counts.items()],
+                )
+            if installations:
+                conn.executemany(
+                    """
+                    INSERT INTO mobile_installation_days (day, installation_id, crashed) VALUES (?, ?, ?)
+                    ON CONFLICT (day, installation_id) DO UPDATE SET crashed = MAX(crashed, excluded.crashed)
+                    """,
+                    [(day, installation_id, int(crashed)) for (day, installation_id), crashed in installations.items()],
+                )
+            if purge_before == self._purged_before:
+                return 0
+            # At most once a day: drop buckets older than the retention window.
+            purged = conn.execute(
+                "SELECT COALESCE(SUM(count), 0) FROM mobile_event_counts WHERE day < ?", (purge_before,)
+            ).fetchone()[0]
+            conn.execute("DELETE FROM mobile_event_counts WHERE day < ?", (purge_before,))
+            conn.execute("DELETE FROM mobile_installation_days WHERE day < ?", (purge_before,))
+            self._purged_before = purge_before
+            return purged
+
+        return _flush
+
+    def _submit_flush(self):
+        counts, installations = self._take_pending()
+        future = self._db().submit_write(self._flush_fn(counts, installations))
+        future.add_done_callback(self._after_flush)
+        return future
+
+    def _after_flush(self, future) -> None:
+        if future.exception() is not None:
+            logger.error("mobile analytics flush failed: %s", future.exception())
+            return
+        purged = future.result()
+        if purged:
+            with self._lock:
+                self.stored_events -= purged
+
+    def flush(self) -> None:
+        self._submit_flush().result()
+
+    async def window(self, start_day: datetime.date) -> MobileWindowTotals:
+        """Totals for every bucket on or after *start_day*, including increments not yet flushed."""
+        await asyncio.wrap_future(self._submit_flush())
+        first_day = start_day.isoformat()
+
+        def _read(conn) -> MobileWindowTotals:
+            totals = MobileWindowTotals()
+            for row in conn.execute(
+                """
+                SELECT event, variant, SUM(count) AS n FROM mobile_event_counts
+                WHERE day >= ? GROUP BY event, variant
+                """,
+                (first_day,),
+            ):
+                totals.event_counts[row["event"]] += row["n"]
+                if row["variant"]:
+                    totals.variant_counts.setdefault(row["variant"], Counter())[row["event"]] += row["n"]
+            installs = conn.execute(
+                """
+                SELECT COUNT(DISTINCT installation_id) AS active,
+                       COUNT(DISTINCT CASE WHEN crashed THEN installation_id END) AS crashing
+                FROM mobile_installation_days WHERE day >= ?
+                """,
+                (first_day,),
+            ).fetchone()
+            totals.active_installations = installs["active"]
+            totals.crashing_installations = installs["crashing"]
+            return totals
+
+        return await self._db().read(_read)
@@ -0,0 +1,139 @@
+"""Analytics job engine: persisted FIFO queue, cancellation, result TTL and long-poll wake-ups."""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from libs.shared_sqlite.store import SQLiteStore
+
+from app.job_engine import JobEngine, create_jobs_table
+from app.job_stages import run_job_pipeline
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _store(tmp_path) -> SQLiteStore:
+    store = SQLiteStore(str(tmp_path / "jobs.db"))
+    store.write_sync(create_jobs_table)
+    return store
+
+
+async def _enqueue(engine: JobEngine, job_id: str, job_type: str = "monthly_pnl") -> None:
+    await engine.enqueue(job_id=job_id, user_id="u1", job_type=job_type, created_at="2026-01-01T00:00:00")
+
+
+def test_running_job_is_cancelled_at_next_checkpoint_and_queue_keeps_fifo_order(tmp_path):
+    store = _store(tmp_path)
+    release = threading.Event()
+    started: list[str] = []
+
+    async def runner(context):
+        started.append(context.job_id)
+        if context.job_id == "slow":
+            rows = ({"date": "2026-01-01", "amount": 1} for _ in range(10_000))
+
+            async def checkpoint(done, total, stage):
+                await asyncio.to_thread(release.wait)
+                await context.checkpoint(done, total, stage)
+
+            return await run_job_pipeline(context.job_type, rows, checkpoint=checkpoint, chunk_size=100)
+        return {"rows_processed": 0}
+
+    engine = JobEngine(lambda: store, runner, concurrency=1, poll_interval=0.05)
+
+    async def scenario():
+        await _enqueue(engine, "slow")
+        await _enqueue(engine, "next")
+        await _enqueue(engine, "dropped")
+        assert (await engine.cancel("dropped", "u1"))["status"] == "cancelled"
+        assert await engine.cancel("slow", "other-user") is None
+        while (await engine.get("slow"))["status"] != "running":
+            await asyncio.sleep(0.01)
+        requested = await engine.cancel("slow", "u1")
+        release.set()
+        slow = await engine.wait("slow", timeout=10)
+        after = await engine.wait("next", timeout=10)
+        return requested, slow, after, await engine.metrics()
+
+    try:
+        requested, slow, after, metrics = asyncio.run(scenario())
+    finally:
+        engine.stop()
+        store.close()
+
+    assert requested["cancel_requested"] == 1
+    assert slow["status"] == "cancelled"
+    assert slow["result_json"] is None
+    assert after["status"] == "completed"
+    assert started == ["slow", "next"]
+    assert metrics["finished_total"] == {"cancelled": 1, "completed": 1}
+    assert metrics["queue_depth"] == 0
+
+
+def test_jobs_left_running_by_a_restart_are_resumed_and_results_expire(tmp_path):
+    store = _store(tmp_path)
+    clock = _Clock()
+
+    async def runner(context):
+        return {"rows_processed": 3, "job_type": context.job_type}
+
+    engine = JobEngine(lambda: store, runner, result_ttl_seconds=60, poll_interval=0.05, clock=clock)
+
+    async def scenario():
+        # A job that a previous process had claimed but never finished.
+        await store.execute(
+            "INSERT INTO jobs (job_id, user_id, job_type, status, created_at, progress)"
+            " VALUES ('orphan', 'u1', 'category_trends', 'running', '2026-01-01T00:00:00', 0.4)"
+        )
+        engine.start()
+        finished = await engine.wait("orphan", timeout=10)
+        clock.now += 61
+        return finished, await engine.get("orphan")
+
+    try:
+        finished, expired = asyncio.run(scenario())
+    finally:
+        engine.stop()
+        store.close()
+
+    assert finished["status"] == "completed"
+    assert finished["progress"] == 1.0
+    assert finished["expires_at"] == 1_000_060.0
+    assert expired is None
+
+
+def test_long_poll_returns_current_state_when_the_job_outlives_the_wait(tmp_path):
+    store = _store(tmp_path)
+    release = threading.Event()
+
+    async def runner(context):
+        await asyncio.to_thread(release.wait)
+        return {"rows_processed": 0}
+
+    engine = JobEngine(lambda: store, runner, concurrency=1, poll_interval=0.05)
+
+    async def scenario():
+        await _enqueue(engine, "job")
+        pending_or_running = await engine.wait("job", timeout=0.2)
+        release.set()
+        return pending_or_running, await engine.wait("job", timeout=10)
+
+    try:
+        early, done = asyncio.run(scenario())
+    finally:
+        release.set()
+        engine.stop()
+        store.close()
+
+    assert early["status"] in ("pending", "running")
+    assert done["status"] == "completed"
@@ -0,0 +1,69 @@
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.job_stages import normalize_merchant, run_job_pipeline
+
+
+def _run(job_type, transactions, **kwargs):
+    return asyncio.run(run_job_pipeline(job_type, transactions, **kwargs))
+
+
+def test_recurring_payments_need_steady_cadence_and_amount():
+    start = datetime.date(2025, 1, 6)
+    txs = []
+    for week in range(6):
+        day = (start + datetime.timedelta(weeks=week)).isoformat()
+        txs.append({"date": day, "amount": -12.5, "description": f"GYM LTD REF{week:04d}"})
+        # Same cadence but the amount swings too much to be a subscription.
+        txs.append({"date": day, "amount": -5.0 * (week + 1), "description": "CORNER SHOP"})
+    txs.append({"date": "2025-01-20", "amount": -3.0, "description": "Coffee"})
+
+    result = _run("recurring_payments", txs)
+
+    assert [r["merchant"] for r in result["recurring_payments"]] == ["GYM LTD REF0000"]
+    gym = result["recurring_payments"][0]
+    assert gym["cadence"] == "weekly"
+    assert gym["occurrences"] == 6
+    assert gym["annual_cost_gbp"] == 650.0
+    assert gym["next_expected_date"] == "2025-02-17"
+
+
+def test_category_trends_and_checkpoints_per_chunk():
+    txs = [{"date": "2025-03-10", "amount": -100, "category": "Travel"}] * 3 + [
+        {"date": "2025-04-10", "amount": -150, "category": "travel"},
+        {"date": "2025-04-11", "amount": -10, "category": "software"},
+        {"date": "2025-04-12", "amount": 50, "provider_transaction_id": "receipt-draft-1"},
+    ]
+    calls = []
+
+    async def checkpoint(done, total, stage):
+        calls.append((done, total, stage))
+
+    result = _run("category_trends", txs, checkpoint=checkpoint, chunk_size=2)
+
+    travel, software = result["category_trends"]
+    assert travel["category"] == "travel"
+    assert travel["monthly"] == [{"month": "2025-03", "spend_gbp": 300.0}, {"month": "2025-04", "spend_gbp": 150.0}]
+    assert (travel["trend"], travel["change_percent"]) == ("falling", -50.0)
+    assert software["change_percent"] is None
+    assert result["rows_skipped"] == 1
+    assert calls == [(2, 6, "category_trends"), (4, 6, "category_trends"), (6, 6, "category_trends"), (6, 6, "finalizing")]
+
+
+def test_categorization_model_learns_keywords():
+    txs = [
+        {"date": "2025-05-01", "amount": -20, "description": "Shell Fuel 123", "category": "transport"},
+        {"date": "2025-05-08", "amount": -25, "description": "SHELL FUEL 456", "category": "transport"},
+        {"date": "2025-05-09", "amount": -9, "description": "Shell shop", "category": "food"},
+        {"date": "2025-05-10", "amount": -9, "description": "unknown"},
+    ]
+
+    result = _run("train_categorization_model", txs)["categorization_model"]
+
+    assert result["labelled_rows"] == 3
+    assert result["categories"]["transport"][0] == {"keyword": "fuel", "precision": 1.0, "support": 2}
+    assert normalize_merchant("AMZN Mktp UK*2K4 ") == "amzn mktp uk k"
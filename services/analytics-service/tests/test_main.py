@@ -2,7 +2,6 @@
 import os
 import sys
 import tempfile
-import time
 import uuid
 
 from fastapi.testclient import TestClient
@@ -10,7 +9,6 @@ from jose import jwt  # type: ignore[import-untyped]
 
 TEST_DB_PATH = os.path.join(tempfile.gettempdir(), "analytics_service_test.db")
 os.environ["ANALYTICS_DB_PATH"] = TEST_DB_PATH
-os.environ["ANALYTICS_JOB_DURATION_SECONDS"] = "0.01"
 os.environ["AUTH_SECRET_KEY"] = "test-secret"
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -45,17 +43,94 @@ def test_trigger_and_complete_job():
     assert uuid.UUID(job_id)
     assert payload["user_id"] == user_id
 
-    latest = payload
-    for _ in range(30):
-        poll = client.get(f"/jobs/{job_id}", headers=auth_headers(user_id))
-        assert poll.status_code == 200
-        latest = poll.json()
-        if latest["status"] == "completed":
-            break
-        time.sleep(0.01)
+    poll = client.get(f"/jobs/{job_id}?wait=10", headers=auth_headers(user_id))
+    assert poll.status_code == 200
+    latest = poll.json()
 
     assert latest["status"] == "completed"
-    assert latest["result"]["rows_processed"] == 15000
+    assert latest["progress"] == 1.0
+    assert latest["expires_at"] is not None
+    # No TRANSACTIONS_SERVICE_URL in tests, so the pipeline runs over an empty stream.
+    assert latest["result"]["rows_processed"] == 0
+    assert latest["result"]["monthly_pnl"] == []
+    assert latest["result"]["recurring_payments"] == []
+
+
+def test_job_streams_transactions_through_aggregation_stages(monkeypatch):
+    from app import main
+
+    transactions = [
+        {"date": f"2026-0{month}-03", "amount": -9.99, "description": f"NETFLIX.COM {month}ABC", "category": "subscriptions"}
+        for month in range(1, 5)
+    ] + [
+        {"date": f"2026-0{month}-15", "amount": 1000.0, "description": "Client payment", "category": "income"}
+        for month in range(1, 5)
+    ]
+
+    pages = []
+
+    async def fake_get_json_with_retry(url, **kwargs):
+        assert kwargs["headers"]["Authorization"].startswith("Bearer ")
+        params = kwargs["params"]
+        pages.append(params)
+        return transactions[params["offset"]:params["offset"] + params["limit"]]
+
+    monkeypatch.setenv("TRANSACTIONS_SERVICE_URL", "http://transactions/transactions/me")
+    monkeypatch.setattr(main, "get_json_with_retry", fake_get_json_with_retry)
+    monkeypatch.setattr(main, "JOB_FETCH_PAGE_SIZE", 3)
+
+    user_id = "etl-user@example.com"
+    job_id = client.post(
+        "/jobs",
+        headers=auth_headers(user_id),
+        json={"job_type": "run_etl_transactions", "parameters": {"start_date": "2026-02-01"}},
+    ).json()["job_id"]
+    result = client.get(f"/jobs/{job_id}?wait=10", headers=auth_headers(user_id)).json()["result"]
+
+    # Fetched page by page, with the job's date window pushed upstream.
+    assert [p["offset"] for p in pages] == [0, 3, 6]
+    assert all(p["from_date"] == "2026-02-01" for p in pages)
+    # The bearer token never reaches the jobs table.
+    stored = main.analytics_db().write_sync(
+        lambda conn: [tuple(row) for row in conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))]
+    )
+    token = auth_headers(user_id)["Authorization"].split()[1]
+    assert stored and token not in {str(value) for value in stored[0]}
+    assert job_id not in main.job_engine._credentials
+    assert result["rows_processed"] == 6
+    assert result["rows_skipped"] == 2
+    assert [m["month"] for m in result["monthly_pnl"]] == ["2026-02", "2026-03", "2026-04"]
+    assert result["monthly_pnl"][0]["net_gbp"] == 990.01
+    assert result["category_trends"][0]["category"] == "subscriptions"
+    assert result["recurring_payments"][0]["cadence"] == "monthly"
+    assert result["recurring_payments"][0]["next_expected_date"] == "2026-05-03"
+
+
+def test_job_cancel_and_metrics():
+    user_id = "cancel-user@example.com"
+    job_id = client.post(
+        "/jobs",
+        headers=auth_headers(user_id),
+        json={"job_type": "monthly_pnl"},
+    ).json()["job_id"]
+    client.get(f"/jobs/{job_id}?wait=10", headers=auth_headers(user_id))
+
+    events = client.get(f"/jobs/{job_id}/events", headers=auth_headers(user_id))
+    assert events.headers["content-type"].startswith("text/event-stream")
+    assert events.text.startswith("event: job\ndata: ")
+    assert '"status":"completed"' in events.text
+
+    finished = client.post(f"/jobs/{job_id}/cancel", headers=auth_headers(user_id))
+    assert finished.status_code == 409
+    assert client.post(f"/jobs/{job_id}/cancel", headers=auth_headers("other@example.com")).status_code == 404
+
+    assert client.get("/jobs/metrics", headers=auth_headers(user_id)).status_code == 403
+    metrics = client.get("/jobs/metrics", headers=auth_headers(user_id, is_admin=True))
+    assert metrics.status_code == 200
+    body = metrics.json()
+    assert body["queue_depth"] == 0
+    assert body["jobs_by_status"]["completed"] >= 1
+    assert body["jobs_per_minute"] > 0
 
 
 def test_plan_middleware_blocks_mortgage_for_starter():
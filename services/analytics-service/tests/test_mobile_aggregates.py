@@ -0,0 +1,87 @@
+"""Mobile analytics daily counters: persistence, day windows and a 1M-event ingestion run."""
+
+import asyncio
+import datetime
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from libs.shared_sqlite.store import SQLiteStore
+
+from app.mobile_aggregates import MobileAnalyticsAggregates
+
+NOW = datetime.datetime.now(datetime.UTC)
+
+
+def _aggregates(store: SQLiteStore) -> MobileAnalyticsAggregates:
+    aggregates = MobileAnalyticsAggregates(lambda: store, retention_days=120)
+    aggregates.load()
+    return aggregates
+
+
+def test_counters_survive_a_restart_and_windows_are_per_day(tmp_path):
+    store = SQLiteStore(str(tmp_path / "mobile.db"))
+    first = _aggregates(store)
+    first.record("mobile.onboarding.impression", NOW, variant_id="velocity", installation_id="a")
+    first.record("mobile.onboarding.completed", NOW, variant_id="velocity", installation_id="a")
+    first.record("mobile.app.crash", NOW, installation_id="b", crashed=True)
+    first.record("mobile.splash.impression", NOW, installation_id="b")
+    first.record("mobile.splash.impression", NOW - datetime.timedelta(days=20), installation_id="c")
+    first.flush()
+
+    # A new instance over the same file stands in for a process restart.
+    second = _aggregates(store)
+    assert second.stored_events == 5
+    recent = asyncio.run(second.window((NOW - datetime.timedelta(days=7)).date()))
+    everything = asyncio.run(second.window((NOW - datetime.timedelta(days=30)).date()))
+    store.close()
+
+    assert recent.total_events == 4
+    assert recent.count("mobile.splash.impression") == 1
+    assert recent.variant_counts == {"velocity": {"mobile.onboarding.impression": 1, "mobile.onboarding.completed": 1}}
+    assert (recent.active_installations, recent.crashing_installations) == (2, 1)
+    assert everything.count("mobile.splash.impression") == 2
+    assert everything.active_installations == 3
+
+
+def test_one_million_events_fold_into_a_few_buckets(tmp_path):
+    store = SQLiteStore(str(tmp_path / "mobile-load.db"))
+    aggregates = _aggregates(store)
+    events = (
+        "mobile.splash.impression",
+        "mobile.onboarding.impression",
+        "mobile.onboarding.cta_tapped",
+        "mobile.onboarding.completed",
+    )
+    days = [NOW - datetime.timedelta(days=n) for n in range(14)]
+    variants = ("velocity", "security", None)
+
+    started = time.perf_counter()
+    for n in range(1_000_000):
+        aggregates.record(
+            events[n % 4],
+            days[n % 14],
+            variant_id=variants[n % 3],
+            installation_id=f"install-{n % 5000}",
+        )
+    aggregates.flush()
+    ingest_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    totals = asyncio.run(aggregates.window(days[-1].date()))
+    read_seconds = time.perf_counter() - started
+    bucket_rows = store.read_sync(lambda conn: conn.execute("SELECT COUNT(*) FROM mobile_event_counts").fetchone()[0])
+    store.close()
+
+    assert aggregates.stored_events == 1_000_000
+    assert totals.total_events == 1_000_000
+    assert totals.count("mobile.onboarding.completed") == 250_000
+    assert sum(counts["mobile.onboarding.impression"] for counts in totals.variant_counts.values()) == 250_000 * 2 // 3 + 1
+    assert totals.active_installations == 5000
+    # At most 14 days x 4 events x 3 variants: the report reads buckets, not a million events.
+    assert bucket_rows == 84
+    assert read_seconds < 1.0
+    assert ingest_seconds < 60
@@ -37,8 +37,7 @@ def _event_payload(
 
 
 def setup_function():
-    main.mobile_analytics_events.clear()
-    main.mobile_weekly_snapshots.clear()
+    main.reset_mobile_analytics_for_tests()
     main.MOBILE_ANALYTICS_INGEST_API_KEY = ""
     main.MOBILE_ONBOARDING_EXPERIMENT_ENABLED = True
     main.MOBILE_ONBOARDING_ROLLBACK_TO_CONTROL = False
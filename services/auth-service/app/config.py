@@ -72,3 +72,21 @@ AUTH_CORS_ORIGINS = list(
 LOCKOUT_THRESHOLD = int(os.getenv("AUTH_MAX_FAILED_LOGIN_ATTEMPTS", "5"))
 LOCKOUT_WINDOW_MINUTES = max(1, int(os.getenv("AUTH_ACCOUNT_LOCKOUT_MINUTES", "15")))
 LOCKOUT_WINDOW_SECONDS = LOCKOUT_WINDOW_MINUTES * 60
+
+# Password hashing runs on a bounded worker pool (bcrypt releases the GIL);
+# requests beyond the queue limit are rejected with 503 instead of piling up.
+HASH_WORKERS = max(1, int(os.getenv("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))))
+HASH_MAX_QUEUE = max(0, int(os.getenv("AUTH_HASH_MAX_QUEUE", "64")))
+# API key secrets are 192-bit random tokens, so a keyed SHA-256 is enough.
+API_KEY_PEPPER = os.getenv("AUTH_API_KEY_PEPPER", "").strip() or SECRET_KEY
+API_KEY_CACHE_TTL_SECONDS = max(0, int(os.getenv("AUTH_API_KEY_CACHE_TTL_SECONDS", "60")))
+API_KEY_CACHE_MAX_ENTRIES = 10_000
+
+# Sessions and security events go to Postgres when this is a postgresql:// URL;
+# otherwise they share AUTH_DB_PATH. Users, subscriptions and API keys stay in
+# AUTH_DB_PATH either way, so this does not make the service multi-replica.
+AUTH_DATABASE_URL = os.getenv("AUTH_DATABASE_URL", "").strip()
+AUTH_DB_POOL_MIN = max(1, int(os.getenv("AUTH_DB_POOL_MIN", "2")))
+AUTH_DB_POOL_MAX = max(AUTH_DB_POOL_MIN, int(os.getenv("AUTH_DB_POOL_MAX", "10")))
+# Failed-login counters; empty keeps them in process memory.
+AUTH_REDIS_URL = os.getenv("AUTH_REDIS_URL", "").strip()
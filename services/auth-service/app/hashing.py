@@ -0,0 +1,159 @@
+"""Password hashing off the event loop and fast API key verification."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext  # type: ignore[import-untyped]
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import (
+    API_KEY_CACHE_MAX_ENTRIES,
+    API_KEY_CACHE_TTL_SECONDS,
+    API_KEY_PEPPER,
+    HASH_MAX_QUEUE,
+    HASH_WORKERS,
+)
+
+HASH_POOL_PENDING = Gauge(
+    "auth_password_hash_pending",
+    "Password hash operations running or waiting for a worker",
+)
+HASH_POOL_QUEUE_DEPTH = Gauge(
+    "auth_password_hash_queue_depth",
+    "Password hash operations waiting for a worker",
+)
+HASH_POOL_REJECTED = Counter(
+    "auth_password_hash_rejected_total",
+    "Password hash operations refused because the queue was full",
+    ["operation"],
+)
+HASH_SECONDS = Histogram(
+    "auth_password_hash_seconds",
+    "Password hash latency including queue wait",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+API_KEY_VERIFICATIONS = Counter(
+    "auth_api_key_verifications_total",
+    "API key verifications by path taken",
+    ["path"],
+)
+
+API_KEY_HASH_PREFIX = "hmac-sha256$"
+
+
+class PasswordHashPool:
+    """Runs bcrypt on a bounded thread pool with admission control.
+
+    At most ``workers + max_queue`` operations are admitted at once; anything
+    beyond that gets a 503 so a login burst cannot stall every other request.
+    """
+
+    def __init__(self, context: CryptContext, *, workers: int = HASH_WORKERS, max_queue: int = HASH_MAX_QUEUE):
+        self._context = context
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _set_pending(self, delta: int) -> None:
+        self._pending += delta
+        HASH_POOL_PENDING.set(self._pending)
+        HASH_POOL_QUEUE_DEPTH.set(max(0, self._pending - self.workers))
+
+    async def _run(self, operation: str, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                HASH_POOL_REJECTED.labels(operation).inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy. Please retry shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._set_pending(1)
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            HASH_SECONDS.labels(operation).observe(time.perf_counter() - started)
+            with self._lock:
+                self._set_pending(-1)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self._context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", self._context.verify, password, hashed_password)
+
+
+def api_key_secret_hash(secret: str) -> str:
+    """Stored form of a new API key secret: keyed SHA-256, checked in microseconds."""
+    digest = hmac.new(API_KEY_PEPPER.encode(), secret.encode(), hashlib.sha256).hexdigest()
+    return API_KEY_HASH_PREFIX + digest
+
+
+def is_fast_api_key_hash(stored: str) -> bool:
+    """False for keys created before the HMAC scheme, which still hold a bcrypt hash."""
+    return stored.startswith(API_KEY_HASH_PREFIX)
+
+
+class VerifiedApiKeyCache:
+    """Short-lived cache of API keys that recently verified: key id -> (secret hash, owner)."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = API_KEY_CACHE_TTL_SECONDS,
+        max_entries: int = API_KEY_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str, str, float]] = OrderedDict()
+
+    def get(self, key_id: str, secret_hash: str) -> Optional[str]:
+        """The owner's email if *key_id* verified recently with the same secret."""
+        with self._lock:
+            entry = self._entries.get(key_id)
+            if entry is None:
+                return None
+            cached_hash, user_email, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key_id]
+                return None
+        if not hmac.compare_digest(cached_hash, secret_hash):
+            return None
+        return user_email
+
+    def put(self, key_id: str, secret_hash: str, user_email: str) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key_id] = (secret_hash, user_email, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key_id: str) -> None:
+        with self._lock:
+            self._entries.pop(key_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,25 +1,126 @@
-"""Failed-login lockout backed by SQLite (survives process restarts)."""
+"""Failed-login lockout on a TTL counter store.
+
+Each failed login bumps a per-email counter whose expiry is pushed out to
+``LOCKOUT_WINDOW_SECONDS`` on every failure, so an account stays locked until
+the window has passed since the last failed attempt. With ``AUTH_REDIS_URL``
+set the counters live in Redis and survive restarts; without it they are kept
+in process memory (tests, local runs).
+"""
 
 from __future__ import annotations
 
-import datetime
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
 
 from fastapi import HTTPException, status
 
 from app.config import (
+    AUTH_REDIS_URL,
     LOCKOUT_THRESHOLD,
     LOCKOUT_WINDOW_MINUTES,
     LOCKOUT_WINDOW_SECONDS,
 )
-from app.db import _connect, db_lock
 
+LOCKOUT_KEY_PREFIX = "auth:lockout:"
+
+
+class TTLCounterStore(ABC):
+    """Integer counters that disappear ``ttl_seconds`` after their last increment."""
+
+    @abstractmethod
+    async def incr(self, key: str, ttl_seconds: int) -> int: ...
+
+    @abstractmethod
+    async def get(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+
+class MemoryTTLCounterStore(TTLCounterStore):
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic, max_keys: int = 100_000):
+        self._clock = clock
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counters: dict[str, tuple[int, float]] = {}
+
+    def _live(self, key: str, now: float) -> int:
+        entry = self._counters.get(key)
+        if entry is None:
+            return 0
+        if entry[1] <= now:
+            del self._counters[key]
+            return 0
+        return entry[0]
+
+    async def incr(self, key: str, ttl_seconds: int) -> int:
+        with self._lock:
+            now = self._clock()
+            if len(self._counters) >= self.max_keys and key not in self._counters:
+                self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+            value = self._live(key, now) + 1
+            self._counters[key] = (value, now + ttl_seconds)
+            return value
+
+    async def get(self, key: str) -> int:
+        with self._lock:
+            return self._live(key, self._clock())
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class RedisTTLCounterStore(TTLCounterStore):
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # type: ignore[import]
 
-def _normalize_email(email: str) -> str:
-    return (email or "").strip().lower()
+        self._redis = redis.from_url(url)
 
+    async def incr(self, key: str, ttl_seconds: int) -> int:
+        # INCR and EXPIRE in one round trip and one MULTI, so a crash between
+        # them cannot leave a counter that never expires.
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, ttl_seconds)
+            value, _ = await pipe.execute()
+        return int(value)
 
-def check_account_lockout(email: str) -> None:
-    if count_recent_failed_attempts(email) >= LOCKOUT_THRESHOLD:
+    async def get(self, key: str) -> int:
+        value = await self._redis.get(key)
+        return int(value) if value is not None else 0
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=f"{LOCKOUT_KEY_PREFIX}*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+
+def create_counter_store(redis_url: str) -> TTLCounterStore:
+    return RedisTTLCounterStore(redis_url) if redis_url else MemoryTTLCounterStore()
+
+
+counters: TTLCounterStore = create_counter_store(AUTH_REDIS_URL)
+
+
+def _key(email: str) -> str:
+    return LOCKOUT_KEY_PREFIX + (email or "").strip().lower()
+
+
+async def check_account_lockout(email: str) -> None:
+    if await count_recent_failed_attempts(email) >= LOCKOUT_THRESHOLD:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=(
@@ -29,62 +130,17 @@ def check_account_lockout(email: str) -> None:
         )
 
 
-def record_failed_attempt(email: str) -> None:
-    key = _normalize_email(email)
-    now = datetime.datetime.now(datetime.UTC).isoformat()
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                "INSERT INTO login_failed_attempts (email, attempted_at) VALUES (?, ?)",
-                (key, now),
-            )
-            conn.commit()
-        finally:
-            conn.close()
-
-
-def clear_failed_attempts(email: str) -> None:
-    key = _normalize_email(email)
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute("DELETE FROM login_failed_attempts WHERE email = ?", (key,))
-            conn.commit()
-        finally:
-            conn.close()
-
-
-def count_recent_failed_attempts(email: str) -> int:
-    key = _normalize_email(email)
-    cutoff = (
-        datetime.datetime.now(datetime.UTC)
-        - datetime.timedelta(seconds=LOCKOUT_WINDOW_SECONDS)
-    ).isoformat()
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                "SELECT COUNT(*) AS c FROM login_failed_attempts WHERE email = ? AND attempted_at > ?",
-                (key, cutoff),
-            ).fetchone()
-        finally:
-            conn.close()
-    return int(row["c"]) if row else 0
-
-
-def prune_old_login_attempts() -> None:
-    """Optional housekeeping; called from init."""
-    cutoff = (
-        datetime.datetime.now(datetime.UTC)
-        - datetime.timedelta(seconds=LOCKOUT_WINDOW_SECONDS * 4)
-    ).isoformat()
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                "DELETE FROM login_failed_attempts WHERE attempted_at < ?", (cutoff,)
-            )
-            conn.commit()
-        finally:
-            conn.close()
+async def record_failed_attempt(email: str) -> int:
+    return await counters.incr(_key(email), LOCKOUT_WINDOW_SECONDS)
+
+
+async def clear_failed_attempts(email: str) -> None:
+    await counters.delete(_key(email))
+
+
+async def count_recent_failed_attempts(email: str) -> int:
+    return await counters.get(_key(email))
+
+
+async def reset_for_tests() -> None:
+    await counters.clear()
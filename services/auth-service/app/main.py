@@ -3,6 +3,7 @@ import asyncio
 import datetime
 import email.mime.multipart
 import email.mime.text
+import hmac
 import io
 import logging
 import os
@@ -35,7 +36,10 @@ from app.config import (
     AUTH_ADMIN_PASSWORD,
     AUTH_BOOTSTRAP_ADMIN,
     AUTH_CORS_ORIGINS,
+    AUTH_DATABASE_URL,
     AUTH_DB_PATH,
+    AUTH_DB_POOL_MAX,
+    AUTH_DB_POOL_MIN,
     COMPLIANCE_SERVICE_URL,
     INTERNAL_SERVICE_SECRET,
     REFERRAL_SERVICE_URL,
@@ -52,6 +56,14 @@ from app.config import (
 )
 from app import lockout
 from app.db import _connect, db_lock
+from app.hashing import (
+    API_KEY_VERIFICATIONS,
+    PasswordHashPool,
+    VerifiedApiKeyCache,
+    api_key_secret_hash,
+    is_fast_api_key_hash,
+)
+from app.storage import SecurityEventBuffer, create_auth_storage
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +86,25 @@ app.add_middleware(
 Instrumentator().instrument(app).expose(app)
 
 
+# Sessions and security events; users, subscriptions and API keys stay in the
+# SQLite file behind db_lock.
+auth_storage = create_auth_storage(
+    AUTH_DATABASE_URL, AUTH_DB_PATH, min_size=AUTH_DB_POOL_MIN, max_size=AUTH_DB_POOL_MAX
+)
+security_event_buffer = SecurityEventBuffer(auth_storage)
+
+
+@app.on_event("startup")
+async def start_auth_storage() -> None:
+    await auth_storage.start()
+
+
+@app.on_event("shutdown")
+async def stop_auth_storage() -> None:
+    await security_event_buffer.flush()
+    await auth_storage.close()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
@@ -129,6 +160,12 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# Request handlers hash through the pool so bcrypt never blocks the event loop;
+# the sync helpers above are for start-up seeding and scripts.
+password_hasher = PasswordHashPool(pwd_context)
+verified_api_keys = VerifiedApiKeyCache()
+
+
 def validate_password_strength(password: str) -> None:
     errors: list[str] = []
     if len(password) < 8:
@@ -351,36 +388,29 @@ def init_auth_db() -> None:
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_api_keys_user ON api_keys(user_email)"
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS login_failed_attempts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT NOT NULL,
-                attempted_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_login_failed_email_at ON login_failed_attempts(email, attempted_at)"
-        )
         conn.commit()
         if AUTH_BOOTSTRAP_ADMIN:
             _seed_admin_user(conn)
             _ensure_configured_admin_privileges(conn)
         conn.close()
-    lockout.prune_old_login_attempts()
 
 
 def reset_auth_db_for_tests() -> None:
     with db_lock:
         conn = _connect()
         conn.execute("DELETE FROM api_keys")
-        conn.execute("DELETE FROM sessions")
-        conn.execute("DELETE FROM login_failed_attempts")
         conn.execute("DELETE FROM users")
         conn.execute("DELETE FROM subscriptions")
         conn.commit()
         conn.close()
+    verified_api_keys.clear()
+    security_event_buffer.clear()
+
+    async def _reset_storage() -> None:
+        await auth_storage.reset()
+        await lockout.reset_for_tests()
+
+    asyncio.run(_reset_storage())
 
 
 def get_user_record(email: str) -> Optional[dict[str, object]]:
@@ -535,12 +565,12 @@ def get_user(email: str) -> Optional[User]:
     )
 
 
-def authenticate_user(email: str, password: str) -> Optional[User]:
+async def authenticate_user(email: str, password: str) -> Optional[User]:
     """Authenticates a user by checking their email and password."""
     row = get_user_record(email)
     if not row:
         return None
-    if not verify_password(password, str(row["hashed_password"])):
+    if not await password_hasher.verify(password, str(row["hashed_password"])):
         return None
     role = str(row.get("role") or ("admin" if row["is_admin"] else "user"))
     return User(
@@ -626,6 +656,7 @@ async def register(user_in: UserCreate):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
+    hashed_password = await password_hasher.hash(user_in.password)
     with db_lock:
         conn = _connect()
         conn.execute(
@@ -633,7 +664,7 @@ async def register(user_in: UserCreate):
             INSERT INTO users (email, hashed_password, is_active, is_admin, is_two_factor_enabled, two_factor_secret)
             VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (user_email, get_password_hash(user_in.password), 1, 0, 0, None),
+            (user_email, hashed_password, 1, 0, 0, None),
         )
         conn.commit()
         conn.close()
@@ -799,6 +830,8 @@ async def confirm_password_reset(body: PasswordResetConfirm):
     Validates the reset token and sets the new password.
     """
     validate_password_strength(body.new_password)
+    # Hash before taking the DB lock; bcrypt is far slower than the writes.
+    new_hash = await password_hasher.hash(body.new_password)
 
     now = datetime.datetime.now(datetime.UTC)
 
@@ -827,7 +860,6 @@ async def confirm_password_reset(body: PasswordResetConfirm):
             raise HTTPException(status_code=400, detail="Reset link has expired. Please request a new one.")
 
         user_email = str(row_dict["user_email"])
-        new_hash = get_password_hash(body.new_password)
 
         conn.execute(
             "UPDATE users SET hashed_password = ? WHERE email = ?",
@@ -841,7 +873,7 @@ async def confirm_password_reset(body: PasswordResetConfirm):
         conn.close()
 
     # Clear any login lockout so the user can sign in immediately
-    lockout.clear_failed_attempts(user_email)
+    await lockout.clear_failed_attempts(user_email)
     logger.info("Password reset completed for %s", user_email)
     return {"message": "Password updated successfully. You can now log in with your new password."}
 
@@ -851,11 +883,11 @@ async def login_for_access_token(
     request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ):
-    lockout.check_account_lockout(form_data.username)
+    await lockout.check_account_lockout(form_data.username)
 
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
-        lockout.record_failed_attempt(form_data.username)
+        await lockout.record_failed_attempt(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -895,7 +927,7 @@ async def login_for_access_token(
             headers={"X-Admin-2FA-Required": "setup"},
         )
 
-    lockout.clear_failed_attempts(form_data.username)
+    await lockout.clear_failed_attempts(form_data.username)
     access_token_expires = datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token_data: dict[str, object] = {
         "sub": user.email,
@@ -916,26 +948,11 @@ async def login_for_access_token(
     )
     expires_refresh_at = now_utc + refresh_expires
     client_host = request.client.host if request.client else None
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                """
-                INSERT INTO sessions (session_id, user_email, issued_at, expires_at, ip, user_agent)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    session_jti,
-                    user.email,
-                    now_utc.isoformat(),
-                    expires_refresh_at.isoformat(),
-                    client_host,
-                    request.headers.get("user-agent"),
-                ),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    user_agent = request.headers.get("user-agent")
+    await auth_storage.create_session(
+        session_jti, user.email, now_utc, expires_refresh_at, client_host, user_agent
+    )
+    _log_security_event(user.email, "login_success", ip=client_host, user_agent=user_agent)
     return Token(
         access_token=access_token,
         token_type="bearer",
@@ -968,7 +985,7 @@ async def create_user_api_key(
             (
                 key_id,
                 current_user.email,
-                get_password_hash(secret),
+                api_key_secret_hash(secret),
                 body.label.strip(),
                 now,
             ),
@@ -1047,18 +1064,22 @@ async def revoke_user_api_key(
         )
         conn.commit()
         conn.close()
+    verified_api_keys.invalidate(kid)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@app.post("/token/api-key", response_model=Token)
-async def exchange_api_key_for_token(body: ApiKeyExchangeRequest, request: Request):
-    parsed = _parse_smk_api_key(body.api_key)
-    if not parsed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid API key format (expected smk_<id>_<secret>).",
-        )
-    key_id, secret = parsed
+async def _verify_api_key(key_id: str, secret: str) -> Optional[str]:
+    """Returns the key owner's email, or None if the key is unknown, revoked or wrong.
+
+    New keys are stored as a keyed SHA-256 and checked inline. Keys created
+    before that still hold a bcrypt hash: they are verified on the hash pool
+    once and then rewritten in the fast form.
+    """
+    secret_hash = api_key_secret_hash(secret)
+    cached_email = verified_api_keys.get(key_id, secret_hash)
+    if cached_email is not None:
+        API_KEY_VERIFICATIONS.labels("cache").inc()
+        return cached_email
     with db_lock:
         conn = _connect()
         row = conn.execute(
@@ -1069,13 +1090,46 @@ async def exchange_api_key_for_token(body: ApiKeyExchangeRequest, request: Reque
             (key_id,),
         ).fetchone()
         conn.close()
-    if row is None or not verify_password(secret, str(row["secret_hash"])):
+    if row is None:
+        return None
+    stored = str(row["secret_hash"])
+    if is_fast_api_key_hash(stored):
+        API_KEY_VERIFICATIONS.labels("hmac").inc()
+        if not hmac.compare_digest(stored, secret_hash):
+            return None
+    else:
+        API_KEY_VERIFICATIONS.labels("bcrypt").inc()
+        if not await password_hasher.verify(secret, stored):
+            return None
+        with db_lock:
+            conn = _connect()
+            conn.execute(
+                "UPDATE api_keys SET secret_hash = ? WHERE key_id = ? AND secret_hash = ?",
+                (secret_hash, key_id, stored),
+            )
+            conn.commit()
+            conn.close()
+    user_email = str(row["user_email"])
+    verified_api_keys.put(key_id, secret_hash, user_email)
+    return user_email
+
+
+@app.post("/token/api-key", response_model=Token)
+async def exchange_api_key_for_token(body: ApiKeyExchangeRequest, request: Request):
+    parsed = _parse_smk_api_key(body.api_key)
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid API key format (expected smk_<id>_<secret>).",
+        )
+    key_id, secret = parsed
+    user_email = await _verify_api_key(key_id, secret)
+    if user_email is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user_email = str(row["user_email"])
     user = get_user(user_email)
     if user is None or not user.is_active:
         raise HTTPException(
@@ -1360,19 +1414,20 @@ async def change_password(
     current_user: Annotated[User, Depends(get_current_active_user)],
 ):
     row = get_user_record(current_user.email)
-    if not row or not verify_password(
+    if not row or not await password_hasher.verify(
         payload.current_password, str(row["hashed_password"])
     ):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     validate_password_strength(payload.new_password)
+    new_hash = await password_hasher.hash(payload.new_password)
 
     with db_lock:
         conn = _connect()
         try:
             conn.execute(
                 "UPDATE users SET hashed_password = ? WHERE email = ?",
-                (get_password_hash(payload.new_password), current_user.email),
+                (new_hash, current_user.email),
             )
             conn.commit()
         finally:
@@ -2062,27 +2117,6 @@ def _init_security_tables() -> None:
     with db_lock:
         conn = _connect()
         conn.executescript("""
-            CREATE TABLE IF NOT EXISTS security_events (
-                event_id    TEXT PRIMARY KEY,
-                user_email  TEXT NOT NULL,
-                event_type  TEXT NOT NULL,
-                occurred_at TEXT NOT NULL,
-                ip          TEXT,
-                user_agent  TEXT,
-                details_json TEXT DEFAULT '{}'
-            );
-
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id         TEXT PRIMARY KEY,
-                user_email         TEXT NOT NULL,
-                issued_at          TEXT NOT NULL,
-                expires_at         TEXT NOT NULL,
-                revoked_at         TEXT,
-                revocation_reason  TEXT,
-                ip                 TEXT,
-                user_agent         TEXT
-            );
-
             CREATE TABLE IF NOT EXISTS legal_acceptances (
                 user_email  TEXT PRIMARY KEY,
                 version     TEXT NOT NULL,
@@ -2138,29 +2172,18 @@ def _log_security_event(
     user_agent: Optional[str] = None,
     details: Optional[dict] = None,
 ) -> None:
-    event_id = str(uuid.uuid4())
-    occurred_at = datetime.datetime.now(datetime.UTC).isoformat()
-    details_json = _json.dumps(details or {})
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                """INSERT INTO security_events
-                   (event_id, user_email, event_type, occurred_at, ip, user_agent, details_json)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    event_id,
-                    email,
-                    event_type,
-                    occurred_at,
-                    ip,
-                    user_agent,
-                    details_json,
-                ),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    """Queues the event; it is written with the next batch (see SecurityEventBuffer)."""
+    security_event_buffer.add(
+        (
+            str(uuid.uuid4()),
+            email,
+            event_type,
+            datetime.datetime.now(datetime.UTC).isoformat(),
+            ip,
+            user_agent,
+            _json.dumps(details or {}),
+        )
+    )
 
 
 # --- Pydantic models ---
@@ -2259,16 +2282,11 @@ async def get_security_state(
     current_user: Annotated[User, Depends(get_current_active_user)],
 ):
     meta = _get_user_metadata(current_user.email)
-    # last login event
+    await security_event_buffer.flush()
+    last_login_at = await auth_storage.last_security_event_at(current_user.email, "login_success")
     with db_lock:
         conn = _connect()
         try:
-            last_login_row = conn.execute(
-                "SELECT occurred_at FROM security_events"
-                " WHERE user_email = ? AND event_type = 'login_success'"
-                " ORDER BY occurred_at DESC LIMIT 1",
-                (current_user.email,),
-            ).fetchone()
             legal_row = conn.execute(
                 "SELECT version, accepted_at FROM legal_acceptances WHERE user_email = ?",
                 (current_user.email,),
@@ -2278,7 +2296,7 @@ async def get_security_state(
 
     legal_accepted_at = legal_row["accepted_at"] if legal_row else None
     legal_accepted_version = legal_row["version"] if legal_row else None
-    failed = lockout.count_recent_failed_attempts(current_user.email)
+    failed = await lockout.count_recent_failed_attempts(current_user.email)
 
     return SecurityStateResponse(
         email=current_user.email,
@@ -2286,7 +2304,7 @@ async def get_security_state(
         failed_login_attempts=failed,
         has_accepted_current_legal=(legal_accepted_version == LEGAL_CURRENT_VERSION),
         is_two_factor_enabled=current_user.is_two_factor_enabled,
-        last_login_at=last_login_row["occurred_at"] if last_login_row else None,
+        last_login_at=last_login_at,
         legal_accepted_at=legal_accepted_at,
         legal_accepted_version=legal_accepted_version,
         legal_current_version=LEGAL_CURRENT_VERSION,
@@ -2306,19 +2324,8 @@ async def get_security_events(
     limit: int = Query(default=25, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
 ):
-    with db_lock:
-        conn = _connect()
-        try:
-            total = conn.execute(
-                "SELECT COUNT(*) FROM security_events WHERE user_email = ?",
-                (current_user.email,),
-            ).fetchone()[0]
-            rows = conn.execute(
-                "SELECT * FROM security_events WHERE user_email = ? ORDER BY occurred_at DESC LIMIT ? OFFSET ?",
-                (current_user.email, limit, offset),
-            ).fetchall()
-        finally:
-            conn.close()
+    await security_event_buffer.flush()
+    rows, total = await auth_storage.list_security_events(current_user.email, limit, offset)
 
     items = [
         SecurityEventItem(
@@ -2348,29 +2355,7 @@ async def get_sessions(
     current_user: Annotated[User, Depends(get_current_active_user)],
     include_revoked: bool = Query(default=False),
 ):
-    with db_lock:
-        conn = _connect()
-        try:
-            if include_revoked:
-                rows = conn.execute(
-                    "SELECT * FROM sessions WHERE user_email = ? ORDER BY issued_at DESC",
-                    (current_user.email,),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM sessions WHERE user_email = ? AND revoked_at IS NULL ORDER BY issued_at DESC",
-                    (current_user.email,),
-                ).fetchall()
-            total = conn.execute(
-                "SELECT COUNT(*) FROM sessions WHERE user_email = ?",
-                (current_user.email,),
-            ).fetchone()[0]
-            active = conn.execute(
-                "SELECT COUNT(*) FROM sessions WHERE user_email = ? AND revoked_at IS NULL",
-                (current_user.email,),
-            ).fetchone()[0]
-        finally:
-            conn.close()
+    rows, total, active = await auth_storage.list_sessions(current_user.email, include_revoked)
 
     items = [
         SessionItem(
@@ -2394,19 +2379,9 @@ async def revoke_session(
     session_id: str,
     current_user: Annotated[User, Depends(get_current_active_user)],
 ):
-    now = datetime.datetime.now(datetime.UTC).isoformat()
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                "UPDATE sessions SET revoked_at = ?,"
-                " revocation_reason = 'user_revoked'"
-                " WHERE session_id = ? AND user_email = ?",
-                (now, session_id, current_user.email),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    await auth_storage.revoke_session(
+        current_user.email, session_id, "user_revoked", datetime.datetime.now(datetime.UTC)
+    )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -2414,19 +2389,9 @@ async def revoke_session(
 async def revoke_all_sessions(
     current_user: Annotated[User, Depends(get_current_active_user)],
 ):
-    now = datetime.datetime.now(datetime.UTC).isoformat()
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                "UPDATE sessions SET revoked_at = ?,"
-                " revocation_reason = 'revoke_all'"
-                " WHERE user_email = ? AND revoked_at IS NULL",
-                (now, current_user.email),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    await auth_storage.revoke_all_sessions(
+        current_user.email, "revoke_all", datetime.datetime.now(datetime.UTC)
+    )
     _log_security_event(current_user.email, "sessions_revoked_all")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -2469,55 +2434,17 @@ async def refresh_token(request: Request, body: RefreshTokenRequest):
     new_jti = uuid.uuid4().hex
     expires_refresh_at = now_utc + refresh_expires
     client_host = request.client.host if request.client else None
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                "SELECT session_id, expires_at, revoked_at FROM sessions WHERE session_id = ? AND user_email = ?",
-                (jti, email),
-            ).fetchone()
-            if row is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Refresh token not recognized",
-                )
-            if row["revoked_at"] is not None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Refresh token revoked",
-                )
-            exp_at = datetime.datetime.fromisoformat(str(row["expires_at"]))
-            if exp_at.tzinfo is None:
-                exp_at = exp_at.replace(tzinfo=datetime.timezone.utc)
-            if now_utc > exp_at:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Refresh token expired",
-                )
-            conn.execute(
-                "UPDATE sessions SET revoked_at = ?, revocation_reason = ? WHERE session_id = ?",
-                (now_utc.isoformat(), "rotated", jti),
-            )
-            conn.execute(
-                """
-                INSERT INTO sessions (session_id, user_email, issued_at, expires_at, ip, user_agent)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    new_jti,
-                    email,
-                    now_utc.isoformat(),
-                    expires_refresh_at.isoformat(),
-                    client_host,
-                    request.headers.get("user-agent"),
-                ),
-            )
-            conn.commit()
-        except HTTPException:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+    refused = await auth_storage.rotate_session(
+        jti,
+        email,
+        new_jti,
+        now_utc,
+        expires_refresh_at,
+        client_host,
+        request.headers.get("user-agent"),
+    )
+    if refused:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=refused)
     access_token_expires = datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_claims: dict[str, object] = {
         "sub": user.email,
@@ -2679,18 +2606,19 @@ async def change_password_alt(
 ):
     """Alias for /change-password used by security.tsx."""
     row = get_user_record(current_user.email)
-    if not row or not verify_password(
+    if not row or not await password_hasher.verify(
         payload.current_password, str(row["hashed_password"])
     ):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     validate_password_strength(payload.new_password)
+    new_hash = await password_hasher.hash(payload.new_password)
     now = datetime.datetime.now(datetime.UTC).isoformat()
     with db_lock:
         conn = _connect()
         try:
             conn.execute(
                 "UPDATE users SET hashed_password = ? WHERE email = ?",
-                (get_password_hash(payload.new_password), current_user.email),
+                (new_hash, current_user.email),
             )
             conn.execute(
                 """INSERT OR REPLACE INTO user_metadata (user_email, email_verified, locked_until, password_changed_at)
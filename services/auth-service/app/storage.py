@@ -0,0 +1,526 @@
+"""Async storage for sessions and security events.
+
+``AuthStorage`` is the interface the routes use. ``PostgresAuthStorage`` keeps
+a pooled asyncpg connection set on a Postgres database; ``SQLiteAuthStorage``
+runs on the shared WAL-mode SQLite store and is what tests use. Users,
+subscriptions and API keys are not behind this interface yet (they stay in
+``app.db``'s SQLite file), so either backend still means a single replica.
+Security events go through ``SecurityEventBuffer`` and are written in batches
+rather than one commit each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from libs.shared_sqlite.store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# (event_id, user_email, event_type, occurred_at, ip, user_agent, details_json)
+SecurityEventRow = tuple[str, str, str, str, Optional[str], Optional[str], str]
+
+SECURITY_EVENT_BACKLOG_LIMIT = 10_000
+
+SESSION_COLUMNS = (
+    "session_id, user_email, issued_at, expires_at, revoked_at, revocation_reason, ip, user_agent"
+)
+
+
+def _parse_utc(value: str) -> datetime.datetime:
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def _rotation_error(row: Optional[dict[str, Any]], now: datetime.datetime) -> Optional[str]:
+    if row is None:
+        return "Refresh token not recognized"
+    if row["revoked_at"] is not None:
+        return "Refresh token revoked"
+    if now > _parse_utc(str(row["expires_at"])):
+        return "Refresh token expired"
+    return None
+
+
+class AuthStorage(ABC):
+    """Sessions and security events; every method is safe to call from request handlers."""
+
+    async def start(self) -> None:
+        """Opens connections and creates tables (idempotent)."""
+
+    async def close(self) -> None:
+        """Releases connections."""
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Deletes every session and security event (tests only)."""
+
+    @abstractmethod
+    async def create_session(
+        self,
+        session_id: str,
+        user_email: str,
+        issued_at: datetime.datetime,
+        expires_at: datetime.datetime,
+        ip: Optional[str],
+        user_agent: Optional[str],
+    ) -> None: ...
+
+    @abstractmethod
+    async def rotate_session(
+        self,
+        old_session_id: str,
+        user_email: str,
+        new_session_id: str,
+        now: datetime.datetime,
+        expires_at: datetime.datetime,
+        ip: Optional[str],
+        user_agent: Optional[str],
+    ) -> Optional[str]:
+        """Revokes *old_session_id* and creates its replacement in one transaction.
+
+        Returns None on success, otherwise why the refresh token was refused.
+        """
+
+    @abstractmethod
+    async def list_sessions(self, user_email: str, include_revoked: bool) -> tuple[list[dict[str, Any]], int, int]:
+        """Returns ``(rows, total, active)`` for the user, newest first."""
+
+    @abstractmethod
+    async def revoke_session(self, user_email: str, session_id: str, reason: str, now: datetime.datetime) -> None: ...
+
+    @abstractmethod
+    async def revoke_all_sessions(self, user_email: str, reason: str, now: datetime.datetime) -> None: ...
+
+    @abstractmethod
+    async def insert_security_events(self, rows: list[SecurityEventRow]) -> None: ...
+
+    @abstractmethod
+    async def list_security_events(self, user_email: str, limit: int, offset: int) -> tuple[list[dict[str, Any]], int]:
+        """Returns ``(rows, total)`` for the user, newest first."""
+
+    @abstractmethod
+    async def last_security_event_at(self, user_email: str, event_type: str) -> Optional[str]: ...
+
+
+# --- SQLite ---
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS security_events (
+    event_id    TEXT PRIMARY KEY,
+    user_email  TEXT NOT NULL,
+    event_type  TEXT NOT NULL,
+    occurred_at TEXT NOT NULL,
+    ip          TEXT,
+    user_agent  TEXT,
+    details_json TEXT DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_security_events_user_at ON security_events(user_email, occurred_at);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id         TEXT PRIMARY KEY,
+    user_email         TEXT NOT NULL,
+    issued_at          TEXT NOT NULL,
+    expires_at         TEXT NOT NULL,
+    revoked_at         TEXT,
+    revocation_reason  TEXT,
+    ip                 TEXT,
+    user_agent         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_issued ON sessions(user_email, issued_at);
+"""
+
+
+def _create_sqlite_schema(conn) -> None:
+    # One statement at a time: executescript would commit the writer's open batch.
+    for statement in SQLITE_SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+class SQLiteAuthStorage(AuthStorage):
+    """Storage on a local WAL-mode SQLite file (tests and single-node deployments)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._store: Optional[SQLiteStore] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> SQLiteStore:
+        # Opened on first use: the test client never runs start-up hooks.
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    store = SQLiteStore(self.path)
+                    store.write_sync(_create_sqlite_schema)
+                    self._store = store
+        return self._store
+
+    async def start(self) -> None:
+        self._db()
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+    async def reset(self) -> None:
+        def _reset(conn) -> None:
+            conn.execute("DELETE FROM sessions")
+            conn.execute("DELETE FROM security_events")
+
+        await self._db().write(_reset)
+
+    async def create_session(self, session_id, user_email, issued_at, expires_at, ip, user_agent) -> None:
+        await self._db().execute(
+            """
+            INSERT INTO sessions (session_id, user_email, issued_at, expires_at, ip, user_agent)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (session_id, user_email, issued_at.isoformat(), expires_at.isoformat(), ip, user_agent),
+        )
+
+    async def rotate_session(
+        self, old_session_id, user_email, new_session_id, now, expires_at, ip, user_agent
+    ) -> Optional[str]:
+        def _rotate(conn) -> Optional[str]:
+            row = conn.execute(
+                "SELECT expires_at, revoked_at FROM sessions WHERE session_id = ? AND user_email = ?",
+                (old_session_id, user_email),
+            ).fetchone()
+            error = _rotation_error(dict(row) if row else None, now)
+            if error:
+                return error
+            conn.execute(
+                "UPDATE sessions SET revoked_at = ?, revocation_reason = 'rotated' WHERE session_id = ?",
+                (now.isoformat(), old_session_id),
+            )
+            conn.execute(
+                """
+                INSERT INTO sessions (session_id, user_email, issued_at, expires_at, ip, user_agent)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (new_session_id, user_email, now.isoformat(), expires_at.isoformat(), ip, user_agent),
+            )
+            return None
+
+        # The writer thread runs one function at a time, so the check and the
+        # update cannot interleave with another rotation of the same token.
+        return await self._db().write(_rotate)
+
+    async def list_sessions(self, user_email, include_revoked) -> tuple[list[dict[str, Any]], int, int]:
+        def _list(conn):
+            active_only = "" if include_revoked else " AND revoked_at IS NULL"
+            rows = conn.execute(
+                f"SELECT {SESSION_COLUMNS} FROM sessions WHERE user_email = ?{active_only} ORDER BY issued_at DESC",
+                (user_email,),
+            ).fetchall()
+            counts = conn.execute(
+                """
+                SELECT COUNT(*) AS total, COUNT(*) - COUNT(revoked_at) AS active
+                FROM sessions WHERE user_email = ?
+                """,
+                (user_email,),
+            ).fetchone()
+            return [dict(r) for r in rows], int(counts["total"]), int(counts["active"] or 0)
+
+        return await self._db().read(_list)
+
+    async def revoke_session(self, user_email, session_id, reason, now) -> None:
+        await self._db().execute(
+            "UPDATE sessions SET revoked_at = ?, revocation_reason = ? WHERE session_id = ? AND user_email = ?",
+            (now.isoformat(), reason, session_id, user_email),
+        )
+
+    async def revoke_all_sessions(self, user_email, reason, now) -> None:
+        await self._db().execute(
+            """
+            UPDATE sessions SET revoked_at = ?, revocation_reason = ?
+            WHERE user_email = ? AND revoked_at IS NULL
+            """,
+            (now.isoformat(), reason, user_email),
+        )
+
+    async def insert_security_events(self, rows) -> None:
+        await self._db().write(
+            lambda conn: conn.executemany(
+                """
+                INSERT OR IGNORE INTO security_events
+                (event_id, user_email, event_type, occurred_at, ip, user_agent, details_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        )
+
+    async def list_security_events(self, user_email, limit, offset) -> tuple[list[dict[str, Any]], int]:
+        def _list(conn):
+            total = conn.execute(
+                "SELECT COUNT(*) FROM security_events WHERE user_email = ?", (user_email,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT * FROM security_events WHERE user_email = ? ORDER BY occurred_at DESC LIMIT ? OFFSET ?",
+                (user_email, limit, offset),
+            ).fetchall()
+            return [dict(r) for r in rows], int(total)
+
+        return await self._db().read(_list)
+
+    async def last_security_event_at(self, user_email, event_type) -> Optional[str]:
+        row = await self._db().fetchone(
+            "SELECT MAX(occurred_at) AS at FROM security_events WHERE user_email = ? AND event_type = ?",
+            (user_email, event_type),
+        )
+        return str(row["at"]) if row and row["at"] else None
+
+
+# --- Postgres ---
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS security_events (
+    event_id     TEXT PRIMARY KEY,
+    user_email   TEXT NOT NULL,
+    event_type   TEXT NOT NULL,
+    occurred_at  TEXT NOT NULL,
+    ip           TEXT,
+    user_agent   TEXT,
+    details_json TEXT DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_security_events_user_at ON security_events(user_email, occurred_at);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id         TEXT PRIMARY KEY,
+    user_email         TEXT NOT NULL,
+    issued_at          TEXT NOT NULL,
+    expires_at         TEXT NOT NULL,
+    revoked_at         TEXT,
+    revocation_reason  TEXT,
+    ip                 TEXT,
+    user_agent         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_issued ON sessions(user_email, issued_at);
+"""
+
+
+class PostgresAuthStorage(AuthStorage):
+    """Storage on Postgres through an asyncpg pool shared by all requests of the process."""
+
+    def __init__(self, dsn: str, *, min_size: int = 2, max_size: int = 10):
+        # asyncpg takes plain postgresql:// URLs, not SQLAlchemy driver URLs.
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+
+    async def _get_pool(self):
+        if self._pool is not None:
+            return self._pool
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+        async with self._pool_lock:
+            if self._pool is None:
+                import asyncpg  # type: ignore[import]
+
+                pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+                async with pool.acquire() as conn:
+                    await conn.execute(POSTGRES_SCHEMA)
+                self._pool = pool
+        return self._pool
+
+    async def start(self) -> None:
+        await self._get_pool()
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def reset(self) -> None:
+        pool = await self._get_pool()
+        await pool.execute("TRUNCATE sessions, security_events")
+
+    async def create_session(self, session_id, user_email, issued_at, expires_at, ip, user_agent) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            """
+            INSERT INTO sessions (session_id, user_email, issued_at, expires_at, ip, user_agent)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            """,
+            session_id, user_email, issued_at.isoformat(), expires_at.isoformat(), ip, user_agent,
+        )
+
+    async def rotate_session(
+        self, old_session_id, user_email, new_session_id, now, expires_at, ip, user_agent
+    ) -> Optional[str]:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # Row lock: a refresh token replayed concurrently waits here
+                # and then sees it revoked.
+                row = await conn.fetchrow(
+                    """
+                    SELECT expires_at, revoked_at FROM sessions
+                    WHERE session_id = $1 AND user_email = $2 FOR UPDATE
+                    """,
+                    old_session_id, user_email,
+                )
+                error = _rotation_error(dict(row) if row else None, now)
+                if error:
+                    return error
+                await conn.execute(
+                    "UPDATE sessions SET revoked_at = $1, revocation_reason = 'rotated' WHERE session_id = $2",
+                    now.isoformat(), old_session_id,
+                )
+                await conn.execute(
+                    """
+                    INSERT INTO sessions (session_id, user_email, issued_at, expires_at, ip, user_agent)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    """,
+                    new_session_id, user_email, now.isoformat(), expires_at.isoformat(), ip, user_agent,
+                )
+        return None
+
+    async def list_sessions(self, user_email, include_revoked) -> tuple[list[dict[str, Any]], int, int]:
+        pool = await self._get_pool()
+        active_only = "" if include_revoked else " AND revoked_at IS NULL"
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"SELECT {SESSION_COLUMNS} FROM sessions WHERE user_email = $1{active_only} ORDER BY issued_at DESC",
+                user_email,
+            )
+            counts = await conn.fetchrow(
+                "SELECT COUNT(*) AS total, COUNT(*) - COUNT(revoked_at) AS active FROM sessions WHERE user_email = $1",
+                user_email,
+            )
+        return [dict(r) for r in rows], int(counts["total"]), int(counts["active"])
+
+    async def revoke_session(self, user_email, session_id, reason, now) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            "UPDATE sessions SET revoked_at = $1, revocation_reason = $2 WHERE session_id = $3 AND user_email = $4",
+            now.isoformat(), reason, session_id, user_email,
+        )
+
+    async def revoke_all_sessions(self, user_email, reason, now) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            """
+            UPDATE sessions SET revoked_at = $1, revocation_reason = $2
+            WHERE user_email = $3 AND revoked_at IS NULL
+            """,
+            now.isoformat(), reason, user_email,
+        )
+
+    async def insert_security_events(self, rows) -> None:
+        pool = await self._get_pool()
+        await pool.executemany(
+            """
+            INSERT INTO security_events
+            (event_id, user_email, event_type, occurred_at, ip, user_agent, details_json)
+            VALUES ($1, $2, $3, $4, $5, $6, $7) ON CONFLICT (event_id) DO NOTHING
+            """,
+            rows,
+        )
+
+    async def list_security_events(self, user_email, limit, offset) -> tuple[list[dict[str, Any]], int]:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            total = await conn.fetchval("SELECT COUNT(*) FROM security_events WHERE user_email = $1", user_email)
+            rows = await conn.fetch(
+                "SELECT * FROM security_events WHERE user_email = $1 ORDER BY occurred_at DESC LIMIT $2 OFFSET $3",
+                user_email, limit, offset,
+            )
+        return [dict(r) for r in rows], int(total)
+
+    async def last_security_event_at(self, user_email, event_type) -> Optional[str]:
+        pool = await self._get_pool()
+        value = await pool.fetchval(
+            "SELECT MAX(occurred_at) FROM security_events WHERE user_email = $1 AND event_type = $2",
+            user_email, event_type,
+        )
+        return str(value) if value else None
+
+
+def create_auth_storage(database_url: str, sqlite_path: str, *, min_size: int = 2, max_size: int = 10) -> AuthStorage:
+    """Postgres when ``database_url`` points at one, otherwise the local SQLite file."""
+    if database_url.startswith(("postgres://", "postgresql://", "postgresql+asyncpg://")):
+        return PostgresAuthStorage(database_url, min_size=min_size, max_size=max_size)
+    return SQLiteAuthStorage(sqlite_path)
+
+
+class SecurityEventBuffer:
+    """Collects security events and writes them to storage in batches.
+
+    ``add`` never waits on the database. A batch is written once it reaches
+    ``max_batch`` events or ``flush_seconds`` after its first event, whichever
+    comes first; readers call ``flush`` so they always see their own events.
+    """
+
+    def __init__(self, storage: AuthStorage, *, max_batch: int = 200, flush_seconds: float = 0.5):
+        self._storage = storage
+        self.max_batch = max_batch
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pending: list[SecurityEventRow] = []
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._full_flush_queued = False
+        self.flushed_batches = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, row: SecurityEventRow) -> None:
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.max_batch and not self._full_flush_queued
+            if full:
+                self._full_flush_queued = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (start-up code); the next flush picks it up
+        if full:
+            loop.create_task(self.flush())
+        elif self._timer_loop is not loop:
+            # One timer per loop; a loop that went away takes its timer with it.
+            self._timer_loop = loop
+            loop.call_later(self.flush_seconds, lambda: loop.create_task(self._flush_from_timer(loop)))
+
+    async def _flush_from_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer_loop is loop:
+            self._timer_loop = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._full_flush_queued = False
+        if not rows:
+            return
+        started = time.perf_counter()
+        try:
+            await self._storage.insert_security_events(rows)
+        except Exception as exc:  # noqa: BLE001 - events go back in the queue
+            logger.error("security event flush failed (%s events): %s", len(rows), exc)
+            with self._lock:
+                self._pending[:0] = rows
+                # Bound the backlog while the database is unreachable.
+                del self._pending[: max(0, len(self._pending) - SECURITY_EVENT_BACKLOG_LIMIT)]
+            return
+        self.flushed_batches += 1
+        logger.debug("flushed %s security events in %.1f ms", len(rows), (time.perf_counter() - started) * 1000)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
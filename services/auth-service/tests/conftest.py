@@ -0,0 +1,10 @@
+"""
+Keep the SQLite auth store out of the service tree: point AUTH_DB_PATH at a
+per-session temp directory before any test module imports app.config.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="auth-service-tests-")
+os.environ.setdefault("AUTH_DB_PATH", os.path.join(_db_dir, "auth.db"))
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+import threading
+
+os.environ["AUTH_ALLOW_WEAK_JWT_SECRET"] = "1"
+os.environ["AUTH_SECRET_KEY"] = "test-secret"
+os.environ["AUTH_REQUIRE_ADMIN_2FA"] = "false"
+_service_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.abspath(os.path.join(_service_root, "..", "..")))
+sys.path.insert(0, _service_root)
+
+import pytest
+from fastapi import HTTPException
+
+from app.hashing import PasswordHashPool, VerifiedApiKeyCache, api_key_secret_hash
+
+
+class _SlowContext:
+    """Stands in for CryptContext; blocks every hash until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify(self, password, hashed):
+        return hashed == f"hashed:{password}"
+
+
+def test_pool_rejects_work_beyond_its_queue_and_recovers():
+    context = _SlowContext()
+    pool = PasswordHashPool(context, workers=1, max_queue=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.hash("a"))
+        second = asyncio.ensure_future(pool.hash("b"))
+        await asyncio.sleep(0.05)
+        assert pool.pending == 2
+        with pytest.raises(HTTPException) as busy:
+            await pool.hash("c")
+        context.release.set()
+        results = await asyncio.gather(first, second)
+        return busy.value, results, await pool.verify("a", "hashed:a")
+
+    busy, results, verified = asyncio.run(scenario())
+    assert busy.status_code == 503
+    assert busy.headers == {"Retry-After": "1"}
+    assert results == ["hashed:a", "hashed:b"]
+    assert verified is True
+    assert pool.pending == 0
+
+
+def test_verified_key_cache_expires_and_checks_the_secret():
+    now = [100.0]
+    cache = VerifiedApiKeyCache(ttl_seconds=60, max_entries=2, clock=lambda: now[0])
+    good = api_key_secret_hash("s" * 48)
+    cache.put("k1", good, "a@example.com")
+
+    assert cache.get("k1", good) == "a@example.com"
+    assert cache.get("k1", api_key_secret_hash("x" * 48)) is None
+    now[0] += 61
+    assert cache.get("k1", good) is None
+
+    cache.put("k1", good, "a@example.com")
+    cache.put("k2", good, "b@example.com")
+    cache.put("k3", good, "c@example.com")
+    assert cache.get("k1", good) is None
+    cache.invalidate("k3")
+    assert cache.get("k3", good) is None
+    assert cache.get("k2", good) == "b@example.com"
@@ -22,7 +22,9 @@ from app.main import (
     PLAN_FEATURES,
     SECRET_KEY,
     ALGORITHM,
+    get_password_hash,
 )
+from app.db import _connect, db_lock
 import datetime
 import pyotp
 from jose import jwt as jose_jwt
@@ -496,6 +498,43 @@ def test_api_key_create_exchange_and_revoke():
     assert ex2.status_code == 401
 
 
+def test_legacy_bcrypt_api_key_is_upgraded_on_first_exchange():
+    email = "apikey-legacy@example.com"
+    client.post(
+        "/register",
+        json={"email": email, "password": STRONG_PASSWORD, "plan": "pro"},
+    )
+    token = _register_and_login(email)
+    headers = {"Authorization": f"Bearer {token}"}
+    create = client.post("/api-keys", headers=headers, json={"label": "old"})
+    key_id = create.json()["key_id"]
+    secret = create.json()["api_key"].split("_", 2)[2]
+    assert create.status_code == 201
+
+    # Keys issued before the HMAC scheme hold a bcrypt hash.
+    with db_lock:
+        conn = _connect()
+        conn.execute(
+            "UPDATE api_keys SET secret_hash = ? WHERE key_id = ?",
+            (get_password_hash(secret), key_id),
+        )
+        conn.commit()
+        conn.close()
+
+    wrong = client.post("/token/api-key", json={"api_key": f"smk_{key_id}_{'0' * 48}"})
+    assert wrong.status_code == 401
+    ex = client.post("/token/api-key", json={"api_key": create.json()["api_key"]})
+    assert ex.status_code == 200
+
+    with db_lock:
+        conn = _connect()
+        stored = conn.execute(
+            "SELECT secret_hash FROM api_keys WHERE key_id = ?", (key_id,)
+        ).fetchone()[0]
+        conn.close()
+    assert stored.startswith("hmac-sha256$")
+
+
 def test_api_key_forbidden_on_free_plan():
     email = "apikey-free@example.com"
     client.post("/register", json={"email": email, "password": STRONG_PASSWORD})
@@ -0,0 +1,88 @@
+import asyncio
+import datetime
+import os
+import sys
+
+os.environ["AUTH_ALLOW_WEAK_JWT_SECRET"] = "1"
+os.environ["AUTH_SECRET_KEY"] = "test-secret"
+os.environ["AUTH_REQUIRE_ADMIN_2FA"] = "false"
+_service_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.abspath(os.path.join(_service_root, "..", "..")))
+sys.path.insert(0, _service_root)
+
+from app.lockout import MemoryTTLCounterStore
+from app.storage import SecurityEventBuffer, SQLiteAuthStorage
+
+NOW = datetime.datetime(2026, 3, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _event(n: int, email: str = "a@example.com", event_type: str = "login_success"):
+    occurred_at = (NOW + datetime.timedelta(seconds=n)).isoformat()
+    return (f"evt-{n}", email, event_type, occurred_at, "127.0.0.1", "pytest", "{}")
+
+
+def test_refresh_rotation_is_single_use(tmp_path):
+    storage = SQLiteAuthStorage(str(tmp_path / "auth.db"))
+    week = NOW + datetime.timedelta(days=7)
+
+    async def scenario():
+        await storage.create_session("s1", "a@example.com", NOW, week, None, None)
+        await storage.create_session("old", "a@example.com", NOW - datetime.timedelta(days=8), NOW - datetime.timedelta(days=1), None, None)
+        first, replay = await asyncio.gather(
+            storage.rotate_session("s1", "a@example.com", "s2", NOW, week, None, None),
+            storage.rotate_session("s1", "a@example.com", "s3", NOW, week, None, None),
+        )
+        expired = await storage.rotate_session("old", "a@example.com", "s4", NOW, week, None, None)
+        unknown = await storage.rotate_session("s1", "b@example.com", "s5", NOW, week, None, None)
+        listed = await storage.list_sessions("a@example.com", include_revoked=True)
+        await storage.close()
+        return first, replay, expired, unknown, listed
+
+    first, replay, expired, unknown, (rows, total, active) = asyncio.run(scenario())
+
+    assert first is None
+    assert replay == "Refresh token revoked"
+    assert expired == "Refresh token expired"
+    assert unknown == "Refresh token not recognized"
+    assert (total, active) == (3, 2)
+    assert {r["session_id"] for r in rows} == {"s1", "s2", "old"}
+
+
+def test_security_events_are_batched_and_flushed_for_readers(tmp_path):
+    storage = SQLiteAuthStorage(str(tmp_path / "auth.db"))
+    buffer = SecurityEventBuffer(storage, max_batch=50, flush_seconds=60)
+
+    async def scenario():
+        for n in range(120):
+            buffer.add(_event(n))
+        await asyncio.sleep(0.05)  # the full batch is written in the background
+        written_in_background = (buffer.flushed_batches, buffer.pending)
+        buffer.add(_event(500, event_type="password_changed"))
+        await buffer.flush()  # readers do this, so they never wait for the timer
+        rows, total = await storage.list_security_events("a@example.com", limit=5, offset=0)
+        last_login = await storage.last_security_event_at("a@example.com", "login_success")
+        await storage.close()
+        return written_in_background, rows, total, last_login
+
+    written_in_background, rows, total, last_login = asyncio.run(scenario())
+
+    assert written_in_background == (1, 0)
+    assert buffer.flushed_batches == 2
+    assert total == 121
+    assert rows[0]["event_type"] == "password_changed"
+    assert last_login == _event(119)[3]
+
+
+def test_lockout_counters_expire_after_the_last_failure():
+    now = [0.0]
+    counters = MemoryTTLCounterStore(clock=lambda: now[0])
+
+    async def scenario():
+        for _ in range(3):
+            await counters.incr("k", 900)
+            now[0] += 600
+        held = await counters.get("k")
+        now[0] += 301
+        return held, await counters.get("k")
+
+    assert asyncio.run(scenario()) == (3, 0)
@@ -67,6 +67,7 @@ for parent in Path(__file__).resolve().parents:
         break
 
 from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies
+from libs.shared_http.client import aclose_upstream_clients
 
 get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
 
@@ -88,6 +89,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
+
+
 # --- Models ---
 class InitiateConnectionRequest(BaseModel):
     provider_id: str
@@ -1,8 +1,17 @@
 import os
+import sys
 import uuid
+from pathlib import Path
 from typing import Optional, Dict, Any, List
 
-import httpx
+for _parent in Path(__file__).resolve().parents:
+    if (_parent / "libs").exists():
+        _root = str(_parent)
+        if _root not in sys.path:
+            sys.path.insert(0, _root)
+        break
+
+from libs.shared_http.client import get_upstream_client
 
 from .base import BankingProvider, ProviderInitResult, ProviderCallbackResult
 
@@ -66,14 +75,13 @@ class SaltedgeProvider(BankingProvider):
         external_id = f"{self.customer_prefix}-{user_id}"
         payload = {"data": {"identifier": external_id}}
         url = f"{self.base_url}/customers"
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=self._headers(), timeout=10.0)
-            if response.status_code in (200, 201):
-                data = response.json().get("data", {})
-                return str(data.get("id") or data.get("identifier") or external_id)
-            if response.status_code == 409:
-                return external_id
-            raise ValueError(f"Salt Edge customer creation failed: {response.text}")
+        response = await get_upstream_client(url).post(url, json=payload, headers=self._headers(), timeout=10.0)
+        if response.status_code in (200, 201):
+            data = response.json().get("data", {})
+            return str(data.get("id") or data.get("identifier") or external_id)
+        if response.status_code == 409:
+            return external_id
+        raise ValueError(f"Salt Edge customer creation failed: {response.text}")
 
     async def _create_connect_session(self, customer_id: str, redirect_uri: str) -> str:
         url = f"{self.base_url}/connect_sessions/create"
@@ -88,15 +96,14 @@ class SaltedgeProvider(BankingProvider):
                 "scopes": self.scopes,
             }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=self._headers(), timeout=10.0)
-            if response.status_code not in (200, 201):
-                raise ValueError(f"Salt Edge connect session failed: {response.text}")
-            data = response.json().get("data", {})
-            connect_url = data.get("connect_url") or data.get("url")
-            if not connect_url:
-                raise ValueError("Salt Edge connect session response missing connect URL.")
-            return connect_url
+        response = await get_upstream_client(url).post(url, json=payload, headers=self._headers(), timeout=10.0)
+        if response.status_code not in (200, 201):
+            raise ValueError(f"Salt Edge connect session failed: {response.text}")
+        data = response.json().get("data", {})
+        connect_url = data.get("connect_url") or data.get("url")
+        if not connect_url:
+            raise ValueError("Salt Edge connect session response missing connect URL.")
+        return connect_url
 
     async def fetch_transactions(self, connection_id: str) -> List[Dict[str, Any]]:
         """Fetch normalized transaction dicts for an existing Salt Edge connection (used on sync)."""
@@ -105,11 +112,10 @@ class SaltedgeProvider(BankingProvider):
     async def _fetch_transactions(self, connection_id: str) -> List[Dict[str, Any]]:
         url = f"{self.base_url}/transactions"
         params = {"connection_id": connection_id}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, headers=self._headers(), timeout=15.0)
-            if response.status_code != 200:
-                return []
-            raw_transactions = response.json().get("data", [])
+        response = await get_upstream_client(url).get(url, params=params, headers=self._headers(), timeout=15.0)
+        if response.status_code != 200:
+            return []
+        raw_transactions = response.json().get("data", [])
 
         mapped: List[Dict[str, Any]] = []
         for item in raw_transactions:
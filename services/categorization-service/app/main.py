@@ -1,14 +1,23 @@
 import logging
 import os
+import sys
+from pathlib import Path
 from typing import Annotated, Optional
 
-from fastapi import Depends, FastAPI, Header, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from pydantic import BaseModel
+for parent in Path(__file__).resolve().parents:
+    if (parent / "libs").exists():
+        parent_str = str(parent)
+        if parent_str not in sys.path:
+            sys.path.append(parent_str)
+        break
 
-from .learn_store import lookup_user_category, upsert_rule
-from .merchant_rules_store import (
+from fastapi import Depends, FastAPI, Header, HTTPException, status  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies  # noqa: E402
+
+from .learn_store import lookup_user_category, upsert_rule  # noqa: E402
+from .merchant_rules_store import (  # noqa: E402
     list_global_merchant_rules,
     lookup_global_merchant_category,
     upsert_global_merchant_rule,
@@ -29,26 +38,7 @@ async def health_check():
     return {"status": "ok"}
 
 # --- Security ---
-AUTH_SECRET_KEY = os.environ["AUTH_SECRET_KEY"]
-AUTH_ALGORITHM = "HS256"
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
-
-
-def get_current_user_id(token: Annotated[str, Depends(oauth2_scheme)]) -> str:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, AUTH_SECRET_KEY, algorithms=[AUTH_ALGORITHM])
-    except JWTError as exc:
-        raise credentials_exception from exc
-
-    user_id = payload.get("sub")
-    if not user_id:
-        raise credentials_exception
-    return user_id
+get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
 
 
 class CategorizationRequest(BaseModel):
@@ -23,6 +23,7 @@ for parent in Path(__file__).resolve().parents:
         break
 
 from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies
+from libs.shared_http.client import aclose_upstream_clients
 from libs.shared_http.retry import post_json_with_retry
 
 get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
@@ -33,6 +34,7 @@ async def lifespan(_app: FastAPI):
     async with engine.begin() as connection:
         await connection.run_sync(Base.metadata.create_all)
     yield
+    await aclose_upstream_clients()
 
 
 app = FastAPI(
@@ -166,8 +166,15 @@ from libs.shared_auth.jwt_fastapi import (  # noqa: E402,I001,I002,C0411
 from libs.shared_auth.plan_enforcement_log import log_plan_enforcement_denial  # noqa: E402
 from libs.shared_auth.plan_limits import PlanLimits, get_plan_limits  # noqa: E402
 from libs.shared_compliance.audit_client import post_audit_event  # noqa: E402
+from libs.shared_http.client import aclose_upstream_clients  # noqa: E402
 from libs.shared_http.request_id import get_request_id  # noqa: E402
 
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
+
+
 get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
 AUTH_SECRET_KEY = os.environ["AUTH_SECRET_KEY"]
 AUTH_ALGORITHM = "HS256"
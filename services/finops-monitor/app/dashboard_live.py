@@ -1,14 +1,57 @@
+"""
+Live dashboard push over WebSocket.
+
+One DashboardHub per process multiplexes every open dashboard socket onto a
+single Redis pattern subscription (``dashboard:live:*``):
+
+  - an in-memory registry maps user_id → open sockets;
+  - ``transactions_updated`` pushes are coalesced per user: the first event is
+    sent at once, further events inside ``DASHBOARD_PUSH_DEBOUNCE_MS`` collapse
+    into one trailing push;
+  - a single heartbeat task pings every socket instead of one task per socket;
+  - every send is bounded by ``DASHBOARD_SEND_TIMEOUT_SECONDS`` and at most
+    ``DASHBOARD_SEND_CONCURRENCY`` sends run at once, so one stalled client
+    cannot hold up a fan-out or heartbeat. Sockets that time out are dropped.
+
+Any replica may publish with publish_dashboard_refresh(); every replica holding
+sockets for that user pushes to them.
+"""
+
 from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import time
 from typing import Any
 
 from fastapi import WebSocket, WebSocketDisconnect
 from jose import JWTError, jwt
+from prometheus_client import Counter, Gauge, Histogram
 
 log = logging.getLogger(__name__)
 
+DASHBOARD_CHANNEL_PREFIX = "dashboard:live:"
+DASHBOARD_PUSH_DEBOUNCE_MS = int(os.getenv("DASHBOARD_PUSH_DEBOUNCE_MS", "500"))
+DASHBOARD_HEARTBEAT_SECONDS = float(os.getenv("DASHBOARD_HEARTBEAT_SECONDS", "25"))
+DASHBOARD_SEND_TIMEOUT_SECONDS = float(os.getenv("DASHBOARD_SEND_TIMEOUT_SECONDS", "5"))
+DASHBOARD_SEND_CONCURRENCY = int(os.getenv("DASHBOARD_SEND_CONCURRENCY", "200"))
+
+DASHBOARD_WS_CONNECTIONS = Gauge(
+    "finops_dashboard_ws_connections",
+    "Open dashboard WebSocket connections in this process.",
+)
+DASHBOARD_PUSHES_TOTAL = Counter(
+    "finops_dashboard_pushes_total",
+    "Dashboard refresh events by outcome (sent, coalesced, failed, timeout, no_sockets).",
+    labelnames=("outcome",),
+)
+DASHBOARD_SEND_SECONDS = Histogram(
+    "finops_dashboard_send_seconds",
+    "Time to push one transactions_updated frame to one socket.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
 
 def _decode_ws_user_id(token: str, *, secret: str, algorithm: str) -> str:
     t = (token or "").strip()
@@ -23,10 +66,167 @@ def _decode_ws_user_id(token: str, *, secret: str, algorithm: str) -> str:
     return str(sub).strip().lower()
 
 
+class DashboardHub:
+    def __init__(
+        self,
+        redis_client: Any,
+        *,
+        debounce_ms: int = DASHBOARD_PUSH_DEBOUNCE_MS,
+        heartbeat_seconds: float = DASHBOARD_HEARTBEAT_SECONDS,
+        send_timeout_seconds: float = DASHBOARD_SEND_TIMEOUT_SECONDS,
+        send_concurrency: int = DASHBOARD_SEND_CONCURRENCY,
+    ):
+        self.redis_client = redis_client
+        self.debounce_seconds = max(debounce_ms, 0) / 1000.0
+        self.heartbeat_seconds = heartbeat_seconds
+        self.send_timeout_seconds = send_timeout_seconds
+        self._send_slots = asyncio.Semaphore(max(send_concurrency, 1))
+        self._sockets: dict[str, set[WebSocket]] = {}
+        self._last_push: dict[str, float] = {}
+        self._scheduled: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._listener: asyncio.Task | None = None
+        self._heartbeat: asyncio.Task | None = None
+
+    # ── registry ──────────────────────────────────────────────────────────────
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(s) for s in self._sockets.values())
+
+    def register(self, user_id: str, websocket: WebSocket) -> None:
+        self._sockets.setdefault(user_id, set()).add(websocket)
+        DASHBOARD_WS_CONNECTIONS.inc()
+
+    def unregister(self, user_id: str, websocket: WebSocket) -> None:
+        sockets = self._sockets.get(user_id)
+        if not sockets or websocket not in sockets:
+            return
+        sockets.discard(websocket)
+        DASHBOARD_WS_CONNECTIONS.dec()
+        if not sockets:
+            del self._sockets[user_id]
+            self._last_push.pop(user_id, None)
+
+    # ── fan-out ───────────────────────────────────────────────────────────────
+
+    def notify(self, user_id: str) -> None:
+        """Queue a transactions_updated push, coalescing bursts for the same user."""
+        if user_id not in self._sockets:
+            DASHBOARD_PUSHES_TOTAL.labels(outcome="no_sockets").inc()
+            return
+        if user_id in self._scheduled:
+            DASHBOARD_PUSHES_TOTAL.labels(outcome="coalesced").inc()
+            return
+        last = self._last_push.get(user_id)
+        delay = 0.0 if last is None else max(last + self.debounce_seconds - time.monotonic(), 0.0)
+        self._scheduled.add(user_id)
+        self._spawn(self._flush(user_id, delay))
+
+    async def _flush(self, user_id: str, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        self._scheduled.discard(user_id)
+        sockets = list(self._sockets.get(user_id, ()))
+        if not sockets:
+            return
+        self._last_push[user_id] = time.monotonic()
+        results = await asyncio.gather(
+            *(self._send(ws, {"type": "transactions_updated"}) for ws in sockets)
+        )
+        for ws, outcome in zip(sockets, results):
+            DASHBOARD_PUSHES_TOTAL.labels(outcome=outcome).inc()
+            if outcome != "sent":
+                self._drop(user_id, ws)
+
+    async def _send(self, websocket: WebSocket, message: dict) -> str:
+        """Send one frame; returns "sent", "timeout" or "failed"."""
+        async with self._send_slots:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(websocket.send_json(message), self.send_timeout_seconds)
+            except asyncio.TimeoutError:
+                return "timeout"
+            except Exception:
+                return "failed"
+            DASHBOARD_SEND_SECONDS.observe(time.perf_counter() - started)
+            return "sent"
+
+    def _drop(self, user_id: str, websocket: WebSocket) -> None:
+        """Forget a socket that failed or stalled and close it in the background."""
+        self.unregister(user_id, websocket)
+        self._spawn(self._close(websocket))
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), self.send_timeout_seconds)
+        except Exception:
+            pass
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def handle_message(self, message: dict) -> None:
+        if message.get("type") != "pmessage":
+            return
+        channel = message.get("channel")
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        if not isinstance(channel, str) or not channel.startswith(DASHBOARD_CHANNEL_PREFIX):
+            return
+        self.notify(channel[len(DASHBOARD_CHANNEL_PREFIX):])
+
+    # ── background tasks ──────────────────────────────────────────────────────
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{DASHBOARD_CHANNEL_PREFIX}*")
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.warning("dashboard hub subscription lost: %s (retry in %.0fs)", exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _ping_all(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            targets = [(user_id, ws) for user_id, sockets in list(self._sockets.items()) for ws in list(sockets)]
+            results = await asyncio.gather(*(self._send(ws, {"type": "ping"}) for _user_id, ws in targets))
+            for (user_id, ws), outcome in zip(targets, results):
+                if outcome != "sent":
+                    self._drop(user_id, ws)
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            self._heartbeat = asyncio.create_task(self._ping_all())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._listener, self._heartbeat, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._listener = self._heartbeat = None
+
+
 async def websocket_dashboard_live(
     *,
     websocket: WebSocket,
-    redis_client: Any,
+    hub: DashboardHub,
     auth_secret_key: str,
     auth_algorithm: str,
 ) -> None:
@@ -42,42 +242,21 @@ async def websocket_dashboard_live(
         await websocket.close(code=1008, reason="unauthorized")
         return
 
-    channel = f"dashboard:live:{user_id}"
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe(channel)
-
-    async def heartbeat() -> None:
-        try:
-            while True:
-                await asyncio.sleep(25)
-                await websocket.send_json({"type": "ping"})
-        except Exception:
-            return
-
-    hb = asyncio.create_task(heartbeat())
+    hub.register(user_id, websocket)
     try:
-        async for msg in pubsub.listen():
-            if msg.get("type") == "message":
-                await websocket.send_json({"type": "transactions_updated"})
+        # Pushes come from the hub; reading here only detects the client going away.
+        while True:
+            await websocket.receive_text()
     except WebSocketDisconnect:
         log.info("dashboard ws closed user=%s", user_id)
     except Exception as exc:
         log.warning("dashboard ws error user=%s: %s", user_id, exc)
     finally:
-        hb.cancel()
-        try:
-            await hb
-        except asyncio.CancelledError:
-            pass
-        try:
-            await pubsub.unsubscribe(channel)
-            await pubsub.close()
-        except Exception:
-            pass
+        hub.unregister(user_id, websocket)
 
 
 async def publish_dashboard_refresh(redis_client: Any, *, user_id: str) -> int:
     uid = user_id.strip().lower()
     if not uid:
         return 0
-    return int(await redis_client.publish(f"dashboard:live:{uid}", "1") or 0)
+    return int(await redis_client.publish(f"{DASHBOARD_CHANNEL_PREFIX}{uid}", "1") or 0)
@@ -8,25 +8,41 @@ Endpoints:
   GET /mtd/{user_id}/quarterly/{quarter}     – specific quarter (e.g. Q1)
   GET /mtd/{user_id}/all/{tax_year}          – all 4 quarters for a tax year
   POST /mtd/{user_id}/sync                   – manual sync of MTD totals
+  POST /mtd/{user_id}/transactions           – idempotent batch ingest (e.g. a whole import)
+  POST /internal/dashboard-transaction-event – fan out a dashboard refresh for a user
+  POST /internal/monitor-events              – enqueue a change event for the stream monitors
+  WS   /ws/dashboard/live                    – live dashboard pushes (first frame: JWT)
+  GET /metrics
+
+Stream monitors (app.monitors.consumer):
+  fraud, balance and invoice monitors consume change events from Redis Streams,
+  one consumer group each; alerts are fingerprinted and suppressed when repeated.
 
 Scheduled tasks:
-  run_all_monitors()    – every 5 minutes  (fraud, balance, invoices)
-  run_mtd_weekly()      – every Sunday     (bulk-sync MTD accumulators)
+  run_all_monitors()    – every FINOPS_MONITOR_RECONCILE_MINUTES (5): concurrent
+                          reconcile poll in case an event was missed
+  run_mtd_weekly()      – every Sunday     (partitioned bulk-sync of MTD accumulators)
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from typing import Literal
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
 
+from app.dashboard_live import DashboardHub, publish_dashboard_refresh, websocket_dashboard_live
 from app.monitors import balance_monitor, fraud_monitor, invoice_monitor
+from app.monitors.consumer import CHANGES_STREAM, build_stream_monitors
+from app.mtd.bulk_sync import sync_all_users
 from app.mtd.deadlines import days_until_deadline, get_next_deadline
 from app.mtd.tracker import QuarterlyAccumulator
 from app.redis_bus import EventType, create_redis_client, publish_event
@@ -35,23 +51,32 @@ log = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 AUTH_SECRET_KEY = os.environ["AUTH_SECRET_KEY"]
+AUTH_ALGORITHM = "HS256"
+MONITOR_RECONCILE_MINUTES = int(os.getenv("FINOPS_MONITOR_RECONCILE_MINUTES", "5"))
 
 # ── scheduler + redis (module-level, initialised in lifespan) ────────────────
 scheduler = AsyncIOScheduler()
 redis_client = None
+dashboard_hub: DashboardHub | None = None
+_stream_monitor_tasks: list[asyncio.Task] = []
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global redis_client
+    global redis_client, dashboard_hub
     redis_client = await create_redis_client()
     log.info("Redis connected: %s", os.getenv("REDIS_URL", "redis://redis:6379/0"))
+    dashboard_hub = DashboardHub(redis_client)
+    dashboard_hub.start()
+    _stream_monitor_tasks[:] = [
+        asyncio.create_task(m.run_forever()) for m in build_stream_monitors(redis_client)
+    ]
 
     # Register periodic jobs
     scheduler.add_job(
         _run_all_monitors,
         "interval",
-        minutes=5,
+        minutes=MONITOR_RECONCILE_MINUTES,
         id="monitors",
         replace_existing=True,
     )
@@ -69,6 +94,11 @@ async def lifespan(app: FastAPI):
     yield
 
     scheduler.shutdown(wait=False)
+    for task in _stream_monitor_tasks:
+        task.cancel()
+    await asyncio.gather(*_stream_monitor_tasks, return_exceptions=True)
+    if dashboard_hub:
+        await dashboard_hub.stop()
     if redis_client:
         await redis_client.aclose()
 
@@ -91,22 +121,26 @@ app.add_middleware(
 # ── scheduled task implementations ───────────────────────────────────────────
 
 async def _run_all_monitors() -> None:
-    """Called every 5 minutes by the scheduler."""
+    """Reconcile poll; the stream monitors handle events as they arrive."""
     log.info("[%s] Running all monitors", datetime.now(timezone.utc).isoformat())
-    try:
-        await fraud_monitor.run(redis_client)
-        await balance_monitor.run(redis_client)
-        await invoice_monitor.run(redis_client)
-    except Exception as exc:
-        log.error("Monitor run error: %s", exc, exc_info=True)
+    results = await asyncio.gather(
+        fraud_monitor.run(redis_client),
+        balance_monitor.run(redis_client),
+        invoice_monitor.run(redis_client),
+        return_exceptions=True,
+    )
+    for name, result in zip(("fraud", "balance", "invoice"), results):
+        if isinstance(result, BaseException):
+            log.error("Monitor run error (%s): %s", name, result, exc_info=result)
 
 
 async def _run_mtd_weekly() -> None:
     """Weekly MTD accumulation sync — called every Sunday at 02:00 UTC."""
     log.info("[%s] Running weekly MTD sync", datetime.now(timezone.utc).isoformat())
-    # In production this would query the transactions service for all users
-    # and call accumulator.bulk_sync(). For now we log the intent.
-    log.info("MTD weekly sync complete (no users configured yet)")
+    try:
+        await sync_all_users(redis_client)
+    except Exception as exc:
+        log.error("MTD weekly sync error: %s", exc, exc_info=True)
 
 
 # ── REST endpoints ────────────────────────────────────────────────────────────
@@ -128,6 +162,67 @@ async def status():
     }
 
 
+@app.get("/metrics")
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# ── live dashboard ────────────────────────────────────────────────────────────
+
+class DashboardTransactionEvent(BaseModel):
+    user_id: str
+
+
+@app.post("/internal/dashboard-transaction-event")
+async def internal_dashboard_transaction_event(
+    payload: DashboardTransactionEvent,
+    x_internal_token: str | None = Header(default=None, alias="X-Internal-Token"),
+):
+    """Transactions-service: a user's transactions changed; refresh their open dashboards on every replica."""
+    secret = os.getenv("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret:
+        raise HTTPException(503, "internal_calls_not_configured")
+    if not x_internal_token or x_internal_token != secret:
+        raise HTTPException(403, "forbidden")
+    receivers = await publish_dashboard_refresh(redis_client, user_id=payload.user_id)
+    return {"status": "published", "receivers": receivers}
+
+
+class MonitorChangeEvent(BaseModel):
+    type: str                      # fraud_flagged | balance_updated | invoice_updated
+    user_id: str
+    data: dict = {}
+
+
+@app.post("/internal/monitor-events")
+async def internal_monitor_events(
+    payload: MonitorChangeEvent,
+    x_internal_token: str | None = Header(default=None, alias="X-Internal-Token"),
+):
+    """Upstream services: enqueue a change event for the stream monitors."""
+    secret = os.getenv("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret:
+        raise HTTPException(503, "internal_calls_not_configured")
+    if not x_internal_token or x_internal_token != secret:
+        raise HTTPException(403, "forbidden")
+    msg_id = await publish_event(
+        redis_client,
+        stream=CHANGES_STREAM,
+        event={**payload.data, "type": payload.type, "user_id": payload.user_id},
+    )
+    return {"status": "queued", "id": msg_id}
+
+
+@app.websocket("/ws/dashboard/live")
+async def ws_dashboard_live(websocket: WebSocket):
+    await websocket_dashboard_live(
+        websocket=websocket,
+        hub=dashboard_hub,
+        auth_secret_key=AUTH_SECRET_KEY,
+        auth_algorithm=AUTH_ALGORITHM,
+    )
+
+
 @app.get("/mtd/{user_id}/status")
 async def mtd_status(user_id: str):
     """Return the current quarter MTD accumulator for a user."""
@@ -210,6 +305,27 @@ async def mtd_sync(user_id: str, payload: SyncPayload):
     return result
 
 
+class AccumulatorTransaction(BaseModel):
+    amount: float
+    transaction_type: Literal["income", "expense"]
+    transaction_id: str | None = None
+    date: str | None = None        # ISO date, picks the quarter; defaults to current
+
+
+class TransactionBatchPayload(BaseModel):
+    transactions: list[AccumulatorTransaction]
+
+
+@app.post("/mtd/{user_id}/transactions")
+async def mtd_add_transactions(user_id: str, payload: TransactionBatchPayload):
+    """Apply a batch of transactions atomically; replayed transaction_ids are not counted again."""
+    acc = QuarterlyAccumulator(redis_client, user_id)
+    try:
+        return await acc.add_transactions(t.model_dump() for t in payload.transactions)
+    except ValueError as exc:
+        raise HTTPException(422, str(exc)) from exc
+
+
 # ── CIS reminder endpoints ────────────────────────────────────────────────────
 
 class CISReminderRequest(BaseModel):
@@ -0,0 +1,70 @@
+"""
+Alert fingerprinting and suppression for the finops:alerts stream.
+
+Every alert is identified by a fingerprint of its type, user and the fields
+that make it "the same alert" (transaction id, invoice id, ...). Publishing
+claims the fingerprint with SET NX EX; while the key lives, the same alert is
+suppressed, so reconcile polls and replayed change events do not republish
+alerts that consumers have already seen. A claim whose publish fails is
+released again, so the retried change still alerts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import Any
+
+from prometheus_client import Counter
+
+from app.redis_bus import EventType, publish_event
+
+log = logging.getLogger(__name__)
+
+ALERTS_STREAM = "finops:alerts"
+_FINGERPRINT_PREFIX = "finops:alert:fp:"
+
+# Seconds an alert stays suppressed after it was published.
+SUPPRESSION_SECONDS: dict[str, int] = {
+    EventType.FRAUD_ALERT:      int(os.getenv("FRAUD_ALERT_SUPPRESS_SECONDS", str(30 * 24 * 3600))),
+    EventType.LOW_BALANCE:      int(os.getenv("LOW_BALANCE_ALERT_SUPPRESS_SECONDS", str(6 * 3600))),
+    EventType.INVOICE_OVERDUE:  int(os.getenv("INVOICE_ALERT_SUPPRESS_SECONDS", str(24 * 3600))),
+    EventType.INVOICE_DUE_SOON: int(os.getenv("INVOICE_ALERT_SUPPRESS_SECONDS", str(24 * 3600))),
+}
+_DEFAULT_SUPPRESSION_SECONDS = 24 * 3600
+
+ALERTS_TOTAL = Counter(
+    "finops_alerts_total",
+    "Monitor alerts by type and outcome (published, suppressed).",
+    labelnames=("type", "outcome"),
+)
+
+
+def alert_fingerprint(alert_type: str, user_id: Any, *identity: Any) -> str:
+    raw = "|".join(str(part) for part in (alert_type, user_id, *identity))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def publish_alert(redis_client: Any, event: dict, *identity: Any) -> bool:
+    """Publish *event* to finops:alerts unless an alert with the same fingerprint is suppressed."""
+    alert_type = str(event.get("type"))
+    fp = alert_fingerprint(alert_type, event.get("user_id"), *identity)
+    window = SUPPRESSION_SECONDS.get(alert_type, _DEFAULT_SUPPRESSION_SECONDS)
+    key = f"{_FINGERPRINT_PREFIX}{fp}"
+    if not await redis_client.set(key, "1", nx=True, ex=window):
+        ALERTS_TOTAL.labels(type=alert_type, outcome="suppressed").inc()
+        return False
+    try:
+        await publish_event(redis_client, stream=ALERTS_STREAM, event={**event, "fingerprint": fp})
+    except BaseException:
+        # Release the claim so the redelivered change can alert instead of being suppressed.
+        await redis_client.delete(key)
+        raise
+    ALERTS_TOTAL.labels(type=alert_type, outcome="published").inc()
+    return True
+
+
+async def clear_alert(redis_client: Any, alert_type: str, user_id: Any, *identity: Any) -> None:
+    """Lift suppression early (e.g. balance recovered), so the next breach alerts at once."""
+    await redis_client.delete(f"{_FINGERPRINT_PREFIX}{alert_fingerprint(alert_type, user_id, *identity)}")
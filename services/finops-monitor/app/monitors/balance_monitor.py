@@ -1,6 +1,11 @@
 """
-Balance monitor — fetches account balances from the transactions service
-and publishes a low-balance warning when below the configured threshold.
+Balance monitor — caches account balances and publishes a low-balance warning
+when below the configured threshold.
+
+Event-driven path: ``balance_updated`` change events are handled as they
+arrive. Reconcile path: run() reads /balances/summary from the transactions
+service. A low-balance alert is suppressed while it stays low and re-armed as
+soon as the balance recovers.
 
 transactions-service: internal port 8003 (or $TRANSACTIONS_SERVICE_URL).
 """
@@ -10,10 +15,12 @@ from __future__ import annotations
 import logging
 import os
 from datetime import datetime, timezone
+from typing import Any
 
 import httpx
 
-from app.redis_bus import EventType, publish_event
+from app.monitors.alerts import clear_alert, publish_alert
+from app.redis_bus import EventType
 
 log = logging.getLogger(__name__)
 
@@ -25,9 +32,46 @@ TRANSACTIONS_SERVICE_URL = os.getenv(
 LOW_BALANCE_THRESHOLD = float(os.getenv("LOW_BALANCE_THRESHOLD", "500"))
 
 
+async def handle_item(redis_client: Any, item: dict) -> dict | None:
+    """Cache one balance and alert if it is low; returns the alert, or None."""
+    uid = item.get("user_id")
+    balance = float(item.get("available_balance", 0))
+    currency = item.get("currency", "GBP")
+
+    # Cache latest balance in Redis
+    await redis_client.hset(
+        f"finops:balance:{uid}",
+        mapping={
+            "available_balance": balance,
+            "currency":          currency,
+            "updated_at":        datetime.now(timezone.utc).isoformat(),
+        },
+    )
+
+    if balance >= LOW_BALANCE_THRESHOLD:
+        await clear_alert(redis_client, EventType.LOW_BALANCE, uid, currency)
+        return None
+
+    event = {
+        "type":              EventType.LOW_BALANCE,
+        "user_id":           uid,
+        "available_balance": balance,
+        "threshold":         LOW_BALANCE_THRESHOLD,
+        "currency":          currency,
+        "checked_at":        datetime.now(timezone.utc).isoformat(),
+    }
+    if not await publish_alert(redis_client, event, currency):
+        return None
+    log.info(
+        "LOW BALANCE alert for user %s: £%.2f (threshold £%.2f)",
+        uid, balance, LOW_BALANCE_THRESHOLD,
+    )
+    return event
+
+
 async def run(redis_client, user_ids: list[str] | None = None) -> list[dict]:
     """
-    Check account balances for all (or specified) users.
+    Reconcile balances for all (or specified) users.
     Publishes a LOW_BALANCE event when balance < LOW_BALANCE_THRESHOLD.
 
     Returns list of events produced this run.
@@ -50,36 +94,10 @@ async def run(redis_client, user_ids: list[str] | None = None) -> list[dict]:
             return events
 
     for item in balances:
-        uid = item.get("user_id")
-        if user_ids and uid not in user_ids:
+        if user_ids and item.get("user_id") not in user_ids:
             continue
-
-        balance = float(item.get("available_balance", 0))
-
-        # Cache latest balance in Redis
-        await redis_client.hset(
-            f"finops:balance:{uid}",
-            mapping={
-                "available_balance": balance,
-                "currency":          item.get("currency", "GBP"),
-                "updated_at":        datetime.now(timezone.utc).isoformat(),
-            },
-        )
-
-        if balance < LOW_BALANCE_THRESHOLD:
-            event = {
-                "type":              EventType.LOW_BALANCE,
-                "user_id":           uid,
-                "available_balance": balance,
-                "threshold":         LOW_BALANCE_THRESHOLD,
-                "currency":          item.get("currency", "GBP"),
-                "checked_at":        datetime.now(timezone.utc).isoformat(),
-            }
+        event = await handle_item(redis_client, item)
+        if event is not None:
             events.append(event)
-            await publish_event(redis_client, stream="finops:alerts", event=event)
-            log.info(
-                "LOW BALANCE alert for user %s: £%.2f (threshold £%.2f)",
-                uid, balance, LOW_BALANCE_THRESHOLD,
-            )
 
     return events
@@ -0,0 +1,164 @@
+"""
+Event-driven monitor runner.
+
+Producers add change events to one Redis stream (``finops:changes``, or
+$FINOPS_CHANGES_STREAM), either directly with XADD or through
+POST /internal/monitor-events:
+
+  fraud_flagged    – user_id, transaction_id, amount, reason, fraud_score, detected_at
+  balance_updated  – user_id, available_balance, currency
+  invoice_updated  – user_id, id, due_date, status, total_amount, currency, client_name
+
+Only fraud_flagged has a producer so far: fraud-detection sends it when an
+ingested transaction batch scores a user high-risk. No service tracks account balances
+and invoice-service does not emit invoice changes yet, so the balance and
+invoice monitors are driven by the reconcile poll alone until one does.
+
+Each monitor reads the stream through its own consumer group, so each keeps
+its own cursor (the group's last-delivered id) and a slow or failing monitor
+never holds the others back. Replicas share a group and split the events.
+
+An entry is acknowledged only once its handler succeeds. A failed entry stays
+pending, and every ``retry_idle_ms`` the consumer XAUTOCLAIMs entries that have
+been pending that long: its own failures, and entries held by a replica that
+died before acknowledging them. After ``max_deliveries`` attempts an entry is
+acknowledged and logged; the reconcile poll covers it from then on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable
+
+from redis.exceptions import ResponseError
+
+from app.monitors import balance_monitor, fraud_monitor, invoice_monitor
+
+log = logging.getLogger(__name__)
+
+CHANGES_STREAM = os.getenv("FINOPS_CHANGES_STREAM", "finops:changes")
+CONSUMER_NAME = os.getenv("HOSTNAME") or socket.gethostname()
+
+Handler = Callable[[Any, dict], Awaitable[Any]]
+
+
+class StreamMonitor:
+    """One monitor = one consumer group on the change stream."""
+
+    def __init__(
+        self,
+        redis_client: Any,
+        name: str,
+        handlers: dict[str, Handler],
+        *,
+        stream: str = CHANGES_STREAM,
+        consumer: str = CONSUMER_NAME,
+        count: int = 100,
+        block_ms: int = 5_000,
+        retry_idle_ms: int = 60_000,
+        max_deliveries: int = 5,
+    ) -> None:
+        self._redis = redis_client
+        self.name = name
+        self.handlers = handlers
+        self.stream = stream
+        self.group = f"finops-monitor:{name}"
+        self.consumer = consumer
+        self.count = count
+        self.block_ms = block_ms
+        self.retry_idle_ms = retry_idle_ms
+        self.max_deliveries = max_deliveries
+        self._reclaim_cursor = "0-0"
+
+    async def ensure_group(self) -> None:
+        try:
+            await self._redis.xgroup_create(self.stream, self.group, id="$", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def process_once(self) -> int:
+        """Read and handle one batch of new entries; returns the number read."""
+        result = await self._redis.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.count,
+            block=self.block_ms,
+        )
+        read = 0
+        for _stream_name, entries in result or []:
+            read += len(entries)
+            await self._handle(entries)
+        return read
+
+    async def reclaim_once(self) -> int:
+        """Take over entries pending longer than ``retry_idle_ms`` and retry them."""
+        result = await self._redis.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=self.retry_idle_ms,
+            start_id=self._reclaim_cursor,
+            count=self.count,
+        )
+        self._reclaim_cursor, entries = result[0], result[1]
+        # Entries trimmed from the stream while pending come back as None.
+        entries = [(msg_id, fields) for msg_id, fields in entries if fields is not None]
+        await self._handle(entries)
+        return len(entries)
+
+    async def _handle(self, entries: list) -> None:
+        for msg_id, fields in entries:
+            handler = self.handlers.get((fields or {}).get("type", ""))
+            if handler is not None:
+                try:
+                    await handler(self._redis, fields)
+                except Exception as exc:
+                    if not await self._exhausted(msg_id):
+                        log.warning("%s monitor failed on %s, will retry: %s", self.name, msg_id, exc)
+                        continue
+                    log.error(
+                        "%s monitor gave up on %s after %d deliveries: %s",
+                        self.name, msg_id, self.max_deliveries, exc,
+                    )
+            await self._redis.xack(self.stream, self.group, msg_id)
+
+    async def _exhausted(self, msg_id: str) -> bool:
+        pending = await self._redis.xpending_range(self.stream, self.group, min=msg_id, max=msg_id, count=1)
+        return bool(pending) and int(pending[0]["times_delivered"]) >= self.max_deliveries
+
+    async def run_forever(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                await self.ensure_group()
+                backoff = 1.0
+                next_reclaim = 0.0
+                while True:
+                    if time.monotonic() >= next_reclaim:
+                        while await self.reclaim_once() and self._reclaim_cursor != "0-0":
+                            pass
+                        next_reclaim = time.monotonic() + self.retry_idle_ms / 1000
+                    if not await self.process_once():
+                        # Normally XREADGROUP already blocked for block_ms; this
+                        # only matters if the read returns at once without data.
+                        await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.warning("%s monitor stream error: %s (retry in %.0fs)", self.name, exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+
+def build_stream_monitors(redis_client: Any) -> list[StreamMonitor]:
+    return [
+        StreamMonitor(redis_client, "fraud", {"fraud_flagged": fraud_monitor.handle_item}),
+        StreamMonitor(redis_client, "balance", {"balance_updated": balance_monitor.handle_item}),
+        StreamMonitor(redis_client, "invoice", {"invoice_updated": invoice_monitor.handle_item}),
+    ]
@@ -1,5 +1,13 @@
 """
-Fraud monitor — polls the fraud-detection service and publishes alerts.
+Fraud monitor — turns fraud-detection findings into finops:alerts.
+
+Event-driven path: ``fraud_flagged`` change events (see app.monitors.consumer)
+are handled one by one as they arrive.
+
+Reconcile path: run() polls /alerts/recent with a ``since`` cursor kept in
+Redis, so each poll only asks for findings newer than the last one seen.
+Either way, publish_alert() fingerprints by transaction id, so a finding is
+alerted once no matter how often it is delivered.
 
 fraud-detection service: internal port 8013 (or $FRAUD_SERVICE_URL).
 """
@@ -9,29 +17,53 @@ from __future__ import annotations
 import logging
 import os
 from datetime import datetime, timezone
+from typing import Any
 
 import httpx
 
-from app.redis_bus import EventType, publish_event
+from app.monitors.alerts import publish_alert
+from app.redis_bus import EventType
 
 log = logging.getLogger(__name__)
 
 FRAUD_SERVICE_URL = os.getenv("FRAUD_SERVICE_URL", "http://fraud-detection-service:8013")
+_CURSOR_KEY = "finops:monitor:cursor:fraud"
+
+
+async def handle_item(redis_client: Any, item: dict) -> dict | None:
+    """Publish one flagged transaction; returns the alert, or None if suppressed."""
+    uid = item.get("user_id")
+    alert = {
+        "type":           EventType.FRAUD_ALERT,
+        "user_id":        uid,
+        "transaction_id": item.get("transaction_id"),
+        "amount":         item.get("amount"),
+        "reason":         item.get("reason", "unknown"),
+        "score":          item.get("fraud_score", item.get("score", 0)),
+        "detected_at":    item.get("detected_at") or datetime.now(timezone.utc).isoformat(),
+    }
+    identity = alert["transaction_id"] or alert["detected_at"]
+    if not await publish_alert(redis_client, alert, identity):
+        return None
+    log.info("FRAUD ALERT published for user %s tx %s", uid, alert["transaction_id"])
+    return alert
 
 
 async def run(redis_client, user_ids: list[str] | None = None) -> list[dict]:
     """
-    Check recent transactions for fraud across all (or specified) users.
-    Publishes an alert event to Redis for each flagged transaction.
+    Reconcile: fetch findings newer than the stored cursor and alert on new ones.
 
     Returns list of alert dicts produced this run.
     """
     alerts: list[dict] = []
+    cursor = await redis_client.get(_CURSOR_KEY)
 
     async with httpx.AsyncClient(timeout=10.0) as client:
         try:
-            # Fetch recent fraud alerts from the fraud-detection service
-            response = await client.get(f"{FRAUD_SERVICE_URL}/alerts/recent")
+            response = await client.get(
+                f"{FRAUD_SERVICE_URL}/alerts/recent",
+                params={"since": cursor} if cursor else None,
+            )
             if response.status_code != 200:
                 log.warning("fraud-detection returned %s", response.status_code)
                 return alerts
@@ -43,23 +75,19 @@ async def run(redis_client, user_ids: list[str] | None = None) -> list[dict]:
             log.error("Could not reach fraud-detection service: %s", exc)
             return alerts
 
+    newest = cursor
     for item in flagged:
-        uid = item.get("user_id")
-        if user_ids and uid not in user_ids:
+        detected_at = item.get("detected_at")
+        if detected_at and (newest is None or str(detected_at) > newest):
+            newest = str(detected_at)
+        if cursor and detected_at and str(detected_at) < cursor:
             continue
+        if user_ids and item.get("user_id") not in user_ids:
+            continue
+        alert = await handle_item(redis_client, item)
+        if alert is not None:
+            alerts.append(alert)
 
-        alert = {
-            "type":           EventType.FRAUD_ALERT,
-            "user_id":        uid,
-            "transaction_id": item.get("transaction_id"),
-            "amount":         item.get("amount"),
-            "reason":         item.get("reason", "unknown"),
-            "score":          item.get("fraud_score", 0),
-            "detected_at":    item.get("detected_at") or datetime.now(timezone.utc).isoformat(),
-        }
-        alerts.append(alert)
-
-        await publish_event(redis_client, stream="finops:alerts", event=alert)
-        log.info("FRAUD ALERT published for user %s tx %s", uid, alert["transaction_id"])
-
+    if newest and newest != cursor:
+        await redis_client.set(_CURSOR_KEY, newest)
     return alerts
@@ -1,6 +1,11 @@
 """
 Invoice monitor — checks for overdue and soon-due invoices and publishes alerts.
 
+Event-driven path: ``invoice_updated`` change events are handled as they
+arrive. Reconcile path: run() lists unpaid invoices from the invoice service.
+Alerts are fingerprinted per invoice and alert type, so a due-soon invoice
+that becomes overdue alerts again, but repeated checks of the same state do not.
+
 invoice-service: internal port 8015 (or $INVOICE_SERVICE_URL).
 """
 
@@ -9,10 +14,12 @@ from __future__ import annotations
 import logging
 import os
 from datetime import date, datetime, timezone
+from typing import Any
 
 import httpx
 
-from app.redis_bus import EventType, publish_event
+from app.monitors.alerts import publish_alert
+from app.redis_bus import EventType
 
 log = logging.getLogger(__name__)
 
@@ -22,9 +29,58 @@ INVOICE_SERVICE_URL = os.getenv("INVOICE_SERVICE_URL", "http://invoice-service:8
 INVOICE_WARNING_DAYS = int(os.getenv("INVOICE_WARNING_DAYS", "7"))
 
 
+async def handle_item(redis_client: Any, inv: dict, today: date | None = None) -> dict | None:
+    """Alert on one invoice if it is overdue or due soon; returns the event, or None."""
+    today = today or date.today()
+    if str(inv.get("status") or "unpaid").lower() == "paid":
+        return None
+
+    due_str = inv.get("due_date")
+    if not due_str:
+        return None
+
+    try:
+        due_date = date.fromisoformat(due_str[:10])
+    except ValueError:
+        log.warning("Invalid due_date %s on invoice %s", due_str, inv.get("id"))
+        return None
+
+    days_left = (due_date - today).days
+
+    if days_left < 0:
+        event_type = EventType.INVOICE_OVERDUE
+        severity = "high"
+    elif days_left <= INVOICE_WARNING_DAYS:
+        event_type = EventType.INVOICE_DUE_SOON
+        severity = "medium"
+    else:
+        return None   # not due yet
+
+    uid = inv.get("user_id")
+    event = {
+        "type":       event_type,
+        "user_id":    uid,
+        "invoice_id": inv.get("id") or inv.get("invoice_id"),
+        "amount":     inv.get("total_amount"),
+        "currency":   inv.get("currency", "GBP"),
+        "client":     inv.get("client_name"),
+        "due_date":   due_str,
+        "days_left":  days_left,
+        "severity":   severity,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if not await publish_alert(redis_client, event, event["invoice_id"], due_str[:10]):
+        return None
+    log.info(
+        "%s for user %s invoice %s (due %s, %d days)",
+        event_type, uid, event["invoice_id"], due_str, days_left,
+    )
+    return event
+
+
 async def run(redis_client, user_ids: list[str] | None = None) -> list[dict]:
     """
-    Check for overdue and soon-due invoices.
+    Reconcile overdue and soon-due invoices.
     Publishes INVOICE_OVERDUE / INVOICE_DUE_SOON events to Redis.
 
     Returns list of events produced this run.
@@ -50,48 +106,10 @@ async def run(redis_client, user_ids: list[str] | None = None) -> list[dict]:
             return events
 
     for inv in invoices:
-        uid = inv.get("user_id")
-        if user_ids and uid not in user_ids:
-            continue
-
-        due_str = inv.get("due_date")
-        if not due_str:
+        if user_ids and inv.get("user_id") not in user_ids:
             continue
-
-        try:
-            due_date = date.fromisoformat(due_str[:10])
-        except ValueError:
-            log.warning("Invalid due_date %s on invoice %s", due_str, inv.get("id"))
-            continue
-
-        days_left = (due_date - today).days
-
-        if days_left < 0:
-            event_type = EventType.INVOICE_OVERDUE
-            severity = "high"
-        elif days_left <= INVOICE_WARNING_DAYS:
-            event_type = EventType.INVOICE_DUE_SOON
-            severity = "medium"
-        else:
-            continue   # not due yet
-
-        event = {
-            "type":       event_type,
-            "user_id":    uid,
-            "invoice_id": inv.get("id"),
-            "amount":     inv.get("total_amount"),
-            "currency":   inv.get("currency", "GBP"),
-            "client":     inv.get("client_name"),
-            "due_date":   due_str,
-            "days_left":  days_left,
-            "severity":   severity,
-            "checked_at": datetime.now(timezone.utc).isoformat(),
-        }
-        events.append(event)
-        await publish_event(redis_client, stream="finops:alerts", event=event)
-        log.info(
-            "%s for user %s invoice %s (due %s, %d days)",
-            event_type, uid, event["invoice_id"], due_str, days_left,
-        )
+        event = await handle_item(redis_client, inv, today)
+        if event is not None:
+            events.append(event)
 
     return events
@@ -0,0 +1,191 @@
+"""
+Weekly MTD bulk sync — rebuilds every user's current-quarter accumulator from
+the transactions service.
+
+Users (from auth-service) are split into FINOPS_MTD_SYNC_PARTITIONS stable
+partitions by crc32(user_id), so several finops-monitor replicas can share a
+run. A replica claims one partition at a time, just before syncing it:
+
+  - the claim is a short SET NX lease, renewed while the partition syncs and
+    released when it finishes or fails;
+  - a finished partition gets a done marker for the run, so nobody repeats it;
+  - a partition whose lease lapsed (its replica died) is claimed again by
+    whichever replica is still running, within the same run.
+
+Within a partition users are synced FINOPS_MTD_SYNC_CONCURRENCY at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+from jose import jwt
+
+from app.mtd.deadlines import MTDQuarter, get_current_quarter
+from app.mtd.reminder_email import fetch_recipient_emails
+from app.mtd.tracker import QuarterlyAccumulator
+
+log = logging.getLogger(__name__)
+
+TRANSACTIONS_SERVICE_URL = os.getenv(
+    "TRANSACTIONS_SERVICE_URL", "http://transactions-service:8003"
+).rstrip("/")
+MTD_SYNC_PARTITIONS = int(os.getenv("FINOPS_MTD_SYNC_PARTITIONS", "16"))
+MTD_SYNC_CONCURRENCY = int(os.getenv("FINOPS_MTD_SYNC_CONCURRENCY", "8"))
+_CLAIM_TTL_SECONDS = 120
+_DONE_TTL_SECONDS = 8 * 24 * 3600
+_PARTITION_ATTEMPTS = 3
+
+
+def partition_for(user_id: str, partitions: int = MTD_SYNC_PARTITIONS) -> int:
+    return zlib.crc32(user_id.encode("utf-8")) % max(partitions, 1)
+
+
+def _worker_bearer(user_id: str) -> str:
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": user_id,
+        "plan": "business",
+        "iat": int(now.timestamp()),
+        "exp": int((now + timedelta(minutes=15)).timestamp()),
+    }
+    return jwt.encode(payload, os.environ["AUTH_SECRET_KEY"].strip(), algorithm="HS256")
+
+
+async def sync_user(redis: Any, client: httpx.AsyncClient, user_id: str, quarter: MTDQuarter) -> dict:
+    """Overwrite one user's quarter totals with figures recomputed from their transactions."""
+    response = await client.get(
+        f"{TRANSACTIONS_SERVICE_URL}/transactions/me",
+        headers={"Authorization": f"Bearer {_worker_bearer(user_id)}"},
+        params={"from_date": quarter.start.isoformat(), "to_date": quarter.end.isoformat()},
+    )
+    response.raise_for_status()
+    transactions = response.json()
+    if not isinstance(transactions, list):
+        transactions = []
+    income = 0.0
+    expenses = 0.0
+    for t in transactions:
+        amount = float(t.get("amount") or 0)
+        if amount > 0:
+            income += amount
+        elif amount < 0:
+            expenses += -amount
+    return await QuarterlyAccumulator(redis, user_id).bulk_sync(
+        income=round(income, 2),
+        expenses=round(expenses, 2),
+        transaction_count=len(transactions),
+        quarter=quarter,
+        transaction_ids=[str(t.get("provider_transaction_id") or t.get("id") or "") for t in transactions],
+    )
+
+
+async def _renew_claim(redis: Any, key: str, token: str, ttl_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(ttl_seconds / 3)
+        if await redis.get(key) != token:
+            return
+        await redis.expire(key, ttl_seconds)
+
+
+async def _release_claim(redis: Any, key: str, token: str) -> None:
+    if await redis.get(key) == token:
+        await redis.delete(key)
+
+
+async def sync_all_users(
+    redis: Any,
+    *,
+    users: list[str] | None = None,
+    today: date | None = None,
+    partitions: int = MTD_SYNC_PARTITIONS,
+    concurrency: int = MTD_SYNC_CONCURRENCY,
+    claim_ttl_seconds: int = _CLAIM_TTL_SECONDS,
+    retry_seconds: float = 10.0,
+) -> dict:
+    today = today or date.today()
+    quarter = get_current_quarter(today)
+    if users is None:
+        users = await fetch_recipient_emails()
+
+    buckets: dict[int, list[str]] = {}
+    for uid in users:
+        buckets.setdefault(partition_for(uid, partitions), []).append(uid)
+
+    year, week, _ = today.isocalendar()
+    run_id = f"{year}-W{week:02d}"
+    token = uuid.uuid4().hex
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    claimed: list[int] = []
+    synced = 0
+    failed = 0
+
+    async def _one(client: httpx.AsyncClient, uid: str) -> None:
+        nonlocal synced, failed
+        async with semaphore:
+            try:
+                await sync_user(redis, client, uid, quarter)
+                synced += 1
+            except Exception as exc:
+                failed += 1
+                log.warning("MTD bulk sync failed for %s: %s", uid, exc)
+
+    async def _partition(client: httpx.AsyncClient, p: int) -> bool:
+        """Sync partition *p* if it can be claimed; True once it is done for the run."""
+        key = f"mtd:bulk_sync:{run_id}:{p}"
+        if await redis.exists(f"{key}:done"):
+            return True
+        if not await redis.set(key, token, nx=True, ex=claim_ttl_seconds):
+            return False
+        if await redis.exists(f"{key}:done"):
+            # Finished by another replica between the check and the claim.
+            await _release_claim(redis, key, token)
+            return True
+        renewer = asyncio.create_task(_renew_claim(redis, key, token, claim_ttl_seconds))
+        try:
+            await asyncio.gather(*(_one(client, uid) for uid in buckets[p]))
+            await redis.set(f"{key}:done", token, ex=_DONE_TTL_SECONDS)
+            claimed.append(p)
+            return True
+        finally:
+            renewer.cancel()
+            await _release_claim(redis, key, token)
+
+    pending = sorted(buckets)
+    attempts = dict.fromkeys(pending, 0)
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        while pending:
+            waiting: list[int] = []
+            for p in pending:
+                try:
+                    if not await _partition(client, p):
+                        waiting.append(p)
+                except Exception as exc:
+                    attempts[p] += 1
+                    log.warning("MTD bulk sync partition %d failed (attempt %d): %s", p, attempts[p], exc)
+                    if attempts[p] < _PARTITION_ATTEMPTS:
+                        waiting.append(p)
+            pending = waiting
+            if pending:
+                # Held by another replica: wait for its done marker, or for its
+                # lease to lapse if that replica has died.
+                await asyncio.sleep(retry_seconds)
+
+    log.info(
+        "MTD bulk sync %s: %d synced, %d failed, partitions %s of %d",
+        run_id, synced, failed, claimed, len(buckets),
+    )
+    return {
+        "run_id": run_id,
+        "quarter": quarter.label,
+        "partitions_claimed": claimed,
+        "synced": synced,
+        "failed": failed,
+    }
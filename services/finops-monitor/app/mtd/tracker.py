@@ -10,18 +10,60 @@ For every user we maintain a Redis hash:
         updated_at     – ISO timestamp of last update
         status         – "accumulating" | "ready" | "submitted"
 
+and a set of transaction ids already counted in that quarter:
+    Key:  mtd:quarterly:{user_id}:{tax_year}:{quarter_num}:seen
+          (expires 400 days after its last write, like the stored reports;
+           the bulk sync replaces it with the ids its totals were built from)
+
+Transactions are applied by a server-side script that checks the seen-set and
+updates the hash in one step, so a replayed event is never counted twice and a
+whole import (all quarters it touches) lands in a single MULTI/EXEC.
+
 MTD threshold for 2026/27: £50,000 turnover.
 """
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Mapping
 
 from app.mtd.deadlines import MTDQuarter, get_current_quarter, is_mtd_required
 
 _REDIS_KEY_PREFIX = "mtd:quarterly"
 _TURNOVER_THRESHOLD = 50_000.0
+# Transactions per script call; one import may span many calls in the same MULTI.
+_SCRIPT_BATCH_SIZE = 1_000
+# A quarter stops receiving transactions once it is filed, so its seen-set can go.
+_SEEN_TTL_SECONDS = 400 * 24 * 3600
+_TRANSACTION_TYPES = ("income", "expense")
+
+# KEYS[1] quarter hash, KEYS[2] seen-id set
+# ARGV[1] updated_at, ARGV[2] seen-set TTL (seconds),
+# then (transaction_id, transaction_type, amount) triples.
+# An empty transaction_id is always applied (no dedupe possible).
+_APPLY_BATCH_LUA = """
+local applied, duplicates = 0, 0
+for i = 3, #ARGV, 3 do
+  local txn_id, kind, amount = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+  if txn_id == '' or redis.call('SADD', KEYS[2], txn_id) == 1 then
+    if kind == 'income' then
+      redis.call('HINCRBYFLOAT', KEYS[1], 'income', amount)
+    elseif kind == 'expense' then
+      redis.call('HINCRBYFLOAT', KEYS[1], 'expenses', amount)
+    end
+    applied = applied + 1
+  else
+    duplicates = duplicates + 1
+  end
+end
+if applied > 0 then
+  redis.call('HINCRBY', KEYS[1], 'transaction_count', applied)
+  redis.call('HSET', KEYS[1], 'updated_at', ARGV[1])
+  redis.call('HSETNX', KEYS[1], 'status', 'accumulating')
+  redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+return {applied, duplicates}
+"""
 
 
 # ── data classes ─────────────────────────────────────────────────────────────
@@ -42,10 +84,7 @@ class QuarterlyAccumulator:
 
     # ── read ─────────────────────────────────────────────────────────────────
 
-    async def get(self, quarter: MTDQuarter | None = None) -> dict:
-        """Return current accumulator data for *quarter* (default: current quarter)."""
-        q = quarter or get_current_quarter()
-        raw = await self._redis.hgetall(self._key(q))
+    def _shape(self, q: MTDQuarter, raw: Mapping[str, Any] | None) -> dict:
         if not raw:
             return {
                 "user_id": self.user_id,
@@ -80,15 +119,24 @@ class QuarterlyAccumulator:
             "mtd_required": is_mtd_required(income),
         }
 
+    async def get(self, quarter: MTDQuarter | None = None) -> dict:
+        """Return current accumulator data for *quarter* (default: current quarter)."""
+        q = quarter or get_current_quarter()
+        return self._shape(q, await self._redis.hgetall(self._key(q)))
+
+    async def get_many(self, quarters: list[MTDQuarter]) -> list[dict]:
+        """Return data for several quarters in one pipelined round trip."""
+        pipe = self._redis.pipeline(transaction=False)
+        for q in quarters:
+            pipe.hgetall(self._key(q))
+        raws = await pipe.execute()
+        return [self._shape(q, raw) for q, raw in zip(quarters, raws)]
+
     async def get_all_quarters(self, tax_year: str) -> list[dict]:
         """Return data for all 4 quarters in the given tax year."""
         from app.mtd.deadlines import _quarters_for_tax_year
         year_start = int(tax_year.split("/")[0])
-        quarters = _quarters_for_tax_year(year_start)
-        results = []
-        for q in quarters:
-            results.append(await self.get(q))
-        return results
+        return await self.get_many(_quarters_for_tax_year(year_start))
 
     # ── write ────────────────────────────────────────────────────────────────
 
@@ -97,23 +145,60 @@ class QuarterlyAccumulator:
         amount: float,
         transaction_type: str,             # "income" | "expense"
         quarter: MTDQuarter | None = None,
+        transaction_id: str | None = None,
     ) -> dict:
-        """Increment running totals with a single transaction."""
+        """Increment running totals with a single transaction (no-op if *transaction_id* was already counted)."""
         q = quarter or get_current_quarter()
-        key = self._key(q)
-        now_iso = datetime.now(timezone.utc).isoformat()
+        await self.add_transactions(
+            [{"amount": amount, "transaction_type": transaction_type, "transaction_id": transaction_id}],
+            quarter=q,
+        )
+        return await self.get(q)
 
-        if transaction_type == "income":
-            await self._redis.hincrbyfloat(key, "income", amount)
-        elif transaction_type == "expense":
-            await self._redis.hincrbyfloat(key, "expenses", amount)
+    async def add_transactions(
+        self,
+        transactions: Iterable[Mapping[str, Any]],
+        quarter: MTDQuarter | None = None,
+    ) -> dict:
+        """
+        Apply a batch of transactions (e.g. a whole import) atomically.
 
-        await self._redis.hincrby(key, "transaction_count", 1)
-        await self._redis.hset(key, "updated_at", now_iso)
-        # Ensure status is initialised
-        await self._redis.hsetnx(key, "status", "accumulating")
+        Each item has ``amount``, ``transaction_type`` ("income" | "expense") and
+        optionally ``transaction_id`` (dedupe key) and ``date`` (ISO string or
+        date; picks the quarter, default *quarter* or the current one).
+        Returns ``{"applied", "duplicates", "quarters"}``.
+        """
+        default_q = quarter or get_current_quarter()
+        batches: dict[str, tuple[MTDQuarter, list[str]]] = {}
+        for t in transactions:
+            raw_date = t.get("date")
+            if raw_date:
+                d = raw_date if isinstance(raw_date, date) else date.fromisoformat(str(raw_date)[:10])
+                q = get_current_quarter(reference=d)
+            else:
+                q = default_q
+            if t["transaction_type"] not in _TRANSACTION_TYPES:
+                raise ValueError(f"transaction_type must be 'income' or 'expense', got {t['transaction_type']!r}")
+            _, args = batches.setdefault(self._key(q), (q, []))
+            args.extend((str(t.get("transaction_id") or ""), str(t["transaction_type"]), repr(float(t["amount"]))))
 
-        return await self.get(q)
+        if not batches:
+            return {"applied": 0, "duplicates": 0, "quarters": []}
+
+        script = self._redis.register_script(_APPLY_BATCH_LUA)
+        now_iso = datetime.now(timezone.utc).isoformat()
+        pipe = self._redis.pipeline(transaction=True)
+        step = _SCRIPT_BATCH_SIZE * 3
+        for key, (_, args) in batches.items():
+            for i in range(0, len(args), step):
+                await script(keys=[key, f"{key}:seen"], args=[now_iso, _SEEN_TTL_SECONDS, *args[i:i + step]], client=pipe)
+        results = await pipe.execute()
+
+        return {
+            "applied": sum(int(r[0]) for r in results),
+            "duplicates": sum(int(r[1]) for r in results),
+            "quarters": [q.label for q, _ in batches.values()],
+        }
 
     async def bulk_sync(
         self,
@@ -121,19 +206,35 @@ class QuarterlyAccumulator:
         expenses: float,
         transaction_count: int,
         quarter: MTDQuarter | None = None,
+        transaction_ids: Iterable[str] | None = None,
     ) -> dict:
-        """Overwrite totals with pre-aggregated values (e.g. from daily sync job)."""
+        """
+        Overwrite totals with pre-aggregated values (e.g. from daily sync job).
+
+        When *transaction_ids* (the ids the totals were computed from) is given,
+        the quarter's seen-set is replaced with them in the same MULTI/EXEC, so
+        later events for those transactions are not counted on top of the totals.
+        """
         q = quarter or get_current_quarter()
         key = self._key(q)
         now_iso = datetime.now(timezone.utc).isoformat()
 
-        await self._redis.hset(key, mapping={
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={
             "income":            income,
             "expenses":          expenses,
             "transaction_count": transaction_count,
             "updated_at":        now_iso,
         })
-        await self._redis.hsetnx(key, "status", "accumulating")
+        pipe.hsetnx(key, "status", "accumulating")
+        if transaction_ids is not None:
+            seen_key = f"{key}:seen"
+            ids = [str(tid) for tid in transaction_ids if tid]
+            pipe.delete(seen_key)
+            for i in range(0, len(ids), _SCRIPT_BATCH_SIZE):
+                pipe.sadd(seen_key, *ids[i:i + _SCRIPT_BATCH_SIZE])
+            pipe.expire(seen_key, _SEEN_TTL_SECONDS)
+        await pipe.execute()
         return await self.get(q)
 
     async def mark_submitted(self, quarter: MTDQuarter | None = None) -> None:
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.dashboard_live import DashboardHub, publish_dashboard_refresh
+
+
+class _FakeSocket:
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.sent: list[dict] = []
+        self.fail = fail
+        self.delay = delay
+        self.closed = False
+
+    async def send_json(self, message: dict) -> None:
+        if self.fail:
+            raise RuntimeError("closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+
+
+class _FakePubSub:
+    def __init__(self, redis: "_FakeRedis"):
+        self.redis = redis
+
+    async def psubscribe(self, pattern: str) -> None:
+        self.redis.patterns.append(pattern)
+
+    async def listen(self):
+        while True:
+            yield await self.redis.queue.get()
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.patterns: list[str] = []
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pubsubs = 0
+
+    def pubsub(self) -> _FakePubSub:
+        self.pubsubs += 1
+        return _FakePubSub(self)
+
+    async def publish(self, channel: str, _data: str) -> int:
+        await self.queue.put({"type": "pmessage", "pattern": "dashboard:live:*", "channel": channel, "data": "1"})
+        return 1
+
+
+async def _drain(hub: DashboardHub) -> None:
+    while hub._tasks:
+        await asyncio.gather(*list(hub._tasks))
+
+
+async def test_single_pattern_subscription_fans_out_to_user_sockets():
+    redis = _FakeRedis()
+    hub = DashboardHub(redis, debounce_ms=0, heartbeat_seconds=3600)
+    alice_tab1, alice_tab2, bob = _FakeSocket(), _FakeSocket(), _FakeSocket()
+    hub.register("alice@example.com", alice_tab1)
+    hub.register("alice@example.com", alice_tab2)
+    hub.register("bob@example.com", bob)
+    hub.start()
+    try:
+        await publish_dashboard_refresh(redis, user_id=" Alice@Example.com ")
+        for _ in range(20):
+            await asyncio.sleep(0)
+        await _drain(hub)
+    finally:
+        await hub.stop()
+
+    assert redis.pubsubs == 1
+    assert redis.patterns == ["dashboard:live:*"]
+    assert alice_tab1.sent == alice_tab2.sent == [{"type": "transactions_updated"}]
+    assert bob.sent == []
+
+
+async def test_bursts_are_coalesced_and_dead_sockets_dropped():
+    hub = DashboardHub(_FakeRedis(), debounce_ms=50, heartbeat_seconds=3600)
+    live, dead = _FakeSocket(), _FakeSocket(fail=True)
+    hub.register("u@example.com", live)
+    hub.register("u@example.com", dead)
+
+    for _ in range(25):
+        hub.notify("u@example.com")
+    await _drain(hub)
+    assert len(live.sent) == 1
+    assert hub.connection_count == 1
+
+    started = time.monotonic()
+    for _ in range(25):
+        hub.notify("u@example.com")
+    await _drain(hub)
+    assert len(live.sent) == 2
+    assert time.monotonic() - started >= 0.04
+
+    hub.unregister("u@example.com", live)
+    hub.notify("u@example.com")
+    assert hub.connection_count == 0 and not hub._tasks
+
+
+async def test_load_10k_sockets_one_subscription():
+    redis = _FakeRedis()
+    hub = DashboardHub(redis, debounce_ms=200, heartbeat_seconds=3600)
+    users = [f"user{i}@example.com" for i in range(2_500)]
+    sockets = {u: [_FakeSocket() for _ in range(4)] for u in users}
+    for u, socks in sockets.items():
+        for ws in socks:
+            hub.register(u, ws)
+    assert hub.connection_count == 10_000
+
+    hub.start()
+    try:
+        started = time.perf_counter()
+        for burst in (1, 2):
+            for _ in range(burst):
+                for u in users:
+                    await redis.publish(f"dashboard:live:{u}", "1")
+            while not redis.queue.empty():
+                await asyncio.sleep(0)
+            await _drain(hub)
+        elapsed = time.perf_counter() - started
+    finally:
+        await hub.stop()
+
+    print(f"\n10k sockets / 7.5k events: {elapsed * 1000:.0f} ms, 1 Redis subscription")
+    assert redis.pubsubs == 1
+    # One push for the first event, one for the two-event burst that follows it.
+    assert all(len(ws.sent) == 2 for socks in sockets.values() for ws in socks)
+
+
+async def test_stalled_socket_times_out_without_holding_up_others():
+    hub = DashboardHub(_FakeRedis(), debounce_ms=0, heartbeat_seconds=3600, send_timeout_seconds=0.05)
+    live, stalled = _FakeSocket(), _FakeSocket(delay=60)
+    hub.register("u@example.com", live)
+    hub.register("u@example.com", stalled)
+
+    started = time.monotonic()
+    hub.notify("u@example.com")
+    await _drain(hub)
+
+    assert time.monotonic() - started < 1
+    assert live.sent == [{"type": "transactions_updated"}]
+    assert stalled.closed and hub.connection_count == 1
+
+
+async def test_heartbeat_pings_sockets_concurrently_under_a_limit():
+    hub = DashboardHub(_FakeRedis(), heartbeat_seconds=0.01, send_timeout_seconds=1, send_concurrency=10)
+    sockets = [_FakeSocket(delay=0.05) for _ in range(40)]
+    for i, ws in enumerate(sockets):
+        hub.register(f"user{i}@example.com", ws)
+
+    hub.start()
+    try:
+        await asyncio.sleep(0.35)
+    finally:
+        await hub.stop()
+
+    # Serial pings would need 2s for one round; 10 at a time need ~0.2s.
+    assert all(ws.sent and ws.sent[0] == {"type": "ping"} for ws in sockets)
+    assert hub.connection_count == 40
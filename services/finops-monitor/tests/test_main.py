@@ -9,7 +9,7 @@ Run with:
 
 from datetime import date
 import os
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
 import pytest
@@ -113,6 +113,54 @@ class TestQuarterlyAccumulator:
         assert data["mtd_required"] is True
 
 
+    @pytest.mark.asyncio
+    async def test_add_transactions_applies_import_in_one_multi(self, mock_redis):
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[[2, 1], [1, 0]])
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        script = AsyncMock()
+        mock_redis.register_script = MagicMock(return_value=script)
+
+        acc = QuarterlyAccumulator(mock_redis, "user1")
+        result = await acc.add_transactions([
+            {"transaction_id": "t1", "amount": 100.0, "transaction_type": "income", "date": "2026-05-01"},
+            {"transaction_id": "t1", "amount": 100.0, "transaction_type": "income", "date": "2026-05-01"},
+            {"transaction_id": "t2", "amount": 20.5, "transaction_type": "expense", "date": "2026-06-01"},
+            {"transaction_id": "t3", "amount": 50.0, "transaction_type": "income", "date": "2026-08-01"},
+        ])
+
+        mock_redis.pipeline.assert_called_once_with(transaction=True)
+        assert script.await_count == 2
+        q1_call, q2_call = script.await_args_list
+        assert q1_call.kwargs["keys"] == ["mtd:quarterly:user1:2026-27:Q1", "mtd:quarterly:user1:2026-27:Q1:seen"]
+        assert q1_call.kwargs["args"][1] == 400 * 24 * 3600
+        assert q1_call.kwargs["args"][2:] == ["t1", "income", "100.0", "t1", "income", "100.0", "t2", "expense", "20.5"]
+        assert q1_call.kwargs["client"] is pipe
+        assert q2_call.kwargs["keys"][0] == "mtd:quarterly:user1:2026-27:Q2"
+        assert result == {"applied": 3, "duplicates": 1, "quarters": ["Q1 2026/27", "Q2 2026/27"]}
+        mock_redis.hincrbyfloat.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_add_transactions_rejects_unknown_type(self, mock_redis):
+        acc = QuarterlyAccumulator(mock_redis, "user1")
+        with pytest.raises(ValueError):
+            await acc.add_transactions([{"transaction_id": "t1", "amount": 1.0, "transaction_type": "refund"}])
+        mock_redis.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_all_quarters_is_one_pipeline(self, mock_redis):
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[{"income": "10"}, {}, {}, {"income": "5", "expenses": "2"}])
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+
+        quarters = await QuarterlyAccumulator(mock_redis, "user1").get_all_quarters("2026/27")
+
+        assert pipe.hgetall.call_count == 4
+        mock_redis.hgetall.assert_not_called()
+        assert [q["income"] for q in quarters] == [10.0, 0.0, 0.0, 5.0]
+        assert quarters[3]["net_profit"] == 3.0
+
+
 def test_calculate_quarterly_summary():
     transactions = [
         {"amount": 10_000, "transaction_type": "income",  "date": "2026-05-01"},
@@ -210,3 +258,11 @@ def test_status_endpoint(client):
     body = r.json()
     assert "days_until_deadline" in body
     assert "next_deadline" in body
+
+
+def test_mtd_transactions_rejects_unknown_type(client):
+    r = client.post(
+        "/mtd/user1/transactions",
+        json={"transactions": [{"amount": 10.0, "transaction_type": "transfer"}]},
+    )
+    assert r.status_code == 422
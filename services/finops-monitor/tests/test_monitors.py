@@ -0,0 +1,175 @@
+import os
+import sys
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import fakeredis
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret-key-for-finops")
+
+from app.monitors import balance_monitor, invoice_monitor  # noqa: E402
+from app.monitors.consumer import StreamMonitor, build_stream_monitors  # noqa: E402
+from app.mtd import bulk_sync  # noqa: E402
+from app.mtd.deadlines import get_current_quarter  # noqa: E402
+from app.redis_bus import EventType, publish_event  # noqa: E402
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+async def _alerts(redis) -> list[dict]:
+    return [fields for _id, fields in await redis.xrange("finops:alerts")]
+
+
+async def test_invoice_alert_is_suppressed_until_state_changes(redis):
+    today = date(2026, 5, 1)
+    inv = {"id": "inv-1", "user_id": "u@example.com", "due_date": "2026-05-04", "total_amount": 100}
+
+    assert await invoice_monitor.handle_item(redis, inv, today) is not None
+    assert await invoice_monitor.handle_item(redis, inv, today) is None
+    overdue = await invoice_monitor.handle_item(redis, inv, date(2026, 5, 10))
+
+    assert overdue["type"] == EventType.INVOICE_OVERDUE
+    assert [a["type"] for a in await _alerts(redis)] == [EventType.INVOICE_DUE_SOON, EventType.INVOICE_OVERDUE]
+    assert await invoice_monitor.handle_item(redis, {**inv, "status": "paid"}, date(2026, 6, 1)) is None
+
+
+async def test_low_balance_alert_rearms_after_recovery(redis):
+    low = {"user_id": "u@example.com", "available_balance": 10, "currency": "GBP"}
+
+    assert await balance_monitor.handle_item(redis, low) is not None
+    assert await balance_monitor.handle_item(redis, low) is None
+    assert await balance_monitor.handle_item(redis, {**low, "available_balance": 5_000}) is None
+    assert await balance_monitor.handle_item(redis, low) is not None
+
+    assert len(await _alerts(redis)) == 2
+    assert (await redis.hgetall("finops:balance:u@example.com"))["available_balance"] == "10.0"
+
+
+async def test_failed_publish_releases_the_fingerprint(redis):
+    low = {"user_id": "u@example.com", "available_balance": 10, "currency": "GBP"}
+
+    with patch("app.monitors.alerts.publish_event", AsyncMock(side_effect=ConnectionError("xadd failed"))):
+        with pytest.raises(ConnectionError):
+            await balance_monitor.handle_item(redis, low)
+
+    assert await balance_monitor.handle_item(redis, low) is not None
+    assert len(await _alerts(redis)) == 1
+
+
+async def test_each_monitor_has_its_own_group_and_replays_are_not_realerted(redis):
+    monitors = [
+        StreamMonitor(m._redis, m.name, m.handlers, block_ms=10, stream="test:changes")
+        for m in build_stream_monitors(redis)
+    ]
+    for m in monitors:
+        await m.ensure_group()
+
+    fraud_event = {
+        "type": "fraud_flagged",
+        "user_id": "u@example.com",
+        "transaction_id": "tx-9",
+        "amount": 900,
+        "fraud_score": 0.97,
+    }
+    await publish_event(redis, "test:changes", fraud_event)
+    await publish_event(redis, "test:changes", {"type": "balance_updated", "user_id": "u@example.com", "available_balance": 20})
+    await publish_event(redis, "test:changes", fraud_event)
+
+    for m in monitors:
+        assert await m.process_once() == 3
+        assert (await redis.xpending("test:changes", m.group))["pending"] == 0
+
+    alerts = await _alerts(redis)
+    assert sorted(a["type"] for a in alerts) == [EventType.FRAUD_ALERT, EventType.LOW_BALANCE]
+    groups = {g["name"] for g in await redis.xinfo_groups("test:changes")}
+    assert groups == {"finops-monitor:fraud", "finops-monitor:balance", "finops-monitor:invoice"}
+
+
+async def test_bulk_sync_partitions_are_claimed_once_per_run(redis):
+    users = [f"user{i}@example.com" for i in range(40)]
+    sync_user = AsyncMock(return_value={})
+
+    with patch.object(bulk_sync, "sync_user", sync_user):
+        first = await bulk_sync.sync_all_users(redis, users=users, today=date(2026, 5, 3), partitions=4)
+        second = await bulk_sync.sync_all_users(redis, users=users, today=date(2026, 5, 3), partitions=4)
+
+    assert first["synced"] == 40 and first["partitions_claimed"] == [0, 1, 2, 3]
+    assert second["synced"] == 0 and second["partitions_claimed"] == []
+    # Leases are released once each partition is done; only the done markers remain.
+    assert all(key.endswith(":done") for key in await redis.keys("mtd:bulk_sync:*"))
+    assert sorted(c.args[2] for c in sync_user.await_args_list) == sorted(users)
+    assert {c.args[3].label for c in sync_user.await_args_list} == {"Q1 2026/27"}
+
+
+async def test_bulk_sync_retakes_a_partition_whose_replica_died(redis):
+    users = [f"user{i}@example.com" for i in range(40)]
+    stuck = bulk_sync.partition_for(users[0], 4)
+    run_id = "2026-W18"
+    # A replica claimed this partition and then crashed without releasing it.
+    await redis.set(f"mtd:bulk_sync:{run_id}:{stuck}", "dead-replica", px=100)
+    sync_user = AsyncMock(return_value={})
+
+    with patch.object(bulk_sync, "sync_user", sync_user):
+        result = await bulk_sync.sync_all_users(
+            redis, users=users, today=date(2026, 5, 3), partitions=4, retry_seconds=0.05,
+        )
+
+    assert result["run_id"] == run_id
+    assert result["synced"] == 40
+    assert result["partitions_claimed"][-1] == stuck
+
+
+async def test_sync_user_rebuilds_the_seen_set_with_the_totals(redis):
+    quarter = get_current_quarter(reference=date(2026, 5, 3))
+    seen_key = "mtd:quarterly:u@example.com:2026-27:Q1:seen"
+    await redis.sadd(seen_key, "stale-tx")
+    rows = [
+        {"provider_transaction_id": "tx-1", "amount": 120.0},
+        {"provider_transaction_id": "tx-2", "amount": -20.0},
+    ]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=rows))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        result = await bulk_sync.sync_user(redis, client, "u@example.com", quarter)
+
+    assert (result["income"], result["expenses"], result["transaction_count"]) == (120.0, 20.0, 2)
+    assert await redis.smembers(seen_key) == {"tx-1", "tx-2"}
+    assert await redis.ttl(seen_key) > 0
+
+
+async def test_failed_entries_stay_pending_until_retried(redis):
+    handler = AsyncMock(side_effect=[RuntimeError("upstream down"), None])
+    monitor = StreamMonitor(redis, "fraud", {"fraud_flagged": handler}, stream="test:changes", block_ms=10, retry_idle_ms=0)
+    await monitor.ensure_group()
+    await publish_event(redis, "test:changes", {"type": "fraud_flagged", "transaction_id": "tx-1"})
+
+    assert await monitor.process_once() == 1
+    assert (await redis.xpending("test:changes", monitor.group))["pending"] == 1
+
+    assert await monitor.reclaim_once() == 1
+    assert handler.await_count == 2
+    assert (await redis.xpending("test:changes", monitor.group))["pending"] == 0
+
+
+async def test_entry_is_dropped_after_max_deliveries(redis):
+    handler = AsyncMock(side_effect=RuntimeError("bad payload"))
+    monitor = StreamMonitor(
+        redis, "fraud", {"fraud_flagged": handler},
+        stream="test:changes", block_ms=10, retry_idle_ms=0, max_deliveries=3,
+    )
+    await monitor.ensure_group()
+    await publish_event(redis, "test:changes", {"type": "fraud_flagged", "transaction_id": "tx-1"})
+
+    await monitor.process_once()
+    await monitor.reclaim_once()
+    assert (await redis.xpending("test:changes", monitor.group))["pending"] == 1
+    await monitor.reclaim_once()
+
+    assert handler.await_count == 3
+    assert (await redis.xpending("test:changes", monitor.group))["pending"] == 0
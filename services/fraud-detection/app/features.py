@@ -0,0 +1,369 @@
+"""
+Streaming per-user fraud features over transaction-created events.
+
+Each user has a fixed-capacity ring buffer of recent events (timestamp, amount,
+merchant hash, flags) stored in compact ``array`` columns. Aggregates are kept
+incrementally as events enter and leave the window, so reading features is O(1)
+amortised:
+
+* velocity: events in the last hour / 24 hours (monotone window pointers),
+* amount mean/variance: Welford's algorithm with removal on eviction,
+* new-merchant rate: share of window events whose merchant was unseen at the time,
+* night-time ratio: share of window events between 00:00 and 05:59 UTC.
+
+Events must be ingested in time order within a batch (the ingest endpoint sorts
+each batch); events arriving after later ones were already ingested are accepted
+and counted but do not rewind the window pointers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+HOUR_SECONDS = 3600.0
+DAY_SECONDS = 86400.0
+NIGHT_END_HOUR = 6
+
+_FLAG_NIGHT = 1
+_FLAG_NEW_MERCHANT = 2
+
+_MERCHANT_NOISE = re.compile(r"[^a-z ]+")
+
+
+def stable_hash(value: str) -> int:
+    """64-bit hash that is stable across processes (unlike ``hash()`` on str)."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def merchant_key(merchant: Optional[str], description: Optional[str]) -> str:
+    """Normalise a merchant name, falling back to the first words of the description."""
+    raw = (merchant or "").strip().lower()
+    if raw:
+        return raw
+    words = _MERCHANT_NOISE.sub(" ", (description or "").lower()).split()
+    return " ".join(words[:3]) or "unknown"
+
+
+def is_night(ts: float) -> bool:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).hour < NIGHT_END_HOUR
+
+
+@dataclass(frozen=True)
+class TransactionEvent:
+    user_id: str
+    transaction_id: str
+    amount: float
+    occurred_at: float
+    merchant: str
+
+
+class UserFeatureState:
+    """Ring buffer plus incrementally maintained aggregates for one user."""
+
+    __slots__ = (
+        "capacity",
+        "window_seconds",
+        "_ts",
+        "_amount",
+        "_merchant",
+        "_id",
+        "_flags",
+        "_seq",
+        "_size",
+        "_hour_seq",
+        "_day_seq",
+        "_mean",
+        "_m2",
+        "_night",
+        "_new_merchant",
+        "_merchant_counts",
+        "_ids",
+        "first_seen_at",
+        "last_event_at",
+        "last_amount_zscore",
+    )
+
+    def __init__(self, capacity: int, window_seconds: float) -> None:
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self._ts = array("d", bytes(8 * capacity))
+        self._amount = array("d", bytes(8 * capacity))
+        self._merchant = array("q", bytes(8 * capacity))
+        self._id = array("q", bytes(8 * capacity))
+        self._flags = bytearray(capacity)
+        self._seq = 0  # sequence number of the next event; slot = seq % capacity
+        self._size = 0
+        self._hour_seq = 0
+        self._day_seq = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._night = 0
+        self._new_merchant = 0
+        self._merchant_counts: Dict[int, int] = {}
+        self._ids: set[int] = set()
+        self.first_seen_at: Optional[float] = None
+        self.last_event_at: Optional[float] = None
+        self.last_amount_zscore = 0.0
+
+    # -- window maintenance -------------------------------------------------
+
+    @property
+    def _oldest_seq(self) -> int:
+        return self._seq - self._size
+
+    def _evict_oldest(self) -> None:
+        slot = self._oldest_seq % self.capacity
+        amount = self._amount[slot]
+        n = self._size
+        if n == 1:
+            self._mean = 0.0
+            self._m2 = 0.0
+        else:
+            delta = amount - self._mean
+            self._mean -= delta / (n - 1)
+            self._m2 = max(0.0, self._m2 - delta * (amount - self._mean))
+        flags = self._flags[slot]
+        if flags & _FLAG_NIGHT:
+            self._night -= 1
+        if flags & _FLAG_NEW_MERCHANT:
+            self._new_merchant -= 1
+        merchant = self._merchant[slot]
+        remaining = self._merchant_counts.get(merchant, 0) - 1
+        if remaining > 0:
+            self._merchant_counts[merchant] = remaining
+        else:
+            self._merchant_counts.pop(merchant, None)
+        self._ids.discard(self._id[slot])
+        self._size -= 1
+        oldest = self._oldest_seq
+        if self._hour_seq < oldest:
+            self._hour_seq = oldest
+        if self._day_seq < oldest:
+            self._day_seq = oldest
+
+    def _advance(self, now: float) -> None:
+        while self._size and self._ts[self._oldest_seq % self.capacity] <= now - self.window_seconds:
+            self._evict_oldest()
+        while self._hour_seq < self._seq and self._ts[self._hour_seq % self.capacity] <= now - HOUR_SECONDS:
+            self._hour_seq += 1
+        while self._day_seq < self._seq and self._ts[self._day_seq % self.capacity] <= now - DAY_SECONDS:
+            self._day_seq += 1
+
+    # -- ingestion ----------------------------------------------------------
+
+    def add(self, ts: float, amount: float, merchant: int, event_id: int) -> bool:
+        """Add one event; returns False for a duplicate still inside the window."""
+        if event_id in self._ids:
+            return False
+        self._advance(max(ts, self.last_event_at or ts))
+        if self._size == self.capacity:
+            self._evict_oldest()
+
+        std = math.sqrt(self._m2 / (self._size - 1)) if self._size > 1 else 0.0
+        self.last_amount_zscore = (amount - self._mean) / std if std > 0 else 0.0
+
+        flags = 0
+        if is_night(ts):
+            flags |= _FLAG_NIGHT
+            self._night += 1
+        if merchant not in self._merchant_counts:
+            flags |= _FLAG_NEW_MERCHANT
+            self._new_merchant += 1
+        self._merchant_counts[merchant] = self._merchant_counts.get(merchant, 0) + 1
+
+        slot = self._seq % self.capacity
+        self._ts[slot] = ts
+        self._amount[slot] = amount
+        self._merchant[slot] = merchant
+        self._id[slot] = event_id
+        self._flags[slot] = flags
+        self._ids.add(event_id)
+        self._seq += 1
+        self._size += 1
+
+        delta = amount - self._mean
+        self._mean += delta / self._size
+        self._m2 += delta * (amount - self._mean)
+
+        if self.first_seen_at is None or ts < self.first_seen_at:
+            self.first_seen_at = ts
+        if self.last_event_at is None or ts > self.last_event_at:
+            self.last_event_at = ts
+        return True
+
+    # -- reads --------------------------------------------------------------
+
+    def features(self, now: float) -> Dict[str, Any]:
+        self._advance(now)
+        n = self._size
+        return {
+            "window_events": n,
+            "velocity_1h": self._seq - self._hour_seq,
+            "velocity_24h": self._seq - self._day_seq,
+            "amount_mean": round(self._mean, 2),
+            "amount_std": round(math.sqrt(self._m2 / (n - 1)), 2) if n > 1 else 0.0,
+            "last_amount_zscore": round(self.last_amount_zscore, 3),
+            "new_merchant_rate": round(self._new_merchant / n, 3) if n else 0.0,
+            "night_ratio": round(self._night / n, 3) if n else 0.0,
+            "distinct_merchants": len(self._merchant_counts),
+            "history_days": round((now - self.first_seen_at) / DAY_SECONDS, 1) if self.first_seen_at else 0.0,
+            "last_event_at": self.last_event_at,
+        }
+
+    def iter_events(self) -> Iterable[list[float]]:
+        for seq in range(self._oldest_seq, self._seq):
+            slot = seq % self.capacity
+            yield [self._ts[slot], self._amount[slot], self._merchant[slot], self._id[slot]]
+
+    def memory_bytes(self) -> int:
+        return (
+            sys.getsizeof(self)
+            + sum(sys.getsizeof(col) for col in (self._ts, self._amount, self._merchant, self._id, self._flags))
+            + sys.getsizeof(self._merchant_counts)
+            + sys.getsizeof(self._ids)
+        )
+
+
+class FeatureStore:
+    """All users' feature states plus snapshot/restore."""
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, capacity: int = 256, window_seconds: float = 30 * DAY_SECONDS) -> None:
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self._users: Dict[str, UserFeatureState] = {}
+        self.events_ingested = 0
+        self.duplicates_skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _state(self, user_id: str) -> UserFeatureState:
+        state = self._users.get(user_id)
+        if state is None:
+            state = UserFeatureState(self.capacity, self.window_seconds)
+            self._users[user_id] = state
+        return state
+
+    def ingest(self, event: TransactionEvent) -> bool:
+        accepted = self._state(event.user_id).add(
+            event.occurred_at,
+            abs(event.amount),
+            stable_hash(event.merchant),
+            stable_hash(event.transaction_id),
+        )
+        if accepted:
+            self.events_ingested += 1
+        else:
+            self.duplicates_skipped += 1
+        return accepted
+
+    def features(self, user_id: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        state = self._users.get(user_id)
+        if state is None:
+            return None
+        return state.features(time.time() if now is None else now)
+
+    def memory_bytes(self) -> int:
+        return sum(state.memory_bytes() for state in self._users.values()) + sys.getsizeof(self._users)
+
+    # -- persistence --------------------------------------------------------
+
+    def snapshot_payload(self) -> Dict[str, Any]:
+        """Copy every user's window into plain data.
+
+        Call this on the thread that ingests events; the result can then be
+        written from any thread with write_snapshot().
+        """
+        return {
+            "version": self.SNAPSHOT_VERSION,
+            "capacity": self.capacity,
+            "window_seconds": self.window_seconds,
+            "users": {
+                user_id: {"first_seen_at": state.first_seen_at, "events": list(state.iter_events())}
+                for user_id, state in list(self._users.items())
+            },
+        }
+
+    def snapshot(self, path: str) -> int:
+        """Atomically write every user's window to *path*; returns users written."""
+        return self.write_snapshot(path, self.snapshot_payload())
+
+    @staticmethod
+    def write_snapshot(path: str, payload: Dict[str, Any]) -> int:
+        """Atomically write a snapshot_payload() result to *path*; returns users written."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".fraud-features-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return len(payload["users"])
+
+    def restore(self, path: str) -> int:
+        """Rebuild state by replaying a snapshot; returns users restored (0 if absent)."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if payload.get("version") != self.SNAPSHOT_VERSION:
+            return 0
+        self._users.clear()
+        for user_id, data in payload.get("users", {}).items():
+            state = self._state(user_id)
+            for ts, amount, merchant, event_id in data.get("events", []):
+                state.add(float(ts), float(amount), int(merchant), int(event_id))
+            if data.get("first_seen_at") is not None:
+                state.first_seen_at = float(data["first_seen_at"])
+        return len(self._users)
+
+
+def score_features(features: Optional[Dict[str, Any]]) -> tuple[float, list[str], Dict[str, bool]]:
+    """Turn precomputed features into (fraud_score, risk_factors, indicator flags)."""
+    if not features or not features["window_events"]:
+        return 0.0, [], {}
+
+    enough_history = features["window_events"] >= 5
+    flags = {
+        "velocity_check_failed": features["velocity_1h"] >= 10 or features["velocity_24h"] >= 50,
+        "unusual_transaction_patterns": enough_history and features["last_amount_zscore"] >= 3.0,
+        "new_merchant_burst": enough_history and features["new_merchant_rate"] >= 0.6,
+        "night_time_activity": enough_history and features["night_ratio"] >= 0.5,
+        "new_account": features["history_days"] < 30,
+    }
+
+    score = 0.0
+    factors: list[str] = []
+    if flags["velocity_check_failed"]:
+        score += 0.30
+        factors.append("High transaction velocity outside normal patterns")
+    if flags["unusual_transaction_patterns"]:
+        score += 0.25
+        factors.append("Unusual transaction pattern detected")
+    if flags["new_merchant_burst"]:
+        score += 0.20
+        factors.append("High share of payments to first-time merchants")
+    if flags["night_time_activity"]:
+        score += 0.15
+        factors.append("Most recent activity happens at night")
+    if flags["new_account"]:
+        score += 0.15
+        factors.append("New account with limited history")
+    return min(score, 1.0), factors, flags
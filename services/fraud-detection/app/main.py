@@ -1,42 +1,117 @@
+import asyncio
 import logging
 import os
-from typing import Annotated, List, Dict, Any
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import Annotated, List, Dict, Any, Optional
 from enum import Enum
-from datetime import datetime
+import datetime as dt
+from datetime import datetime, timezone
 
-from fastapi import Depends, FastAPI, HTTPException, status, BackgroundTasks
+from fastapi import Depends, FastAPI, Header, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer
+import httpx
 from jose import JWTError, jwt
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from .features import FeatureStore, TransactionEvent, merchant_key, score_features
 
 logger = logging.getLogger(__name__)
 
+# --- Streaming feature engine ---
+FEATURE_WINDOW_EVENTS = int(os.getenv("FRAUD_FEATURE_WINDOW_EVENTS", "256"))
+FEATURE_WINDOW_DAYS = float(os.getenv("FRAUD_FEATURE_WINDOW_DAYS", "30"))
+FEATURE_SNAPSHOT_PATH = os.getenv("FRAUD_FEATURE_SNAPSHOT_PATH", "/tmp/fraud-detection/features.json")
+FEATURE_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("FRAUD_FEATURE_SNAPSHOT_INTERVAL_SECONDS", "60"))
+
+feature_store = FeatureStore(capacity=FEATURE_WINDOW_EVENTS, window_seconds=FEATURE_WINDOW_DAYS * 86400)
+
+# --- finops-monitor change events ---
+FINOPS_MONITOR_URL = os.getenv("FINOPS_MONITOR_URL", "http://finops-monitor:8021").rstrip("/")
+# Scores at or above this (risk level "high") are reported to finops-monitor as fraud_flagged.
+FRAUD_FLAG_SCORE = float(os.getenv("FRAUD_FLAG_SCORE", "0.4"))
+
+
+def _write_snapshot() -> None:
+    try:
+        feature_store.snapshot(FEATURE_SNAPSHOT_PATH)
+    except Exception:
+        logger.exception("fraud feature snapshot failed")
+
+
+async def _snapshot_loop() -> None:
+    while True:
+        await asyncio.sleep(FEATURE_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            # Copy on the event loop, which is the only writer of the store;
+            # only the serialisation and file write run in the worker thread.
+            payload = feature_store.snapshot_payload()
+            await asyncio.to_thread(FeatureStore.write_snapshot, FEATURE_SNAPSHOT_PATH, payload)
+        except Exception:
+            logger.exception("fraud feature snapshot failed; retrying in %ss", FEATURE_SNAPSHOT_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    try:
+        restored = feature_store.restore(FEATURE_SNAPSHOT_PATH)
+        logger.info("Restored fraud features for %s user(s)", restored)
+    except (OSError, ValueError) as exc:
+        logger.warning("fraud feature snapshot restore failed: %s", exc)
+    snapshot_task = asyncio.create_task(_snapshot_loop()) if FEATURE_SNAPSHOT_INTERVAL_SECONDS > 0 else None
+    yield
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await snapshot_task
+    _write_snapshot()
+
+
 app = FastAPI(
     title="Fraud Detection Service",
     description="Real-time fraud detection and risk monitoring for enhanced security monetization.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # --- Security ---
 AUTH_SECRET_KEY = os.environ["AUTH_SECRET_KEY"]
 AUTH_ALGORITHM = "HS256"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
-def get_current_user_id(token: Annotated[str, Depends(oauth2_scheme)]) -> str:
+def _decode_token_claims(token: str | None) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, AUTH_SECRET_KEY, algorithms=[AUTH_ALGORITHM])
     except JWTError as exc:
         raise credentials_exception from exc
 
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub"):
         raise credentials_exception
-    return user_id
+    return payload
+
+
+def get_current_user_id(token: Annotated[str, Depends(oauth2_scheme)]) -> str:
+    return str(_decode_token_claims(token)["sub"])
+
+
+def _is_admin(claims: dict) -> bool:
+    return claims.get("is_admin") is True or str(claims.get("role") or "user") in ("owner", "admin")
+
+
+def _require_internal_service_token(x_internal_token: str | None) -> None:
+    secret = os.getenv("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="internal_calls_not_configured")
+    if not x_internal_token or x_internal_token != secret:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
 # --- Models ---
 class RiskLevel(str, Enum):
@@ -56,60 +131,119 @@ class FraudAlert(BaseModel):
     estimated_loss_prevented: float
     created_at: datetime
 
+class TransactionCreatedEvent(BaseModel):
+    user_id: str
+    transaction_id: str
+    amount: float
+    occurred_at: Optional[datetime] = None
+    date: Optional[dt.date] = None
+    merchant: Optional[str] = None
+    description: Optional[str] = None
+
+
+class TransactionEventBatch(BaseModel):
+    events: List[TransactionCreatedEvent] = Field(default_factory=list, max_length=5000)
+
+
+def _event_timestamp(event: TransactionCreatedEvent) -> float:
+    if event.occurred_at is not None:
+        occurred = event.occurred_at
+        if occurred.tzinfo is None:
+            occurred = occurred.replace(tzinfo=timezone.utc)
+        return occurred.timestamp()
+    if event.date is not None:
+        # Bank feeds only carry a booking date; use midday so it never counts as night-time.
+        return datetime(event.date.year, event.date.month, event.date.day, 12, tzinfo=timezone.utc).timestamp()
+    return time.time()
+
+
+async def _publish_fraud_flags(flags: List[Dict[str, Any]]) -> None:
+    """Hand flagged transactions to finops-monitor's stream monitors (fraud_flagged change events)."""
+    secret = os.getenv("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret or not FINOPS_MONITOR_URL:
+        return
+    async with httpx.AsyncClient(timeout=8.0) as client:
+        for flag in flags:
+            try:
+                response = await client.post(
+                    f"{FINOPS_MONITOR_URL}/internal/monitor-events",
+                    json=flag,
+                    headers={"X-Internal-Token": secret},
+                )
+                response.raise_for_status()
+            except Exception as exc:
+                logger.warning("fraud_flagged event for user %s not delivered: %s", flag["user_id"], exc)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+
+@app.post("/internal/transaction-events")
+async def ingest_transaction_events(
+    batch: TransactionEventBatch,
+    background_tasks: BackgroundTasks,
+    x_internal_token: str | None = Header(default=None, alias="X-Internal-Token"),
+) -> Dict[str, Any]:
+    """Consume transaction-created events, update per-user streaming features and report high-risk users."""
+    _require_internal_service_token(x_internal_token)
+    # The window pointers only move forward, so feed each batch oldest first
+    # whatever order the producer listed it in (bank feeds are newest first).
+    timed = sorted(((_event_timestamp(event), event) for event in batch.events), key=lambda pair: pair[0])
+    accepted = 0
+    latest: Dict[str, TransactionCreatedEvent] = {}
+    for occurred_at, event in timed:
+        if feature_store.ingest(
+            TransactionEvent(
+                user_id=event.user_id,
+                transaction_id=event.transaction_id,
+                amount=event.amount,
+                occurred_at=occurred_at,
+                merchant=merchant_key(event.merchant, event.description),
+            )
+        ):
+            accepted += 1
+            latest[event.user_id] = event
+
+    flags: List[Dict[str, Any]] = []
+    detected_at = datetime.now(timezone.utc).isoformat()
+    for user_id, event in latest.items():
+        fraud_score, risk_factors, _ = score_features(feature_store.features(user_id))
+        if fraud_score >= FRAUD_FLAG_SCORE:
+            flags.append({
+                "type": "fraud_flagged",
+                "user_id": user_id,
+                "data": {
+                    "transaction_id": event.transaction_id,
+                    "amount": event.amount,
+                    "reason": risk_factors[0] if risk_factors else "unknown",
+                    "fraud_score": round(fraud_score, 3),
+                    "detected_at": detected_at,
+                },
+            })
+    if flags:
+        background_tasks.add_task(_publish_fraud_flags, flags)
+    return {"received": len(batch.events), "accepted": accepted, "duplicates": len(batch.events) - accepted}
+
 @app.get("/fraud-risk-assessment/{user_id}")
 async def assess_fraud_risk(
     user_id: str,
-    current_user: str = Depends(get_current_user_id)
+    token: str | None = Depends(optional_oauth2_scheme),
+    x_internal_token: str | None = Header(default=None, alias="X-Internal-Token"),
 ) -> Dict[str, Any]:
-    """Real-time fraud risk assessment for user transactions and behavior"""
-
-    # Mock fraud detection algorithm (in production: ML models + rule engine)
-    import random
-    random.seed(hash(user_id) % 1000)
-
-    # Analyze user behavior patterns
-    risk_indicators: Dict[str, Any] = {
-        "unusual_transaction_patterns": random.choice([True, False]),
-        "device_fingerprint_anomaly": random.choice([True, False]),
-        "geographical_inconsistency": random.choice([True, False]),
-        "velocity_check_failed": random.choice([True, False]),
-        "known_fraud_network": random.choice([True, False]),
-        "account_age_days": random.randint(1, 1000),
-        "transaction_frequency": random.uniform(0.1, 5.0),
-        "average_transaction_amount": random.uniform(10.0, 5000.0)
-    }
-
-    # Calculate fraud score
-    fraud_score = 0.0
-    risk_factors: List[str] = []
-
-    if risk_indicators["unusual_transaction_patterns"]:
-        fraud_score += 0.25
-        risk_factors.append("Unusual transaction pattern detected")
-
-    if risk_indicators["device_fingerprint_anomaly"]:
-        fraud_score += 0.35
-        risk_factors.append("Unrecognized device or suspicious device characteristics")
-
-    if risk_indicators["geographical_inconsistency"]:
-        fraud_score += 0.20
-        risk_factors.append("Geographic location inconsistent with user profile")
-
-    if risk_indicators["velocity_check_failed"]:
-        fraud_score += 0.30
-        risk_factors.append("High transaction velocity outside normal patterns")
-
-    if risk_indicators["known_fraud_network"]:
-        fraud_score += 0.50
-        risk_factors.append("Associated with known fraudulent network")
+    """Real-time fraud risk assessment scored from precomputed streaming features"""
+    # Features describe a user's spending; only that user, an admin or an internal service may read them.
+    if x_internal_token is not None:
+        _require_internal_service_token(x_internal_token)
+    else:
+        claims = _decode_token_claims(token)
+        if claims["sub"] != user_id and not _is_admin(claims):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
-    if risk_indicators["account_age_days"] < 30:
-        fraud_score += 0.15
-        risk_factors.append("New account with limited history")
+    features = feature_store.features(user_id)
+    fraud_score, risk_factors, flags = score_features(features)
+    risk_indicators: Dict[str, Any] = {**(features or {}), **flags}
 
     # Determine risk level
     if fraud_score < 0.2:
@@ -142,6 +276,7 @@ async def assess_fraud_risk(
         "risk_factors": risk_factors,
         "recommended_actions": recommended_actions,
         "risk_indicators": risk_indicators,
+        "features_available": features is not None,
         "estimated_loss_prevented": round(estimated_loss_prevented, 2),
         "assessment_timestamp": datetime.now(),
         "status": "completed"
@@ -0,0 +1,148 @@
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from app.features import (
+    DAY_SECONDS,
+    FeatureStore,
+    TransactionEvent,
+    merchant_key,
+    score_features,
+)
+
+BASE_TS = datetime(2025, 3, 3, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _event(user: str, n: int, ts: float, amount: float = 20.0, merchant: str = "tesco") -> TransactionEvent:
+    return TransactionEvent(user_id=user, transaction_id=f"{user}-{n}", amount=amount, occurred_at=ts, merchant=merchant)
+
+
+def test_velocity_windows_slide_with_time():
+    store = FeatureStore(capacity=64)
+    for i in range(12):
+        store.ingest(_event("u", i, BASE_TS + i * 60))
+
+    now = BASE_TS + 11 * 60
+    features = store.features("u", now=now)
+    assert features["velocity_1h"] == 12
+    assert features["velocity_24h"] == 12
+
+    later = store.features("u", now=BASE_TS + 2 * 3600)
+    assert later["velocity_1h"] == 0
+    assert later["velocity_24h"] == 12
+    assert store.features("u", now=BASE_TS + 2 * DAY_SECONDS)["velocity_24h"] == 0
+
+
+def test_welford_matches_statistics_after_ring_eviction():
+    rng = random.Random(7)
+    store = FeatureStore(capacity=32)
+    amounts = [rng.uniform(1, 500) for _ in range(100)]
+    for i, amount in enumerate(amounts):
+        store.ingest(_event("u", i, BASE_TS + i, amount=amount))
+
+    window = amounts[-32:]
+    features = store.features("u", now=BASE_TS + 100)
+    assert features["window_events"] == 32
+    assert abs(features["amount_mean"] - statistics.fmean(window)) < 0.01
+    assert abs(features["amount_std"] - statistics.stdev(window)) < 0.01
+
+
+def test_new_merchant_and_night_ratios():
+    store = FeatureStore(capacity=16)
+    night = datetime(2025, 3, 4, 2, 30, tzinfo=timezone.utc).timestamp()
+    store.ingest(_event("u", 0, night, merchant="a"))
+    store.ingest(_event("u", 1, night + 60, merchant="a"))
+    store.ingest(_event("u", 2, BASE_TS + DAY_SECONDS * 2, merchant="b"))
+    store.ingest(_event("u", 3, BASE_TS + DAY_SECONDS * 2 + 60, merchant="c"))
+
+    features = store.features("u", now=BASE_TS + DAY_SECONDS * 2 + 60)
+    assert features["new_merchant_rate"] == 0.75
+    assert features["night_ratio"] == 0.5
+    assert features["distinct_merchants"] == 3
+
+
+def test_duplicate_events_are_ignored():
+    store = FeatureStore()
+    assert store.ingest(_event("u", 1, BASE_TS)) is True
+    assert store.ingest(_event("u", 1, BASE_TS)) is False
+    assert store.features("u", now=BASE_TS)["window_events"] == 1
+    assert store.duplicates_skipped == 1
+
+
+def test_merchant_key_falls_back_to_description_words():
+    assert merchant_key(None, "CARD PAYMENT TO TESCO STORES 3021 LONDON") == "card payment to"
+    assert merchant_key("  Amazon ", "ignored") == "amazon"
+
+
+def test_score_flags_velocity_spike_and_large_amount():
+    store = FeatureStore()
+    for i in range(40):
+        store.ingest(_event("u", i, BASE_TS - 40 * DAY_SECONDS + i * DAY_SECONDS, amount=25.0 + (i % 3)))
+    for i in range(40, 52):
+        store.ingest(_event("u", i, BASE_TS + (i - 40) * 30, amount=26.0))
+    store.ingest(_event("u", 99, BASE_TS + 400, amount=4000.0))
+
+    score, factors, flags = score_features(store.features("u", now=BASE_TS + 400))
+    assert flags["velocity_check_failed"]
+    assert flags["unusual_transaction_patterns"]
+    assert not flags["new_account"]
+    assert score >= 0.55
+    assert "High transaction velocity outside normal patterns" in factors
+
+
+def test_score_without_history_is_zero():
+    assert score_features(None) == (0.0, [], {})
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = FeatureStore(capacity=32)
+    for i in range(50):
+        store.ingest(_event(f"user-{i % 5}", i, BASE_TS + i * 10, amount=10.0 + i, merchant=f"m{i % 7}"))
+    path = str(tmp_path / "features.json")
+    assert store.snapshot(path) == 5
+
+    restored = FeatureStore(capacity=32)
+    assert restored.restore(path) == 5
+    now = BASE_TS + 500
+    for i in range(5):
+        assert restored.features(f"user-{i}", now=now) == store.features(f"user-{i}", now=now)
+    assert restored.ingest(_event("user-0", 0, BASE_TS)) is False  # dedupe state survives restore
+
+
+def test_replay_benchmark_events_per_second_and_memory_per_user():
+    rng = random.Random(42)
+    users = 2_000
+    events_per_user = 100
+    store = FeatureStore(capacity=256)
+    events = [
+        TransactionEvent(
+            user_id=f"user-{u}",
+            transaction_id=f"tx-{u}-{n}",
+            amount=rng.lognormvariate(3.5, 1.0),
+            occurred_at=BASE_TS + n * 1800 + u,
+            merchant=f"merchant-{rng.randrange(40)}",
+        )
+        for n in range(events_per_user)
+        for u in range(users)
+    ]
+
+    started = time.perf_counter()
+    for event in events:
+        store.ingest(event)
+    elapsed = time.perf_counter() - started
+
+    score_started = time.perf_counter()
+    now = BASE_TS + events_per_user * 1800
+    for u in range(users):
+        score_features(store.features(f"user-{u}", now=now))
+    score_elapsed = time.perf_counter() - score_started
+
+    rate = len(events) / elapsed
+    per_user = store.memory_bytes() / users
+    print(
+        f"\nfraud feature replay: {rate:,.0f} events/s, {per_user / 1024:.1f} KiB/user, "
+        f"{score_elapsed / users * 1e6:.1f} µs/assessment"
+    )
+    assert store.events_ingested == users * events_per_user
+    assert per_user < 64 * 1024
@@ -1,6 +1,10 @@
 import os
 os.environ["AUTH_SECRET_KEY"] = "test-secret"
 
+from datetime import datetime, timedelta, timezone
+
+from unittest.mock import AsyncMock
+
 import pytest
 from jose import jwt
 from fastapi.testclient import TestClient
@@ -13,8 +17,12 @@ AUTH_SECRET_KEY = "test-secret"
 AUTH_ALGORITHM = "HS256"
 
 
-def make_token(sub: str = "test-user-123") -> str:
-    return jwt.encode({"sub": sub}, AUTH_SECRET_KEY, algorithm=AUTH_ALGORITHM)
+def make_token(sub: str = "test-user-123", **claims) -> str:
+    return jwt.encode({"sub": sub, **claims}, AUTH_SECRET_KEY, algorithm=AUTH_ALGORITHM)
+
+
+def auth_header(sub: str, **claims) -> dict:
+    return {"Authorization": f"Bearer {make_token(sub, **claims)}"}
 
 
 VALID_TOKEN = make_token()
@@ -75,7 +83,7 @@ def test_security_monetization_no_auth():
 # --- Authenticated endpoints ---
 
 def test_fraud_risk_assessment():
-    resp = client.get("/fraud-risk-assessment/user1", headers=AUTH_HEADER)
+    resp = client.get("/fraud-risk-assessment/user1", headers=auth_header("user1"))
     assert resp.status_code == 200
     data = resp.json()
     assert data["user_id"] == "user1"
@@ -84,6 +92,21 @@ def test_fraud_risk_assessment():
     assert data["status"] == "completed"
 
 
+def test_fraud_risk_assessment_of_another_user_is_forbidden():
+    resp = client.get("/fraud-risk-assessment/user1", headers=AUTH_HEADER)
+    assert resp.status_code == 403
+
+
+def test_fraud_risk_assessment_allows_admins_and_internal_services(monkeypatch):
+    monkeypatch.setenv("INTERNAL_SERVICE_SECRET", "internal-secret")
+    assert client.get("/fraud-risk-assessment/user1", headers=auth_header("ops", role="admin")).status_code == 200
+    assert client.get("/fraud-risk-assessment/user1", headers=auth_header("ops", is_admin=True)).status_code == 200
+    internal = client.get("/fraud-risk-assessment/user1", headers={"X-Internal-Token": "internal-secret"})
+    assert internal.status_code == 200
+    wrong = client.get("/fraud-risk-assessment/user1", headers={"X-Internal-Token": "nope"})
+    assert wrong.status_code == 403
+
+
 def test_create_fraud_alert():
     resp = client.post(
         "/fraud-alerts",
@@ -139,3 +162,115 @@ def test_security_monetization_metrics():
     data = resp.json()
     assert "revenue_protection" in data
     assert "total_monetization_impact" in data
+
+
+# --- Streaming features ---
+
+def test_transaction_events_require_internal_token(monkeypatch):
+    monkeypatch.setenv("INTERNAL_SERVICE_SECRET", "internal-secret")
+    resp = client.post("/internal/transaction-events", json={"events": []})
+    assert resp.status_code == 403
+
+
+def test_ingested_events_drive_risk_assessment(monkeypatch):
+    from app import main as main_module
+
+    monkeypatch.setenv("INTERNAL_SERVICE_SECRET", "internal-secret")
+    published = []
+
+    async def fake_publish(flags):
+        published.extend(flags)
+
+    monkeypatch.setattr(main_module, "_publish_fraud_flags", fake_publish)
+    now = datetime.now(timezone.utc)
+    events = [
+        {
+            "user_id": "velocity-user",
+            "transaction_id": f"t-{i}",
+            "amount": -40.0,
+            "occurred_at": (now - timedelta(minutes=i)).isoformat(),
+            "description": f"CARD PAYMENT SHOP{i}",
+        }
+        for i in range(12)
+    ]
+    resp = client.post(
+        "/internal/transaction-events",
+        json={"events": events + events[:2]},
+        headers={"X-Internal-Token": "internal-secret"},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"received": 14, "accepted": 12, "duplicates": 2}
+
+    resp = client.get("/fraud-risk-assessment/velocity-user", headers=auth_header("velocity-user"))
+    data = resp.json()
+    assert data["features_available"] is True
+    assert data["risk_indicators"]["velocity_1h"] == 12
+    assert data["risk_indicators"]["velocity_check_failed"] is True
+    assert "High transaction velocity outside normal patterns" in data["risk_factors"]
+    assert data["risk_level"] in ("medium", "high", "critical")
+
+    # The velocity spike is handed to finops-monitor as one fraud_flagged change event.
+    assert [(f["type"], f["user_id"]) for f in published] == [("fraud_flagged", "velocity-user")]
+    assert published[0]["data"]["transaction_id"] == "t-0"
+    assert published[0]["data"]["reason"] == "High transaction velocity outside normal patterns"
+
+
+def test_newest_first_batch_does_not_inflate_velocity(monkeypatch):
+    from app import main as main_module
+
+    monkeypatch.setenv("INTERNAL_SERVICE_SECRET", "internal-secret")
+    monkeypatch.setattr(main_module, "_publish_fraud_flags", AsyncMock())
+    now = datetime.now(timezone.utc)
+    events = [
+        {"user_id": "feed-user", "transaction_id": "newest", "amount": -5.0, "occurred_at": now.isoformat()},
+        {
+            "user_id": "feed-user",
+            "transaction_id": "older",
+            "amount": -5.0,
+            "occurred_at": (now - timedelta(hours=2)).isoformat(),
+        },
+    ]
+    resp = client.post(
+        "/internal/transaction-events",
+        json={"events": events},
+        headers={"X-Internal-Token": "internal-secret"},
+    )
+    assert resp.status_code == 200
+
+    data = client.get("/fraud-risk-assessment/feed-user", headers=auth_header("feed-user")).json()
+    assert data["risk_indicators"]["velocity_1h"] == 1
+    assert data["risk_indicators"]["velocity_24h"] == 2
+
+
+def test_risk_assessment_without_events_is_low_risk():
+    resp = client.get("/fraud-risk-assessment/unknown-user", headers=auth_header("unknown-user"))
+    data = resp.json()
+    assert data["features_available"] is False
+    assert data["fraud_score"] == 0.0
+    assert data["risk_level"] == "low"
+
+
+def test_snapshot_loop_survives_failures(monkeypatch):
+    import asyncio
+
+    from app import main as main_module
+
+    writes = []
+
+    def flaky_write(path, payload):
+        writes.append(payload)
+        if len(writes) == 1:
+            raise RuntimeError("disk went away")
+        return len(payload["users"])
+
+    monkeypatch.setattr(main_module, "FEATURE_SNAPSHOT_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(main_module.FeatureStore, "write_snapshot", staticmethod(flaky_write))
+
+    async def run_until_second_write():
+        task = asyncio.create_task(main_module._snapshot_loop())
+        while len(writes) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(run_until_second_write(), timeout=5))
+    assert writes[1]["version"] == main_module.FeatureStore.SNAPSHOT_VERSION
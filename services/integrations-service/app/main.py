@@ -5,7 +5,6 @@ import math
 import os
 import sqlite3
 import sys
-import threading
 import time
 import uuid
 from collections import deque
@@ -28,7 +27,9 @@ from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies
 from libs.shared_auth.plan_limits import strict_hmrc_fraud_client_context_required
 from libs.shared_cis.audit_actions import CISAuditAction
 from libs.shared_compliance.audit_client import post_audit_event
+from libs.shared_http.client import aclose_upstream_clients
 from libs.shared_mtd.audit_actions import MTDAuditAction
+from libs.shared_sqlite.store import SQLiteStoreHandle
 
 from .companies_house import (
     CompanyProfile,
@@ -202,7 +203,8 @@ COMPLIANCE_SERVICE_URL = (os.getenv("COMPLIANCE_SERVICE_URL") or "").strip()
 INTEGRATIONS_PROCESSING_DELAY_SECONDS = _parse_non_negative_float_env(
     "INTEGRATIONS_PROCESSING_DELAY_SECONDS", 2.0
 )
-db_lock = threading.RLock()
+# Long-lived WAL connections; follows INTEGRATIONS_DB_PATH if tests repoint it.
+integrations_db = SQLiteStoreHandle(lambda: INTEGRATIONS_DB_PATH)
 
 # --- Models ---
 
@@ -269,7 +271,7 @@ def _require_internal_service_token(x_internal_token: str | None) -> None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
 
-def _persist_mtd_quarterly_draft_core(
+async def _persist_mtd_quarterly_draft_core(
     *,
     user_id: str,
     report: HMRCMTDQuarterlyReport,
@@ -288,7 +290,7 @@ def _persist_mtd_quarterly_draft_core(
         client_context=client_context,
         inbound=http_request,
     )
-    _log_mtd_fraud_audit(
+    await _log_mtd_fraud_audit(
         user_id=user_id,
         stage="draft",
         connection_method=conn_method,
@@ -301,29 +303,23 @@ def _persist_mtd_quarterly_draft_core(
     now = _utc_now()
     expires = now + datetime.timedelta(hours=HMRC_MTD_DRAFT_TTL_HOURS)
     draft_id = uuid.uuid4()
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                """
-                INSERT INTO mtd_quarterly_drafts (
-                    draft_id, user_id, report_json, report_hash, policy_version, created_at, expires_at, workflow_status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    str(draft_id),
-                    user_id,
-                    report_json,
-                    report_hash,
-                    POLICY_SPEC_VERSION,
-                    now.isoformat(),
-                    expires.isoformat(),
-                    MTD_WF_DRAFT,
-                ),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    await integrations_db().execute(
+        """
+        INSERT INTO mtd_quarterly_drafts (
+            draft_id, user_id, report_json, report_hash, policy_version, created_at, expires_at, workflow_status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            str(draft_id),
+            user_id,
+            report_json,
+            report_hash,
+            POLICY_SPEC_VERSION,
+            now.isoformat(),
+            expires.isoformat(),
+            MTD_WF_DRAFT,
+        ),
+    )
     return MTDQuarterlyDraftResponse(
         draft_id=draft_id,
         report_hash=report_hash,
@@ -332,12 +328,6 @@ def _persist_mtd_quarterly_draft_core(
     )
 
 
-def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(INTEGRATIONS_DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def _utc_now() -> datetime.datetime:
     return datetime.datetime.now(datetime.UTC)
 
@@ -358,24 +348,18 @@ def _mtd_draft_workflow_transition_allowed(current: str, target: str) -> bool:
     return False
 
 
-def _mark_draft_workflow_submitted(draft_id: str, user_id: str) -> None:
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                """
-                UPDATE mtd_quarterly_drafts
-                SET workflow_status = ?
-                WHERE draft_id = ? AND user_id = ?
-                """,
-                (MTD_WF_SUBMITTED, draft_id, user_id),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+async def _mark_draft_workflow_submitted(draft_id: str, user_id: str) -> None:
+    await integrations_db().execute(
+        """
+        UPDATE mtd_quarterly_drafts
+        SET workflow_status = ?
+        WHERE draft_id = ? AND user_id = ?
+        """,
+        (MTD_WF_SUBMITTED, draft_id, user_id),
+    )
 
 
-def _log_mtd_fraud_audit(
+async def _log_mtd_fraud_audit(
     *,
     user_id: str,
     stage: str,
@@ -404,38 +388,32 @@ def _log_mtd_fraud_audit(
     )
     now = _utc_now().isoformat()
     try:
-        with db_lock:
-            conn = _connect()
-            try:
-                conn.execute(
-                    """
-                    INSERT INTO mtd_fraud_audit (
-                        user_id, stage, connection_method, report_hash, fraud_headers_hash,
-                        client_context_json, forwarded_observed, unverified_cis_ack, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        user_id,
-                        stage,
-                        connection_method,
-                        report_hash,
-                        fh_hash,
-                        ctx_json,
-                        forwarded_observed[:2048],
-                        1
-                        if unverified_cis_ack is True
-                        else (0 if unverified_cis_ack is False else None),
-                        now,
-                    ),
-                )
-                conn.commit()
-            finally:
-                conn.close()
+        await integrations_db().execute(
+            """
+            INSERT INTO mtd_fraud_audit (
+                user_id, stage, connection_method, report_hash, fraud_headers_hash,
+                client_context_json, forwarded_observed, unverified_cis_ack, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id,
+                stage,
+                connection_method,
+                report_hash,
+                fh_hash,
+                ctx_json,
+                forwarded_observed[:2048],
+                1
+                if unverified_cis_ack is True
+                else (0 if unverified_cis_ack is False else None),
+                now,
+            ),
+        )
     except sqlite3.OperationalError as exc:
         logger.warning("mtd_fraud_audit persist skipped (sqlite): %s", exc)
 
 
-def _require_and_consume_mtd_confirmation(
+async def _require_and_consume_mtd_confirmation(
     mtd_submission: HMRCMTDQuarterlySubmissionRequest,
     user_id: str,
 ) -> str:
@@ -451,146 +429,144 @@ def _require_and_consume_mtd_confirmation(
         )
     report_hash = compute_quarterly_report_fingerprint(mtd_submission.report)
     now = _utc_now()
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                """
-                SELECT t.user_id, t.report_hash, t.expires_at, t.consumed_at, t.draft_id,
-                       COALESCE(d.workflow_status, ?) AS workflow_status
-                FROM mtd_quarterly_confirmation_tokens t
-                INNER JOIN mtd_quarterly_drafts d ON d.draft_id = t.draft_id
-                WHERE t.token = ?
-                """,
-                (MTD_WF_DRAFT, token),
-            ).fetchone()
-            if not row:
-                raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Invalid confirmation token.")
-            if row["user_id"] != user_id:
-                raise HTTPException(
-                    status.HTTP_403_FORBIDDEN,
-                    detail="Confirmation token does not match user.",
-                )
-            if row["consumed_at"]:
-                raise HTTPException(
-                    status.HTTP_403_FORBIDDEN,
-                    detail="Confirmation token already used.",
-                )
-            exp = datetime.datetime.fromisoformat(row["expires_at"])
-            if exp < now:
-                raise HTTPException(
-                    status.HTTP_403_FORBIDDEN,
-                    detail="Confirmation token expired.",
-                )
-            if row["report_hash"] != report_hash:
-                raise HTTPException(
-                    status.HTTP_400_BAD_REQUEST,
-                    detail="Report payload does not match confirmed draft (hash mismatch).",
-                )
-            wf = _normalize_mtd_workflow(row["workflow_status"])
-            if wf != MTD_WF_READY_USER:
-                raise HTTPException(
-                    status.HTTP_403_FORBIDDEN,
-                    detail=(
-                        "Quarterly draft workflow must be ready_for_user_confirm before HMRC submit "
-                        f"(current: {wf}). Complete accountant review steps or POST .../confirm when eligible."
-                    ),
-                )
-            conn.execute(
-                "UPDATE mtd_quarterly_confirmation_tokens SET consumed_at = ? WHERE token = ?",
-                (now.isoformat(), token),
-            )
-            conn.commit()
-            return str(row["draft_id"])
-        finally:
-            conn.close()
-
 
-def init_integrations_db() -> None:
-    with db_lock:
-        conn = _connect()
-        conn.execute(
+    def _consume(conn: sqlite3.Connection) -> str:
+        row = conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS hmrc_submissions (
-                submission_id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                tax_period_start TEXT NOT NULL,
-                tax_period_end TEXT NOT NULL,
-                tax_due REAL NOT NULL,
-                status TEXT NOT NULL,
-                message TEXT NOT NULL,
-                provider_reference TEXT,
-                submitted_at TEXT NOT NULL
+            SELECT t.user_id, t.report_hash, t.expires_at, t.consumed_at, t.draft_id,
+                   COALESCE(d.workflow_status, ?) AS workflow_status
+            FROM mtd_quarterly_confirmation_tokens t
+            INNER JOIN mtd_quarterly_drafts d ON d.draft_id = t.draft_id
+            WHERE t.token = ?
+            """,
+            (MTD_WF_DRAFT, token),
+        ).fetchone()
+        if not row:
+            raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Invalid confirmation token.")
+        if row["user_id"] != user_id:
+            raise HTTPException(
+                status.HTTP_403_FORBIDDEN,
+                detail="Confirmation token does not match user.",
             )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS mtd_quarterly_drafts (
-                draft_id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                report_json TEXT NOT NULL,
-                report_hash TEXT NOT NULL,
-                policy_version TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                expires_at TEXT NOT NULL,
-                workflow_status TEXT NOT NULL DEFAULT 'draft'
+        if row["consumed_at"]:
+            raise HTTPException(
+                status.HTTP_403_FORBIDDEN,
+                detail="Confirmation token already used.",
             )
-            """
-        )
-        pragma_cols = {str(r[1]) for r in conn.execute("PRAGMA table_info(mtd_quarterly_drafts)").fetchall()}
-        if "workflow_status" not in pragma_cols:
-            conn.execute(
-                "ALTER TABLE mtd_quarterly_drafts ADD COLUMN workflow_status TEXT NOT NULL DEFAULT 'draft'"
+        exp = datetime.datetime.fromisoformat(row["expires_at"])
+        if exp < now:
+            raise HTTPException(
+                status.HTTP_403_FORBIDDEN,
+                detail="Confirmation token expired.",
             )
-        submission_cols = {str(r[1]) for r in conn.execute("PRAGMA table_info(hmrc_submissions)").fetchall()}
-        if "submission_mode" not in submission_cols:
-            conn.execute(
-                "ALTER TABLE hmrc_submissions ADD COLUMN submission_mode TEXT"
+        if row["report_hash"] != report_hash:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="Report payload does not match confirmed draft (hash mismatch).",
             )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS mtd_quarterly_confirmation_tokens (
-                token TEXT PRIMARY KEY,
-                draft_id TEXT NOT NULL,
-                user_id TEXT NOT NULL,
-                report_hash TEXT NOT NULL,
-                policy_version TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                expires_at TEXT NOT NULL,
-                consumed_at TEXT
+        wf = _normalize_mtd_workflow(row["workflow_status"])
+        if wf != MTD_WF_READY_USER:
+            raise HTTPException(
+                status.HTTP_403_FORBIDDEN,
+                detail=(
+                    "Quarterly draft workflow must be ready_for_user_confirm before HMRC submit "
+                    f"(current: {wf}). Complete accountant review steps or POST .../confirm when eligible."
+                ),
             )
-            """
+        conn.execute(
+            "UPDATE mtd_quarterly_confirmation_tokens SET consumed_at = ? WHERE token = ?",
+            (now.isoformat(), token),
         )
+        return str(row["draft_id"])
+
+    # Check and consume in one write so a token cannot be used twice concurrently.
+    return await integrations_db().write(_consume)
+
+
+def _create_integrations_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS hmrc_submissions (
+            submission_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            tax_period_start TEXT NOT NULL,
+            tax_period_end TEXT NOT NULL,
+            tax_due REAL NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT NOT NULL,
+            provider_reference TEXT,
+            submitted_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mtd_quarterly_drafts (
+            draft_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            report_json TEXT NOT NULL,
+            report_hash TEXT NOT NULL,
+            policy_version TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            workflow_status TEXT NOT NULL DEFAULT 'draft'
+        )
+        """
+    )
+    pragma_cols = {str(r[1]) for r in conn.execute("PRAGMA table_info(mtd_quarterly_drafts)").fetchall()}
+    if "workflow_status" not in pragma_cols:
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS mtd_fraud_audit (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                stage TEXT NOT NULL,
-                connection_method TEXT NOT NULL,
-                report_hash TEXT,
-                fraud_headers_hash TEXT NOT NULL,
-                client_context_json TEXT,
-                forwarded_observed TEXT,
-                unverified_cis_ack INTEGER,
-                created_at TEXT NOT NULL
-            )
-            """
+            "ALTER TABLE mtd_quarterly_drafts ADD COLUMN workflow_status TEXT NOT NULL DEFAULT 'draft'"
+        )
+    submission_cols = {str(r[1]) for r in conn.execute("PRAGMA table_info(hmrc_submissions)").fetchall()}
+    if "submission_mode" not in submission_cols:
+        conn.execute(
+            "ALTER TABLE hmrc_submissions ADD COLUMN submission_mode TEXT"
+        )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mtd_quarterly_confirmation_tokens (
+            token TEXT PRIMARY KEY,
+            draft_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            report_hash TEXT NOT NULL,
+            policy_version TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            consumed_at TEXT
         )
-        conn.commit()
-        conn.close()
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mtd_fraud_audit (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            connection_method TEXT NOT NULL,
+            report_hash TEXT,
+            fraud_headers_hash TEXT NOT NULL,
+            client_context_json TEXT,
+            forwarded_observed TEXT,
+            unverified_cis_ack INTEGER,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def init_integrations_db() -> None:
+    integrations_db().write_sync(_create_integrations_tables)
 
 
 def reset_integrations_db_for_tests() -> None:
-    with db_lock:
-        conn = _connect()
+    def _reset(conn: sqlite3.Connection) -> None:
         conn.execute("DELETE FROM mtd_fraud_audit")
         conn.execute("DELETE FROM mtd_quarterly_confirmation_tokens")
         conn.execute("DELETE FROM mtd_quarterly_drafts")
         conn.execute("DELETE FROM hmrc_submissions")
-        conn.commit()
-        conn.close()
+
+    integrations_db().write_sync(_reset)
 
 
 def _row_to_submission(row: sqlite3.Row) -> SubmissionStatus:
@@ -604,7 +580,7 @@ def _row_to_submission(row: sqlite3.Row) -> SubmissionStatus:
     )
 
 
-def save_submission(
+async def save_submission(
     submission_id: uuid.UUID,
     user_id: str,
     request: HMRCSubmissionRequest,
@@ -612,33 +588,27 @@ def save_submission(
     message: str,
     submission_mode: Optional[str] = None,
 ) -> None:
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                """
-                INSERT INTO hmrc_submissions (
-                    submission_id, user_id, tax_period_start, tax_period_end, tax_due,
-                    status, message, provider_reference, submitted_at, submission_mode
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    str(submission_id),
-                    user_id,
-                    request.tax_period_start.isoformat(),
-                    request.tax_period_end.isoformat(),
-                    request.tax_due,
-                    status_value,
-                    message,
-                    None,
-                    datetime.datetime.now(datetime.UTC).isoformat(),
-                    submission_mode,
-                ),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+    await integrations_db().execute(
+        """
+        INSERT INTO hmrc_submissions (
+            submission_id, user_id, tax_period_start, tax_period_end, tax_due,
+            status, message, provider_reference, submitted_at, submission_mode
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            str(submission_id),
+            user_id,
+            request.tax_period_start.isoformat(),
+            request.tax_period_end.isoformat(),
+            request.tax_due,
+            status_value,
+            message,
+            None,
+            datetime.datetime.now(datetime.UTC).isoformat(),
+            submission_mode,
+        ),
+    )
 
 
 def update_submission(
@@ -647,49 +617,35 @@ def update_submission(
     message: str,
     provider_reference: Optional[str],
 ) -> None:
-    with db_lock:
-        conn = _connect()
-        try:
-            conn.execute(
-                """
-                UPDATE hmrc_submissions
-                SET status = ?, message = ?, provider_reference = ?
-                WHERE submission_id = ?
-                """,
-                (status_value, message, provider_reference, str(submission_id)),
-            )
-            conn.commit()
-        finally:
-            conn.close()
-
-
-def get_submission(submission_id: uuid.UUID) -> Optional[sqlite3.Row]:
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                "SELECT * FROM hmrc_submissions WHERE submission_id = ?",
-                (str(submission_id),),
-            ).fetchone()
-        finally:
-            conn.close()
-    return row
-
-
-def list_submissions_for_user(user_id: str) -> List[SubmissionStatus]:
-    with db_lock:
-        conn = _connect()
-        try:
-            rows = conn.execute(
-                """
-                SELECT * FROM hmrc_submissions
-                WHERE user_id = ?
-                ORDER BY submitted_at DESC
-                """,
-                (user_id,),
-            ).fetchall()
-        finally:
-            conn.close()
+    # Called from worker threads, so it blocks on the store rather than awaiting it.
+    integrations_db().write_sync(
+        lambda conn: conn.execute(
+            """
+            UPDATE hmrc_submissions
+            SET status = ?, message = ?, provider_reference = ?
+            WHERE submission_id = ?
+            """,
+            (status_value, message, provider_reference, str(submission_id)),
+        )
+    )
+
+
+async def get_submission(submission_id: uuid.UUID) -> Optional[sqlite3.Row]:
+    return await integrations_db().fetchone(
+        "SELECT * FROM hmrc_submissions WHERE submission_id = ?",
+        (str(submission_id),),
+    )
+
+
+async def list_submissions_for_user(user_id: str) -> List[SubmissionStatus]:
+    rows = await integrations_db().fetchall(
+        """
+        SELECT * FROM hmrc_submissions
+        WHERE user_id = ?
+        ORDER BY submitted_at DESC
+        """,
+        (user_id,),
+    )
     return [_row_to_submission(row) for row in rows]
 
 
@@ -888,7 +844,7 @@ async def submit_tax_return(
 ):
     submission_id = uuid.uuid4()
     mode = "live" if HMRC_DIRECT_SUBMISSION_ENABLED else "simulation"
-    save_submission(
+    await save_submission(
         submission_id=submission_id,
         user_id=user_id,
         request=request,
@@ -896,7 +852,7 @@ async def submit_tax_return(
         message="Submission received and queued for HMRC processing.",
         submission_mode=mode,
     )
-    row = get_submission(submission_id)
+    row = await get_submission(submission_id)
     if row is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -925,7 +881,7 @@ async def create_hmrc_mtd_quarterly_draft(
     http_request: Request,
     user_id: str = Depends(get_current_user_id),
 ):
-    return _persist_mtd_quarterly_draft_core(
+    return await _persist_mtd_quarterly_draft_core(
         user_id=user_id,
         report=body.report,
         http_request=http_request,
@@ -944,7 +900,7 @@ async def internal_create_hmrc_mtd_quarterly_draft(
     x_internal_token: str | None = Header(default=None, alias="X-Internal-Token"),
 ):
     _require_internal_service_token(x_internal_token)
-    return _persist_mtd_quarterly_draft_core(
+    return await _persist_mtd_quarterly_draft_core(
         user_id=body.user_id.strip(),
         report=body.report,
         http_request=http_request,
@@ -963,82 +919,80 @@ async def confirm_hmrc_mtd_quarterly_draft(
     user_id: str = Depends(get_current_user_id),
 ):
     now = _utc_now()
-    policy_version = POLICY_SPEC_VERSION
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                """
-                SELECT user_id, report_hash, policy_version, expires_at,
-                       COALESCE(workflow_status, ?) AS workflow_status
-                FROM mtd_quarterly_drafts
-                WHERE draft_id = ?
-                """,
-                (MTD_WF_DRAFT, str(body.draft_id)),
-            ).fetchone()
-            if not row:
-                raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Draft not found.")
-            if row["user_id"] != user_id:
-                raise HTTPException(
-                    status.HTTP_403_FORBIDDEN,
-                    detail="Draft belongs to another user.",
-                )
-            policy_version = row["policy_version"] or POLICY_SPEC_VERSION
-            draft_exp = datetime.datetime.fromisoformat(row["expires_at"])
-            if draft_exp < now:
-                raise HTTPException(status.HTTP_410_GONE, detail="Draft expired.")
-            wf = _normalize_mtd_workflow(row["workflow_status"])
-            if wf == MTD_WF_READY_ACCT:
-                raise HTTPException(
-                    status.HTTP_409_CONFLICT,
-                    detail="Draft is with your accountant for review; confirm after accountant_reviewed.",
-                )
-            if wf == MTD_WF_SUBMITTED:
-                raise HTTPException(status.HTTP_410_GONE, detail="Draft already submitted.")
-            if wf not in (MTD_WF_DRAFT, MTD_WF_ACCT_DONE, MTD_WF_READY_USER):
-                raise HTTPException(
-                    status.HTTP_409_CONFLICT,
-                    detail=f"Cannot confirm draft in workflow state: {wf}",
-                )
-            fraud_headers, conn_method = build_fraud_prevention_headers(
-                user_id=user_id,
-                client_context=body.client_context,
-                inbound=http_request,
-            )
-            _log_mtd_fraud_audit(
-                user_id=user_id,
-                stage="confirm",
-                connection_method=conn_method,
-                fraud_headers=fraud_headers,
-                client_context=body.client_context,
-                report_hash=row["report_hash"],
-                forwarded_observed=json.dumps(observed_inbound_client_metadata(http_request), default=str),
+    token = str(uuid.uuid4())
+    confirm_exp = now + datetime.timedelta(minutes=HMRC_MTD_CONFIRM_TTL_MINUTES)
+
+    def _confirm(conn: sqlite3.Connection) -> tuple[str, str]:
+        row = conn.execute(
+            """
+            SELECT user_id, report_hash, policy_version, expires_at,
+                   COALESCE(workflow_status, ?) AS workflow_status
+            FROM mtd_quarterly_drafts
+            WHERE draft_id = ?
+            """,
+            (MTD_WF_DRAFT, str(body.draft_id)),
+        ).fetchone()
+        if not row:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Draft not found.")
+        if row["user_id"] != user_id:
+            raise HTTPException(
+                status.HTTP_403_FORBIDDEN,
+                detail="Draft belongs to another user.",
             )
-            token = str(uuid.uuid4())
-            confirm_exp = now + datetime.timedelta(minutes=HMRC_MTD_CONFIRM_TTL_MINUTES)
-            conn.execute(
-                """
-                INSERT INTO mtd_quarterly_confirmation_tokens (
-                    token, draft_id, user_id, report_hash, policy_version, created_at, expires_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    token,
-                    str(body.draft_id),
-                    user_id,
-                    row["report_hash"],
-                    policy_version,
-                    now.isoformat(),
-                    confirm_exp.isoformat(),
-                ),
+        policy_version = row["policy_version"] or POLICY_SPEC_VERSION
+        draft_exp = datetime.datetime.fromisoformat(row["expires_at"])
+        if draft_exp < now:
+            raise HTTPException(status.HTTP_410_GONE, detail="Draft expired.")
+        wf = _normalize_mtd_workflow(row["workflow_status"])
+        if wf == MTD_WF_READY_ACCT:
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                detail="Draft is with your accountant for review; confirm after accountant_reviewed.",
             )
-            conn.execute(
-                "UPDATE mtd_quarterly_drafts SET workflow_status = ? WHERE draft_id = ?",
-                (MTD_WF_READY_USER, str(body.draft_id)),
+        if wf == MTD_WF_SUBMITTED:
+            raise HTTPException(status.HTTP_410_GONE, detail="Draft already submitted.")
+        if wf not in (MTD_WF_DRAFT, MTD_WF_ACCT_DONE, MTD_WF_READY_USER):
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                detail=f"Cannot confirm draft in workflow state: {wf}",
             )
-            conn.commit()
-        finally:
-            conn.close()
+        conn.execute(
+            """
+            INSERT INTO mtd_quarterly_confirmation_tokens (
+                token, draft_id, user_id, report_hash, policy_version, created_at, expires_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                token,
+                str(body.draft_id),
+                user_id,
+                row["report_hash"],
+                policy_version,
+                now.isoformat(),
+                confirm_exp.isoformat(),
+            ),
+        )
+        conn.execute(
+            "UPDATE mtd_quarterly_drafts SET workflow_status = ? WHERE draft_id = ?",
+            (MTD_WF_READY_USER, str(body.draft_id)),
+        )
+        return row["report_hash"], policy_version
+
+    report_hash, policy_version = await integrations_db().write(_confirm)
+    fraud_headers, conn_method = build_fraud_prevention_headers(
+        user_id=user_id,
+        client_context=body.client_context,
+        inbound=http_request,
+    )
+    await _log_mtd_fraud_audit(
+        user_id=user_id,
+        stage="confirm",
+        connection_method=conn_method,
+        fraud_headers=fraud_headers,
+        client_context=body.client_context,
+        report_hash=report_hash,
+        forwarded_observed=json.dumps(observed_inbound_client_metadata(http_request), default=str),
+    )
     return MTDQuarterlyConfirmResponse(
         confirmation_token=token,
         policy_version=policy_version,
@@ -1052,21 +1006,16 @@ async def confirm_hmrc_mtd_quarterly_draft(
 )
 async def get_latest_mtd_quarterly_draft(user_id: str = Depends(get_current_user_id)):
     now_iso = _utc_now().isoformat()
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                """
-                SELECT draft_id, workflow_status, expires_at, report_json, report_hash
-                FROM mtd_quarterly_drafts
-                WHERE user_id = ? AND datetime(expires_at) > datetime(?)
-                ORDER BY datetime(created_at) DESC
-                LIMIT 1
-                """,
-                (user_id, now_iso),
-            ).fetchone()
-        finally:
-            conn.close()
+    row = await integrations_db().fetchone(
+        """
+        SELECT draft_id, workflow_status, expires_at, report_json, report_hash
+        FROM mtd_quarterly_drafts
+        WHERE user_id = ? AND datetime(expires_at) > datetime(?)
+        ORDER BY datetime(created_at) DESC
+        LIMIT 1
+        """,
+        (user_id, now_iso),
+    )
     if not row:
         return MTDDraftLatestResponse()
     quarter: str | None = None
@@ -1095,37 +1044,34 @@ async def transition_mtd_draft_workflow(
     body: MTDDraftWorkflowTransitionBody,
     user_id: str = Depends(get_current_user_id),
 ):
-    with db_lock:
-        conn = _connect()
-        try:
-            row = conn.execute(
-                """
-                SELECT COALESCE(workflow_status, ?) AS workflow_status
-                FROM mtd_quarterly_drafts
-                WHERE draft_id = ? AND user_id = ?
-                """,
-                (MTD_WF_DRAFT, str(draft_id), user_id),
-            ).fetchone()
-            if not row:
-                raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Draft not found.")
-            cur = _normalize_mtd_workflow(row["workflow_status"])
-            tgt = body.target_status
-            if not _mtd_draft_workflow_transition_allowed(cur, tgt):
-                raise HTTPException(
-                    status.HTTP_409_CONFLICT,
-                    detail=f"Workflow transition {cur!r} -> {tgt!r} is not allowed.",
-                )
-            conn.execute(
-                """
-                UPDATE mtd_quarterly_drafts
-                SET workflow_status = ?
-                WHERE draft_id = ? AND user_id = ?
-                """,
-                (tgt, str(draft_id), user_id),
+    def _transition(conn: sqlite3.Connection) -> None:
+        row = conn.execute(
+            """
+            SELECT COALESCE(workflow_status, ?) AS workflow_status
+            FROM mtd_quarterly_drafts
+            WHERE draft_id = ? AND user_id = ?
+            """,
+            (MTD_WF_DRAFT, str(draft_id), user_id),
+        ).fetchone()
+        if not row:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Draft not found.")
+        cur = _normalize_mtd_workflow(row["workflow_status"])
+        tgt = body.target_status
+        if not _mtd_draft_workflow_transition_allowed(cur, tgt):
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                detail=f"Workflow transition {cur!r} -> {tgt!r} is not allowed.",
             )
-            conn.commit()
-        finally:
-            conn.close()
+        conn.execute(
+            """
+            UPDATE mtd_quarterly_drafts
+            SET workflow_status = ?
+            WHERE draft_id = ? AND user_id = ?
+            """,
+            (tgt, str(draft_id), user_id),
+        )
+
+    await integrations_db().write(_transition)
     return {"draft_id": str(draft_id), "workflow_status": body.target_status}
 
 
@@ -1149,7 +1095,7 @@ async def submit_hmrc_mtd_quarterly_update(
     )
     consumed_draft_id: str | None = None
     if HMRC_REQUIRE_EXPLICIT_CONFIRM:
-        consumed_draft_id = _require_and_consume_mtd_confirmation(body, user_id)
+        consumed_draft_id = await _require_and_consume_mtd_confirmation(body, user_id)
     cis_disc = body.report.cis_disclosure
     unverified_cis = (
         cis_disc is not None and cis_disc.credit_self_attested_unverified_gbp > 0.01
@@ -1189,7 +1135,7 @@ async def submit_hmrc_mtd_quarterly_update(
         client_context=body.client_context,
         inbound=http_request,
     )
-    _log_mtd_fraud_audit(
+    await _log_mtd_fraud_audit(
         user_id=user_id,
         stage="submit",
         connection_method=conn_method,
@@ -1327,7 +1273,7 @@ async def submit_hmrc_mtd_quarterly_update(
         used_fallback=used_fallback,
     )
     if consumed_draft_id and result.status != "failed":
-        _mark_draft_workflow_submitted(consumed_draft_id, user_id)
+        await _mark_draft_workflow_submitted(consumed_draft_id, user_id)
     if COMPLIANCE_SERVICE_URL and result.status != "failed":
         await post_audit_event(
             compliance_base_url=COMPLIANCE_SERVICE_URL,
@@ -1561,7 +1507,7 @@ async def get_company_profile_endpoint(
 @app.get("/integrations/submissions/latest")
 async def get_latest_submission(user_id: str = Depends(get_current_user_id)):
     """Return the most recent HMRC submission for the authenticated user."""
-    submissions = list_submissions_for_user(user_id)
+    submissions = await list_submissions_for_user(user_id)
     if not submissions:
         return {"submission": None}
     latest = submissions[0]
@@ -1579,7 +1525,7 @@ async def get_latest_submission(user_id: str = Depends(get_current_user_id)):
 @app.get("/integrations/submissions")
 async def list_submissions(user_id: str = Depends(get_current_user_id)):
     """Return all HMRC submissions for the authenticated user, newest first."""
-    submissions = list_submissions_for_user(user_id)
+    submissions = await list_submissions_for_user(user_id)
     return {
         "submissions": [
             {
@@ -1598,21 +1544,16 @@ async def list_submissions(user_id: str = Depends(get_current_user_id)):
 async def get_audit_trail(user_id: str = Depends(get_current_user_id)):
     """Return user-visible audit trail: MTD workflow stages + submission records."""
     events: list[dict] = []
-    with db_lock:
-        conn = _connect()
-        try:
-            rows = conn.execute(
-                """
-                SELECT stage, created_at, report_hash, unverified_cis_ack
-                FROM mtd_fraud_audit
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT 50
-                """,
-                (user_id,),
-            ).fetchall()
-        finally:
-            conn.close()
+    rows = await integrations_db().fetchall(
+        """
+        SELECT stage, created_at, report_hash, unverified_cis_ack
+        FROM mtd_fraud_audit
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+        LIMIT 50
+        """,
+        (user_id,),
+    )
     for row in rows:
         label_map = {
             "preview": "Quarterly preview generated",
@@ -1629,7 +1570,7 @@ async def get_audit_trail(user_id: str = Depends(get_current_user_id)):
             "unverified_cis_ack": bool(row["unverified_cis_ack"]),
         })
     # Append submission records not already covered by fraud-audit rows
-    subs = list_submissions_for_user(user_id)
+    subs = await list_submissions_for_user(user_id)
     for s in subs:
         events.append({
             "event_type": "submission_record",
@@ -1655,7 +1596,7 @@ async def log_audit_event(
     user_id: str = Depends(get_current_user_id),
 ):
     """Log a user-initiated workflow event (preview, confirm, etc.) to the audit table."""
-    _log_mtd_fraud_audit(
+    await _log_mtd_fraud_audit(
         stage=req.stage,
         user_id=user_id,
         connection_method="WEB_APP_VIA_SERVER",
@@ -1845,3 +1786,8 @@ async def _on_startup() -> None:
     if not logging.getLogger().handlers:
         logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s %(message)s")
     init_integrations_db()
+
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
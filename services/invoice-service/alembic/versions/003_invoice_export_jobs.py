@@ -0,0 +1,57 @@
+"""Bulk invoice export jobs and their per-invoice checkpoints
+
+Revision ID: 003_invoice_export_jobs
+Revises: 002_stripe_invoice_payment_links
+Create Date: 2026-04-28
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "003_invoice_export_jobs"
+down_revision = "002_stripe_invoice_payment_links"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_export_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("tax_year", sa.Integer(), nullable=False),
+        sa.Column("export_format", sa.String(length=8), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("total_count", sa.Integer(), nullable=False),
+        sa.Column("processed_count", sa.Integer(), nullable=False),
+        sa.Column("output_path", sa.String(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("lease_owner", sa.String(length=64), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_invoice_export_jobs_id", "invoice_export_jobs", ["id"])
+    op.create_index("ix_invoice_export_jobs_user_id", "invoice_export_jobs", ["user_id"])
+    op.create_index("ix_invoice_export_jobs_status", "invoice_export_jobs", ["status"])
+    op.create_table(
+        "invoice_export_items",
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("invoice_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("file_name", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["invoice_export_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id", "position"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("invoice_export_items")
+    op.drop_index("ix_invoice_export_jobs_status", table_name="invoice_export_jobs")
+    op.drop_index("ix_invoice_export_jobs_user_id", table_name="invoice_export_jobs")
+    op.drop_index("ix_invoice_export_jobs_id", table_name="invoice_export_jobs")
+    op.drop_table("invoice_export_jobs")
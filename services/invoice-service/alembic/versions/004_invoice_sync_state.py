@@ -0,0 +1,32 @@
+"""Per-user watermark for the invoice to transactions sync
+
+Revision ID: 004_invoice_sync_state
+Revises: 003_invoice_export_jobs
+Create Date: 2026-05-02
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "004_invoice_sync_state"
+down_revision = "003_invoice_export_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_sync_state",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("synced_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("synced_until_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_invoices_user_id_updated_at", "invoices", ["user_id", "updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_invoices_user_id_updated_at", table_name="invoices")
+    op.drop_table("invoice_sync_state")
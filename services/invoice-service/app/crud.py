@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from . import models, schemas
+from .report_cache import report_cache
 
 # === CLIENT CRUD ===
 
@@ -154,6 +155,7 @@ async def create_invoice(
         db.add(db_line_item)
 
     await db.commit()
+    report_cache.invalidate_user(user_id)
     await db.refresh(db_invoice)
     return db_invoice
 
@@ -224,6 +226,7 @@ async def update_invoice(
         setattr(invoice, field, value)
 
     await db.commit()
+    report_cache.invalidate_user(invoice.user_id)
     await db.refresh(invoice)
     return invoice
 
@@ -237,8 +240,10 @@ async def delete_invoice(db: AsyncSession, invoice_id: str) -> bool:
     if not invoice:
         return False
 
+    user_id = invoice.user_id
     await db.delete(invoice)
     await db.commit()
+    report_cache.invalidate_user(user_id)
     return True
 
 async def update_invoice_pdf_path(db: AsyncSession, invoice_id: str, pdf_path: str):
@@ -322,6 +327,7 @@ async def update_invoice_status_from_payments(db: AsyncSession, invoice_id: str)
         invoice.status = schemas.InvoiceStatus.PARTIALLY_PAID
 
     await db.commit()
+    report_cache.invalidate_user(invoice.user_id)
 
 # === TEMPLATE OPERATIONS ===
 
@@ -0,0 +1,336 @@
+"""
+Bulk invoice export jobs (every invoice for a tax year as a ZIP or one merged PDF).
+
+Creating a job snapshots the invoices it covers into ``invoice_export_items``.
+A worker leases the job, renders pending items a window at a time through the
+shared PDF render pool, spools each PDF to the job's directory and marks the
+items done in the same commit that renews its lease. Memory is bounded by the
+window, and if the worker dies its job resumes from the last checkpoint once
+the lease expires. When no items are pending the spooled files are streamed
+into the final archive, which is swapped into place atomically.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import socket
+import uuid
+import zipfile
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from . import models
+from .pdf_generator import PDFGenerator
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # merged-PDF exports are optional
+    PdfWriter = None
+
+EXPORT_FORMATS = ("zip", "pdf")
+EXPORT_DIR = Path(os.getenv("INVOICE_EXPORT_DIR", "/tmp/invoice-exports"))
+EXPORT_WINDOW_SIZE = int(os.getenv("INVOICE_EXPORT_WINDOW_SIZE", "32"))
+EXPORT_LEASE_SECONDS = int(os.getenv("INVOICE_EXPORT_LEASE_SECONDS", "120"))
+
+ACTIVE_STATUSES = ("pending", "running")
+_UNSAFE_FILE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def tax_year_bounds(tax_year: int) -> tuple[datetime, datetime]:
+    """UK tax year: 6 April to 5 April inclusive, as a half-open datetime range"""
+    return (
+        datetime.combine(date(tax_year, 4, 6), time.min, tzinfo=timezone.utc),
+        datetime.combine(date(tax_year + 1, 4, 6), time.min, tzinfo=timezone.utc),
+    )
+
+
+def export_file_name(position: int, invoice_number: str) -> str:
+    safe_number = _UNSAFE_FILE_CHARS.sub("_", invoice_number).strip("_") or "invoice"
+    return f"{position + 1:05d}-{safe_number}.pdf"
+
+
+def merged_pdf_supported() -> bool:
+    return PdfWriter is not None
+
+
+async def create_export_job(
+    db: AsyncSession, *, user_id: str, tax_year: int, export_format: str = "zip"
+) -> models.InvoiceExportJob:
+    """Create a job and snapshot the ids of the user's invoices issued in *tax_year*"""
+    start, end = tax_year_bounds(tax_year)
+    invoice_rows = (
+        await db.execute(
+            select(models.Invoice.id, models.Invoice.invoice_number)
+            .where(and_(
+                models.Invoice.user_id == user_id,
+                models.Invoice.issue_date >= start,
+                models.Invoice.issue_date < end,
+            ))
+            .order_by(models.Invoice.issue_date, models.Invoice.invoice_number)
+        )
+    ).all()
+
+    job = models.InvoiceExportJob(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        tax_year=tax_year,
+        export_format=export_format,
+        status="pending",
+        total_count=len(invoice_rows),
+        processed_count=0,
+    )
+    db.add(job)
+    await db.flush()
+    items = [
+        {
+            "job_id": job.id,
+            "position": position,
+            "invoice_id": invoice_id,
+            "file_name": export_file_name(position, invoice_number),
+            "status": "pending",
+        }
+        for position, (invoice_id, invoice_number) in enumerate(invoice_rows)
+    ]
+    for offset in range(0, len(items), 1000):
+        await db.execute(insert(models.InvoiceExportItem), items[offset:offset + 1000])
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_export_job(db: AsyncSession, *, job_id: uuid.UUID, user_id: str) -> Optional[models.InvoiceExportJob]:
+    result = await db.execute(
+        select(models.InvoiceExportJob).where(and_(
+            models.InvoiceExportJob.id == job_id,
+            models.InvoiceExportJob.user_id == user_id,
+        ))
+    )
+    return result.scalar_one_or_none()
+
+
+class InvoiceExportRunner:
+    """Runs export jobs under a renewable lease so crashed work is picked up elsewhere"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        pdf_generator: Callable[[], PDFGenerator],
+        *,
+        export_dir: Path = EXPORT_DIR,
+        window_size: int = EXPORT_WINDOW_SIZE,
+        lease_seconds: int = EXPORT_LEASE_SECONDS,
+        worker_id: Optional[str] = None,
+        clock: Callable[[], datetime] = _utcnow,
+    ):
+        self._session_factory = session_factory
+        self._pdf_generator = pdf_generator
+        self.export_dir = Path(export_dir)
+        self.window_size = max(window_size, 1)
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._clock = clock
+        # Jobs this runner is processing right now; resume_stale skips them
+        self._running: set[uuid.UUID] = set()
+
+    def job_dir(self, job_id: uuid.UUID) -> Path:
+        return self.export_dir / str(job_id)
+
+    def _lease_expiry(self) -> datetime:
+        return self._clock() + timedelta(seconds=self.lease_seconds)
+
+    def _lease_token(self) -> str:
+        """A fresh lease owner per run, so two runs in one process never share a lease"""
+        return f"{self.worker_id[:55]}:{uuid.uuid4().hex[:8]}"
+
+    async def _claim(self, db: AsyncSession, job_id: uuid.UUID, lease_token: str) -> bool:
+        job = models.InvoiceExportJob
+        result = await db.execute(
+            update(job)
+            .where(and_(
+                job.id == job_id,
+                job.status.in_(ACTIVE_STATUSES),
+                or_(job.lease_owner.is_(None), job.lease_expires_at < self._clock()),
+            ))
+            .values(status="running", lease_owner=lease_token, lease_expires_at=self._lease_expiry())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def _checkpoint(self, db: AsyncSession, job_id: uuid.UUID, positions: List[int], lease_token: str) -> bool:
+        """Mark *positions* done and renew the lease; False if the lease was lost"""
+        job = models.InvoiceExportJob
+        item = models.InvoiceExportItem
+        await db.execute(
+            update(item)
+            .where(and_(item.job_id == job_id, item.position.in_(positions)))
+            .values(status="done")
+            .execution_options(synchronize_session=False)
+        )
+        done_count = select(func.count()).select_from(item).where(
+            and_(item.job_id == job_id, item.status == "done")
+        ).scalar_subquery()
+        result = await db.execute(
+            update(job)
+            .where(and_(job.id == job_id, job.lease_owner == lease_token))
+            .values(processed_count=done_count, lease_expires_at=self._lease_expiry())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return False
+        await db.commit()
+        return True
+
+    async def _render_window(self, job_dir: Path, items: List[models.InvoiceExportItem], invoices: dict) -> None:
+        generator = self._pdf_generator()
+
+        async def _render(item: models.InvoiceExportItem) -> None:
+            target = job_dir / item.file_name
+            if target.exists():
+                return  # spooled before a crash, but not yet checkpointed
+            pdf = await generator.render_invoice_pdf(invoices[item.invoice_id], cache_result=False)
+            partial = target.with_suffix(".partial")
+            await asyncio.to_thread(partial.write_bytes, pdf.content)
+            os.replace(partial, target)
+
+        await asyncio.gather(*(_render(item) for item in items))
+
+    def _assemble(self, job_dir: Path, file_names: List[str], export_format: str, output_path: Path) -> None:
+        partial = output_path.with_name(output_path.name + ".partial")
+        if export_format == "pdf":
+            writer = PdfWriter()
+            for file_name in file_names:
+                writer.append(str(job_dir / file_name))
+            with open(partial, "wb") as fh:
+                writer.write(fh)
+        else:
+            # PDFs are already compressed; storing them keeps assembly I/O-bound.
+            with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for file_name in file_names:
+                    archive.write(job_dir / file_name, arcname=file_name)
+        os.replace(partial, output_path)
+
+    async def run(self, job_id: uuid.UUID) -> Optional[str]:
+        """Process a job to completion; returns its status, or None if another run holds it"""
+        if job_id in self._running:
+            return None
+        self._running.add(job_id)
+        try:
+            return await self._run_claimed(job_id, self._lease_token())
+        finally:
+            self._running.discard(job_id)
+
+    async def _run_claimed(self, job_id: uuid.UUID, lease_token: str) -> Optional[str]:
+        async with self._session_factory() as db:
+            if not await self._claim(db, job_id, lease_token):
+                return None
+            job = await db.get(models.InvoiceExportJob, job_id)
+            export_format = job.export_format
+            job_dir = self.job_dir(job_id)
+            job_dir.mkdir(parents=True, exist_ok=True)
+            item = models.InvoiceExportItem
+
+            try:
+                while True:
+                    window = list((
+                        await db.execute(
+                            select(item)
+                            .where(and_(item.job_id == job_id, item.status == "pending"))
+                            .order_by(item.position)
+                            .limit(self.window_size)
+                        )
+                    ).scalars().all())
+                    if not window:
+                        break
+                    invoices = {
+                        invoice.id: invoice
+                        for invoice in (
+                            await db.execute(
+                                select(models.Invoice)
+                                .options(
+                                    selectinload(models.Invoice.line_items),
+                                    selectinload(models.Invoice.payments),
+                                )
+                                .where(models.Invoice.id.in_([entry.invoice_id for entry in window]))
+                            )
+                        ).scalars()
+                    }
+                    # Invoices deleted since the job was created are left out of the export.
+                    present = [entry for entry in window if entry.invoice_id in invoices]
+                    await self._render_window(job_dir, present, invoices)
+                    if not await self._checkpoint(db, job_id, [entry.position for entry in window], lease_token):
+                        return None
+                    db.expunge_all()
+
+                file_names = [
+                    file_name
+                    for file_name in (
+                        await db.execute(
+                            select(item.file_name)
+                            .where(and_(item.job_id == job_id, item.status == "done"))
+                            .order_by(item.position)
+                        )
+                    ).scalars()
+                    if (job_dir / file_name).exists()
+                ]
+                suffix = "pdf" if export_format == "pdf" else "zip"
+                output_path = self.export_dir / f"{job_id}.{suffix}"
+                await asyncio.to_thread(self._assemble, job_dir, file_names, export_format, output_path)
+                await db.execute(
+                    update(models.InvoiceExportJob)
+                    .where(and_(models.InvoiceExportJob.id == job_id, models.InvoiceExportJob.lease_owner == lease_token))
+                    .values(
+                        status="completed",
+                        output_path=str(output_path),
+                        completed_at=self._clock(),
+                        lease_owner=None,
+                        lease_expires_at=None,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                await asyncio.to_thread(shutil.rmtree, job_dir, True)
+                return "completed"
+            except Exception as exc:
+                await db.rollback()
+                await db.execute(
+                    update(models.InvoiceExportJob)
+                    .where(and_(models.InvoiceExportJob.id == job_id, models.InvoiceExportJob.lease_owner == lease_token))
+                    .values(status="failed", error=str(exc)[:2000], lease_owner=None, lease_expires_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                return "failed"
+
+    async def resume_stale(self) -> int:
+        """Run every active job whose lease is free or expired; returns jobs completed here"""
+        job = models.InvoiceExportJob
+        async with self._session_factory() as db:
+            job_ids = (
+                await db.execute(
+                    select(job.id)
+                    .where(and_(
+                        job.status.in_(ACTIVE_STATUSES),
+                        or_(job.lease_owner.is_(None), job.lease_expires_at < self._clock()),
+                    ))
+                    .order_by(job.created_at)
+                )
+            ).scalars().all()
+        completed = 0
+        for job_id in job_ids:
+            if job_id in self._running:
+                continue
+            if await self.run(job_id) == "completed":
+                completed += 1
+        return completed
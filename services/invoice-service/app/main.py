@@ -1,20 +1,23 @@
+import asyncio
 import os
 from datetime import datetime, timedelta
 from typing import List, Optional
 from uuid import UUID
 
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from . import crud, schemas
-from .database import get_db
+from . import crud, export_jobs, schemas
+from .database import AsyncSessionLocal, get_db
 from .invoice_calculator import InvoiceCalculator
-from .pdf_generator import PDFGenerator
+from .pdf_generator import get_pdf_generator
+from .pdf_rendering import iter_pdf_chunks
 from .reporting_service import InvoiceReportingService
 from .sync_service import (
+    InvoiceTransactionSync,
     sync_invoice_to_transactions,  # pylint: disable=no-name-in-module
 )
 
@@ -27,7 +30,8 @@ app = FastAPI(
         {"name": "templates", "description": "Invoice template management"},
         {"name": "payments", "description": "Payment tracking"},
         {"name": "reporting", "description": "Invoice analytics and reporting"},
-        {"name": "pdf", "description": "PDF generation and download"}
+        {"name": "pdf", "description": "PDF generation and download"},
+        {"name": "exports", "description": "Bulk invoice exports"}
     ]
 )
 
@@ -57,6 +61,35 @@ def get_current_user_token(token: str = Depends(oauth2_scheme)) -> str:
     """Get current user token for service-to-service calls"""
     return token
 
+INVOICE_EXPORT_RESUME_INTERVAL_SECONDS = int(os.getenv("INVOICE_EXPORT_RESUME_INTERVAL_SECONDS", "60"))
+
+export_runner = export_jobs.InvoiceExportRunner(lambda: AsyncSessionLocal(), get_pdf_generator)
+_export_resume_task: Optional[asyncio.Task] = None
+
+
+async def _export_resume_loop() -> None:
+    """Pick up export jobs left behind by crashed workers once their lease expires"""
+    while True:
+        try:
+            await export_runner.resume_stale()
+        except Exception as exc:  # pragma: no cover - defensive runtime guard
+            print(f"Invoice export resume failed: {exc}")
+        await asyncio.sleep(INVOICE_EXPORT_RESUME_INTERVAL_SECONDS)
+
+
+@app.on_event("startup")
+async def start_export_resume_loop() -> None:
+    global _export_resume_task
+    _export_resume_task = asyncio.create_task(_export_resume_loop())
+
+
+@app.on_event("shutdown")
+def shutdown_pdf_render_pool() -> None:
+    if _export_resume_task is not None:
+        _export_resume_task.cancel()
+    if get_pdf_generator.cache_info().currsize:
+        get_pdf_generator().render_pool.shutdown()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -260,7 +293,7 @@ async def send_invoice(
         raise HTTPException(status_code=400, detail="Can only send draft invoices")
 
     # Generate PDF if not exists
-    pdf_generator = PDFGenerator()
+    pdf_generator = get_pdf_generator()
     if not invoice.pdf_file_path:
         pdf_path = await pdf_generator.generate_invoice_pdf(invoice)
         await crud.update_invoice_pdf_path(db, invoice_id=invoice_id, pdf_path=pdf_path)
@@ -426,7 +459,7 @@ async def generate_pdf(
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
 
-    pdf_generator = PDFGenerator()
+    pdf_generator = get_pdf_generator()
 
     # Get template if specified
     template = None
@@ -449,25 +482,108 @@ async def generate_pdf(
         generated_at=datetime.utcnow()
     )
 
-@app.get("/invoices/{invoice_id}/pdf/download", response_class=FileResponse, tags=["pdf"])
+@app.get("/invoices/{invoice_id}/pdf/download", response_class=StreamingResponse, tags=["pdf"])
 async def download_pdf(
     invoice_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    template_id: Optional[str] = Query(None)
 ):
-    """Download invoice PDF"""
+    """Download invoice PDF (rendered in memory; unchanged invoices come from the cache)"""
     invoice = await crud.get_invoice(db, invoice_id=invoice_id, user_id=user_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
 
-    if not invoice.pdf_file_path or not os.path.exists(invoice.pdf_file_path):
-        raise HTTPException(status_code=404, detail="PDF not found")
+    template = None
+    if template_id:
+        template = await crud.get_template(db, template_id=template_id, user_id=user_id)
+
+    pdf = await get_pdf_generator().render_invoice_pdf(invoice=invoice, template=template)
 
     filename = f"Invoice-{invoice.invoice_number}.pdf"
+    return StreamingResponse(
+        iter_pdf_chunks(pdf.content),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(len(pdf.content)),
+            "ETag": f'"{pdf.content_hash}"',
+        },
+    )
+
+# === BULK EXPORT ENDPOINTS ===
+
+def _export_job_response(job) -> schemas.InvoiceExportJob:
+    total = job.total_count or 0
+    return schemas.InvoiceExportJob(
+        id=job.id,
+        tax_year=job.tax_year,
+        export_format=job.export_format,
+        status=job.status,
+        total_count=total,
+        processed_count=job.processed_count or 0,
+        progress_percent=round(100.0 * (job.processed_count or 0) / total, 1) if total else 100.0,
+        error=job.error,
+        download_url=f"/invoices/exports/{job.id}/download" if job.status == "completed" else None,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+    )
+
+@app.post(
+    "/invoices/exports",
+    response_model=schemas.InvoiceExportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["exports"],
+)
+async def create_invoice_export(
+    export_request: schemas.InvoiceExportRequest,
+    background_tasks: BackgroundTasks,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start exporting every invoice in a tax year as a ZIP of PDFs or one merged PDF"""
+    if export_request.export_format == "pdf" and not export_jobs.merged_pdf_supported():
+        raise HTTPException(status_code=400, detail="Merged PDF export is not available; use zip")
+
+    job = await export_jobs.create_export_job(
+        db,
+        user_id=user_id,
+        tax_year=export_request.tax_year,
+        export_format=export_request.export_format,
+    )
+    background_tasks.add_task(export_runner.run, job.id)
+    return _export_job_response(job)
+
+@app.get("/invoices/exports/{job_id}", response_model=schemas.InvoiceExportJob, tags=["exports"])
+async def get_invoice_export(
+    job_id: UUID,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Export progress"""
+    job = await export_jobs.get_export_job(db, job_id=job_id, user_id=user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return _export_job_response(job)
+
+@app.get("/invoices/exports/{job_id}/download", response_class=FileResponse, tags=["exports"])
+async def download_invoice_export(
+    job_id: UUID,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download a completed export (streamed from disk)"""
+    job = await export_jobs.get_export_job(db, job_id=job_id, user_id=user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job.status != "completed" or not job.output_path or not os.path.exists(job.output_path):
+        raise HTTPException(status_code=409, detail="Export is not ready")
+
+    media_type = "application/pdf" if job.export_format == "pdf" else "application/zip"
     return FileResponse(
-        path=invoice.pdf_file_path,
-        filename=filename,
-        media_type="application/pdf"
+        path=job.output_path,
+        filename=f"invoices-{job.tax_year}-{job.tax_year + 1}.{job.export_format}",
+        media_type=media_type
     )
 
 # === INTEGRATION ENDPOINTS ===
@@ -484,15 +600,19 @@ async def get_expense_categories(
 @app.post("/integration/sync-to-transactions", tags=["reporting"])
 async def sync_to_transactions_service(
     user_id: str = Depends(get_current_user_id),
+    token: str = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db),
-    invoice_id: Optional[str] = Query(None),
-    start_date: Optional[datetime] = Query(None),
-    end_date: Optional[datetime] = Query(None)
+    invoice_id: Optional[UUID] = Query(None)
 ):
-    """Sync invoice data to transactions service for reporting"""
-    # TODO: Implement sync with transactions-service
-    # This would push invoice data to main transactions for comprehensive reporting
-    return {"message": "Sync initiated", "status": "pending"}
+    """Sync invoices changed since the last sync (or one invoice) to transactions service"""
+    syncer = InvoiceTransactionSync()
+    if invoice_id is None:
+        return await syncer.sync_changed_invoices(db, user_id, token)
+
+    invoice = await crud.get_invoice(db, invoice_id=invoice_id, user_id=user_id)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return await syncer.bulk_sync_invoices([invoice], token)
 
 @app.get("/integration/tax-data", tags=["reporting"])
 async def get_tax_data(
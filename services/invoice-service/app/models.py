@@ -7,8 +7,10 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
+    PrimaryKeyConstraint,
     String,
     Text,
 )
@@ -52,6 +54,7 @@ class Client(Base):
 class Invoice(Base):
     """Core invoice model for business invoicing"""
     __tablename__ = "invoices"
+    __table_args__ = (Index("ix_invoices_user_id_updated_at", "user_id", "updated_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
     invoice_number = Column(String, unique=True, nullable=False, index=True)
@@ -221,3 +224,51 @@ class RecurringInvoice(Base):
 
     # Relationship
     template = relationship("InvoiceTemplate")
+
+
+class InvoiceExportJob(Base):
+    """Bulk PDF/ZIP export of a user's invoices for one tax year"""
+    __tablename__ = "invoice_export_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    user_id = Column(String, nullable=False, index=True)
+    tax_year = Column(Integer, nullable=False)
+    export_format = Column(String(8), nullable=False, default='zip')  # zip, pdf
+
+    # Progress
+    status = Column(String, nullable=False, default='pending', index=True)  # pending, running, completed, failed
+    total_count = Column(Integer, nullable=False, default=0)
+    processed_count = Column(Integer, nullable=False, default=0)
+    output_path = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Worker lease; an expired lease lets another worker resume the job
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class InvoiceExportItem(Base):
+    """One invoice within an export job; ``done`` items have a spooled PDF on disk"""
+    __tablename__ = "invoice_export_items"
+    __table_args__ = (PrimaryKeyConstraint("job_id", "position"),)
+
+    job_id = Column(UUID(as_uuid=True), ForeignKey("invoice_export_jobs.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    invoice_id = Column(UUID(as_uuid=True), nullable=False)
+    file_name = Column(String, nullable=False)
+    status = Column(String, nullable=False, default='pending')  # pending, done
+
+
+class InvoiceSyncState(Base):
+    """Per-user watermark of invoices already mirrored to transactions-service"""
+    __tablename__ = "invoice_sync_state"
+
+    user_id = Column(String, primary_key=True)
+    # Keyset position (updated_at, id) of the last invoice acknowledged by transactions-service
+    synced_until = Column(DateTime(timezone=True), nullable=True)
+    synced_until_id = Column(UUID(as_uuid=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
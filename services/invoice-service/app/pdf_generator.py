@@ -1,17 +1,32 @@
+import asyncio
+import json
 import os
 import jinja2
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from weasyprint import HTML, CSS
 from pathlib import Path
 
 from . import schemas
+from .pdf_rendering import PDFRenderPool, content_hash, stylesheet_key
+
+# Fields that change without changing the rendered document.
+_HASH_EXCLUDED_INVOICE_FIELDS = {"pdf_file_path", "created_at", "updated_at"}
+
+
+@dataclass(frozen=True)
+class RenderedPDF:
+    content: bytes
+    content_hash: str
+    cached: bool
+
 
 class PDFGenerator:
     """Generate professional PDF invoices with customizable templates"""
 
-    def __init__(self):
+    def __init__(self, render_pool: Optional[PDFRenderPool] = None):
         self.template_dir = Path(__file__).parent / "templates"
         self.static_dir = Path(__file__).parent / "static"
         self.output_dir = Path(os.getenv("PDF_OUTPUT_DIR", "/tmp/invoices"))
@@ -19,10 +34,13 @@ class PDFGenerator:
         # Ensure directories exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Setup Jinja2 environment
+        # Setup Jinja2 environment; templates ship with the service, so compiled
+        # templates are cached for the life of the process.
         self.jinja_env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(str(self.template_dir)),
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
+            autoescape=jinja2.select_autoescape(['html', 'xml']),
+            auto_reload=False,
+            cache_size=-1,
         )
 
         # Add custom filters
@@ -30,13 +48,21 @@ class PDFGenerator:
         self.jinja_env.filters['date'] = self._format_date
         self.jinja_env.filters['percentage'] = self._format_percentage
 
-    async def generate_invoice_pdf(
+        self.css_content = self._get_default_css()
+        self.css_key = stylesheet_key(self.css_content)
+        self.render_pool = render_pool or PDFRenderPool(stylesheets={self.css_key: self.css_content})
+
+    async def render_invoice_pdf(
         self,
         invoice: schemas.Invoice,
         template: Optional[schemas.InvoiceTemplate] = None,
-        custom_styling: Optional[Dict[str, Any]] = None
-    ) -> str:
-        """Generate PDF for invoice and return file path"""
+        custom_styling: Optional[Dict[str, Any]] = None,
+        cache_result: bool = True
+    ) -> RenderedPDF:
+        """Render invoice PDF bytes, reusing the cached document when nothing has changed"""
+
+        # Templates expect the API representation (enum status, computed line totals)
+        invoice = schemas.Invoice.model_validate(invoice)
 
         # Prepare template context
         context = self._prepare_template_context(invoice, template)
@@ -47,21 +73,66 @@ class PDFGenerator:
             # Use custom template (would need to be saved as file)
             template_name = f"custom_{template.id}.html"
 
+        key = self._content_hash(invoice, template_name, context, custom_styling)
+        cached = self.render_pool.cache.get(key)
+        if cached is not None:
+            return RenderedPDF(content=cached, content_hash=key, cached=True)
+
         # Render HTML
         html_content = self._render_template(template_name, context, custom_styling)
 
-        # Generate PDF
-        pdf_path = await self._generate_pdf_from_html(html_content, invoice.invoice_number)
+        # Generate PDF off the event loop
+        content, cached = await self.render_pool.render(
+            html_content,
+            key=key,
+            css_key=self.css_key,
+            base_url=str(self.template_dir),
+            cache_result=cache_result,
+        )
+        return RenderedPDF(content=content, content_hash=key, cached=cached)
+
+    async def generate_invoice_pdf(
+        self,
+        invoice: schemas.Invoice,
+        template: Optional[schemas.InvoiceTemplate] = None,
+        custom_styling: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Generate PDF for invoice and return file path"""
+        pdf = await self.render_invoice_pdf(invoice, template, custom_styling)
+
+        # Content-addressed name: re-generating an unchanged invoice reuses the file
+        pdf_path = self.output_dir / f"invoice-{invoice.invoice_number}-{pdf.content_hash[:16]}.pdf"
+        if not pdf_path.exists():
+            await asyncio.to_thread(pdf_path.write_bytes, pdf.content)
 
         return str(pdf_path)
 
+    def _content_hash(
+        self,
+        invoice: schemas.Invoice,
+        template_name: str,
+        context: Dict[str, Any],
+        custom_styling: Optional[Dict[str, Any]],
+    ) -> str:
+        """Hash every input that affects the rendered document (not the generation time)"""
+        payload = {
+            "invoice": invoice.model_dump(mode="json", exclude=_HASH_EXCLUDED_INVOICE_FIELDS),
+            "template": template_name,
+            "company": context["company"],
+            "aging_days": context["aging_days"],
+            "custom_styling": custom_styling,
+            "css": self.css_key,
+        }
+        return content_hash(json.dumps(payload, sort_keys=True, default=str).encode("utf-8"))
+
     def _prepare_template_context(self, invoice: schemas.Invoice, template: Optional[schemas.InvoiceTemplate]) -> Dict[str, Any]:
         """Prepare context data for template rendering"""
 
         # Calculate aging if overdue
         aging_days = 0
         if invoice.due_date:
-            aging_days = max(0, (datetime.now().date() - invoice.due_date).days)
+            due_date = invoice.due_date.date() if isinstance(invoice.due_date, datetime) else invoice.due_date
+            aging_days = max(0, (datetime.now().date() - due_date).days)
 
         # Company information (would come from user profile in real app)
         company_info = {
@@ -105,24 +176,6 @@ class PDFGenerator:
 
         return template.render(**context)
 
-    async def _generate_pdf_from_html(self, html_content: str, invoice_number: str) -> Path:
-        """Convert HTML to PDF using WeasyPrint"""
-
-        # Output file path
-        filename = f"invoice-{invoice_number}-{int(datetime.utcnow().timestamp())}.pdf"
-        pdf_path = self.output_dir / filename
-
-        # CSS styling
-        css_content = self._get_default_css()
-
-        # Generate PDF
-        html_doc = HTML(string=html_content, base_url=str(self.template_dir))
-        css_doc = CSS(string=css_content)
-
-        html_doc.write_pdf(str(pdf_path), stylesheets=[css_doc])
-
-        return pdf_path
-
     def _get_default_css(self) -> str:
         """Get default CSS styling for invoice PDFs"""
         return """
@@ -440,3 +493,9 @@ class PDFGenerator:
 </html>
 """
         return template_content
+
+
+@lru_cache(maxsize=1)
+def get_pdf_generator() -> PDFGenerator:
+    """Shared generator so the Jinja template cache and render pool live for the whole process"""
+    return PDFGenerator()
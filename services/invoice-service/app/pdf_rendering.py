@@ -0,0 +1,206 @@
+"""
+Off-loop PDF rendering for invoices.
+
+WeasyPrint layout is CPU-bound, so ``PDFRenderPool`` runs it in a process
+pool sized to the host's cores instead of on the event loop. Each worker
+parses the invoice stylesheets once and reuses them for every document.
+Rendered bytes are kept in a size-bounded ``PDFCache`` keyed by a content
+hash of everything that affects the output, so an unchanged invoice is served
+without being rendered again; concurrent requests for the same hash share one
+render.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+PDF_RENDER_START_METHOD = os.getenv("PDF_RENDER_START_METHOD", "spawn")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PDF_STREAM_CHUNK_BYTES = 64 * 1024
+
+RenderFunction = Callable[[str, str, str, str], bytes]
+
+# Parsed stylesheets, per worker process, keyed by ``stylesheet_key``.
+_worker_stylesheets: Dict[str, Any] = {}
+
+
+def content_hash(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def stylesheet_key(css: str) -> str:
+    return content_hash(css.encode("utf-8"))[:16]
+
+
+def _parsed_stylesheet(css_key: str, css: str) -> Any:
+    stylesheet = _worker_stylesheets.get(css_key)
+    if stylesheet is None:
+        # Imported lazily: only render workers need WeasyPrint's native libraries.
+        from weasyprint import CSS
+
+        stylesheet = CSS(string=css)
+        _worker_stylesheets[css_key] = stylesheet
+    return stylesheet
+
+
+def _init_worker(stylesheets: Dict[str, str]) -> None:
+    for css_key, css in stylesheets.items():
+        _parsed_stylesheet(css_key, css)
+
+
+def render_html_to_pdf(html: str, base_url: str, css_key: str, css: str) -> bytes:
+    """Render one document to PDF bytes (runs inside a pool worker)."""
+    from weasyprint import HTML
+
+    return HTML(string=html, base_url=base_url).write_pdf(stylesheets=[_parsed_stylesheet(css_key, css)])
+
+
+def iter_pdf_chunks(content: bytes, chunk_size: int = PDF_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    view = memoryview(content)
+    for offset in range(0, len(view), chunk_size):
+        yield bytes(view[offset : offset + chunk_size])
+
+
+class PDFCache:
+    """LRU of rendered PDFs bounded by total size in bytes."""
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        content = self._entries.get(key)
+        if content is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= len(previous)
+        self._entries[key] = content
+        self.size_bytes += len(content)
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class PDFRenderPool:
+    """Renders HTML to PDF bytes in worker processes, with a content-hash cache in front.
+
+    ``workers=0`` renders in a single background thread instead of processes,
+    which keeps the event loop free on hosts where forking workers is not wanted.
+    """
+
+    def __init__(
+        self,
+        *,
+        stylesheets: Dict[str, str],
+        workers: int = PDF_RENDER_WORKERS,
+        cache: Optional[PDFCache] = None,
+        render: RenderFunction = render_html_to_pdf,
+        start_method: str = PDF_RENDER_START_METHOD,
+    ):
+        self.stylesheets = dict(stylesheets)
+        self.workers = max(workers, 0)
+        self.cache = cache if cache is not None else PDFCache()
+        self.renders = 0
+        self._render = render
+        self._start_method = start_method
+        self._executor: Optional[Executor] = None
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # Pre-parse stylesheets in each worker, unless a custom renderer manages its own.
+            init: Dict[str, Any] = {}
+            if self._render is render_html_to_pdf:
+                init = {"initializer": _init_worker, "initargs": (self.stylesheets,)}
+            if self.workers == 0:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render", **init)
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self._start_method),
+                    **init,
+                )
+        return self._executor
+
+    async def render(
+        self, html: str, *, key: str, css_key: str, base_url: str = "", cache_result: bool = True
+    ) -> tuple[bytes, bool]:
+        """Return ``(pdf_bytes, cache_hit)`` for *html*, rendering at most once per *key*.
+
+        Bulk callers pass ``cache_result=False`` so one-off documents do not evict
+        the interactive working set.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, True
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+
+        # The render's result lives on its own future, resolved from the executor
+        # callback, so a cancelled caller never cancels it for the others waiting.
+        loop = asyncio.get_running_loop()
+        shared: "asyncio.Future[bytes]" = loop.create_future()
+        self._inflight[key] = shared
+        try:
+            job = self._get_executor().submit(
+                self._render, html, base_url, css_key, self.stylesheets[css_key]
+            )
+        except BaseException as exc:
+            self._inflight.pop(key, None)
+            shared.set_exception(exc)
+            shared.exception()
+            raise
+
+        def _resolve(done: "Future[bytes]") -> None:
+            if self._inflight.get(key) is shared:
+                del self._inflight[key]
+            if done.cancelled():
+                shared.cancel()
+                return
+            exc = done.exception()
+            if exc is not None:
+                shared.set_exception(exc)
+                shared.exception()  # nobody may be waiting any more
+                return
+            content = done.result()
+            self.renders += 1
+            if cache_result:
+                self.cache.put(key, content)
+            shared.set_result(content)
+
+        job.add_done_callback(lambda done: loop.call_soon_threadsafe(_resolve, done))
+        return await asyncio.shield(shared), False
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
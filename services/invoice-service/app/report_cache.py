@@ -0,0 +1,70 @@
+"""
+In-process cache for invoice report aggregates.
+
+Entries are scoped to a user and tagged with that user's generation number.
+Invoice writes in ``crud`` bump the generation, which invalidates every
+cached report for the user, including one that was being computed while the
+write happened. The TTL bounds staleness when another replica takes the write.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", "300"))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "5000"))
+
+
+class ReportCache:
+    """LRU of ``(user_id, key) -> value`` that drops a user's entries on any of their invoice writes"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = REPORT_CACHE_TTL_SECONDS,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[int, float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            self.misses += 1
+            return None
+        generation, expires_at, value = entry
+        if generation != self.generation(user_id) or expires_at <= self._clock():
+            del self._entries[(user_id, key)]
+            self.misses += 1
+            return None
+        self._entries.move_to_end((user_id, key))
+        self.hits += 1
+        return value
+
+    def put(self, user_id: str, key: Hashable, value: Any, generation: int) -> None:
+        """Store *value* computed at *generation*; silently dropped if a write happened since"""
+        if generation != self.generation(user_id):
+            return
+        self._entries[(user_id, key)] = (generation, self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end((user_id, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self._generations[user_id] = self.generation(user_id) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+
+report_cache = ReportCache()
@@ -1,13 +1,28 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date, timedelta, timezone
+import asyncio
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Union
+from datetime import datetime, date, time, timedelta, timezone
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, extract
+from sqlalchemy import select, func, and_, case, literal
 from sqlalchemy.orm import selectinload
-from dataclasses import dataclass
-import httpx  # For external service integration
-
-from . import models, schemas, crud
+from dataclasses import dataclass, field
+
+from . import models, schemas
+from .report_cache import ReportCache, report_cache
+
+# Statuses that count as taxable income and as money still owed
+TAXABLE_STATUSES = (
+    schemas.InvoiceStatus.SENT.value,
+    schemas.InvoiceStatus.PAID.value,
+    schemas.InvoiceStatus.PARTIALLY_PAID.value,
+)
+UNPAID_STATUSES = (
+    schemas.InvoiceStatus.SENT.value,
+    schemas.InvoiceStatus.PARTIALLY_PAID.value,
+    schemas.InvoiceStatus.OVERDUE.value,
+)
+TOP_CLIENTS_LIMIT = 10
 
 @dataclass
 class RevenueDataPoint:
@@ -16,112 +31,279 @@ class RevenueDataPoint:
     invoice_count: int
     avg_invoice_value: Decimal
 
+@dataclass(frozen=True)
+class InvoiceBucket:
+    """Invoices sharing an issue day, status and client"""
+    day: date
+    status: str
+    client_name: str
+    invoice_count: int
+    total_amount: float
+    subtotal: float
+    vat_amount: float
+    paid_amount: float
+    overdue_amount: float
+    paid_with_date: int
+    payment_days: float
+
+@dataclass(frozen=True)
+class LineBucket:
+    """Line items sharing a category, VAT rate and invoice status"""
+    category: Optional[str]
+    vat_rate: float
+    status: str
+    net_amount: float
+    vat_amount: float
+    item_count: int
+
+@dataclass
+class InvoiceAggregates:
+    """Everything the period reports need, from one pass over invoices and one over line items"""
+    invoices: List[InvoiceBucket] = field(default_factory=list)
+    lines: List[LineBucket] = field(default_factory=list)
+
+    def invoices_with_status(self, statuses) -> List[InvoiceBucket]:
+        return [bucket for bucket in self.invoices if bucket.status in statuses]
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _period_bounds(start: Union[date, datetime], end: Union[date, datetime]) -> tuple[datetime, datetime]:
+    """Half-open ``[start, end)`` range; a plain end date includes that whole day"""
+    if not isinstance(start, datetime):
+        start = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    if isinstance(end, datetime):
+        return start, end + timedelta(microseconds=1)
+    return start, datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+
+def _period_start(grouping: str, day: date) -> date:
+    if grouping == "day":
+        return day
+    if grouping == "week":
+        return day - timedelta(days=day.weekday())
+    if grouping == "quarter":
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    return day.replace(day=1)
+
+
+def _period_label(grouping: str, period: date) -> str:
+    if grouping == "day":
+        return period.strftime("%Y-%m-%d")
+    if grouping == "week":
+        return period.strftime("Week of %Y-%m-%d")
+    if grouping == "quarter":
+        return f"Q{(period.month - 1) // 3 + 1} {period.year}"
+    return period.strftime("%B %Y")
+
+
 class InvoiceReportingService:
     """Service for generating invoice reports and analytics"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: ReportCache = report_cache,
+        concurrent_queries: Optional[bool] = None,
+    ):
         self.db = db
-
-    async def generate_summary_report(
+        self.cache = cache
+        # None: run independent queries concurrently unless the backend is SQLite
+        self.concurrent_queries = concurrent_queries
+
+    # === AGGREGATION ===
+
+    def _days_between(self, later, earlier):
+        if self.db.get_bind().dialect.name == "sqlite":
+            return func.julianday(later) - func.julianday(earlier)
+        return func.extract("epoch", later - earlier) / 86400.0
+
+    async def _execute_all(self, statements) -> List[list]:
+        """Run independent queries concurrently on their own sessions where the driver allows it"""
+        # AsyncSession.get_bind() returns the sync Engine; new sessions need the AsyncEngine
+        engine = self.db.bind
+        concurrent = self.concurrent_queries
+        if concurrent is None:
+            concurrent = self.db.get_bind().dialect.name != "sqlite"
+        if len(statements) == 1 or not concurrent or engine is None:
+            return [(await self.db.execute(statement)).all() for statement in statements]
+
+        async def _run(statement) -> list:
+            async with AsyncSession(engine) as session:
+                return (await session.execute(statement)).all()
+
+        return list(await asyncio.gather(*(_run(statement) for statement in statements)))
+
+    async def _load_aggregates(
         self,
         user_id: str,
-        start_date: date,
-        end_date: date,
+        start_date: Union[date, datetime],
+        end_date: Union[date, datetime],
         company_id: Optional[str] = None
-    ) -> schemas.InvoiceReportSummary:
-        """Generate comprehensive invoice summary report"""
-
-        # Base query filter
+    ) -> InvoiceAggregates:
+        """Per-(user, period) invoice and line-item buckets, cached until the user's next invoice write"""
+        period_start, period_end = _period_bounds(start_date, end_date)
+        cache_key = ("aggregates", period_start, period_end, company_id)
+        cached = self.cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation(user_id)
+
+        invoice = models.Invoice
+        line = models.InvoiceLineItem
         base_filter = and_(
-            models.Invoice.user_id == user_id,
-            models.Invoice.issue_date >= start_date,
-            models.Invoice.issue_date <= end_date
+            invoice.user_id == user_id,
+            invoice.issue_date >= period_start,
+            invoice.issue_date < period_end
         )
-
         if company_id:
-            base_filter = and_(base_filter, models.Invoice.company_id == company_id)
+            base_filter = and_(base_filter, invoice.company_id == company_id)
 
-        # Get basic statistics
-        stats_result = await self.db.execute(
-            select(
-                func.count(models.Invoice.id).label('total_invoices'),
-                func.sum(models.Invoice.total_amount).label('total_billed'),
-                func.avg(models.Invoice.total_amount).label('avg_invoice_value')
-            )
-            .where(base_filter)
+        outstanding = invoice.total_amount - func.coalesce(invoice.paid_amount, 0)
+        is_overdue = and_(
+            invoice.status.in_(UNPAID_STATUSES),
+            invoice.due_date < datetime.now(timezone.utc),
         )
-        stats = stats_result.first()
-
-        # Status breakdown
-        status_result = await self.db.execute(
+        has_payment = and_(invoice.status == schemas.InvoiceStatus.PAID.value, invoice.payment_date.isnot(None))
+        issue_day = func.date(invoice.issue_date)
+        invoice_statement = (
             select(
-                models.Invoice.status,
-                func.count(models.Invoice.id).label('count'),
-                func.sum(models.Invoice.total_amount).label('amount')
+                issue_day.label('day'),
+                invoice.status,
+                invoice.client_name,
+                func.count(invoice.id).label('invoice_count'),
+                func.sum(invoice.total_amount).label('total_amount'),
+                func.sum(invoice.subtotal).label('subtotal'),
+                func.sum(invoice.vat_amount).label('vat_amount'),
+                func.sum(func.coalesce(invoice.paid_amount, 0)).label('paid_amount'),
+                func.sum(case((is_overdue, outstanding), else_=literal(0))).label('overdue_amount'),
+                func.sum(case((has_payment, 1), else_=0)).label('paid_with_date'),
+                func.sum(
+                    case((has_payment, self._days_between(invoice.payment_date, invoice.issue_date)), else_=literal(0.0))
+                ).label('payment_days'),
             )
             .where(base_filter)
-            .group_by(models.Invoice.status)
+            .group_by(issue_day, invoice.status, invoice.client_name)
         )
-
-        status_summary = {}
-        for row in status_result.fetchall():
-            status_summary[str(row.status)] = {
-                'count': row.count,
-                'amount': float(row.amount or 0)
-            }
-
-        # Category breakdown
-        category_result = await self.db.execute(
+        line_statement = (
             select(
-                models.InvoiceLineItem.category,
-                func.sum(models.InvoiceLineItem.line_total).label('total_amount'),
-                func.count(models.InvoiceLineItem.id).label('item_count')
+                line.category,
+                line.vat_rate,
+                invoice.status,
+                func.sum(line.line_total).label('net_amount'),
+                func.sum(line.vat_amount).label('vat_amount'),
+                func.count(line.id).label('item_count'),
             )
-            .join(models.Invoice)
+            .join(invoice, line.invoice_id == invoice.id)
             .where(base_filter)
-            .where(models.InvoiceLineItem.category.isnot(None))
-            .group_by(models.InvoiceLineItem.category)
+            .group_by(line.category, line.vat_rate, invoice.status)
         )
-
-        category_breakdown = {}
-        for row in category_result.fetchall():
-            category_breakdown[row.category] = {
-                'total_amount': float(row.total_amount or 0),
-                'item_count': row.item_count
-            }
-
-        # Top clients
-        client_result = await self.db.execute(
-            select(
-                models.Invoice.client_name,
-                func.count(models.Invoice.id).label('invoice_count'),
-                func.sum(models.Invoice.total_amount).label('total_amount')
-            )
-            .where(base_filter)
-            .group_by(models.Invoice.client_name)
-            .order_by(func.sum(models.Invoice.total_amount).desc())
-            .limit(10)
+        invoice_rows, line_rows = await self._execute_all([invoice_statement, line_statement])
+
+        aggregates = InvoiceAggregates(
+            invoices=[
+                InvoiceBucket(
+                    day=_as_date(row.day),
+                    status=str(row.status),
+                    client_name=row.client_name,
+                    invoice_count=int(row.invoice_count or 0),
+                    total_amount=float(row.total_amount or 0),
+                    subtotal=float(row.subtotal or 0),
+                    vat_amount=float(row.vat_amount or 0),
+                    paid_amount=float(row.paid_amount or 0),
+                    overdue_amount=float(row.overdue_amount or 0),
+                    paid_with_date=int(row.paid_with_date or 0),
+                    payment_days=float(row.payment_days or 0),
+                )
+                for row in invoice_rows
+            ],
+            lines=[
+                LineBucket(
+                    category=row.category,
+                    vat_rate=float(row.vat_rate or 0),
+                    status=str(row.status),
+                    net_amount=float(row.net_amount or 0),
+                    vat_amount=float(row.vat_amount or 0),
+                    item_count=int(row.item_count or 0),
+                )
+                for row in line_rows
+            ],
         )
+        self.cache.put(user_id, cache_key, aggregates, generation)
+        return aggregates
 
-        top_clients = []
-        for row in client_result.fetchall():
-            top_clients.append({
-                'client_name': row.client_name,
-                'invoice_count': row.invoice_count,
-                'total_amount': float(row.total_amount or 0)
-            })
+    # === REPORTS ===
 
+    async def generate_summary_report(
+        self,
+        user_id: str,
+        start_date: date,
+        end_date: date,
+        company_id: Optional[str] = None
+    ) -> schemas.InvoiceReportSummary:
+        """Generate comprehensive invoice summary report"""
+        aggregates = await self._load_aggregates(user_id, start_date, end_date, company_id)
+
+        total_invoices = sum(bucket.invoice_count for bucket in aggregates.invoices)
+        total_amount = sum(bucket.total_amount for bucket in aggregates.invoices)
+        paid_amount = sum(bucket.paid_amount for bucket in aggregates.invoices)
+        paid_with_date = sum(bucket.paid_with_date for bucket in aggregates.invoices)
+
+        status_summary: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'count': 0, 'amount': 0.0})
+        monthly: Dict[date, Dict[str, Any]] = defaultdict(lambda: {'invoice_count': 0, 'revenue': 0.0})
+        clients: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'invoice_count': 0, 'total_amount': 0.0})
+        for bucket in aggregates.invoices:
+            status_summary[bucket.status]['count'] += bucket.invoice_count
+            status_summary[bucket.status]['amount'] += bucket.total_amount
+            month = monthly[bucket.day.replace(day=1)]
+            month['invoice_count'] += bucket.invoice_count
+            month['revenue'] += bucket.total_amount
+            client = clients[bucket.client_name]
+            client['invoice_count'] += bucket.invoice_count
+            client['total_amount'] += bucket.total_amount
+
+        top_clients = sorted(clients.items(), key=lambda item: item[1]['total_amount'], reverse=True)
+        period_start, _ = _period_bounds(start_date, end_date)
         return schemas.InvoiceReportSummary(
-            period_start=start_date,
-            period_end=end_date,
-            total_invoices=stats.total_invoices or 0,
-            total_billed=float(stats.total_billed or 0),
-            total_collected=0.0,
-            outstanding_amount=float(stats.total_billed or 0),
-            avg_invoice_value=float(stats.avg_invoice_value or 0),
-            status_summary=status_summary,
-            category_breakdown=category_breakdown,
-            top_clients=top_clients
+            period_start=period_start,
+            period_end=end_date if isinstance(end_date, datetime) else datetime.combine(end_date, time.max),
+            stats=schemas.InvoiceStats(
+                total_invoices=total_invoices,
+                total_amount=round(total_amount, 2),
+                paid_amount=round(paid_amount, 2),
+                outstanding_amount=round(total_amount - paid_amount, 2),
+                overdue_amount=round(sum(bucket.overdue_amount for bucket in aggregates.invoices), 2),
+                average_payment_time=(
+                    round(sum(bucket.payment_days for bucket in aggregates.invoices) / paid_with_date, 1)
+                    if paid_with_date else None
+                ),
+            ),
+            invoices_by_status={
+                status: {'count': values['count'], 'amount': round(values['amount'], 2)}
+                for status, values in status_summary.items()
+            },
+            monthly_breakdown=[
+                {
+                    'month': month.strftime("%Y-%m"),
+                    'invoice_count': values['invoice_count'],
+                    'revenue': round(values['revenue'], 2),
+                }
+                for month, values in sorted(monthly.items())
+            ],
+            top_clients=[
+                {
+                    'client_name': client_name,
+                    'invoice_count': values['invoice_count'],
+                    'total_amount': round(values['total_amount'], 2),
+                }
+                for client_name, values in top_clients[:TOP_CLIENTS_LIMIT]
+            ]
         )
 
     async def generate_aging_report(
@@ -130,28 +312,32 @@ class InvoiceReportingService:
         company_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate accounts receivable aging report"""
+        today = date.today()
+        cache_key = ("aging", company_id, today)
+        cached = self.cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation(user_id)
 
-        # Get all unpaid/partially paid invoices
+        # Unpaid/partially paid invoices, summed per due day
         base_filter = and_(
             models.Invoice.user_id == user_id,
-            models.Invoice.status.in_([
-                schemas.InvoiceStatus.SENT,
-                schemas.InvoiceStatus.PARTIALLY_PAID,
-                schemas.InvoiceStatus.OVERDUE
-            ])
+            models.Invoice.status.in_(UNPAID_STATUSES)
         )
-
         if company_id:
             base_filter = and_(base_filter, models.Invoice.company_id == company_id)
 
+        due_day = func.date(models.Invoice.due_date)
         result = await self.db.execute(
-            select(models.Invoice)
+            select(
+                due_day.label('due_day'),
+                func.count(models.Invoice.id).label('count'),
+                func.sum(models.Invoice.total_amount - func.coalesce(models.Invoice.paid_amount, 0)).label('outstanding')
+            )
             .where(base_filter)
-            .order_by(models.Invoice.due_date.asc())
+            .group_by(due_day)
         )
 
-        invoices = result.scalars().all()
-
         aging_buckets = {
             'current': {'count': 0, 'amount': 0},
             '1-30_days': {'count': 0, 'amount': 0},
@@ -160,15 +346,11 @@ class InvoiceReportingService:
             '90+_days': {'count': 0, 'amount': 0}
         }
 
-        today = date.today()
-
-        for invoice in invoices:
-            outstanding = invoice.total_amount - (invoice.paid_amount or Decimal(0))
-
-            if not invoice.due_date or invoice.due_date >= today:
+        for row in result.fetchall():
+            if row.due_day is None or _as_date(row.due_day) >= today:
                 bucket = 'current'
             else:
-                days_overdue = (today - invoice.due_date).days
+                days_overdue = (today - _as_date(row.due_day)).days
                 if days_overdue <= 30:
                     bucket = '1-30_days'
                 elif days_overdue <= 60:
@@ -178,14 +360,16 @@ class InvoiceReportingService:
                 else:
                     bucket = '90+_days'
 
-            aging_buckets[bucket]['count'] += 1
-            aging_buckets[bucket]['amount'] += float(outstanding)
+            aging_buckets[bucket]['count'] += row.count
+            aging_buckets[bucket]['amount'] += float(row.outstanding or 0)
 
-        return {
+        report = {
             'generated_at': datetime.now(timezone.utc),
             'aging_buckets': aging_buckets,
             'total_outstanding': sum(bucket['amount'] for bucket in aging_buckets.values())
         }
+        self.cache.put(user_id, cache_key, report, generation)
+        return report
 
     async def generate_revenue_report(
         self,
@@ -195,54 +379,23 @@ class InvoiceReportingService:
         grouping: str = "month"
     ) -> List[Dict[str, Any]]:
         """Generate revenue analytics over time"""
-
-        if grouping == "day":
-            date_trunc = func.date(models.Invoice.invoice_date)
-            date_format = "%Y-%m-%d"
-        elif grouping == "week":
-            date_trunc = func.date_trunc('week', models.Invoice.invoice_date)
-            date_format = "Week of %Y-%m-%d"
-        elif grouping == "quarter":
-            date_trunc = func.date_trunc('quarter', models.Invoice.invoice_date)
-            date_format = "Q%q %Y"
-        else:  # month
-            date_trunc = func.date_trunc('month', models.Invoice.invoice_date)
-            date_format = "%B %Y"
-
-        result = await self.db.execute(
-            select(
-                date_trunc.label('period'),
-                func.sum(models.Invoice.total_amount).label('revenue'),
-                func.count(models.Invoice.id).label('invoice_count'),
-                func.avg(models.Invoice.total_amount).label('avg_invoice_value')
-            )
-            .where(
-                and_(
-                    models.Invoice.user_id == user_id,
-                    models.Invoice.invoice_date >= start_date,
-                    models.Invoice.invoice_date <= end_date
-                )
-            )
-            .group_by(date_trunc)
-            .order_by(date_trunc)
-        )
-
-        revenue_data = []
-        for row in result.fetchall():
-            period_date = row.period
-            if isinstance(period_date, str):
-                period_str = period_date
-            else:
-                period_str = period_date.strftime(date_format)
-
-            revenue_data.append({
-                'period': period_str,
-                'revenue': float(row.revenue or 0),
-                'invoice_count': row.invoice_count,
-                'avg_invoice_value': float(row.avg_invoice_value or 0)
-            })
-
-        return revenue_data
+        aggregates = await self._load_aggregates(user_id, start_date, end_date)
+
+        periods: Dict[date, Dict[str, Any]] = defaultdict(lambda: {'revenue': 0.0, 'invoice_count': 0})
+        for bucket in aggregates.invoices:
+            period = periods[_period_start(grouping, bucket.day)]
+            period['revenue'] += bucket.total_amount
+            period['invoice_count'] += bucket.invoice_count
+
+        return [
+            {
+                'period': _period_label(grouping, period),
+                'revenue': round(values['revenue'], 2),
+                'invoice_count': values['invoice_count'],
+                'avg_invoice_value': round(values['revenue'] / values['invoice_count'], 2) if values['invoice_count'] else 0.0
+            }
+            for period, values in sorted(periods.items())
+        ]
 
     async def generate_tax_report(
         self,
@@ -253,67 +406,26 @@ class InvoiceReportingService:
 
         start_date = date(tax_year, 4, 6)  # UK tax year starts April 6th
         end_date = date(tax_year + 1, 4, 5)
+        aggregates = await self._load_aggregates(user_id, start_date, end_date)
 
-        # Get all tax data for the year
-        result = await self.db.execute(
-            select(
-                func.sum(models.Invoice.subtotal).label('total_income'),
-                func.sum(models.Invoice.tax_amount).label('total_vat_charged')
-            )
-            .where(
-                and_(
-                    models.Invoice.user_id == user_id,
-                    models.Invoice.invoice_date >= start_date,
-                    models.Invoice.invoice_date <= end_date,
-                    models.Invoice.status.in_([
-                        schemas.InvoiceStatus.SENT,
-                        schemas.InvoiceStatus.PAID,
-                        schemas.InvoiceStatus.PARTIALLY_PAID
-                    ])
-                )
-            )
-        )
-
-        tax_summary = result.first()
-
-        # VAT breakdown by rate
-        vat_breakdown_result = await self.db.execute(
-            select(
-                models.InvoiceLineItem.tax_rate,
-                func.sum(models.InvoiceLineItem.total_amount).label('net_amount'),
-                func.sum(models.InvoiceLineItem.tax_amount).label('vat_amount')
-            )
-            .join(models.Invoice)
-            .where(
-                and_(
-                    models.Invoice.user_id == user_id,
-                    models.Invoice.invoice_date >= start_date,
-                    models.Invoice.invoice_date <= end_date,
-                    models.Invoice.status.in_([
-                        schemas.InvoiceStatus.SENT,
-                        schemas.InvoiceStatus.PAID,
-                        schemas.InvoiceStatus.PARTIALLY_PAID
-                    ])
-                )
-            )
-            .group_by(models.InvoiceLineItem.tax_rate)
-        )
-
-        vat_breakdown = {}
-        for row in vat_breakdown_result.fetchall():
-            rate = row.tax_rate or 0
-            vat_breakdown[f"{rate}%"] = {
-                'net_amount': float(row.net_amount or 0),
-                'vat_amount': float(row.vat_amount or 0)
-            }
+        taxable = aggregates.invoices_with_status(TAXABLE_STATUSES)
+        vat_breakdown: Dict[str, Dict[str, float]] = defaultdict(lambda: {'net_amount': 0.0, 'vat_amount': 0.0})
+        for bucket in aggregates.lines:
+            if bucket.status in TAXABLE_STATUSES:
+                rate = vat_breakdown[f"{bucket.vat_rate:g}%"]
+                rate['net_amount'] += bucket.net_amount
+                rate['vat_amount'] += bucket.vat_amount
 
         return {
             'tax_year': f"{tax_year}/{tax_year + 1}",
             'period_start': start_date,
             'period_end': end_date,
-            'total_income': float(tax_summary.total_income or 0),
-            'total_vat_charged': float(tax_summary.total_vat_charged or 0),
-            'vat_breakdown': vat_breakdown,
+            'total_income': round(sum(bucket.subtotal for bucket in taxable), 2),
+            'total_vat_charged': round(sum(bucket.vat_amount for bucket in taxable), 2),
+            'vat_breakdown': {
+                rate: {key: round(value, 2) for key, value in values.items()}
+                for rate, values in vat_breakdown.items()
+            },
             'generated_at': datetime.utcnow()
         }
 
@@ -393,39 +505,20 @@ class InvoiceReportingService:
         start_date = date(tax_year, 4, 6)
         end_date = date(tax_year + 1, 4, 5)
 
-        # Get invoice summary
+        # Summary and category breakdown share one cached aggregation pass
         summary = await self.generate_summary_report(user_id, start_date, end_date)
+        aggregates = await self._load_aggregates(user_id, start_date, end_date)
 
-        # Get category breakdown for expense categorization
-        category_result = await self.db.execute(
-            select(
-                models.InvoiceLineItem.category,
-                func.sum(models.InvoiceLineItem.total_amount).label('total'),
-                func.count(models.InvoiceLineItem.id).label('count')
-            )
-            .join(models.Invoice)
-            .where(
-                and_(
-                    models.Invoice.user_id == user_id,
-                    models.Invoice.invoice_date >= start_date,
-                    models.Invoice.invoice_date <= end_date
-                )
-            )
-            .group_by(models.InvoiceLineItem.category)
-        )
-
-        income_by_category = {}
-        for row in category_result.fetchall():
-            if row.category:
-                income_by_category[row.category] = {
-                    'total': float(row.total),
-                    'count': row.count
-                }
+        income_by_category: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'total': 0.0, 'count': 0})
+        for bucket in aggregates.lines:
+            if bucket.category:
+                income_by_category[bucket.category]['total'] += bucket.net_amount
+                income_by_category[bucket.category]['count'] += bucket.item_count
 
         return {
             'tax_year': f"{tax_year}/{tax_year + 1}",
             'summary': summary,
-            'income_by_category': income_by_category,
+            'income_by_category': dict(income_by_category),
             'recommended_actions': [
                 'Ensure all business expenses are recorded in the expense tracker',
                 'Review and update client contact information',
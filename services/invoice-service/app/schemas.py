@@ -1,10 +1,13 @@
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, BeforeValidator, EmailStr, Field
+
+# ORM primary keys are UUID columns; the API exposes them as strings.
+UUIDStr = Annotated[str, BeforeValidator(lambda value: str(value) if isinstance(value, UUID) else value)]
 
 
 class InvoiceStatus(str, Enum):
@@ -87,7 +90,7 @@ class InvoiceLineItemUpdate(BaseModel):
     product_code: Optional[str] = Field(None, max_length=50)
 
 class InvoiceLineItem(InvoiceLineItemBase):
-    id: str
+    id: UUIDStr
     line_total: Decimal
     vat_amount: Decimal
 
@@ -106,8 +109,8 @@ class InvoicePaymentCreate(InvoicePaymentBase):
     pass
 
 class InvoicePayment(InvoicePaymentBase):
-    id: str
-    invoice_id: str
+    id: UUIDStr
+    invoice_id: UUIDStr
     created_at: datetime
 
     class Config:
@@ -150,7 +153,7 @@ class InvoiceUpdate(BaseModel):
     terms_conditions: Optional[str] = Field(None, max_length=5000)
 
 class Invoice(InvoiceBase):
-    id: str
+    id: UUIDStr
     invoice_number: str
     user_id: str
     company_id: Optional[str]
@@ -285,6 +288,24 @@ class PDFGenerationResponse(BaseModel):
     file_path: str
     generated_at: datetime
 
+# === BULK EXPORT SCHEMAS ===
+class InvoiceExportRequest(BaseModel):
+    tax_year: int = Field(..., ge=2020, le=2030, description="Tax year starting 6 April")
+    export_format: Literal["zip", "pdf"] = Field(default="zip", description="ZIP of PDFs or one merged PDF")
+
+class InvoiceExportJob(BaseModel):
+    id: UUIDStr
+    tax_year: int
+    export_format: str
+    status: str
+    total_count: int
+    processed_count: int
+    progress_percent: float
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
 # === CALCULATION RESULT SCHEMAS ===
 class CalculatedLineItem(BaseModel):
     """Line item with calculated totals"""
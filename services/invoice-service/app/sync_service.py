@@ -5,22 +5,88 @@ corresponding transaction records for comprehensive financial reporting
 """
 
 import asyncio
+import hashlib
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from . import models, schemas
+from .database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 
+SYNC_SOURCE = "invoice_service"
+SYNC_BATCH_SIZE = int(os.getenv("INVOICE_SYNC_BATCH_SIZE", "200"))
+SYNC_PAGE_SIZE = int(os.getenv("INVOICE_SYNC_PAGE_SIZE", "2000"))
+SYNC_MAX_CONCURRENCY = int(os.getenv("INVOICE_SYNC_MAX_CONCURRENCY", "8"))
+SYNC_TARGET_LATENCY_SECONDS = float(os.getenv("INVOICE_SYNC_TARGET_LATENCY_SECONDS", "1.0"))
+# updated_at is stamped when a transaction starts, not when it commits, so an invoice
+# can become visible with an updated_at behind the watermark. Every sync re-reads this
+# window behind it; re-sent rows come back "unchanged" from the idempotent batch.
+SYNC_OVERLAP_SECONDS = float(os.getenv("INVOICE_SYNC_OVERLAP_SECONDS", "120"))
+
+# Statuses whose invoices count as income in transactions-service; others mirror as zero.
+INCOME_STATUSES = (
+    schemas.InvoiceStatus.SENT.value,
+    schemas.InvoiceStatus.PAID.value,
+    schemas.InvoiceStatus.PARTIALLY_PAID.value,
+    schemas.InvoiceStatus.OVERDUE.value,
+)
+
+# One watermark sync per user at a time within this process.
+_user_sync_locks: Dict[str, asyncio.Lock] = {}
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD limit on in-flight sync batches, driven by upstream latency.
+
+    Each round of batches that all succeed within ``target_latency`` raises the
+    limit by one; a slow or failed round halves it.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = SYNC_MAX_CONCURRENCY,
+        target_latency: float = SYNC_TARGET_LATENCY_SECONDS,
+    ):
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.target_latency = target_latency
+
+    def record_round(self, latencies: List[float], ok: bool) -> None:
+        if not ok or (latencies and max(latencies) > self.target_latency):
+            self.limit = max(self.minimum, self.limit // 2)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+
 class InvoiceTransactionSync:
     """Handles synchronization between invoice-service and transactions-service"""
 
-    def __init__(self, transactions_service_url: str = "http://transactions-service:80"):
+    def __init__(
+        self,
+        transactions_service_url: str = "http://transactions-service:80",
+        batch_size: int = SYNC_BATCH_SIZE,
+        page_size: int = SYNC_PAGE_SIZE,
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+        overlap_seconds: float = SYNC_OVERLAP_SECONDS
+    ):
         self.transactions_service_url = transactions_service_url
         self.timeout = 30.0
+        self.batch_size = max(batch_size, 1)
+        self.page_size = max(page_size, self.batch_size)
+        self.overlap = timedelta(seconds=max(overlap_seconds, 0.0))
+        self.concurrency = concurrency or AdaptiveConcurrencyLimit()
 
     async def sync_invoice_to_transactions(
         self,
@@ -267,58 +333,189 @@ class InvoiceTransactionSync:
                 "payment_id": payment.id
             }
 
-    async def bulk_sync_invoices(
+    def _create_sync_item(self, invoice: models.Invoice) -> Dict[str, Any]:
+        """Transaction row mirrored for *invoice* by the batch sync protocol"""
+        line_items = invoice.line_items or []
+        counts_as_income = str(invoice.status) in INCOME_STATUSES
+        issue_date = invoice.issue_date or datetime.now()
+        return {
+            "provider_transaction_id": f"invoice-{invoice.id}",
+            "date": issue_date.date().isoformat(),
+            "description": f"Invoice {invoice.invoice_number} - {invoice.client_name}",
+            "amount": float(invoice.total_amount or 0) if counts_as_income else 0.0,
+            "currency": str(invoice.currency or "GBP"),
+            "category": (line_items[0].category if line_items else None) or "Business Income",
+        }
+
+    @staticmethod
+    def _batch_idempotency_key(user_id: str, invoices: List[models.Invoice], items: List[Dict[str, Any]]) -> str:
+        """Stable across retries of the same batch; changes whenever any invoice in it changes"""
+        material = json.dumps(
+            [user_id, [[str(invoice.id), str(invoice.updated_at)] for invoice in invoices], items],
+            sort_keys=True,
+            default=str,
+        )
+        return f"invoice-sync-{hashlib.sha256(material.encode('utf-8')).hexdigest()[:48]}"
+
+    async def _post_batch(
         self,
+        client: httpx.AsyncClient,
+        auth_token: str,
         invoices: List[models.Invoice],
-        auth_token: str
-    ) -> Dict[str, Any]:
-        """Bulk sync multiple invoices"""
-        results: Dict[str, Any] = {
-            "total_invoices": len(invoices),
+    ) -> Tuple[bool, float, Dict[str, Any]]:
+        """Send one batch; returns ``(ok, latency_seconds, response_or_error)``"""
+        items = [self._create_sync_item(invoice) for invoice in invoices]
+        headers = {
+            "Authorization": f"Bearer {auth_token}",
+            "Content-Type": "application/json",
+            "Idempotency-Key": self._batch_idempotency_key(str(invoices[0].user_id), invoices, items),
+        }
+        started = time.monotonic()
+        try:
+            response = await client.post(
+                f"{self.transactions_service_url}/transactions/sync-batch",
+                headers=headers,
+                json={"source": SYNC_SOURCE, "transactions": items},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return True, time.monotonic() - started, response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error syncing invoice batch: {e.response.status_code} - {e.response.text}")
+            return False, time.monotonic() - started, {"message": e.response.text, "status_code": e.response.status_code}
+        except Exception as e:
+            logger.error(f"Error syncing invoice batch: {e}")
+            return False, time.monotonic() - started, {"message": str(e)}
+
+    async def _sync_in_batches(
+        self,
+        invoices: List[models.Invoice],
+        auth_token: str,
+        results: Dict[str, Any],
+    ) -> int:
+        """Sync *invoices* in order; returns how many leading invoices transactions-service acknowledged"""
+        batches = [invoices[i:i + self.batch_size] for i in range(0, len(invoices), self.batch_size)]
+        acknowledged = 0
+        next_batch = 0
+        async with httpx.AsyncClient() as client:
+            while next_batch < len(batches):
+                round_batches = batches[next_batch:next_batch + self.concurrency.limit]
+                outcomes = await asyncio.gather(
+                    *(self._post_batch(client, auth_token, batch) for batch in round_batches)
+                )
+                round_ok = all(ok for ok, _, _ in outcomes)
+                self.concurrency.record_round([latency for _, latency, _ in outcomes], round_ok)
+
+                # Earlier rounds all succeeded, so only a failure in this round breaks contiguity.
+                contiguous = True
+                for batch, (ok, _, payload) in zip(round_batches, outcomes):
+                    if ok:
+                        results["successful_syncs"] += len(batch)
+                        results["created"] += payload.get("created_count", 0)
+                        results["updated"] += payload.get("updated_count", 0)
+                        results["unchanged"] += payload.get("unchanged_count", 0)
+                        if contiguous:
+                            acknowledged += len(batch)
+                    else:
+                        contiguous = False
+                        results["failed_syncs"] += len(batch)
+                        results["errors"].append(payload.get("message", "Unknown error"))
+                next_batch += len(round_batches)
+
+                if not round_ok:
+                    # Back off entirely; the watermark makes the next run pick up from here.
+                    unsent = sum(len(batch) for batch in batches[next_batch:])
+                    results["failed_syncs"] += unsent
+                    break
+        return acknowledged
+
+    @staticmethod
+    def _new_results(total: int = 0) -> Dict[str, Any]:
+        return {
+            "total_invoices": total,
             "successful_syncs": 0,
             "failed_syncs": 0,
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
             "errors": []
         }
 
-        # Process in batches to avoid overwhelming the service
-        batch_size = 10
-        for i in range(0, len(invoices), batch_size):
-            batch = invoices[i:i+batch_size]
-
-            # Process batch concurrently
-            tasks = [
-                self.sync_invoice_to_transactions(invoice, auth_token, "bulk_sync")
-                for invoice in batch
-            ]
-
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    results["failed_syncs"] += 1
-                    results["errors"].append(str(result))
-                elif isinstance(result, dict) and result.get("status") == "success":
-                    results["successful_syncs"] += 1
-                else:
-                    results["failed_syncs"] += 1
-                    if isinstance(result, dict):
-                        results["errors"].append(result.get("message", "Unknown error"))
-                    else:
-                        results["errors"].append("Unknown error type")
-
-            # Small delay between batches
-            await asyncio.sleep(0.1)
-
+    async def bulk_sync_invoices(
+        self,
+        invoices: List[models.Invoice],
+        auth_token: str
+    ) -> Dict[str, Any]:
+        """Bulk sync multiple invoices through the idempotent batch endpoint"""
+        results = self._new_results(len(invoices))
+        if invoices:
+            await self._sync_in_batches(invoices, auth_token, results)
         return results
 
+    async def sync_changed_invoices(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        auth_token: str
+    ) -> Dict[str, Any]:
+        """Sync every invoice of *user_id* changed since the stored watermark, then advance it"""
+        async with _user_sync_locks.setdefault(user_id, asyncio.Lock()):
+            state = await db.get(models.InvoiceSyncState, user_id)
+            if state is None:
+                state = models.InvoiceSyncState(user_id=user_id)
+                db.add(state)
+
+            results = self._new_results()
+            invoice = models.Invoice
+            # Page with an in-run keyset cursor; the first page starts one overlap window
+            # behind the stored watermark to catch late-committed invoices.
+            cursor: Optional[Tuple[datetime, Any]] = None
+            if state.synced_until is not None and not self.overlap:
+                cursor = (state.synced_until, state.synced_until_id)
+            while True:
+                query = (
+                    select(invoice)
+                    .options(selectinload(invoice.line_items))
+                    .where(invoice.user_id == user_id)
+                    .order_by(invoice.updated_at, invoice.id)
+                    .limit(self.page_size)
+                )
+                if cursor is not None:
+                    query = query.where(or_(
+                        invoice.updated_at > cursor[0],
+                        and_(invoice.updated_at == cursor[0], invoice.id > cursor[1]),
+                    ))
+                elif state.synced_until is not None:
+                    query = query.where(invoice.updated_at >= state.synced_until - self.overlap)
+                changed = list((await db.execute(query)).scalars().all())
+                if not changed:
+                    break
+
+                results["total_invoices"] += len(changed)
+                acknowledged = await self._sync_in_batches(changed, auth_token, results)
+                if acknowledged:
+                    last = changed[acknowledged - 1]
+                    # Re-read overlap rows sit behind the watermark; never move it backwards.
+                    if state.synced_until is None or last.updated_at >= state.synced_until:
+                        state.synced_until = last.updated_at
+                        state.synced_until_id = last.id
+                        await db.commit()
+                if acknowledged < len(changed) or len(changed) < self.page_size:
+                    break
+                cursor = (changed[-1].updated_at, changed[-1].id)
+            return results
+
 
 # Module-level convenience wrapper — called from main.py background tasks.
 async def sync_invoice_to_transactions(invoice_id: str, auth_token: str) -> None:
-    """Fire-and-forget sync of a single invoice to transactions-service."""
+    """Fire-and-forget sync of the invoice owner's changed invoices to transactions-service."""
     syncer = InvoiceTransactionSync()
     try:
-        await syncer.sync_invoice_to_transactions(  # type: ignore[arg-type]
-            invoice_id, auth_token  # type: ignore[arg-type]
-        )
+        async with AsyncSessionLocal() as db:
+            user_id = (
+                await db.execute(select(models.Invoice.user_id).where(models.Invoice.id == invoice_id))
+            ).scalar_one_or_none()
+            if user_id:
+                await syncer.sync_changed_invoices(db, user_id, auth_token)
     except Exception as exc:
         logger.warning("Background sync failed for invoice %s: %s", invoice_id, exc)
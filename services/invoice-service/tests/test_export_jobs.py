@@ -0,0 +1,209 @@
+"""Bulk invoice export: tax-year snapshot, ZIP assembly and resume after a worker crash."""
+
+import asyncio
+import os
+import sys
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import export_jobs, models
+from app.database import Base
+from app.export_jobs import InvoiceExportRunner
+from app.pdf_generator import PDFGenerator
+from app.pdf_rendering import PDFRenderPool
+
+TAX_YEAR = 2025
+YEAR_START = datetime(2025, 4, 6, tzinfo=timezone.utc)
+IN_YEAR = 2_000
+
+
+def _fake_render(html: str, base_url: str, css_key: str, css: str) -> bytes:
+    return b"%PDF-1.4\n" + str(len(html)).encode("ascii")
+
+
+class _WorkerCrash(BaseException):
+    """Escapes the runner's error handling, like a killed process would."""
+
+
+class _CrashingGenerator:
+    def __init__(self, generator: PDFGenerator, crash_after: int):
+        self._generator = generator
+        self.crash_after = crash_after
+        self.rendered = 0
+
+    async def render_invoice_pdf(self, invoice, *args, **kwargs):
+        if self.rendered >= self.crash_after:
+            raise _WorkerCrash()
+        self.rendered += 1
+        return await self._generator.render_invoice_pdf(invoice, *args, **kwargs)
+
+
+async def _setup(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'exports.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rows = []
+    for n in range(IN_YEAR + 20):
+        in_year = n < IN_YEAR
+        rows.append({
+            "id": uuid.uuid4(),
+            "invoice_number": f"INV-{n:05d}",
+            "user_id": "user-1" if n < IN_YEAR + 10 else "user-2",
+            "client_name": f"Client {n % 37}",
+            "issue_date": YEAR_START + timedelta(hours=n * 4) if in_year else YEAR_START - timedelta(days=1 + n),
+            "due_date": YEAR_START + timedelta(days=30),
+            "subtotal": Decimal("100.00"),
+            "vat_rate": Decimal("20.00"),
+            "vat_amount": Decimal("20.00"),
+            "total_amount": Decimal("120.00"),
+            "status": "sent",
+            "currency": "GBP",
+            "created_at": YEAR_START,
+            "updated_at": YEAR_START,
+        })
+    async with Session() as session:
+        await session.execute(insert(models.Invoice), rows)
+        await session.commit()
+    return engine, Session
+
+
+def _generator(tmp_path, monkeypatch) -> PDFGenerator:
+    monkeypatch.setenv("PDF_OUTPUT_DIR", str(tmp_path / "pdf"))
+    generator = PDFGenerator()
+    generator.render_pool = PDFRenderPool(
+        stylesheets={generator.css_key: generator.css_content}, workers=0, render=_fake_render
+    )
+    return generator
+
+
+def test_export_job_builds_zip_for_tax_year(tmp_path, monkeypatch):
+    generator = _generator(tmp_path, monkeypatch)
+
+    async def run():
+        engine, Session = await _setup(tmp_path)
+        try:
+            async with Session() as session:
+                job = await export_jobs.create_export_job(session, user_id="user-1", tax_year=TAX_YEAR)
+            runner = InvoiceExportRunner(Session, lambda: generator, export_dir=tmp_path / "exports", window_size=64)
+            status = await runner.run(job.id)
+            async with Session() as session:
+                finished = await export_jobs.get_export_job(session, job_id=job.id, user_id="user-1")
+            return job, status, finished, runner
+        finally:
+            await engine.dispose()
+
+    job, status, finished, runner = asyncio.run(run())
+    assert job.total_count == IN_YEAR
+    assert status == "completed"
+    assert finished.processed_count == IN_YEAR and finished.lease_owner is None
+    with zipfile.ZipFile(finished.output_path) as archive:
+        names = archive.namelist()
+    assert len(names) == IN_YEAR
+    assert names[0] == "00001-INV-00000.pdf" and names == sorted(names)
+    assert not runner.job_dir(job.id).exists()  # spool removed after assembly
+    assert generator.render_pool.renders == IN_YEAR
+    assert len(generator.render_pool.cache) == 0  # bulk renders bypass the interactive cache
+
+
+def test_export_resumes_from_checkpoint_after_worker_crash(tmp_path, monkeypatch):
+    generator = _generator(tmp_path, monkeypatch)
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        engine, Session = await _setup(tmp_path)
+        try:
+            async with Session() as session:
+                job = await export_jobs.create_export_job(session, user_id="user-1", tax_year=TAX_YEAR)
+
+            crashing = _CrashingGenerator(generator, crash_after=700)
+            first = InvoiceExportRunner(
+                Session, lambda: crashing, export_dir=tmp_path / "exports", window_size=100, worker_id="worker-a"
+            )
+            try:
+                await first.run(job.id)
+            except _WorkerCrash:
+                pass
+            async with Session() as session:
+                crashed = await export_jobs.get_export_job(session, job_id=job.id, user_id="user-1")
+
+            resumed = _CrashingGenerator(generator, crash_after=IN_YEAR)
+            def second(clock):
+                return InvoiceExportRunner(
+                    Session,
+                    lambda: resumed,
+                    export_dir=tmp_path / "exports",
+                    window_size=100,
+                    worker_id="worker-b",
+                    clock=clock,
+                )
+
+            # The crashed worker's lease still blocks others until it expires.
+            blocked = await second(lambda: now).resume_stale()
+            completed = await second(lambda: now + timedelta(minutes=10)).resume_stale()
+            async with Session() as session:
+                finished = await export_jobs.get_export_job(session, job_id=job.id, user_id="user-1")
+                done = (
+                    await session.execute(
+                        select(models.InvoiceExportItem.status).where(models.InvoiceExportItem.job_id == job.id)
+                    )
+                ).scalars().all()
+            return crashed, blocked, completed, finished, done, resumed.rendered
+        finally:
+            await engine.dispose()
+
+    crashed, blocked, completed, finished, done, resumed_renders = asyncio.run(run())
+    assert crashed.status == "running" and crashed.processed_count == 700
+    assert blocked == 0
+    assert completed == 1
+    assert finished.status == "completed" and finished.processed_count == IN_YEAR
+    assert set(done) == {"done"}
+    assert resumed_renders == IN_YEAR - 700  # checkpointed work is not redone
+    with zipfile.ZipFile(finished.output_path) as archive:
+        assert len(archive.namelist()) == IN_YEAR
+
+
+def test_resume_stale_skips_a_job_already_running_in_this_process(tmp_path, monkeypatch):
+    generator = _generator(tmp_path, monkeypatch)
+
+    async def run():
+        engine, Session = await _setup(tmp_path)
+        try:
+            async with Session() as session:
+                job = await export_jobs.create_export_job(session, user_id="user-1", tax_year=TAX_YEAR)
+
+            gate = asyncio.Event()
+            renders = {"n": 0}
+
+            class _GatedGenerator:
+                async def render_invoice_pdf(self, invoice, *args, **kwargs):
+                    renders["n"] += 1
+                    await gate.wait()
+                    return await generator.render_invoice_pdf(invoice, *args, **kwargs)
+
+            runner = InvoiceExportRunner(
+                Session, lambda: _GatedGenerator(), export_dir=tmp_path / "exports", window_size=100
+            )
+            background = asyncio.create_task(runner.run(job.id))
+            while not renders["n"]:
+                await asyncio.sleep(0.01)
+            resumed = await runner.resume_stale()
+            second_run = await runner.run(job.id)
+            gate.set()
+            return resumed, second_run, await background, renders["n"]
+        finally:
+            await engine.dispose()
+
+    resumed, second_run, status, renders = asyncio.run(run())
+    assert resumed == 0 and second_run is None
+    assert status == "completed"
+    assert renders == IN_YEAR  # nothing was rendered twice
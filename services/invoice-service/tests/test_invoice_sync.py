@@ -0,0 +1,182 @@
+"""Invoice to transactions sync: batched requests, watermark resume and adaptive concurrency."""
+
+import asyncio
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, sync_service
+from app.database import Base
+from app.sync_service import AdaptiveConcurrencyLimit, InvoiceTransactionSync
+
+CHANGED_AT = datetime(2026, 4, 1, 12, 0, tzinfo=timezone.utc)
+INVOICES = 450
+
+
+class _TransactionsService:
+    """Stands in for transactions-service's /transactions/sync-batch endpoint."""
+
+    def __init__(self, fail_batches: int = 0):
+        self.fail_batches = fail_batches
+        self.requests: list = []
+        self.rows: dict = {}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/transactions/sync-batch"
+        body = json.loads(request.content)
+        self.requests.append((request.headers["Idempotency-Key"], body))
+        if self.fail_batches and len(self.requests) > 1:
+            self.fail_batches -= 1
+            return httpx.Response(503, text="busy")
+        for item in body["transactions"]:
+            self.rows[item["provider_transaction_id"]] = item
+        return httpx.Response(200, json={"created_count": len(body["transactions"]), "updated_count": 0, "unchanged_count": 0})
+
+
+async def _setup(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "invoice_number": f"INV-{n:05d}",
+            "user_id": "user-1",
+            "client_name": "Acme",
+            "issue_date": CHANGED_AT,
+            "due_date": CHANGED_AT + timedelta(days=30),
+            "subtotal": Decimal("100.00"),
+            "vat_amount": Decimal("20.00"),
+            "total_amount": Decimal("120.00"),
+            "status": "sent",
+            "currency": "GBP",
+            # Several invoices share a timestamp, so the watermark must break ties by id.
+            "updated_at": CHANGED_AT + timedelta(seconds=n // 7),
+        }
+        for n in range(INVOICES)
+    ]
+    async with Session() as session:
+        await session.execute(insert(models.Invoice), rows)
+        await session.commit()
+    return engine, Session
+
+
+def test_watermark_resumes_after_failed_batch_and_skips_unchanged(tmp_path, monkeypatch):
+    upstream = _TransactionsService(fail_batches=1)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        sync_service.httpx, "AsyncClient", lambda: real_client(transport=httpx.MockTransport(upstream.handle))
+    )
+    syncer = InvoiceTransactionSync(
+        "http://transactions",
+        batch_size=100,
+        page_size=200,
+        concurrency=AdaptiveConcurrencyLimit(initial=2),
+        overlap_seconds=0,
+    )
+
+    async def scenario():
+        engine, Session = await _setup(tmp_path)
+        async with Session() as db:
+            first = await syncer.sync_changed_invoices(db, "user-1", "token")
+        requests_after_first = len(upstream.requests)
+        async with Session() as db:
+            second = await syncer.sync_changed_invoices(db, "user-1", "token")
+        async with Session() as db:
+            idle = await syncer.sync_changed_invoices(db, "user-1", "token")
+        requests_after_idle = len(upstream.requests)
+        async with Session() as db:
+            await db.execute(
+                update(models.Invoice)
+                .where(models.Invoice.invoice_number == "INV-00003")
+                .values(status="cancelled", updated_at=CHANGED_AT + timedelta(days=1))
+            )
+            await db.commit()
+            edited = await syncer.sync_changed_invoices(db, "user-1", "token")
+        await engine.dispose()
+        return first, second, idle, edited, requests_after_first, requests_after_idle
+
+    first, second, idle, edited, after_first, after_idle = asyncio.run(scenario())
+
+    # First round: batch one lands, batch two is refused, and the run stops there.
+    assert after_first == 2
+    assert (first["successful_syncs"], first["failed_syncs"]) == (100, 100)
+    assert second["successful_syncs"] == INVOICES - 100
+    assert len(upstream.rows) == INVOICES
+    # Nothing changed since the watermark, so nothing is sent.
+    assert idle["total_invoices"] == 0
+    assert after_idle == after_first + 4
+    # An edited invoice is the only one re-sent, as a zero-value cancelled transaction.
+    assert edited["total_invoices"] == 1
+    last_key, last_body = upstream.requests[-1]
+    assert [item["amount"] for item in last_body["transactions"]] == [0.0]
+    assert len({key for key, _ in upstream.requests}) == len(upstream.requests) - 1  # only the 503 batch was retried
+
+
+def test_overlap_window_picks_up_invoices_committed_behind_the_watermark(tmp_path, monkeypatch):
+    upstream = _TransactionsService()
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        sync_service.httpx, "AsyncClient", lambda: real_client(transport=httpx.MockTransport(upstream.handle))
+    )
+    syncer = InvoiceTransactionSync("http://transactions", batch_size=100, page_size=200, overlap_seconds=30)
+
+    async def scenario():
+        engine, Session = await _setup(tmp_path)
+        async with Session() as db:
+            await syncer.sync_changed_invoices(db, "user-1", "token")
+            watermark = (await db.get(models.InvoiceSyncState, "user-1")).synced_until
+            # Stamped before the watermark but committed after the sync above.
+            late_id = uuid.uuid4()
+            await db.execute(
+                insert(models.Invoice),
+                [{
+                    "id": late_id,
+                    "invoice_number": "INV-LATE",
+                    "user_id": "user-1",
+                    "client_name": "Acme",
+                    "issue_date": CHANGED_AT,
+                    "due_date": CHANGED_AT + timedelta(days=30),
+                    "subtotal": Decimal("100.00"),
+                    "vat_amount": Decimal("20.00"),
+                    "total_amount": Decimal("120.00"),
+                    "status": "sent",
+                    "currency": "GBP",
+                    "updated_at": watermark - timedelta(seconds=10),
+                }],
+            )
+            await db.commit()
+            again = await syncer.sync_changed_invoices(db, "user-1", "token")
+            after = (await db.get(models.InvoiceSyncState, "user-1")).synced_until
+        await engine.dispose()
+        return late_id, again, watermark, after
+
+    late_id, again, watermark, after = asyncio.run(scenario())
+
+    assert f"invoice-{late_id}" in upstream.rows
+    # Only the overlap window is re-read, not the whole history.
+    assert 0 < again["total_invoices"] < INVOICES
+    assert after == watermark
+
+
+def test_adaptive_concurrency_grows_on_fast_rounds_and_halves_on_slow_ones():
+    limit = AdaptiveConcurrencyLimit(initial=2, maximum=6, target_latency=0.5)
+    for _ in range(10):
+        limit.record_round([0.1, 0.2], ok=True)
+    assert limit.limit == 6
+    limit.record_round([0.1, 0.9], ok=True)
+    assert limit.limit == 3
+    limit.record_round([0.1], ok=False)
+    limit.record_round([0.1], ok=False)
+    assert limit.limit == 1
@@ -0,0 +1,169 @@
+"""PDF rendering pool: content-hash caching, shared in-flight renders and throughput."""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import schemas
+from app.pdf_generator import PDFGenerator
+from app.pdf_rendering import PDFCache, PDFRenderPool, iter_pdf_chunks
+
+NOW = datetime(2026, 3, 2, 9, 0)
+DUE = datetime.now() + timedelta(days=14)
+
+
+def _slow_render(html: str, base_url: str, css_key: str, css: str) -> bytes:
+    time.sleep(0.05)
+    return b"%PDF-" + html.encode("utf-8")
+
+
+def _invoice(**overrides) -> schemas.Invoice:
+    values = dict(
+        id="inv-1",
+        invoice_number="INV-2026-0001",
+        user_id="user-1",
+        company_id=None,
+        client_name="Acme Ltd",
+        due_date=DUE,
+        issue_date=NOW,
+        payment_date=None,
+        subtotal=Decimal("100.00"),
+        vat_amount=Decimal("20.00"),
+        total_amount=Decimal("120.00"),
+        status=schemas.InvoiceStatus.DRAFT,
+        pdf_file_path=None,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    values.update(overrides)
+    return schemas.Invoice(**values)
+
+
+def _generator(tmp_path, monkeypatch) -> PDFGenerator:
+    monkeypatch.setenv("PDF_OUTPUT_DIR", str(tmp_path))
+    generator = PDFGenerator()
+    generator.render_pool = PDFRenderPool(
+        stylesheets={generator.css_key: generator.css_content}, workers=0, render=_slow_render
+    )
+    return generator
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    cache = PDFCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.size_bytes == 8
+    cache.put("huge", b"x" * 11)
+    assert len(cache) == 2
+    assert b"".join(iter_pdf_chunks(b"x" * 100, chunk_size=30)) == b"x" * 100
+
+
+def test_unchanged_invoice_is_not_rendered_again(tmp_path, monkeypatch):
+    generator = _generator(tmp_path, monkeypatch)
+
+    async def run():
+        first = await generator.render_invoice_pdf(_invoice())
+        # Bookkeeping fields do not change the document.
+        second = await generator.render_invoice_pdf(
+            _invoice(updated_at=NOW + timedelta(hours=1), pdf_file_path="/tmp/old.pdf")
+        )
+        changed = await generator.render_invoice_pdf(_invoice(total_amount=Decimal("130.00")))
+        path = await generator.generate_invoice_pdf(_invoice())
+        again = await generator.generate_invoice_pdf(_invoice())
+        return first, second, changed, path, again
+
+    first, second, changed, path, again = asyncio.run(run())
+    assert first.content.startswith(b"%PDF-") and not first.cached
+    assert second.cached and second.content_hash == first.content_hash
+    assert not changed.cached and changed.content_hash != first.content_hash
+    assert path == again and first.content_hash[:16] in path
+    assert generator.render_pool.renders == 2
+
+
+def test_concurrent_requests_share_one_render_off_the_event_loop():
+    pool = PDFRenderPool(stylesheets={"css": ""}, workers=0, render=_slow_render)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(pool.render("<p>1</p>", key="k", css_key="css") for _ in range(5)))
+        task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    pool.shutdown()
+    assert {content for content, _ in results} == {b"%PDF-<p>1</p>"}
+    assert [hit for _, hit in results].count(False) == 1
+    assert pool.renders == 1
+    assert ticks >= 3  # the loop kept running while the render was in progress
+
+
+def test_cancelled_first_downloader_does_not_cancel_the_shared_render():
+    pool = PDFRenderPool(stylesheets={"css": ""}, workers=0, render=_slow_render)
+
+    async def run():
+        leader = asyncio.create_task(pool.render("<p>1</p>", key="k", css_key="css"))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(pool.render("<p>1</p>", key="k", css_key="css")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return leader, await asyncio.gather(*followers)
+
+    leader, results = asyncio.run(run())
+    pool.shutdown()
+    assert leader.cancelled()
+    assert results == [(b"%PDF-<p>1</p>", True)] * 3
+    assert pool.renders == 1
+    assert pool.cache.get("k") == b"%PDF-<p>1</p>"
+
+
+def test_render_throughput_benchmark(tmp_path, monkeypatch):
+    generator = PDFGenerator()
+    html = generator._render_template(
+        "default_invoice.html", generator._prepare_template_context(_invoice(), None)
+    )
+    probe = PDFRenderPool(stylesheets={generator.css_key: generator.css_content}, workers=1)
+    try:
+        asyncio.run(probe.render(html, key="probe", css_key=generator.css_key))
+    except Exception as exc:  # WeasyPrint needs Pango/Cairo on the host
+        pytest.skip(f"WeasyPrint cannot render here: {exc}")
+    finally:
+        probe.shutdown()
+
+    documents = 48
+
+    async def run(pool: PDFRenderPool) -> float:
+        await pool.render(html, key="warm-up", css_key=generator.css_key)
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(pool.render(f"{html}<!-- {n} -->", key=str(n), css_key=generator.css_key) for n in range(documents))
+        )
+        return documents / (time.perf_counter() - started)
+
+    rates = {}
+    for workers in (1, 4, 8):
+        pool = PDFRenderPool(stylesheets={generator.css_key: generator.css_content}, workers=workers)
+        try:
+            rates[workers] = asyncio.run(run(pool))
+        finally:
+            pool.shutdown()
+    print("\npdf render throughput: " + ", ".join(f"{w} workers {r:.1f} PDFs/s" for w, r in rates.items()))
+    assert all(rate > 0 for rate in rates.values())
@@ -0,0 +1,177 @@
+"""Invoice reporting: single-pass aggregates, the per-user report cache and invalidation on writes."""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import Base
+from app.report_cache import ReportCache
+from app.reporting_service import InvoiceReportingService
+
+PERIOD_START = date(2025, 4, 6)
+PERIOD_END = date(2026, 4, 5)
+ISSUED = datetime(2025, 5, 10, 9, 0, tzinfo=timezone.utc)
+
+
+def _invoice(n: int, *, status: str, client: str, issue_date: datetime, paid: str = "0.00", user_id: str = "user-1"):
+    return {
+        "id": uuid.uuid4(),
+        "invoice_number": f"INV-{n:04d}",
+        "user_id": user_id,
+        "client_name": client,
+        "issue_date": issue_date,
+        "due_date": issue_date + timedelta(days=30),
+        "payment_date": issue_date + timedelta(days=10) if status == "paid" else None,
+        "subtotal": Decimal("100.00"),
+        "vat_rate": Decimal("20.00"),
+        "vat_amount": Decimal("20.00"),
+        "total_amount": Decimal("120.00"),
+        "paid_amount": Decimal(paid),
+        "status": status,
+        "currency": "GBP",
+    }
+
+
+async def _setup(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reports.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    invoices = [
+        _invoice(1, status="paid", client="Acme", issue_date=ISSUED, paid="120.00"),
+        _invoice(2, status="paid", client="Acme", issue_date=ISSUED + timedelta(hours=3), paid="120.00"),
+        _invoice(3, status="sent", client="Globex", issue_date=ISSUED + timedelta(days=40)),
+        _invoice(4, status="partially_paid", client="Globex", issue_date=ISSUED + timedelta(days=75), paid="20.00"),
+        _invoice(5, status="draft", client="Initech", issue_date=ISSUED + timedelta(days=100)),
+        # Outside the period and another user's invoice must not be counted.
+        _invoice(6, status="paid", client="Acme", issue_date=ISSUED - timedelta(days=60), paid="120.00"),
+        _invoice(7, status="paid", client="Acme", issue_date=ISSUED, paid="120.00", user_id="user-2"),
+    ]
+    lines = [
+        {
+            "id": uuid.uuid4(),
+            "invoice_id": row["id"],
+            "description": "Consulting",
+            "quantity": Decimal("1"),
+            "unit_price": Decimal("100.00"),
+            "line_total": Decimal("100.00"),
+            "vat_rate": Decimal("20.00"),
+            "vat_amount": Decimal("20.00"),
+            "category": "consulting" if n % 2 == 0 else "design",
+        }
+        for n, row in enumerate(invoices)
+    ]
+    async with Session() as session:
+        await session.execute(insert(models.Invoice), invoices)
+        await session.execute(insert(models.InvoiceLineItem), lines)
+        await session.commit()
+    return engine, Session, invoices
+
+
+def _count_queries(engine) -> list:
+    statements: list = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_summary_and_tax_report_from_one_aggregation_pass(tmp_path):
+    async def scenario():
+        engine, Session, _ = await _setup(tmp_path)
+        statements = _count_queries(engine)
+        async with Session() as session:
+            service = InvoiceReportingService(session, cache=ReportCache())
+            summary = await service.generate_summary_report("user-1", PERIOD_START, PERIOD_END)
+            tax = await service.generate_tax_report("user-1", 2025)
+            revenue = await service.generate_revenue_report("user-1", PERIOD_START, PERIOD_END, grouping="quarter")
+        await engine.dispose()
+        return summary, tax, revenue, statements
+
+    summary, tax, revenue, statements = asyncio.run(scenario())
+
+    assert isinstance(summary, schemas.InvoiceReportSummary)
+    assert summary.stats.total_invoices == 5
+    assert summary.stats.total_amount == Decimal("600.00")
+    assert summary.stats.paid_amount == Decimal("260.00")
+    assert summary.stats.outstanding_amount == Decimal("340.00")
+    assert summary.stats.average_payment_time == 10.0
+    assert summary.invoices_by_status["paid"] == {"count": 2, "amount": 240.0}
+    assert summary.top_clients[0] == {"client_name": "Acme", "invoice_count": 2, "total_amount": 240.0}
+    assert [month["month"] for month in summary.monthly_breakdown] == ["2025-05", "2025-06", "2025-07", "2025-08"]
+
+    # Drafts are not taxable income.
+    assert tax["total_income"] == 400.0
+    assert tax["total_vat_charged"] == 80.0
+    assert tax["vat_breakdown"] == {"20%": {"net_amount": 400.0, "vat_amount": 80.0}}
+
+    assert revenue == [
+        {"period": "Q2 2025", "revenue": 360.0, "invoice_count": 3, "avg_invoice_value": 120.0},
+        {"period": "Q3 2025", "revenue": 240.0, "invoice_count": 2, "avg_invoice_value": 120.0},
+    ]
+    # All three reports share the tax-year aggregates: one invoice query and one line-item query.
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]) == 2
+
+
+def test_concurrent_query_path_uses_the_async_engine(tmp_path):
+    async def scenario():
+        engine, Session, _ = await _setup(tmp_path)
+        async with Session() as session:
+            # The non-SQLite branch: each aggregate query runs on its own session.
+            service = InvoiceReportingService(session, cache=ReportCache(), concurrent_queries=True)
+            summary = await service.generate_summary_report("user-1", PERIOD_START, PERIOD_END)
+            tax = await service.generate_tax_report("user-1", 2025)
+        await engine.dispose()
+        return summary, tax
+
+    summary, tax = asyncio.run(scenario())
+
+    assert summary.stats.total_invoices == 5
+    assert summary.stats.total_amount == Decimal("600.00")
+    assert tax["total_income"] == 400.0
+    assert tax["vat_breakdown"] == {"20%": {"net_amount": 400.0, "vat_amount": 80.0}}
+
+
+def test_cached_reports_are_invalidated_by_invoice_writes(tmp_path, monkeypatch):
+    cache = ReportCache()
+    monkeypatch.setattr(crud, "report_cache", cache)
+
+    async def scenario():
+        engine, Session, invoices = await _setup(tmp_path)
+        statements = _count_queries(engine)
+        async with Session() as session:
+            service = InvoiceReportingService(session, cache=cache)
+            first = await service.generate_summary_report("user-1", PERIOD_START, PERIOD_END)
+            queries_after_first = len(statements)
+            again = await service.generate_summary_report("user-1", PERIOD_START, PERIOD_END)
+            queries_after_hit = len(statements)
+
+            # Another user's write leaves user-1's cache alone.
+            cache.invalidate_user("user-2")
+            await service.generate_summary_report("user-1", PERIOD_START, PERIOD_END)
+            queries_after_other_user = len(statements)
+
+            await crud.update_invoice(
+                session, invoices[2]["id"], schemas.InvoiceUpdate(status=schemas.InvoiceStatus.PAID)
+            )
+            after_write = await service.generate_summary_report("user-1", PERIOD_START, PERIOD_END)
+        await engine.dispose()
+        return first, again, after_write, queries_after_first, queries_after_hit, queries_after_other_user
+
+    first, again, after_write, after_first, after_hit, after_other_user = asyncio.run(scenario())
+
+    assert again == first
+    assert after_hit == after_first
+    assert after_other_user == after_first
+    assert cache.hits == 2
+    assert first.invoices_by_status["paid"]["count"] == 2
+    assert after_write.invoices_by_status["paid"]["count"] == 3
@@ -24,6 +24,8 @@ from pydantic import BaseModel, Field
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 from fastapi.responses import Response
 
+from libs.shared_http.client import aclose_upstream_clients
+
 from .orchestrator import MasterOrchestrator, _DISABLED_AGENTS
 from .memory.shared_context import append_audit_log, get_audit_log, set_user_context
 
@@ -39,6 +41,12 @@ app = FastAPI(
     version="1.0.0",
 )
 
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
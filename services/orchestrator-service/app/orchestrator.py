@@ -13,11 +13,19 @@ import asyncio
 import json
 import logging
 import os
+import sys
 import time
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 
-import httpx
+for _parent in Path(__file__).resolve().parents:
+    if (_parent / "libs").exists():
+        if str(_parent) not in sys.path:
+            sys.path.append(str(_parent))
+        break
+
+from libs.shared_http.client import get_upstream_client
 
 log = logging.getLogger(__name__)
 
@@ -50,17 +58,15 @@ def _headers(token: str) -> dict[str, str]:
 
 
 async def _get(url: str, token: str, params: dict | None = None) -> Any:
-    async with httpx.AsyncClient(timeout=AGENT_TIMEOUT) as client:
-        r = await client.get(url, headers=_headers(token), params=params)
-        r.raise_for_status()
-        return r.json()
+    r = await get_upstream_client(url).get(url, headers=_headers(token), params=params, timeout=AGENT_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def _post(url: str, token: str, body: dict) -> Any:
-    async with httpx.AsyncClient(timeout=AGENT_TIMEOUT) as client:
-        r = await client.post(url, headers=_headers(token), json=body)
-        r.raise_for_status()
-        return r.json()
+    r = await get_upstream_client(url).post(url, headers=_headers(token), json=body, timeout=AGENT_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 # ── Data types ────────────────────────────────────────────────────────────────
@@ -0,0 +1,55 @@
+"""add invoice number counters
+
+Revision ID: a4c7e9f1b2d3
+Revises: f3b9d2e1a7c4
+Create Date: 2026-02-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c7e9f1b2d3"
+down_revision: Union[str, None] = "f3b9d2e1a7c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _seed_counters(table_name: str, prefix_root: str) -> dict[str, int]:
+    # Prefixes look like INV-202602 / SEI-202602, numbers like INV-202602-000042.
+    rows = op.get_bind().execute(
+        sa.text(f"SELECT invoice_number FROM {table_name} WHERE invoice_number LIKE :pattern"),
+        {"pattern": f"{prefix_root}-%"},
+    )
+    counters: dict[str, int] = {}
+    for (invoice_number,) in rows:
+        prefix, _, suffix = str(invoice_number).rpartition("-")
+        if prefix and suffix.isdigit():
+            counters[prefix] = max(counters.get(prefix, 0), int(suffix))
+    return counters
+
+
+def upgrade() -> None:
+    counters_table = op.create_table(
+        "invoice_number_counters",
+        sa.Column("prefix", sa.String(length=24), nullable=False),
+        sa.Column("last_value", sa.Integer(), nullable=False),
+        sa.CheckConstraint("last_value >= 0", name="ck_invoice_number_counters_last_value_non_negative"),
+        sa.PrimaryKeyConstraint("prefix"),
+    )
+
+    counters = _seed_counters("billing_invoices", "INV")
+    counters.update(_seed_counters("self_employed_invoices", "SEI"))
+    if counters:
+        op.bulk_insert(
+            counters_table,
+            [{"prefix": prefix, "last_value": last_value} for prefix, last_value in sorted(counters.items())],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("invoice_number_counters")
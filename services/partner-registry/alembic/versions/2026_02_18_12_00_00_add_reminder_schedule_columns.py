@@ -0,0 +1,79 @@
+"""add reminder schedule and lease columns
+
+Revision ID: b5d8f0a2c3e4
+Revises: a4c7e9f1b2d3
+Create Date: 2026-02-18 12:00:00.000000
+
+"""
+
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d8f0a2c3e4"
+down_revision: Union[str, None] = "a4c7e9f1b2d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("self_employed_calendar_events", "self_employed_invoices")
+DEFAULT_INVOICE_DUE_SOON_DAYS = 3
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(tzinfo=datetime.UTC) if value.tzinfo is None else value
+
+
+def _backfill_next_fire_at() -> None:
+    # Approximate fire times; the scheduler recomputes the exact value the first time it claims a row.
+    bind = op.get_bind()
+    calendar_rows = bind.execute(
+        sa.text(
+            "SELECT id, starts_at, notify_before_minutes FROM self_employed_calendar_events "
+            "WHERE status = 'scheduled'"
+        )
+    ).fetchall()
+    for event_id, starts_at, notify_before_minutes in calendar_rows:
+        if isinstance(starts_at, str):
+            starts_at = datetime.datetime.fromisoformat(starts_at)
+        fire_at = _as_utc(starts_at) - datetime.timedelta(minutes=int(notify_before_minutes or 0))
+        bind.execute(
+            sa.text("UPDATE self_employed_calendar_events SET next_fire_at = :fire_at WHERE id = :id"),
+            {"fire_at": fire_at, "id": event_id},
+        )
+
+    invoice_rows = bind.execute(
+        sa.text("SELECT id, due_date FROM self_employed_invoices WHERE status IN ('issued', 'overdue')")
+    ).fetchall()
+    for invoice_id, due_date in invoice_rows:
+        if isinstance(due_date, str):
+            due_date = datetime.date.fromisoformat(due_date)
+        fire_at = datetime.datetime.combine(
+            due_date - datetime.timedelta(days=DEFAULT_INVOICE_DUE_SOON_DAYS),
+            datetime.time.min,
+            tzinfo=datetime.UTC,
+        )
+        bind.execute(
+            sa.text("UPDATE self_employed_invoices SET next_fire_at = :fire_at WHERE id = :id"),
+            {"fire_at": fire_at, "id": invoice_id},
+        )
+
+
+def upgrade() -> None:
+    for table_name in TABLES:
+        op.add_column(table_name, sa.Column("next_fire_at", sa.DateTime(timezone=True), nullable=True))
+        op.add_column(table_name, sa.Column("reminder_lease_owner", sa.String(length=64), nullable=True))
+        op.add_column(table_name, sa.Column("reminder_lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+        op.create_index(f"ix_{table_name}_status_next_fire_at", table_name, ["status", "next_fire_at"])
+    _backfill_next_fire_at()
+
+
+def downgrade() -> None:
+    for table_name in TABLES:
+        op.drop_index(f"ix_{table_name}_status_next_fire_at", table_name=table_name)
+        op.drop_column(table_name, "reminder_lease_expires_at")
+        op.drop_column(table_name, "reminder_lease_owner")
+        op.drop_column(table_name, "next_fire_at")
@@ -0,0 +1,74 @@
+"""add investor rollup tables
+
+Revision ID: c6e1a3b5d7f9
+Revises: b5d8f0a2c3e4
+Create Date: 2026-02-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c6e1a3b5d7f9"
+down_revision: Union[str, None] = "b5d8f0a2c3e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tables start empty; the service's rollup job runs a full rebuild on startup.
+    op.create_table(
+        "investor_user_activity_rollups",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("first_seen_date", sa.Date(), nullable=False),
+        sa.Column("activation_lag_days", sa.Integer(), nullable=False),
+        sa.Column("retained_30d", sa.Integer(), nullable=False),
+        sa.Column("retained_60d", sa.Integer(), nullable=False),
+        sa.Column("retained_90d", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_investor_user_activity_rollups_first_seen_date",
+        "investor_user_activity_rollups",
+        ["first_seen_date"],
+    )
+    op.create_table(
+        "investor_pmf_cohort_days",
+        sa.Column("cohort_date", sa.Date(), nullable=False),
+        sa.Column("activation_lag_days", sa.Integer(), nullable=False),
+        sa.Column("retained_30d", sa.Integer(), nullable=False),
+        sa.Column("retained_60d", sa.Integer(), nullable=False),
+        sa.Column("retained_90d", sa.Integer(), nullable=False),
+        sa.Column("users", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("cohort_date", "activation_lag_days", "retained_30d", "retained_60d", "retained_90d"),
+    )
+    op.create_table(
+        "investor_nps_days",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("responses_count", sa.Integer(), nullable=False),
+        sa.Column("promoters_count", sa.Integer(), nullable=False),
+        sa.Column("passives_count", sa.Integer(), nullable=False),
+        sa.Column("detractors_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "investor_invoice_months",
+        sa.Column("month_start", sa.Date(), nullable=False),
+        sa.Column("mrr_gbp", sa.Float(), nullable=False),
+        sa.Column("active_invoice_count", sa.Integer(), nullable=False),
+        sa.Column("paid_invoice_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("month_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("investor_invoice_months")
+    op.drop_table("investor_nps_days")
+    op.drop_table("investor_pmf_cohort_days")
+    op.drop_index("ix_investor_user_activity_rollups_first_seen_date", table_name="investor_user_activity_rollups")
+    op.drop_table("investor_user_activity_rollups")
@@ -2,14 +2,14 @@ import datetime
 import hashlib
 from typing import List, Optional
 
-from sqlalchemy import Select, case, distinct, func, text
+from sqlalchemy import Select, case, distinct, func, or_, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from . import models
 
-INVOICE_SEQUENCE_LOCK_KEY = 6_217_650_042_184_901_117
-SELF_EMPLOYED_INVOICE_SEQUENCE_LOCK_KEY = 2_961_144_028_593_640_553
 
 SEED_PARTNERS = [
     {
@@ -122,28 +122,6 @@ async def _acquire_dedupe_lock_if_postgres(db: AsyncSession, user_id: str, partn
     )
 
 
-async def _acquire_invoice_sequence_lock_if_postgres(db: AsyncSession) -> None:
-    bind = db.get_bind()
-    if not bind or bind.dialect.name != "postgresql":
-        return
-
-    await db.execute(
-        text("SELECT pg_advisory_xact_lock(:lock_key)"),
-        {"lock_key": INVOICE_SEQUENCE_LOCK_KEY},
-    )
-
-
-async def _acquire_self_employed_invoice_sequence_lock_if_postgres(db: AsyncSession) -> None:
-    bind = db.get_bind()
-    if not bind or bind.dialect.name != "postgresql":
-        return
-
-    await db.execute(
-        text("SELECT pg_advisory_xact_lock(:lock_key)"),
-        {"lock_key": SELF_EMPLOYED_INVOICE_SEQUENCE_LOCK_KEY},
-    )
-
-
 def _invoice_prefix_for_date(invoice_date: datetime.date) -> str:
     return f"INV-{invoice_date.strftime('%Y%m')}"
 
@@ -152,38 +130,63 @@ def _self_employed_invoice_prefix_for_date(invoice_date: datetime.date) -> str:
     return f"SEI-{invoice_date.strftime('%Y%m')}"
 
 
-async def _next_invoice_number(db: AsyncSession, *, invoice_date: datetime.date) -> str:
-    prefix = _invoice_prefix_for_date(invoice_date)
-    like_prefix = f"{prefix}-%"
-    result = await db.execute(
-        select(models.BillingInvoice.invoice_number).filter(models.BillingInvoice.invoice_number.like(like_prefix))
-    )
-    existing_numbers = [str(item) for item in result.scalars().all() if item]
-
+def _max_invoice_sequence(invoice_numbers: list[str], prefix: str) -> int:
     max_sequence = 0
-    for invoice_number in existing_numbers:
+    for invoice_number in invoice_numbers:
         suffix = invoice_number.removeprefix(f"{prefix}-")
         if suffix.isdigit():
             max_sequence = max(max_sequence, int(suffix))
+    return max_sequence
 
-    return f"{prefix}-{max_sequence + 1:06d}"
 
+async def _seed_invoice_counter(db: AsyncSession, *, prefix: str, number_column) -> None:
+    # Only runs the first time a prefix is seen (normally once per month);
+    # seeds from existing numbers so rows written before the counter existed stay unique.
+    result = await db.execute(select(number_column).filter(number_column.like(f"{prefix}-%")))
+    last_value = _max_invoice_sequence([str(item) for item in result.scalars().all() if item], prefix)
 
-async def _next_self_employed_invoice_number(db: AsyncSession, *, invoice_date: datetime.date) -> str:
-    prefix = _self_employed_invoice_prefix_for_date(invoice_date)
-    like_prefix = f"{prefix}-%"
-    result = await db.execute(
-        select(models.SelfEmployedInvoice.invoice_number).filter(models.SelfEmployedInvoice.invoice_number.like(like_prefix))
+    bind = db.get_bind()
+    insert = postgresql_insert if bind.dialect.name == "postgresql" else sqlite_insert
+    await db.execute(
+        insert(models.InvoiceNumberCounter)
+        .values(prefix=prefix, last_value=last_value)
+        .on_conflict_do_nothing(index_elements=["prefix"])
     )
-    existing_numbers = [str(item) for item in result.scalars().all() if item]
 
-    max_sequence = 0
-    for invoice_number in existing_numbers:
-        suffix = invoice_number.removeprefix(f"{prefix}-")
-        if suffix.isdigit():
-            max_sequence = max(max_sequence, int(suffix))
 
-    return f"{prefix}-{max_sequence + 1:06d}"
+async def _allocate_invoice_number(db: AsyncSession, *, prefix: str, number_column) -> str:
+    """Allocate the next gap-free number for *prefix* inside the caller's transaction.
+
+    The counter row stays locked until the caller commits, so only creators of
+    the same prefix wait on each other, and a rollback returns the number.
+    """
+    statement = (
+        update(models.InvoiceNumberCounter)
+        .where(models.InvoiceNumberCounter.prefix == prefix)
+        .values(last_value=models.InvoiceNumberCounter.last_value + 1)
+        .returning(models.InvoiceNumberCounter.last_value)
+    )
+    sequence = (await db.execute(statement)).scalar_one_or_none()
+    if sequence is None:
+        await _seed_invoice_counter(db, prefix=prefix, number_column=number_column)
+        sequence = (await db.execute(statement)).scalar_one()
+    return f"{prefix}-{int(sequence):06d}"
+
+
+async def _next_invoice_number(db: AsyncSession, *, invoice_date: datetime.date) -> str:
+    return await _allocate_invoice_number(
+        db,
+        prefix=_invoice_prefix_for_date(invoice_date),
+        number_column=models.BillingInvoice.invoice_number,
+    )
+
+
+async def _next_self_employed_invoice_number(db: AsyncSession, *, invoice_date: datetime.date) -> str:
+    return await _allocate_invoice_number(
+        db,
+        prefix=_self_employed_invoice_prefix_for_date(invoice_date),
+        number_column=models.SelfEmployedInvoice.invoice_number,
+    )
 
 
 async def create_or_get_handoff_lead(
@@ -458,7 +461,6 @@ async def create_billing_invoice(
 ) -> models.BillingInvoice:
     issue_date = datetime.datetime.now(datetime.UTC).date()
     due_date = issue_date + datetime.timedelta(days=max(due_days, 1))
-    await _acquire_invoice_sequence_lock_if_postgres(db)
     invoice_number = await _next_invoice_number(db, invoice_date=issue_date)
 
     invoice = models.BillingInvoice(
@@ -581,7 +583,6 @@ async def create_self_employed_invoice(
     tax_amount_gbp = round(subtotal_gbp * (max(tax_rate_percent, 0.0) / 100.0), 2)
     total_amount_gbp = round(subtotal_gbp + tax_amount_gbp, 2)
 
-    await _acquire_self_employed_invoice_sequence_lock_if_postgres(db)
     invoice_number = await _next_self_employed_invoice_number(db, invoice_date=issue_date)
 
     invoice = models.SelfEmployedInvoice(
@@ -688,8 +689,10 @@ async def update_self_employed_invoice_status(
     invoice: models.SelfEmployedInvoice,
     *,
     status: str,
+    next_fire_at: datetime.datetime | None = None,
 ) -> models.SelfEmployedInvoice:
     invoice.status = status
+    invoice.next_fire_at = next_fire_at
     invoice.updated_at = datetime.datetime.now(datetime.UTC)
     await db.commit()
     await db.refresh(invoice)
@@ -716,8 +719,12 @@ async def mark_self_employed_invoice_reminder_sent(
     invoice: models.SelfEmployedInvoice,
     *,
     reminder_at: datetime.datetime,
+    next_fire_at: datetime.datetime | None,
 ) -> models.SelfEmployedInvoice:
     invoice.reminder_last_sent_at = reminder_at
+    invoice.next_fire_at = next_fire_at
+    invoice.reminder_lease_owner = None
+    invoice.reminder_lease_expires_at = None
     invoice.updated_at = datetime.datetime.now(datetime.UTC)
     await db.commit()
     await db.refresh(invoice)
@@ -977,6 +984,7 @@ async def create_calendar_event(
     notify_email: bool,
     notify_sms: bool,
     notify_before_minutes: int,
+    next_fire_at: datetime.datetime | None = None,
 ) -> models.SelfEmployedCalendarEvent:
     event = models.SelfEmployedCalendarEvent(
         user_id=user_id,
@@ -992,6 +1000,7 @@ async def create_calendar_event(
         notify_email=1 if notify_email else 0,
         notify_sms=1 if notify_sms else 0,
         notify_before_minutes=notify_before_minutes,
+        next_fire_at=next_fire_at,
         status="scheduled",
     )
     db.add(event)
@@ -1061,9 +1070,11 @@ async def update_calendar_event(
     event: models.SelfEmployedCalendarEvent,
     *,
     updates: dict[str, object],
+    next_fire_at: datetime.datetime | None = None,
 ) -> models.SelfEmployedCalendarEvent:
     for field_name, field_value in updates.items():
         setattr(event, field_name, field_value)
+    event.next_fire_at = next_fire_at
     event.updated_at = datetime.datetime.now(datetime.UTC)
     await db.commit()
     await db.refresh(event)
@@ -1119,8 +1130,12 @@ async def mark_calendar_event_reminder_sent(
     event: models.SelfEmployedCalendarEvent,
     *,
     reminder_at: datetime.datetime,
+    next_fire_at: datetime.datetime | None,
 ) -> models.SelfEmployedCalendarEvent:
     event.reminder_last_sent_at = reminder_at
+    event.next_fire_at = next_fire_at
+    event.reminder_lease_owner = None
+    event.reminder_lease_expires_at = None
     event.updated_at = datetime.datetime.now(datetime.UTC)
     await db.commit()
     await db.refresh(event)
@@ -1174,3 +1189,112 @@ async def list_calendar_reminder_events_for_user(
     rows = list((await db.execute(query)).scalars().all())
     return total, rows
 
+
+ReminderModel = type[models.SelfEmployedCalendarEvent] | type[models.SelfEmployedInvoice]
+
+
+def _reminder_lease_free(model: ReminderModel, now: datetime.datetime):
+    return or_(model.reminder_lease_expires_at.is_(None), model.reminder_lease_expires_at < now)
+
+
+async def claim_due_reminder_rows(
+    db: AsyncSession,
+    model: ReminderModel,
+    *,
+    statuses: list[str],
+    now: datetime.datetime,
+    lease_owner: str,
+    lease_seconds: float,
+    limit: int = 100,
+) -> list[tuple[str, datetime.datetime]]:
+    """Lease up to *limit* rows whose next_fire_at has passed; returns (id, next_fire_at) pairs.
+
+    SKIP LOCKED lets several replicas claim disjoint batches concurrently on
+    Postgres; SQLite ignores the locking clause and serialises writers instead.
+    """
+    query = (
+        select(model.id, model.next_fire_at)
+        .filter(
+            model.status.in_(statuses),
+            model.next_fire_at.is_not(None),
+            model.next_fire_at <= now,
+            _reminder_lease_free(model, now),
+        )
+        .order_by(model.next_fire_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = [(str(row_id), fire_at) for row_id, fire_at in (await db.execute(query)).all()]
+    if not rows:
+        await db.rollback()
+        return []
+    await db.execute(
+        update(model)
+        .where(model.id.in_([row_id for row_id, _ in rows]))
+        .values(
+            reminder_lease_owner=lease_owner,
+            reminder_lease_expires_at=now + datetime.timedelta(seconds=lease_seconds),
+        )
+    )
+    await db.commit()
+    return rows
+
+
+async def claim_reminder_rows_by_id(
+    db: AsyncSession,
+    model: ReminderModel,
+    *,
+    ids: list[str],
+    now: datetime.datetime,
+    lease_owner: str,
+    lease_seconds: float,
+) -> list[str]:
+    """Lease specific rows (manual runs); rows already leased by another worker are skipped."""
+    if not ids:
+        return []
+    result = await db.execute(
+        update(model)
+        .where(model.id.in_(ids), _reminder_lease_free(model, now))
+        .values(
+            reminder_lease_owner=lease_owner,
+            reminder_lease_expires_at=now + datetime.timedelta(seconds=lease_seconds),
+        )
+        .returning(model.id)
+    )
+    claimed = [str(item) for item in result.scalars().all()]
+    await db.commit()
+    return claimed
+
+
+async def release_reminder_lease(
+    db: AsyncSession,
+    row: models.SelfEmployedCalendarEvent | models.SelfEmployedInvoice,
+    *,
+    next_fire_at: datetime.datetime | None,
+) -> None:
+    row.next_fire_at = next_fire_at
+    row.reminder_lease_owner = None
+    row.reminder_lease_expires_at = None
+    await db.commit()
+
+
+async def get_calendar_event_by_id(
+    db: AsyncSession,
+    *,
+    event_id: str,
+) -> models.SelfEmployedCalendarEvent | None:
+    result = await db.execute(
+        select(models.SelfEmployedCalendarEvent).filter(models.SelfEmployedCalendarEvent.id == event_id)
+    )
+    return result.scalars().first()
+
+
+async def get_self_employed_invoice_by_id(
+    db: AsyncSession,
+    *,
+    invoice_id: str,
+) -> models.SelfEmployedInvoice | None:
+    result = await db.execute(
+        select(models.SelfEmployedInvoice).filter(models.SelfEmployedInvoice.id == invoice_id)
+    )
+    return result.scalars().first()
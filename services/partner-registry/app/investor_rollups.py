@@ -0,0 +1,455 @@
+"""
+Precomputed rollups behind the ``/investor/*`` endpoints.
+
+* ``investor_user_activity_rollups``: one row per user with first-seen date,
+  activation lag and 30/60/90-day retention flags derived from handoff leads;
+* ``investor_pmf_cohort_days``: user counts per (first-seen day, activation lag,
+  retention flags), so PMF cohorts are read in O(days) rows;
+* ``investor_nps_days``: response counts per day and score band;
+* ``investor_invoice_months``: non-void billing invoice totals per month.
+
+Write paths refresh the affected user, day or month after they commit, and
+the background job in ``main`` catches up on anything they missed and
+periodically rebuilds everything. Every refresh recounts from the source
+rows, so running one twice (or concurrently with a write) is harmless.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+ACTIVATION_STATUSES = frozenset({"qualified", "converted"})
+RETENTION_OFFSETS_DAYS = (30, 60, 90)
+RETENTION_WINDOW_DAYS = 30
+NOT_ACTIVATED = -1
+PROMOTER_MIN_SCORE = 9
+PASSIVE_MIN_SCORE = 7
+VOID_INVOICE_STATUS = "void"
+PAID_INVOICE_STATUS = "paid"
+_INSERT_CHUNK_SIZE = 1000
+
+
+def to_utc_date(value: Any) -> datetime.date | None:
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return value.date()
+        return value.astimezone(datetime.UTC).date()
+    if isinstance(value, datetime.date):
+        return value
+    return None
+
+
+def _day_bounds(day: datetime.date) -> tuple[datetime.datetime, datetime.datetime]:
+    start = datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.UTC)
+    return start, start + datetime.timedelta(days=1)
+
+
+def _month_bounds(month_start: datetime.date) -> tuple[datetime.datetime, datetime.datetime]:
+    next_month = (month_start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return (
+        datetime.datetime.combine(month_start, datetime.time.min, tzinfo=datetime.UTC),
+        datetime.datetime.combine(next_month, datetime.time.min, tzinfo=datetime.UTC),
+    )
+
+
+def _dialect_insert(db: AsyncSession):
+    bind = db.get_bind()
+    return postgresql_insert if bind.dialect.name == "postgresql" else sqlite_insert
+
+
+@dataclass(frozen=True)
+class UserActivityState:
+    first_seen_date: datetime.date
+    activation_lag_days: int
+    retained_30d: int
+    retained_60d: int
+    retained_90d: int
+
+    @property
+    def cohort_key(self) -> tuple[datetime.date, int, int, int, int]:
+        return (
+            self.first_seen_date,
+            self.activation_lag_days,
+            self.retained_30d,
+            self.retained_60d,
+            self.retained_90d,
+        )
+
+
+def compute_user_activity(leads: Iterable[tuple[Any, Any, Any]]) -> Optional[UserActivityState]:
+    """Fold a user's ``(created_at, updated_at, status)`` lead rows into their PMF state.
+
+    A lead counts as activity on its created and updated days, and as activation
+    on its updated day when it is qualified or converted.
+    """
+    activity_dates: set[datetime.date] = set()
+    activation_dates: set[datetime.date] = set()
+    created_dates: list[datetime.date] = []
+    for created_at, updated_at, status_value in leads:
+        created_date = to_utc_date(created_at)
+        updated_date = to_utc_date(updated_at)
+        if created_date:
+            created_dates.append(created_date)
+            activity_dates.add(created_date)
+        if updated_date:
+            activity_dates.add(updated_date)
+        if str(status_value) in ACTIVATION_STATUSES:
+            activation_date = updated_date or created_date
+            if activation_date:
+                activation_dates.add(activation_date)
+    if not created_dates:
+        return None
+
+    first_seen = min(created_dates)
+    activation_lags = [(item - first_seen).days for item in activation_dates if item >= first_seen]
+    retained = [
+        int(
+            any(
+                offset <= (activity_date - first_seen).days < offset + RETENTION_WINDOW_DAYS
+                for activity_date in activity_dates
+            )
+        )
+        for offset in RETENTION_OFFSETS_DAYS
+    ]
+    return UserActivityState(
+        first_seen_date=first_seen,
+        activation_lag_days=min(activation_lags) if activation_lags else NOT_ACTIVATED,
+        retained_30d=retained[0],
+        retained_60d=retained[1],
+        retained_90d=retained[2],
+    )
+
+
+def _rollup_values(state: UserActivityState) -> dict[str, Any]:
+    return {
+        "first_seen_date": state.first_seen_date,
+        "activation_lag_days": state.activation_lag_days,
+        "retained_30d": state.retained_30d,
+        "retained_60d": state.retained_60d,
+        "retained_90d": state.retained_90d,
+    }
+
+
+def _cohort_values(key: tuple[datetime.date, int, int, int, int]) -> dict[str, Any]:
+    cohort_date, activation_lag_days, retained_30d, retained_60d, retained_90d = key
+    return {
+        "cohort_date": cohort_date,
+        "activation_lag_days": activation_lag_days,
+        "retained_30d": retained_30d,
+        "retained_60d": retained_60d,
+        "retained_90d": retained_90d,
+    }
+
+
+async def _adjust_cohort_count(db: AsyncSession, key: tuple[datetime.date, int, int, int, int], delta: int) -> None:
+    table = models.InvestorPMFCohortDay
+    statement = _dialect_insert(db)(table).values(**_cohort_values(key), users=max(delta, 0))
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["cohort_date", "activation_lag_days", "retained_30d", "retained_60d", "retained_90d"],
+            set_={"users": table.users + delta},
+        )
+    )
+
+
+async def refresh_user_activity(db: AsyncSession, *, user_id: str) -> Optional[UserActivityState]:
+    """Recompute one user's rollup from their leads and move them between cohort buckets."""
+    lead_rows = (
+        await db.execute(
+            select(
+                models.HandoffLead.created_at,
+                models.HandoffLead.updated_at,
+                models.HandoffLead.status,
+            ).filter(models.HandoffLead.user_id == user_id)
+        )
+    ).all()
+    state = compute_user_activity(lead_rows)
+    rollup_table = models.InvestorUserActivityRollup
+
+    if state is not None:
+        inserted = (
+            await db.execute(
+                _dialect_insert(db)(rollup_table)
+                .values(user_id=user_id, **_rollup_values(state))
+                .on_conflict_do_nothing(index_elements=["user_id"])
+                .returning(rollup_table.user_id)
+            )
+        ).first()
+        if inserted is not None:
+            await _adjust_cohort_count(db, state.cohort_key, 1)
+            await db.commit()
+            return state
+
+    # Row lock keeps concurrent refreshes of the same user from double-moving them.
+    existing = (
+        await db.execute(select(rollup_table).filter(rollup_table.user_id == user_id).with_for_update())
+    ).scalars().first()
+    if existing is None:
+        await db.commit()
+        return state
+    previous_key = (
+        existing.first_seen_date,
+        int(existing.activation_lag_days),
+        int(existing.retained_30d),
+        int(existing.retained_60d),
+        int(existing.retained_90d),
+    )
+    if state is None:
+        await db.delete(existing)
+        await _adjust_cohort_count(db, previous_key, -1)
+    elif state.cohort_key != previous_key:
+        for field_name, field_value in _rollup_values(state).items():
+            setattr(existing, field_name, field_value)
+        await _adjust_cohort_count(db, previous_key, -1)
+        await _adjust_cohort_count(db, state.cohort_key, 1)
+    await db.commit()
+    return state
+
+
+def _nps_band_counts(score_counts: Iterable[tuple[Any, Any]]) -> dict[str, int]:
+    counts = {"responses_count": 0, "promoters_count": 0, "passives_count": 0, "detractors_count": 0}
+    for score_raw, count_raw in score_counts:
+        score = int(score_raw)
+        count = int(count_raw or 0)
+        counts["responses_count"] += count
+        if score >= PROMOTER_MIN_SCORE:
+            counts["promoters_count"] += count
+        elif score >= PASSIVE_MIN_SCORE:
+            counts["passives_count"] += count
+        else:
+            counts["detractors_count"] += count
+    return counts
+
+
+async def refresh_nps_day(db: AsyncSession, *, day: datetime.date) -> None:
+    start, end = _day_bounds(day)
+    score_counts = (
+        await db.execute(
+            select(models.NPSResponse.score, func.count(models.NPSResponse.id))
+            .filter(models.NPSResponse.created_at >= start, models.NPSResponse.created_at < end)
+            .group_by(models.NPSResponse.score)
+        )
+    ).all()
+    counts = _nps_band_counts(score_counts)
+    if counts["responses_count"]:
+        statement = _dialect_insert(db)(models.InvestorNPSDay).values(day=day, **counts)
+        await db.execute(statement.on_conflict_do_update(index_elements=["day"], set_=counts))
+    else:
+        await db.execute(delete(models.InvestorNPSDay).where(models.InvestorNPSDay.day == day))
+    await db.commit()
+
+
+async def refresh_invoice_month(db: AsyncSession, *, month_start: datetime.date) -> None:
+    start, end = _month_bounds(month_start)
+    mrr_gbp, active_invoice_count, paid_invoice_count = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(models.BillingInvoice.total_amount_gbp), 0.0),
+                func.count(models.BillingInvoice.id),
+                func.sum(case((models.BillingInvoice.status == PAID_INVOICE_STATUS, 1), else_=0)),
+            ).filter(
+                models.BillingInvoice.created_at >= start,
+                models.BillingInvoice.created_at < end,
+                models.BillingInvoice.status != VOID_INVOICE_STATUS,
+            )
+        )
+    ).one()
+    values = {
+        "mrr_gbp": float(mrr_gbp or 0.0),
+        "active_invoice_count": int(active_invoice_count or 0),
+        "paid_invoice_count": int(paid_invoice_count or 0),
+    }
+    if values["active_invoice_count"]:
+        statement = _dialect_insert(db)(models.InvestorInvoiceMonth).values(month_start=month_start, **values)
+        await db.execute(statement.on_conflict_do_update(index_elements=["month_start"], set_=values))
+    else:
+        await db.execute(
+            delete(models.InvestorInvoiceMonth).where(models.InvestorInvoiceMonth.month_start == month_start)
+        )
+    await db.commit()
+
+
+async def refresh_investor_rollups_since(db: AsyncSession, *, since: datetime.datetime) -> dict[str, int]:
+    """Refresh every user, NPS day and invoice month touched at or after *since*."""
+    user_ids = (
+        await db.execute(
+            select(models.HandoffLead.user_id).filter(models.HandoffLead.updated_at >= since).distinct()
+        )
+    ).scalars().all()
+    nps_days = {
+        to_utc_date(created_at)
+        for created_at in (
+            await db.execute(select(models.NPSResponse.created_at).filter(models.NPSResponse.created_at >= since))
+        ).scalars()
+    }
+    invoice_months = {
+        created_date.replace(day=1)
+        for created_date in (
+            to_utc_date(created_at)
+            for created_at in (
+                await db.execute(
+                    select(models.BillingInvoice.created_at).filter(models.BillingInvoice.updated_at >= since)
+                )
+            ).scalars()
+        )
+        if created_date
+    }
+    await db.commit()
+
+    for user_id in user_ids:
+        await refresh_user_activity(db, user_id=str(user_id))
+    for day in sorted(item for item in nps_days if item):
+        await refresh_nps_day(db, day=day)
+    for month_start in sorted(invoice_months):
+        await refresh_invoice_month(db, month_start=month_start)
+    return {"users": len(user_ids), "nps_days": len(nps_days), "invoice_months": len(invoice_months)}
+
+
+async def _insert_chunked(db: AsyncSession, model: Any, rows: list[dict[str, Any]]) -> None:
+    for offset in range(0, len(rows), _INSERT_CHUNK_SIZE):
+        await db.execute(insert(model), rows[offset : offset + _INSERT_CHUNK_SIZE])
+
+
+async def rebuild_investor_rollups(db: AsyncSession) -> dict[str, int]:
+    """Recompute every rollup table from the source tables in one transaction."""
+    user_rows: list[dict[str, Any]] = []
+    cohort_counts: Counter[tuple[datetime.date, int, int, int, int]] = Counter()
+
+    def _flush_user(user_id: Optional[str], leads: list[tuple[Any, Any, Any]]) -> None:
+        state = compute_user_activity(leads) if user_id is not None else None
+        if state is None:
+            return
+        user_rows.append({"user_id": user_id, **_rollup_values(state)})
+        cohort_counts[state.cohort_key] += 1
+
+    current_user: Optional[str] = None
+    current_leads: list[tuple[Any, Any, Any]] = []
+    lead_stream = await db.stream(
+        select(
+            models.HandoffLead.user_id,
+            models.HandoffLead.created_at,
+            models.HandoffLead.updated_at,
+            models.HandoffLead.status,
+        ).order_by(models.HandoffLead.user_id)
+    )
+    async for user_id_value, created_at, updated_at, status_value in lead_stream:
+        user_id = str(user_id_value)
+        if user_id != current_user:
+            _flush_user(current_user, current_leads)
+            current_user, current_leads = user_id, []
+        current_leads.append((created_at, updated_at, status_value))
+    _flush_user(current_user, current_leads)
+
+    nps_scores: dict[datetime.date, Counter[int]] = defaultdict(Counter)
+    nps_stream = await db.stream(select(models.NPSResponse.created_at, models.NPSResponse.score))
+    async for created_at, score in nps_stream:
+        created_date = to_utc_date(created_at)
+        if created_date:
+            nps_scores[created_date][int(score)] += 1
+
+    invoice_months: dict[datetime.date, dict[str, Any]] = defaultdict(
+        lambda: {"mrr_gbp": 0.0, "active_invoice_count": 0, "paid_invoice_count": 0}
+    )
+    invoice_stream = await db.stream(
+        select(
+            models.BillingInvoice.created_at,
+            models.BillingInvoice.total_amount_gbp,
+            models.BillingInvoice.status,
+        ).filter(models.BillingInvoice.status != VOID_INVOICE_STATUS)
+    )
+    async for created_at, total_amount_gbp, status_value in invoice_stream:
+        created_date = to_utc_date(created_at)
+        if not created_date:
+            continue
+        bucket = invoice_months[created_date.replace(day=1)]
+        bucket["mrr_gbp"] += float(total_amount_gbp or 0.0)
+        bucket["active_invoice_count"] += 1
+        if str(status_value) == PAID_INVOICE_STATUS:
+            bucket["paid_invoice_count"] += 1
+
+    for model in (
+        models.InvestorUserActivityRollup,
+        models.InvestorPMFCohortDay,
+        models.InvestorNPSDay,
+        models.InvestorInvoiceMonth,
+    ):
+        await db.execute(delete(model))
+    await _insert_chunked(db, models.InvestorUserActivityRollup, user_rows)
+    await _insert_chunked(
+        db,
+        models.InvestorPMFCohortDay,
+        [{**_cohort_values(key), "users": users} for key, users in cohort_counts.items()],
+    )
+    await _insert_chunked(
+        db,
+        models.InvestorNPSDay,
+        [{"day": day, **_nps_band_counts(scores.items())} for day, scores in nps_scores.items()],
+    )
+    await _insert_chunked(
+        db,
+        models.InvestorInvoiceMonth,
+        [{"month_start": month_start, **values} for month_start, values in invoice_months.items()],
+    )
+    await db.commit()
+    return {
+        "users": len(user_rows),
+        "cohort_days": len(cohort_counts),
+        "nps_days": len(nps_scores),
+        "invoice_months": len(invoice_months),
+    }
+
+
+async def load_pmf_cohort_days(
+    db: AsyncSession,
+    *,
+    cohort_start: datetime.date,
+    as_of_date: datetime.date,
+) -> list[models.InvestorPMFCohortDay]:
+    result = await db.execute(
+        select(models.InvestorPMFCohortDay).filter(
+            models.InvestorPMFCohortDay.cohort_date >= cohort_start,
+            models.InvestorPMFCohortDay.cohort_date <= as_of_date,
+            models.InvestorPMFCohortDay.users > 0,
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def load_nps_days(
+    db: AsyncSession,
+    *,
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> list[models.InvestorNPSDay]:
+    result = await db.execute(
+        select(models.InvestorNPSDay).filter(
+            models.InvestorNPSDay.day >= start_date,
+            models.InvestorNPSDay.day <= end_date,
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def load_invoice_months(
+    db: AsyncSession,
+    *,
+    start_month: datetime.date,
+    end_month: datetime.date,
+) -> list[models.InvestorInvoiceMonth]:
+    result = await db.execute(
+        select(models.InvestorInvoiceMonth).filter(
+            models.InvestorInvoiceMonth.month_start >= start_month,
+            models.InvestorInvoiceMonth.month_start <= end_month,
+        )
+    )
+    return list(result.scalars().all())
@@ -11,7 +11,7 @@ import uuid
 from collections import defaultdict
 from contextlib import asynccontextmanager, suppress
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
 
 import httpx
 from fastapi import Depends, FastAPI, HTTPException, Query, Response, status
@@ -19,8 +19,9 @@ from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select, text
 
-from . import crud, models, schemas
+from . import crud, investor_rollups, models, schemas
 from .database import AsyncSessionLocal, Base, engine, get_db
+from .reminder_scheduler import LeaseReminderScheduler, RateLimiterRegistry, default_worker_id
 
 COMPLIANCE_SERVICE_URL = os.getenv("COMPLIANCE_SERVICE_URL", "http://localhost:8003/audit-events")
 AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "false").lower() == "true"
@@ -36,6 +37,7 @@ from libs.shared_auth.jwt_fastapi import (
     DEFAULT_ALGORITHM,
     build_jwt_auth_dependencies,
 )
+from libs.shared_http.client import aclose_upstream_clients
 from libs.shared_http.retry import post_json_with_retry
 
 get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
@@ -139,10 +141,14 @@ SELF_EMPLOYED_CALENDAR_AUTORUN_HORIZON_HOURS = _parse_positive_int_env(
     "SELF_EMPLOYED_CALENDAR_AUTORUN_HORIZON_HOURS",
     24,
 )
-SELF_EMPLOYED_CALENDAR_AUTORUN_USER_BATCH = _parse_positive_int_env(
-    "SELF_EMPLOYED_CALENDAR_AUTORUN_USER_BATCH",
-    500,
-)
+SELF_EMPLOYED_INVOICE_REMINDER_AUTORUN_ENABLED = _parse_bool_env("SELF_EMPLOYED_INVOICE_REMINDER_AUTORUN_ENABLED", False)
+SELF_EMPLOYED_INVOICE_REMINDER_COOLDOWN_HOURS = 24
+SELF_EMPLOYED_REMINDER_SCHEDULER_BATCH_SIZE = _parse_positive_int_env("SELF_EMPLOYED_REMINDER_SCHEDULER_BATCH_SIZE", 100)
+SELF_EMPLOYED_REMINDER_SCHEDULER_CONCURRENCY = _parse_positive_int_env("SELF_EMPLOYED_REMINDER_SCHEDULER_CONCURRENCY", 10)
+SELF_EMPLOYED_REMINDER_LEASE_SECONDS = _parse_positive_int_env("SELF_EMPLOYED_REMINDER_LEASE_SECONDS", 120)
+SELF_EMPLOYED_REMINDER_EMAIL_RATE_PER_SECOND = _parse_non_negative_float_env("SELF_EMPLOYED_REMINDER_EMAIL_RATE_PER_SECOND", 10.0)
+SELF_EMPLOYED_REMINDER_SMS_RATE_PER_SECOND = _parse_non_negative_float_env("SELF_EMPLOYED_REMINDER_SMS_RATE_PER_SECOND", 5.0)
+REMINDER_WORKER_ID = os.getenv("REMINDER_WORKER_ID", "").strip() or default_worker_id()
 LEAD_STATUS_TRANSITIONS = {
     schemas.LeadStatus.initiated.value: {schemas.LeadStatus.qualified.value, schemas.LeadStatus.rejected.value},
     schemas.LeadStatus.qualified.value: {schemas.LeadStatus.converted.value, schemas.LeadStatus.rejected.value},
@@ -206,6 +212,12 @@ UNIT_ECONOMICS_MAX_PERIOD_MONTHS = 24
 SEED_GATE_REQUIRED_MRR_GBP = _parse_non_negative_float_env("SEED_GATE_REQUIRED_MRR_GBP", 40_000.0)
 SEED_GATE_MAX_MONTHLY_CHURN_PERCENT = _parse_non_negative_float_env("SEED_GATE_MAX_MONTHLY_CHURN_PERCENT", 3.0)
 SEED_GATE_MIN_LTV_CAC_RATIO = _parse_non_negative_float_env("SEED_GATE_MIN_LTV_CAC_RATIO", 4.0)
+INVESTOR_ROLLUP_REFRESH_ENABLED = _parse_bool_env("INVESTOR_ROLLUP_REFRESH_ENABLED", True)
+INVESTOR_ROLLUP_REFRESH_INTERVAL_SECONDS = _parse_positive_int_env("INVESTOR_ROLLUP_REFRESH_INTERVAL_SECONDS", 300)
+INVESTOR_ROLLUP_FULL_REBUILD_INTERVAL_SECONDS = _parse_positive_int_env(
+    "INVESTOR_ROLLUP_FULL_REBUILD_INTERVAL_SECONDS",
+    86_400,
+)
 PARTNER_EXPORT_WATERMARK_ENABLED = _parse_bool_env("PARTNER_EXPORT_WATERMARK_ENABLED", True)
 PARTNER_EXPORT_WATERMARK_SECRET = (
     os.getenv("PARTNER_EXPORT_WATERMARK_SECRET", AUTH_SECRET_KEY).strip() or AUTH_SECRET_KEY
@@ -285,6 +297,7 @@ def _build_export_response_headers(*, filename: str, watermark: Optional[Dict[st
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     background_task: asyncio.Task[None] | None = None
+    rollup_task: asyncio.Task[None] | None = None
     if AUTO_CREATE_SCHEMA:
         async with engine.begin() as connection:
             await connection.run_sync(Base.metadata.create_all)
@@ -298,15 +311,19 @@ async def lifespan(_app: FastAPI):
                     "Run `alembic upgrade head` or set AUTO_CREATE_SCHEMA=true for local bootstrapping."
                 ) from exc
         await crud.seed_partners_if_empty(db)
-    if SELF_EMPLOYED_CALENDAR_AUTORUN_ENABLED:
-        background_task = asyncio.create_task(_calendar_autoreminders_loop())
+    if SELF_EMPLOYED_CALENDAR_AUTORUN_ENABLED or SELF_EMPLOYED_INVOICE_REMINDER_AUTORUN_ENABLED:
+        background_task = asyncio.create_task(_reminder_scheduler_loop())
+    if INVESTOR_ROLLUP_REFRESH_ENABLED:
+        rollup_task = asyncio.create_task(_investor_rollup_loop())
     try:
         yield
     finally:
-        if background_task:
-            background_task.cancel()
-            with suppress(asyncio.CancelledError):
-                await background_task
+        for task in (background_task, rollup_task):
+            if task:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        await aclose_upstream_clients()
 
 
 app = FastAPI(
@@ -331,35 +348,109 @@ async def log_audit_event(user_id: str, action: str, details: Dict[str, Any]) ->
 
 
 async def _run_calendar_autoreminders_pass() -> None:
-    async with AsyncSessionLocal() as db:
-        user_ids = await crud.list_calendar_users_with_scheduled_events(
-            db,
-            limit=SELF_EMPLOYED_CALENDAR_AUTORUN_USER_BATCH,
+    result = await calendar_reminder_scheduler.run_pass()
+    by_user: dict[str, list[schemas.SelfEmployedCalendarReminderEvent]] = defaultdict(list)
+    for user_id, reminders in result.results:
+        by_user[user_id].extend(reminders)
+    for user_id, reminders in by_user.items():
+        if not reminders:
+            continue
+        calendar_reminder_scheduler.stats.reminders_total += len(reminders)
+        await log_audit_event(
+            user_id=user_id,
+            action="self_employed.calendar.reminders.sent",
+            details={
+                "count": len(reminders),
+                "horizon_hours": SELF_EMPLOYED_CALENDAR_AUTORUN_HORIZON_HOURS,
+                "sent_by_channel": _reminder_sent_by_channel(reminders),
+                "source": "scheduler",
+            },
         )
-    for user_id in user_ids:
-        try:
-            async with AsyncSessionLocal() as db:
-                await _run_calendar_reminders_for_user(
-                    db,
-                    user_id=user_id,
-                    horizon_hours=SELF_EMPLOYED_CALENDAR_AUTORUN_HORIZON_HOURS,
-                    source="scheduler",
-                )
-        except asyncio.CancelledError:
-            raise
-        except Exception as exc:  # pragma: no cover - defensive runtime guard
-            print(f"Calendar auto-reminder pass failed for user {user_id}: {exc}")
 
 
-async def _calendar_autoreminders_loop() -> None:
+async def _run_invoice_autoreminders_pass() -> None:
+    result = await invoice_reminder_scheduler.run_pass()
+    by_user: dict[str, list[schemas.SelfEmployedInvoiceReminderEvent]] = defaultdict(list)
+    for user_id, reminders in result.results:
+        by_user[user_id].extend(reminders)
+    for user_id, reminders in by_user.items():
+        if not reminders:
+            continue
+        invoice_reminder_scheduler.stats.reminders_total += len(reminders)
+        await log_audit_event(
+            user_id=user_id,
+            action="self_employed.invoice.reminders.sent",
+            details={
+                "count": len(reminders),
+                "due_in_days": SELF_EMPLOYED_REMINDER_DUE_SOON_DAYS,
+                "sent_by_channel": _reminder_sent_by_channel(reminders),
+                "source": "scheduler",
+            },
+        )
+
+
+async def _reminder_scheduler_loop() -> None:
     while True:
+        passes: list[Callable[[], Awaitable[None]]] = []
+        if SELF_EMPLOYED_CALENDAR_AUTORUN_ENABLED:
+            passes.append(_run_calendar_autoreminders_pass)
+        if SELF_EMPLOYED_INVOICE_REMINDER_AUTORUN_ENABLED:
+            passes.append(_run_invoice_autoreminders_pass)
+        for run_pass in passes:
+            try:
+                await run_pass()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - defensive runtime guard
+                print(f"Reminder scheduler pass {run_pass.__name__} failed: {exc}")
+        await asyncio.sleep(SELF_EMPLOYED_CALENDAR_AUTORUN_INTERVAL_SECONDS)
+
+
+async def _investor_rollup_loop() -> None:
+    # Starts with a full rebuild, then catches up on recent writes; the overlap
+    # covers clock skew and transactions that committed late.
+    last_rebuild_at: datetime.datetime | None = None
+    refreshed_through: datetime.datetime | None = None
+    overlap = datetime.timedelta(seconds=INVESTOR_ROLLUP_REFRESH_INTERVAL_SECONDS)
+    while True:
+        started_at = datetime.datetime.now(datetime.UTC)
         try:
-            await _run_calendar_autoreminders_pass()
+            async with AsyncSessionLocal() as db:
+                if last_rebuild_at is None or (started_at - last_rebuild_at).total_seconds() >= (
+                    INVESTOR_ROLLUP_FULL_REBUILD_INTERVAL_SECONDS
+                ):
+                    await investor_rollups.rebuild_investor_rollups(db)
+                    last_rebuild_at = started_at
+                elif refreshed_through is not None:
+                    await investor_rollups.refresh_investor_rollups_since(db, since=refreshed_through - overlap)
+            refreshed_through = started_at
         except asyncio.CancelledError:
             raise
         except Exception as exc:  # pragma: no cover - defensive runtime guard
-            print(f"Calendar auto-reminder loop failed: {exc}")
-        await asyncio.sleep(SELF_EMPLOYED_CALENDAR_AUTORUN_INTERVAL_SECONDS)
+            print(f"Investor rollup refresh failed: {exc}")
+        await asyncio.sleep(INVESTOR_ROLLUP_REFRESH_INTERVAL_SECONDS)
+
+
+async def _refresh_investor_rollups(
+    db: AsyncSession,
+    *,
+    user_id: str | None = None,
+    nps_day: datetime.date | None = None,
+    invoice_created_at: datetime.datetime | None = None,
+) -> None:
+    # Runs after the write has committed; a failure here only delays the
+    # rollup until the next background refresh.
+    try:
+        if user_id is not None:
+            await investor_rollups.refresh_user_activity(db, user_id=user_id)
+        if nps_day is not None:
+            await investor_rollups.refresh_nps_day(db, day=nps_day)
+        invoice_date = investor_rollups.to_utc_date(invoice_created_at)
+        if invoice_date is not None:
+            await investor_rollups.refresh_invoice_month(db, month_start=_month_start(invoice_date))
+    except Exception as exc:  # pragma: no cover - defensive runtime guard
+        await db.rollback()
+        print(f"Investor rollup refresh after write failed: {exc}")
 
 
 def _build_report_window(
@@ -445,6 +536,63 @@ def _to_utc_datetime(value: datetime.datetime) -> datetime.datetime:
     return value.astimezone(datetime.UTC)
 
 
+def _reminder_sent_by_channel(reminders: list[Any]) -> dict[str, int]:
+    return {
+        channel: len([item for item in reminders if item.channel == channel and item.status == "sent"])
+        for channel in ("in_app", "email", "sms")
+    }
+
+
+def _future_fire_at(fire_at: datetime.datetime | None, now: datetime.datetime) -> datetime.datetime | None:
+    # A released row must not be immediately due again, or a pass would keep re-claiming it.
+    if fire_at is None or fire_at > now:
+        return fire_at
+    return now + datetime.timedelta(seconds=SELF_EMPLOYED_CALENDAR_AUTORUN_INTERVAL_SECONDS)
+
+
+def _invoice_next_fire_at(
+    *,
+    status: str,
+    due_date: datetime.date,
+    reminder_last_sent_at: datetime.datetime | None,
+) -> datetime.datetime | None:
+    if status == schemas.SelfEmployedInvoiceStatus.issued.value:
+        fire_date = due_date - datetime.timedelta(days=SELF_EMPLOYED_REMINDER_DUE_SOON_DAYS)
+    elif status == schemas.SelfEmployedInvoiceStatus.overdue.value:
+        fire_date = due_date + datetime.timedelta(days=1)
+    else:
+        return None
+    fire_at = datetime.datetime.combine(fire_date, datetime.time.min, tzinfo=datetime.UTC)
+    if reminder_last_sent_at:
+        cooldown_end = _to_utc_datetime(reminder_last_sent_at) + datetime.timedelta(
+            hours=SELF_EMPLOYED_INVOICE_REMINDER_COOLDOWN_HOURS
+        )
+        fire_at = max(fire_at, cooldown_end)
+    return fire_at
+
+
+def _calendar_event_next_fire_at(
+    *,
+    status: str,
+    starts_at: datetime.datetime,
+    notify_before_minutes: int,
+    reminder_last_sent_at: datetime.datetime | None,
+) -> datetime.datetime | None:
+    if status != schemas.SelfEmployedCalendarEventStatus.scheduled.value:
+        return None
+    starts_at = _to_utc_datetime(starts_at)
+    fire_at = max(
+        starts_at - datetime.timedelta(minutes=max(notify_before_minutes, 0)),
+        starts_at - datetime.timedelta(hours=SELF_EMPLOYED_CALENDAR_AUTORUN_HORIZON_HOURS),
+    )
+    if reminder_last_sent_at:
+        cooldown_end = _to_utc_datetime(reminder_last_sent_at) + datetime.timedelta(
+            hours=SELF_EMPLOYED_CALENDAR_REMINDER_COOLDOWN_HOURS
+        )
+        fire_at = max(fire_at, cooldown_end)
+    return fire_at
+
+
 def _is_retryable_delivery_status(status_code: int) -> bool:
     return status_code in {408, 409, 425, 429, 500, 502, 503, 504}
 
@@ -957,41 +1105,24 @@ async def _load_seed_invoice_metrics(
 ) -> dict[str, Any]:
     current_month_start = _month_start(as_of_date)
     window_start = _shift_month(current_month_start, -(period_months - 1))
-    window_start_at = datetime.datetime.combine(window_start, datetime.time.min, tzinfo=datetime.UTC)
 
     month_starts = [_shift_month(window_start, offset) for offset in range(period_months)]
     month_totals: dict[str, float] = {_month_key(item): 0.0 for item in month_starts}
 
-    rows = (
-        await db.execute(
-            select(
-                models.BillingInvoice.created_at,
-                models.BillingInvoice.total_amount_gbp,
-                models.BillingInvoice.status,
-            ).filter(
-                models.BillingInvoice.created_at >= window_start_at,
-                models.BillingInvoice.status != schemas.BillingInvoiceStatus.void.value,
-            )
-        )
-    ).all()
-
+    rows = await investor_rollups.load_invoice_months(
+        db,
+        start_month=window_start,
+        end_month=current_month_start,
+    )
     active_invoice_count = 0
     paid_invoice_count = 0
-    for created_at, total_amount_gbp, status_value in rows:
-        if not isinstance(created_at, datetime.datetime):
-            continue
-        created_date = (
-            created_at.astimezone(datetime.UTC).date()
-            if created_at.tzinfo is not None
-            else created_at.date()
-        )
-        month_key = _month_key(_month_start(created_date))
+    for row in rows:
+        month_key = _month_key(row.month_start)
         if month_key not in month_totals:
             continue
-        month_totals[month_key] += float(total_amount_gbp or 0.0)
-        active_invoice_count += 1
-        if str(status_value) == schemas.BillingInvoiceStatus.paid.value:
-            paid_invoice_count += 1
+        month_totals[month_key] += float(row.mrr_gbp or 0.0)
+        active_invoice_count += int(row.active_invoice_count or 0)
+        paid_invoice_count += int(row.paid_invoice_count or 0)
 
     current_key = _month_key(current_month_start)
     previous_key = _month_key(_shift_month(current_month_start, -1))
@@ -1316,139 +1447,47 @@ async def _build_seed_readiness_snapshot(
     )
 
 
-def _to_utc_date(value: Any) -> datetime.date | None:
-    if isinstance(value, datetime.datetime):
-        if value.tzinfo is None:
-            return value.date()
-        return value.astimezone(datetime.UTC).date()
-    if isinstance(value, datetime.date):
-        return value
-    return None
-
-
-def _retained_in_window(
+def _build_cohort_pmf_flags(
     *,
-    first_seen: datetime.date,
-    activity_dates: set[datetime.date],
-    start_day: int,
-) -> bool:
-    window_start = first_seen + datetime.timedelta(days=start_day)
-    window_end = window_start + datetime.timedelta(days=29)
-    return any(window_start <= activity_date <= window_end for activity_date in activity_dates)
-
-
-async def _load_pmf_user_activity(
-    db: AsyncSession,
-    *,
-    cohort_start: datetime.date,
-    as_of_date: datetime.date,
-) -> dict[str, dict[str, Any]]:
-    first_seen_rows = (
-        await db.execute(
-            select(
-                models.HandoffLead.user_id,
-                func.min(models.HandoffLead.created_at).label("first_seen_at"),
-            ).group_by(models.HandoffLead.user_id)
-        )
-    ).all()
-
-    first_seen_by_user: dict[str, datetime.date] = {}
-    for user_id_value, first_seen_at in first_seen_rows:
-        first_seen_date = _to_utc_date(first_seen_at)
-        if not first_seen_date:
-            continue
-        if cohort_start <= first_seen_date <= as_of_date:
-            first_seen_by_user[str(user_id_value)] = first_seen_date
-
-    if not first_seen_by_user:
-        return {}
-
-    activity_rows = (
-        await db.execute(
-            select(
-                models.HandoffLead.user_id,
-                models.HandoffLead.created_at,
-                models.HandoffLead.updated_at,
-                models.HandoffLead.status,
-            ).filter(models.HandoffLead.user_id.in_(list(first_seen_by_user.keys())))
-        )
-    ).all()
-
-    activity_by_user: dict[str, dict[str, Any]] = {
-        user_id: {
-            "first_seen": first_seen_date,
-            "activity_dates": set(),
-            "activation_dates": set(),
-        }
-        for user_id, first_seen_date in first_seen_by_user.items()
-    }
-    activation_statuses = {
-        schemas.LeadStatus.qualified.value,
-        schemas.LeadStatus.converted.value,
-    }
-    for user_id_value, created_at, updated_at, status_value in activity_rows:
-        user_id = str(user_id_value)
-        row = activity_by_user.get(user_id)
-        if row is None:
-            continue
-        created_date = _to_utc_date(created_at)
-        updated_date = _to_utc_date(updated_at)
-        if created_date:
-            row["activity_dates"].add(created_date)
-        if updated_date:
-            row["activity_dates"].add(updated_date)
-        if str(status_value) in activation_statuses:
-            activation_date = updated_date or created_date
-            if activation_date:
-                row["activation_dates"].add(activation_date)
-    return activity_by_user
-
-
-def _build_user_pmf_flags(
-    *,
-    activity_by_user: dict[str, dict[str, Any]],
+    cohort_days: list[models.InvestorPMFCohortDay],
     as_of_date: datetime.date,
     activation_window_days: int,
 ) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
-    for user_id, row in activity_by_user.items():
-        first_seen = row["first_seen"]
-        if not isinstance(first_seen, datetime.date):
-            continue
-        activity_dates_raw = row["activity_dates"]
-        activation_dates_raw = row["activation_dates"]
-        activity_dates = activity_dates_raw if isinstance(activity_dates_raw, set) else set()
-        activation_dates = activation_dates_raw if isinstance(activation_dates_raw, set) else set()
-        activation_deadline = first_seen + datetime.timedelta(days=activation_window_days)
-        activated = any(first_seen <= activation_date <= activation_deadline for activation_date in activation_dates)
+    for item in cohort_days:
+        first_seen = item.cohort_date
+        activation_lag_days = int(item.activation_lag_days)
         eligible_30 = as_of_date >= first_seen + datetime.timedelta(days=30)
         eligible_60 = as_of_date >= first_seen + datetime.timedelta(days=60)
         eligible_90 = as_of_date >= first_seen + datetime.timedelta(days=90)
         rows.append(
             {
-                "user_id": user_id,
                 "first_seen": first_seen,
-                "activated": activated,
+                "users": int(item.users),
+                "activated": 0 <= activation_lag_days <= activation_window_days,
                 "eligible_30": eligible_30,
                 "eligible_60": eligible_60,
                 "eligible_90": eligible_90,
-                "retained_30": eligible_30 and _retained_in_window(first_seen=first_seen, activity_dates=activity_dates, start_day=30),
-                "retained_60": eligible_60 and _retained_in_window(first_seen=first_seen, activity_dates=activity_dates, start_day=60),
-                "retained_90": eligible_90 and _retained_in_window(first_seen=first_seen, activity_dates=activity_dates, start_day=90),
+                "retained_30": eligible_30 and bool(item.retained_30d),
+                "retained_60": eligible_60 and bool(item.retained_60d),
+                "retained_90": eligible_90 and bool(item.retained_90d),
             }
         )
     return rows
 
 
 def _aggregate_pmf_flags(rows: list[dict[str, Any]]) -> dict[str, float | int]:
-    total_new_users = len(rows)
-    activated_users = sum(1 for row in rows if bool(row.get("activated")))
-    eligible_users_30d = sum(1 for row in rows if bool(row.get("eligible_30")))
-    eligible_users_60d = sum(1 for row in rows if bool(row.get("eligible_60")))
-    eligible_users_90d = sum(1 for row in rows if bool(row.get("eligible_90")))
-    retained_users_30d = sum(1 for row in rows if bool(row.get("retained_30")))
-    retained_users_60d = sum(1 for row in rows if bool(row.get("retained_60")))
-    retained_users_90d = sum(1 for row in rows if bool(row.get("retained_90")))
+    def _users_where(flag: str) -> int:
+        return sum(int(row.get("users", 1)) for row in rows if bool(row.get(flag)))
+
+    total_new_users = sum(int(row.get("users", 1)) for row in rows)
+    activated_users = _users_where("activated")
+    eligible_users_30d = _users_where("eligible_30")
+    eligible_users_60d = _users_where("eligible_60")
+    eligible_users_90d = _users_where("eligible_90")
+    retained_users_30d = _users_where("retained_30")
+    retained_users_60d = _users_where("retained_60")
+    retained_users_90d = _users_where("retained_90")
     return {
         "total_new_users": total_new_users,
         "activated_users": activated_users,
@@ -1506,13 +1545,13 @@ async def _build_pmf_evidence_snapshot(
     as_of_date: datetime.date,
 ) -> schemas.PMFEvidenceResponse:
     cohort_start = _shift_month(_month_start(as_of_date), -(cohort_months - 1))
-    activity_by_user = await _load_pmf_user_activity(
+    cohort_days = await investor_rollups.load_pmf_cohort_days(
         db,
         cohort_start=cohort_start,
         as_of_date=as_of_date,
     )
-    pmf_rows = _build_user_pmf_flags(
-        activity_by_user=activity_by_user,
+    pmf_rows = _build_cohort_pmf_flags(
+        cohort_days=cohort_days,
         as_of_date=as_of_date,
         activation_window_days=activation_window_days,
     )
@@ -1651,13 +1690,6 @@ async def _load_nps_trend(
     period_months: int,
 ) -> dict[str, Any]:
     period_start = _shift_month(_month_start(as_of_date), -(period_months - 1))
-    period_start_at = datetime.datetime.combine(period_start, datetime.time.min, tzinfo=datetime.UTC)
-    period_end_before = datetime.datetime.combine(
-        as_of_date + datetime.timedelta(days=1),
-        datetime.time.min,
-        tzinfo=datetime.UTC,
-    )
-
     month_starts = [_shift_month(period_start, offset) for offset in range(period_months)]
     bucket: dict[str, dict[str, int]] = {
         _month_key(month_start): {
@@ -1669,35 +1701,15 @@ async def _load_nps_trend(
         for month_start in month_starts
     }
 
-    rows = (
-        await db.execute(
-            select(
-                models.NPSResponse.created_at,
-                models.NPSResponse.score,
-            ).filter(
-                models.NPSResponse.created_at >= period_start_at,
-                models.NPSResponse.created_at < period_end_before,
-            )
-        )
-    ).all()
-
-    for created_at, score_raw in rows:
-        created_date = _to_utc_date(created_at)
-        if created_date is None:
-            continue
-        month_key = _month_key(_month_start(created_date))
-        month_row = bucket.get(month_key)
+    rows = await investor_rollups.load_nps_days(db, start_date=period_start, end_date=as_of_date)
+    for row in rows:
+        month_row = bucket.get(_month_key(_month_start(row.day)))
         if month_row is None:
             continue
-        score = int(score_raw)
-        month_row["responses_count"] += 1
-        score_band = _nps_score_band(score)
-        if score_band == "promoter":
-            month_row["promoters_count"] += 1
-        elif score_band == "passive":
-            month_row["passives_count"] += 1
-        else:
-            month_row["detractors_count"] += 1
+        month_row["responses_count"] += int(row.responses_count or 0)
+        month_row["promoters_count"] += int(row.promoters_count or 0)
+        month_row["passives_count"] += int(row.passives_count or 0)
+        month_row["detractors_count"] += int(row.detractors_count or 0)
 
     monthly_trend: list[schemas.NPSMonthlyTrendPoint] = []
     total_responses = 0
@@ -2982,12 +2994,14 @@ async def initiate_handoff(
             lead_id=uuid.UUID(str(lead.id)),
             duplicated=True,
         )
+    lead_id = uuid.UUID(str(lead.id))
+    await _refresh_investor_rollups(db, user_id=user_id)
 
     audit_event_id = await log_audit_event(
         user_id=user_id,
         action="partner.handoff.initiated",
         details={
-            "lead_id": str(lead.id),
+            "lead_id": str(lead_id),
             "partner_id": partner_db_id,
             "partner_name": partner_name,
         },
@@ -2995,7 +3009,7 @@ async def initiate_handoff(
 
     return schemas.HandoffResponse(
         message=f"Handoff to {partner_name} initiated.",
-        lead_id=uuid.UUID(str(lead.id)),
+        lead_id=lead_id,
         audit_event_id=audit_event_id,
     )
 
@@ -3015,6 +3029,8 @@ async def update_lead_status(
     _validate_status_transition(previous_status, payload.status)
     if payload.status.value != previous_status:
         lead = await crud.update_handoff_lead_status(db, lead=lead, status=payload.status.value)
+        await _refresh_investor_rollups(db, user_id=str(lead.user_id))
+        await db.refresh(lead)
         await log_audit_event(
             user_id=user_id,
             action="partner.handoff.status.updated",
@@ -3220,6 +3236,11 @@ async def update_self_employed_invoice_status(
             db,
             invoice,
             status=payload.status.value,
+            next_fire_at=_invoice_next_fire_at(
+                status=payload.status.value,
+                due_date=invoice.due_date,
+                reminder_last_sent_at=invoice.reminder_last_sent_at,
+            ),
         )
         await log_audit_event(
             user_id=user_id,
@@ -3670,6 +3691,188 @@ async def run_self_employed_reminder_delivery_smoke_check(
     )
 
 
+def _invoice_reminder_candidate(item: Any) -> dict[str, Any]:
+    return {
+        "id": str(item.id),
+        "status": str(item.status),
+        "due_date": item.due_date,
+        "invoice_number": str(item.invoice_number),
+        "customer_email": item.customer_email,
+        "customer_phone": item.customer_phone,
+        "reminder_last_sent_at": _to_utc_datetime(item.reminder_last_sent_at) if item.reminder_last_sent_at else None,
+    }
+
+
+def _invoice_reminder_type(
+    invoice_candidate: dict[str, Any],
+    *,
+    today: datetime.date,
+    now: datetime.datetime,
+    due_in_days: int,
+) -> Literal["due_soon", "overdue"] | None:
+    reminder_type: Literal["due_soon", "overdue"] | None = None
+    if invoice_candidate["status"] == schemas.SelfEmployedInvoiceStatus.overdue.value:
+        reminder_type = "overdue"
+    elif today <= invoice_candidate["due_date"] <= today + datetime.timedelta(days=due_in_days):
+        reminder_type = "due_soon"
+    if invoice_candidate["reminder_last_sent_at"] and (
+        now - invoice_candidate["reminder_last_sent_at"]
+    ).total_seconds() < SELF_EMPLOYED_INVOICE_REMINDER_COOLDOWN_HOURS * 3600:
+        return None
+    return reminder_type
+
+
+async def _send_invoice_reminder(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    invoice_candidate: dict[str, Any],
+    reminder_type: Literal["due_soon", "overdue"],
+    today: datetime.date,
+    now: datetime.datetime,
+) -> list[schemas.SelfEmployedInvoiceReminderEvent]:
+    """Send one leased invoice reminder on every enabled channel, then record the next fire time."""
+    message = (
+        f"Invoice {invoice_candidate['invoice_number']} is overdue since {invoice_candidate['due_date'].isoformat()}."
+        if reminder_type == "overdue"
+        else (
+            f"Invoice {invoice_candidate['invoice_number']} is due on {invoice_candidate['due_date'].isoformat()} "
+            f"(in {(invoice_candidate['due_date'] - today).days} day(s))."
+        )
+    )
+    event = await crud.create_invoice_reminder_event(
+        db,
+        invoice_id=invoice_candidate["id"],
+        user_id=user_id,
+        reminder_type=reminder_type,
+        channel="in_app",
+        status="sent",
+        message=message,
+        sent_at=now,
+    )
+    reminders = [_to_reminder_event(event)]
+
+    dispatches: list[tuple[Literal["email", "sms"], Awaitable[tuple[str, str]]]] = []
+    if SELF_EMPLOYED_REMINDER_EMAIL_ENABLED:
+        dispatches.append(
+            (
+                "email",
+                reminder_rate_limiters.run(
+                    f"email:{SELF_EMPLOYED_REMINDER_EMAIL_PROVIDER}",
+                    lambda: _dispatch_invoice_reminder_email(
+                        invoice_id=invoice_candidate["id"],
+                        invoice_number=invoice_candidate["invoice_number"],
+                        reminder_type=reminder_type,
+                        message=message,
+                        recipient_email=invoice_candidate["customer_email"],
+                    ),
+                ),
+            )
+        )
+    if SELF_EMPLOYED_REMINDER_SMS_ENABLED:
+        dispatches.append(
+            (
+                "sms",
+                reminder_rate_limiters.run(
+                    f"sms:{SELF_EMPLOYED_REMINDER_SMS_PROVIDER}",
+                    lambda: _dispatch_invoice_reminder_sms(
+                        invoice_id=invoice_candidate["id"],
+                        invoice_number=invoice_candidate["invoice_number"],
+                        reminder_type=reminder_type,
+                        message=message,
+                        recipient_phone=invoice_candidate["customer_phone"],
+                    ),
+                ),
+            )
+        )
+    outcomes = await asyncio.gather(*(dispatch for _, dispatch in dispatches))
+    for (channel, _), (delivery_status, delivery_message) in zip(dispatches, outcomes):
+        channel_event = await crud.create_invoice_reminder_event(
+            db,
+            invoice_id=invoice_candidate["id"],
+            user_id=user_id,
+            reminder_type=reminder_type,
+            channel=channel,
+            status=delivery_status,
+            message=delivery_message,
+            sent_at=now if delivery_status == "sent" else None,
+        )
+        reminders.append(_to_reminder_event(channel_event))
+
+    invoice_to_update = await crud.get_self_employed_invoice_by_id(db, invoice_id=invoice_candidate["id"])
+    if invoice_to_update is not None:
+        await crud.mark_self_employed_invoice_reminder_sent(
+            db,
+            invoice_to_update,
+            reminder_at=now,
+            next_fire_at=_invoice_next_fire_at(
+                status=str(invoice_to_update.status),
+                due_date=invoice_to_update.due_date,
+                reminder_last_sent_at=now,
+            ),
+        )
+    return reminders
+
+
+async def _claim_due_invoice_reminders(
+    now: datetime.datetime,
+    lease_owner: str,
+    limit: int,
+) -> list[tuple[str, datetime.datetime]]:
+    async with AsyncSessionLocal() as db:
+        return await crud.claim_due_reminder_rows(
+            db,
+            models.SelfEmployedInvoice,
+            statuses=[
+                schemas.SelfEmployedInvoiceStatus.issued.value,
+                schemas.SelfEmployedInvoiceStatus.overdue.value,
+            ],
+            now=now,
+            lease_owner=lease_owner,
+            lease_seconds=SELF_EMPLOYED_REMINDER_LEASE_SECONDS,
+            limit=limit,
+        )
+
+
+async def _process_scheduled_invoice_reminder(
+    invoice_id: str,
+    lease_owner: str,
+) -> tuple[str, list[schemas.SelfEmployedInvoiceReminderEvent]]:
+    now = datetime.datetime.now(datetime.UTC)
+    today = now.date()
+    async with AsyncSessionLocal() as db:
+        invoice = await crud.get_self_employed_invoice_by_id(db, invoice_id=invoice_id)
+        if invoice is None or invoice.reminder_lease_owner != lease_owner:
+            return "", []
+        user_id = str(invoice.user_id)
+        if invoice.status == schemas.SelfEmployedInvoiceStatus.issued.value and invoice.due_date < today:
+            invoice.status = schemas.SelfEmployedInvoiceStatus.overdue.value
+            invoice.updated_at = now
+        invoice_candidate = _invoice_reminder_candidate(invoice)
+        reminder_type = _invoice_reminder_type(
+            invoice_candidate,
+            today=today,
+            now=now,
+            due_in_days=SELF_EMPLOYED_REMINDER_DUE_SOON_DAYS,
+        )
+        if reminder_type is None:
+            next_fire_at = _invoice_next_fire_at(
+                status=invoice_candidate["status"],
+                due_date=invoice.due_date,
+                reminder_last_sent_at=invoice_candidate["reminder_last_sent_at"],
+            )
+            await crud.release_reminder_lease(db, invoice, next_fire_at=_future_fire_at(next_fire_at, now))
+            return user_id, []
+        return user_id, await _send_invoice_reminder(
+            db,
+            user_id=user_id,
+            invoice_candidate=invoice_candidate,
+            reminder_type=reminder_type,
+            today=today,
+            now=now,
+        )
+
+
 @app.post(
     "/self-employed/invoicing/reminders/run",
     response_model=schemas.SelfEmployedInvoiceReminderRunResponse,
@@ -3696,122 +3899,49 @@ async def run_self_employed_invoice_reminders(
     )
     _ = issued_total + overdue_total  # Retained for future pagination improvements.
     today = datetime.datetime.now(datetime.UTC).date()
-    due_soon_cutoff = today + datetime.timedelta(days=due_in_days)
     now = datetime.datetime.now(datetime.UTC)
 
-    invoice_candidates = [
-        {
-            "id": str(item.id),
-            "status": str(item.status),
-            "due_date": item.due_date,
-            "invoice_number": str(item.invoice_number),
-            "customer_email": item.customer_email,
-            "customer_phone": item.customer_phone,
-            "reminder_last_sent_at": item.reminder_last_sent_at,
-        }
-        for item in [*issued_rows, *overdue_rows]
-    ]
+    due_candidates: list[tuple[dict[str, Any], Literal["due_soon", "overdue"]]] = []
+    for item in [*issued_rows, *overdue_rows]:
+        invoice_candidate = _invoice_reminder_candidate(item)
+        reminder_type = _invoice_reminder_type(invoice_candidate, today=today, now=now, due_in_days=due_in_days)
+        if reminder_type is not None:
+            due_candidates.append((invoice_candidate, reminder_type))
 
-    reminders: list[schemas.SelfEmployedInvoiceReminderEvent] = []
-    for invoice_candidate in invoice_candidates:
-        reminder_type: Literal["due_soon", "overdue"] | None = None
-        if invoice_candidate["status"] == schemas.SelfEmployedInvoiceStatus.overdue.value:
-            reminder_type = "overdue"
-        elif today <= invoice_candidate["due_date"] <= due_soon_cutoff:
-            reminder_type = "due_soon"
-        if reminder_type is None:
-            continue
-        if invoice_candidate["reminder_last_sent_at"] and (
-            now - invoice_candidate["reminder_last_sent_at"]
-        ).total_seconds() < 24 * 3600:
-            continue
-
-        message = (
-            f"Invoice {invoice_candidate['invoice_number']} is overdue since {invoice_candidate['due_date'].isoformat()}."
-            if reminder_type == "overdue"
-            else (
-                f"Invoice {invoice_candidate['invoice_number']} is due on {invoice_candidate['due_date'].isoformat()} "
-                f"(in {(invoice_candidate['due_date'] - today).days} day(s))."
-            )
-        )
-        event = await crud.create_invoice_reminder_event(
+    # Lease the rows first so a concurrent scheduler pass cannot send the same reminder.
+    leased_ids = set(
+        await crud.claim_reminder_rows_by_id(
             db,
-            invoice_id=invoice_candidate["id"],
-            user_id=user_id,
-            reminder_type=reminder_type,
-            channel="in_app",
-            status="sent",
-            message=message,
-            sent_at=now,
+            models.SelfEmployedInvoice,
+            ids=[invoice_candidate["id"] for invoice_candidate, _ in due_candidates],
+            now=now,
+            lease_owner=f"manual-{uuid.uuid4().hex[:12]}",
+            lease_seconds=SELF_EMPLOYED_REMINDER_LEASE_SECONDS,
         )
-        reminders.append(_to_reminder_event(event))
-
-        if SELF_EMPLOYED_REMINDER_EMAIL_ENABLED:
-            email_status, email_message = await _dispatch_invoice_reminder_email(
-                invoice_id=invoice_candidate["id"],
-                invoice_number=invoice_candidate["invoice_number"],
-                reminder_type=reminder_type,
-                message=message,
-                recipient_email=invoice_candidate["customer_email"],
-            )
-            email_event = await crud.create_invoice_reminder_event(
-                db,
-                invoice_id=invoice_candidate["id"],
-                user_id=user_id,
-                reminder_type=reminder_type,
-                channel="email",
-                status=email_status,
-                message=email_message,
-                sent_at=now if email_status == "sent" else None,
-            )
-            reminders.append(_to_reminder_event(email_event))
-
-        if SELF_EMPLOYED_REMINDER_SMS_ENABLED:
-            sms_status, sms_message = await _dispatch_invoice_reminder_sms(
-                invoice_id=invoice_candidate["id"],
-                invoice_number=invoice_candidate["invoice_number"],
-                reminder_type=reminder_type,
-                message=message,
-                recipient_phone=invoice_candidate["customer_phone"],
-            )
-            sms_event = await crud.create_invoice_reminder_event(
+    )
+    reminders: list[schemas.SelfEmployedInvoiceReminderEvent] = []
+    for invoice_candidate, reminder_type in due_candidates:
+        if invoice_candidate["id"] not in leased_ids:
+            continue
+        reminders.extend(
+            await _send_invoice_reminder(
                 db,
-                invoice_id=invoice_candidate["id"],
                 user_id=user_id,
+                invoice_candidate=invoice_candidate,
                 reminder_type=reminder_type,
-                channel="sms",
-                status=sms_status,
-                message=sms_message,
-                sent_at=now if sms_status == "sent" else None,
+                today=today,
+                now=now,
             )
-            reminders.append(_to_reminder_event(sms_event))
-
-        invoice_to_update = await crud.get_self_employed_invoice_by_id_for_user(
-            db,
-            invoice_id=invoice_candidate["id"],
-            user_id=user_id,
-        )
-        if invoice_to_update is None:
-            continue
-        await crud.mark_self_employed_invoice_reminder_sent(
-            db,
-            invoice_to_update,
-            reminder_at=now,
         )
 
     if reminders:
-        sent_by_channel = {
-            "in_app": len([item for item in reminders if item.channel == "in_app" and item.status == "sent"]),
-            "email": len([item for item in reminders if item.channel == "email" and item.status == "sent"]),
-            "sms": len([item for item in reminders if item.channel == "sms" and item.status == "sent"]),
-        }
         await log_audit_event(
             user_id=user_id,
             action="self_employed.invoice.reminders.sent",
             details={
                 "count": len(reminders),
                 "due_in_days": due_in_days,
-                "sent_by_channel": sent_by_channel,
+                "sent_by_channel": _reminder_sent_by_channel(reminders),
             },
         )
     return schemas.SelfEmployedInvoiceReminderRunResponse(
@@ -3890,6 +4020,12 @@ async def create_self_employed_calendar_event(
         notify_email=payload.notify_email,
         notify_sms=payload.notify_sms,
         notify_before_minutes=payload.notify_before_minutes,
+        next_fire_at=_calendar_event_next_fire_at(
+            status=schemas.SelfEmployedCalendarEventStatus.scheduled.value,
+            starts_at=starts_at,
+            notify_before_minutes=payload.notify_before_minutes,
+            reminder_last_sent_at=None,
+        ),
     )
     await log_audit_event(
         user_id=user_id,
@@ -4013,6 +4149,12 @@ async def update_self_employed_calendar_event(
         db,
         event,
         updates=updates,
+        next_fire_at=_calendar_event_next_fire_at(
+            status=str(updates.get("status", event.status)),
+            starts_at=effective_starts_at,
+            notify_before_minutes=int(updates.get("notify_before_minutes", event.notify_before_minutes) or 0),
+            reminder_last_sent_at=event.reminder_last_sent_at,
+        ),
     )
     await log_audit_event(
         user_id=user_id,
@@ -4050,6 +4192,140 @@ async def delete_self_employed_calendar_event(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+def _calendar_reminder_candidate(item: Any) -> dict[str, Any]:
+    return {
+        "id": str(item.id),
+        "title": str(item.title),
+        "starts_at": _to_utc_datetime(item.starts_at),
+        "notify_before_minutes": int(item.notify_before_minutes or 0),
+        "notify_in_app": bool(item.notify_in_app),
+        "notify_email": bool(item.notify_email),
+        "notify_sms": bool(item.notify_sms),
+        "recipient_email": item.recipient_email,
+        "recipient_phone": item.recipient_phone,
+        "reminder_last_sent_at": _to_utc_datetime(item.reminder_last_sent_at) if item.reminder_last_sent_at else None,
+    }
+
+
+def _calendar_reminder_is_due(event_candidate: dict[str, Any], *, now: datetime.datetime) -> bool:
+    starts_at = event_candidate["starts_at"]
+    reminder_window_start = starts_at - datetime.timedelta(minutes=max(event_candidate["notify_before_minutes"], 0))
+    if now < reminder_window_start:
+        return False
+    if event_candidate["reminder_last_sent_at"] and (
+        now - event_candidate["reminder_last_sent_at"]
+    ).total_seconds() < SELF_EMPLOYED_CALENDAR_REMINDER_COOLDOWN_HOURS * 3600:
+        return False
+    return True
+
+
+async def _send_calendar_reminder(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    event_candidate: dict[str, Any],
+    now: datetime.datetime,
+) -> list[schemas.SelfEmployedCalendarReminderEvent]:
+    """Send one leased calendar reminder on its channels, then record the next fire time."""
+    starts_at = event_candidate["starts_at"]
+    reminder_type: Literal["upcoming", "overdue"] = "overdue" if starts_at < now else "upcoming"
+    minutes_delta = int(max((starts_at - now).total_seconds(), 0) // 60)
+    message = (
+        f"Calendar event '{event_candidate['title']}' was scheduled for {starts_at.isoformat()} and needs attention."
+        if reminder_type == "overdue"
+        else (
+            f"Calendar event '{event_candidate['title']}' starts at {starts_at.isoformat()} "
+            f"(in {minutes_delta} minute(s))."
+        )
+    )
+
+    reminders: list[schemas.SelfEmployedCalendarReminderEvent] = []
+    sent_any = False
+    if event_candidate["notify_in_app"]:
+        in_app_event = await crud.create_calendar_reminder_event(
+            db,
+            event_id=event_candidate["id"],
+            user_id=user_id,
+            reminder_type=reminder_type,
+            channel="in_app",
+            status="sent",
+            message=message,
+            sent_at=now,
+        )
+        reminders.append(_to_calendar_reminder_event(in_app_event))
+        sent_any = True
+
+    dispatches: list[tuple[Literal["email", "sms"], Awaitable[tuple[str, str]]]] = []
+    if event_candidate["notify_email"]:
+        dispatches.append(
+            (
+                "email",
+                reminder_rate_limiters.run(
+                    f"email:{SELF_EMPLOYED_REMINDER_EMAIL_PROVIDER}",
+                    lambda: _dispatch_calendar_reminder_email(
+                        event_id=event_candidate["id"],
+                        title=event_candidate["title"],
+                        starts_at=starts_at,
+                        reminder_type=reminder_type,
+                        message=message,
+                        recipient_email=event_candidate["recipient_email"],
+                    ),
+                ),
+            )
+        )
+    if event_candidate["notify_sms"]:
+        dispatches.append(
+            (
+                "sms",
+                reminder_rate_limiters.run(
+                    f"sms:{SELF_EMPLOYED_REMINDER_SMS_PROVIDER}",
+                    lambda: _dispatch_calendar_reminder_sms(
+                        event_id=event_candidate["id"],
+                        title=event_candidate["title"],
+                        starts_at=starts_at,
+                        reminder_type=reminder_type,
+                        message=message,
+                        recipient_phone=event_candidate["recipient_phone"],
+                    ),
+                ),
+            )
+        )
+    outcomes = await asyncio.gather(*(dispatch for _, dispatch in dispatches))
+    for (channel, _), (delivery_status, delivery_message) in zip(dispatches, outcomes):
+        channel_event = await crud.create_calendar_reminder_event(
+            db,
+            event_id=event_candidate["id"],
+            user_id=user_id,
+            reminder_type=reminder_type,
+            channel=channel,
+            status=delivery_status,
+            message=delivery_message,
+            sent_at=now if delivery_status == "sent" else None,
+        )
+        reminders.append(_to_calendar_reminder_event(channel_event))
+        sent_any = sent_any or delivery_status == "sent"
+
+    event_to_update = await crud.get_calendar_event_by_id(db, event_id=event_candidate["id"])
+    if event_to_update is None:
+        return reminders
+    if sent_any:
+        await crud.mark_calendar_event_reminder_sent(
+            db,
+            event_to_update,
+            reminder_at=now,
+            next_fire_at=_calendar_event_next_fire_at(
+                status=str(event_to_update.status),
+                starts_at=event_to_update.starts_at,
+                notify_before_minutes=int(event_to_update.notify_before_minutes or 0),
+                reminder_last_sent_at=now,
+            ),
+        )
+    else:
+        # Nothing was delivered: retry on a later pass instead of waiting out the cooldown.
+        await crud.release_reminder_lease(db, event_to_update, next_fire_at=_future_fire_at(now, now))
+    return reminders
+
+
 async def _run_calendar_reminders_for_user(
     db: AsyncSession,
     *,
@@ -4066,129 +4342,35 @@ async def _run_calendar_reminders_for_user(
         limit=500,
     )
     event_candidates = [
-        {
-            "id": str(item.id),
-            "title": str(item.title),
-            "starts_at": _to_utc_datetime(item.starts_at),
-            "notify_before_minutes": int(item.notify_before_minutes or 0),
-            "notify_in_app": bool(item.notify_in_app),
-            "notify_email": bool(item.notify_email),
-            "notify_sms": bool(item.notify_sms),
-            "recipient_email": item.recipient_email,
-            "recipient_phone": item.recipient_phone,
-            "reminder_last_sent_at": _to_utc_datetime(item.reminder_last_sent_at) if item.reminder_last_sent_at else None,
-        }
-        for item in rows
+        event_candidate
+        for event_candidate in (_calendar_reminder_candidate(item) for item in rows)
+        if _calendar_reminder_is_due(event_candidate, now=now)
     ]
+    leased_ids = set(
+        await crud.claim_reminder_rows_by_id(
+            db,
+            models.SelfEmployedCalendarEvent,
+            ids=[event_candidate["id"] for event_candidate in event_candidates],
+            now=now,
+            lease_owner=f"{source}-{uuid.uuid4().hex[:12]}",
+            lease_seconds=SELF_EMPLOYED_REMINDER_LEASE_SECONDS,
+        )
+    )
 
     reminders: list[schemas.SelfEmployedCalendarReminderEvent] = []
-    cooldown_seconds = SELF_EMPLOYED_CALENDAR_REMINDER_COOLDOWN_HOURS * 3600
     for event_candidate in event_candidates:
-        starts_at = event_candidate["starts_at"]
-        reminder_window_start = starts_at - datetime.timedelta(minutes=max(event_candidate["notify_before_minutes"], 0))
-        if now < reminder_window_start:
-            continue
-        if event_candidate["reminder_last_sent_at"] and (
-            now - event_candidate["reminder_last_sent_at"]
-        ).total_seconds() < cooldown_seconds:
+        if event_candidate["id"] not in leased_ids:
             continue
-
-        reminder_type: Literal["upcoming", "overdue"] = "overdue" if starts_at < now else "upcoming"
-        minutes_delta = int(max((starts_at - now).total_seconds(), 0) // 60)
-        message = (
-            f"Calendar event '{event_candidate['title']}' was scheduled for {starts_at.isoformat()} and needs attention."
-            if reminder_type == "overdue"
-            else (
-                f"Calendar event '{event_candidate['title']}' starts at {starts_at.isoformat()} "
-                f"(in {minutes_delta} minute(s))."
-            )
-        )
-
-        sent_any = False
-        if event_candidate["notify_in_app"]:
-            in_app_event = await crud.create_calendar_reminder_event(
-                db,
-                event_id=event_candidate["id"],
-                user_id=user_id,
-                reminder_type=reminder_type,
-                channel="in_app",
-                status="sent",
-                message=message,
-                sent_at=now,
-            )
-            reminders.append(_to_calendar_reminder_event(in_app_event))
-            sent_any = True
-
-        if event_candidate["notify_email"]:
-            email_status, email_message = await _dispatch_calendar_reminder_email(
-                event_id=event_candidate["id"],
-                title=event_candidate["title"],
-                starts_at=starts_at,
-                reminder_type=reminder_type,
-                message=message,
-                recipient_email=event_candidate["recipient_email"],
-            )
-            email_event = await crud.create_calendar_reminder_event(
-                db,
-                event_id=event_candidate["id"],
-                user_id=user_id,
-                reminder_type=reminder_type,
-                channel="email",
-                status=email_status,
-                message=email_message,
-                sent_at=now if email_status == "sent" else None,
-            )
-            reminders.append(_to_calendar_reminder_event(email_event))
-            sent_any = sent_any or email_status == "sent"
-
-        if event_candidate["notify_sms"]:
-            sms_status, sms_message = await _dispatch_calendar_reminder_sms(
-                event_id=event_candidate["id"],
-                title=event_candidate["title"],
-                starts_at=starts_at,
-                reminder_type=reminder_type,
-                message=message,
-                recipient_phone=event_candidate["recipient_phone"],
-            )
-            sms_event = await crud.create_calendar_reminder_event(
-                db,
-                event_id=event_candidate["id"],
-                user_id=user_id,
-                reminder_type=reminder_type,
-                channel="sms",
-                status=sms_status,
-                message=sms_message,
-                sent_at=now if sms_status == "sent" else None,
-            )
-            reminders.append(_to_calendar_reminder_event(sms_event))
-            sent_any = sent_any or sms_status == "sent"
-
-        if sent_any:
-            event_to_update = await crud.get_calendar_event_by_id_for_user(
-                db,
-                event_id=event_candidate["id"],
-                user_id=user_id,
-            )
-            if event_to_update:
-                await crud.mark_calendar_event_reminder_sent(
-                    db,
-                    event_to_update,
-                    reminder_at=now,
-                )
+        reminders.extend(await _send_calendar_reminder(db, user_id=user_id, event_candidate=event_candidate, now=now))
 
     if reminders:
-        sent_by_channel = {
-            "in_app": len([item for item in reminders if item.channel == "in_app" and item.status == "sent"]),
-            "email": len([item for item in reminders if item.channel == "email" and item.status == "sent"]),
-            "sms": len([item for item in reminders if item.channel == "sms" and item.status == "sent"]),
-        }
         await log_audit_event(
             user_id=user_id,
             action="self_employed.calendar.reminders.sent",
             details={
                 "count": len(reminders),
                 "horizon_hours": horizon_hours,
-                "sent_by_channel": sent_by_channel,
+                "sent_by_channel": _reminder_sent_by_channel(reminders),
                 "source": source,
             },
         )
@@ -4200,6 +4382,90 @@ async def _run_calendar_reminders_for_user(
     )
 
 
+async def _claim_due_calendar_reminders(
+    now: datetime.datetime,
+    lease_owner: str,
+    limit: int,
+) -> list[tuple[str, datetime.datetime]]:
+    async with AsyncSessionLocal() as db:
+        return await crud.claim_due_reminder_rows(
+            db,
+            models.SelfEmployedCalendarEvent,
+            statuses=[schemas.SelfEmployedCalendarEventStatus.scheduled.value],
+            now=now,
+            lease_owner=lease_owner,
+            lease_seconds=SELF_EMPLOYED_REMINDER_LEASE_SECONDS,
+            limit=limit,
+        )
+
+
+async def _process_scheduled_calendar_reminder(
+    event_id: str,
+    lease_owner: str,
+) -> tuple[str, list[schemas.SelfEmployedCalendarReminderEvent]]:
+    now = datetime.datetime.now(datetime.UTC)
+    async with AsyncSessionLocal() as db:
+        event = await crud.get_calendar_event_by_id(db, event_id=event_id)
+        if event is None or event.reminder_lease_owner != lease_owner:
+            return "", []
+        user_id = str(event.user_id)
+        event_candidate = _calendar_reminder_candidate(event)
+        if not _calendar_reminder_is_due(event_candidate, now=now):
+            next_fire_at = _calendar_event_next_fire_at(
+                status=str(event.status),
+                starts_at=event_candidate["starts_at"],
+                notify_before_minutes=event_candidate["notify_before_minutes"],
+                reminder_last_sent_at=event_candidate["reminder_last_sent_at"],
+            )
+            await crud.release_reminder_lease(db, event, next_fire_at=_future_fire_at(next_fire_at, now))
+            return user_id, []
+        return user_id, await _send_calendar_reminder(db, user_id=user_id, event_candidate=event_candidate, now=now)
+
+
+reminder_rate_limiters = RateLimiterRegistry(
+    {
+        "email": SELF_EMPLOYED_REMINDER_EMAIL_RATE_PER_SECOND,
+        "sms": SELF_EMPLOYED_REMINDER_SMS_RATE_PER_SECOND,
+    },
+    default_rate_per_second=SELF_EMPLOYED_REMINDER_EMAIL_RATE_PER_SECOND,
+)
+calendar_reminder_scheduler: LeaseReminderScheduler[tuple[str, list[schemas.SelfEmployedCalendarReminderEvent]]] = (
+    LeaseReminderScheduler(
+        kind="calendar",
+        claim=_claim_due_calendar_reminders,
+        process=_process_scheduled_calendar_reminder,
+        worker_id=REMINDER_WORKER_ID,
+        batch_size=SELF_EMPLOYED_REMINDER_SCHEDULER_BATCH_SIZE,
+        concurrency=SELF_EMPLOYED_REMINDER_SCHEDULER_CONCURRENCY,
+    )
+)
+invoice_reminder_scheduler: LeaseReminderScheduler[tuple[str, list[schemas.SelfEmployedInvoiceReminderEvent]]] = (
+    LeaseReminderScheduler(
+        kind="invoice",
+        claim=_claim_due_invoice_reminders,
+        process=_process_scheduled_invoice_reminder,
+        worker_id=REMINDER_WORKER_ID,
+        batch_size=SELF_EMPLOYED_REMINDER_SCHEDULER_BATCH_SIZE,
+        concurrency=SELF_EMPLOYED_REMINDER_SCHEDULER_CONCURRENCY,
+    )
+)
+
+
+@app.get("/self-employed/reminders/scheduler/metrics")
+async def get_reminder_scheduler_metrics(
+    _billing_user: str = Depends(require_billing_report_access),
+):
+    return {
+        "worker_id": REMINDER_WORKER_ID,
+        "calendar_autorun_enabled": SELF_EMPLOYED_CALENDAR_AUTORUN_ENABLED,
+        "invoice_autorun_enabled": SELF_EMPLOYED_INVOICE_REMINDER_AUTORUN_ENABLED,
+        "schedulers": [
+            calendar_reminder_scheduler.stats.snapshot(),
+            invoice_reminder_scheduler.stats.snapshot(),
+        ],
+    }
+
+
 @app.post(
     "/self-employed/calendar/reminders/run",
     response_model=schemas.SelfEmployedCalendarReminderRunResponse,
@@ -4281,19 +4547,21 @@ async def generate_billing_invoice(
             for item in report.by_partner
         ],
     )
+    invoice_id = uuid.UUID(str(invoice.id))
+    await _refresh_investor_rollups(db, invoice_created_at=invoice.created_at)
 
     await log_audit_event(
         user_id=user_id,
         action="partner.billing.invoice.generated",
         details={
-            "invoice_id": str(invoice.id),
+            "invoice_id": str(invoice_id),
             "total_amount_gbp": report.total_amount_gbp,
             "currency": report.currency,
             "lines_count": len(report.by_partner),
         },
     )
 
-    return await _load_invoice_detail(db, uuid.UUID(str(invoice.id)))
+    return await _load_invoice_detail(db, invoice_id)
 
 
 @app.get("/billing/invoices", response_model=schemas.BillingInvoiceListResponse)
@@ -4393,11 +4661,12 @@ async def update_billing_invoice_status(
     previous_status = invoice.status
     if payload.status.value != invoice.status:
         invoice = await crud.update_billing_invoice_status(db, invoice, status=payload.status.value)
+        await _refresh_investor_rollups(db, invoice_created_at=invoice.created_at)
         await log_audit_event(
             user_id=user_id,
             action="partner.billing.invoice.status.updated",
             details={
-                "invoice_id": str(invoice.id),
+                "invoice_id": str(invoice_id),
                 "from_status": previous_status,
                 "to_status": payload.status.value,
             },
@@ -4534,20 +4803,23 @@ async def submit_nps_response(
     db.add(record)
     await db.commit()
     await db.refresh(record)
+    response_id = uuid.UUID(str(record.id))
+    submitted_at = record.created_at
+    await _refresh_investor_rollups(db, nps_day=investor_rollups.to_utc_date(submitted_at))
     await log_audit_event(
         user_id=user_id,
         action="investor.nps.submitted",
         details={
-            "response_id": str(record.id),
+            "response_id": str(response_id),
             "score": payload.score,
             "score_band": _nps_score_band(payload.score),
             "context_tag": context_tag,
         },
     )
     return schemas.NPSSubmissionResponse(
-        response_id=uuid.UUID(str(record.id)),
+        response_id=response_id,
         score_band=_nps_score_band(payload.score),
-        submitted_at=record.created_at,
+        submitted_at=submitted_at,
         message="NPS feedback submitted. Thank you for helping improve product quality.",
     )
 
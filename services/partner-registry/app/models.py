@@ -120,6 +120,7 @@ class SelfEmployedInvoice(Base):
         Index("ix_self_employed_invoices_due_date", "due_date"),
         Index("ix_self_employed_invoices_invoice_number", "invoice_number", unique=True),
         Index("ix_self_employed_invoices_recurring_plan_id", "recurring_plan_id"),
+        Index("ix_self_employed_invoices_status_next_fire_at", "status", "next_fire_at"),
     )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
@@ -143,6 +144,9 @@ class SelfEmployedInvoice(Base):
     brand_logo_url = Column(String(length=500), nullable=True)
     brand_accent_color = Column(String(length=16), nullable=True)
     reminder_last_sent_at = Column(DateTime(timezone=True), nullable=True)
+    next_fire_at = Column(DateTime(timezone=True), nullable=True)
+    reminder_lease_owner = Column(String(length=64), nullable=True)
+    reminder_lease_expires_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(String(length=16), nullable=False, default="draft")
     notes = Column(String(length=1000), nullable=True)
     created_at = Column(
@@ -279,6 +283,7 @@ class SelfEmployedCalendarEvent(Base):
         Index("ix_self_employed_calendar_events_user_starts_at", "user_id", "starts_at"),
         Index("ix_self_employed_calendar_events_status", "status"),
         Index("ix_self_employed_calendar_events_reminder_last_sent_at", "reminder_last_sent_at"),
+        Index("ix_self_employed_calendar_events_status_next_fire_at", "status", "next_fire_at"),
     )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
@@ -296,6 +301,9 @@ class SelfEmployedCalendarEvent(Base):
     notify_sms = Column(Integer, nullable=False, default=0)
     notify_before_minutes = Column(Integer, nullable=False, default=1440)
     reminder_last_sent_at = Column(DateTime(timezone=True), nullable=True)
+    next_fire_at = Column(DateTime(timezone=True), nullable=True)
+    reminder_lease_owner = Column(String(length=64), nullable=True)
+    reminder_lease_expires_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(String(length=16), nullable=False, default="scheduled")
     created_at = Column(
         DateTime(timezone=True),
@@ -390,3 +398,59 @@ class MarketingSpendEntry(Base):
         index=True,
     )
 
+
+
+class InvoiceNumberCounter(Base):
+    __tablename__ = "invoice_number_counters"
+    __table_args__ = (CheckConstraint("last_value >= 0", name="ck_invoice_number_counters_last_value_non_negative"),)
+
+    prefix = Column(String(length=24), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+class InvestorUserActivityRollup(Base):
+    __tablename__ = "investor_user_activity_rollups"
+    __table_args__ = (Index("ix_investor_user_activity_rollups_first_seen_date", "first_seen_date"),)
+
+    user_id = Column(String, primary_key=True)
+    first_seen_date = Column(Date, nullable=False)
+    activation_lag_days = Column(Integer, nullable=False, default=-1)
+    retained_30d = Column(Integer, nullable=False, default=0)
+    retained_60d = Column(Integer, nullable=False, default=0)
+    retained_90d = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.datetime.now(datetime.UTC),
+        onupdate=lambda: datetime.datetime.now(datetime.UTC),
+    )
+
+
+class InvestorPMFCohortDay(Base):
+    __tablename__ = "investor_pmf_cohort_days"
+
+    cohort_date = Column(Date, primary_key=True)
+    activation_lag_days = Column(Integer, primary_key=True)
+    retained_30d = Column(Integer, primary_key=True)
+    retained_60d = Column(Integer, primary_key=True)
+    retained_90d = Column(Integer, primary_key=True)
+    users = Column(Integer, nullable=False, default=0)
+
+
+class InvestorNPSDay(Base):
+    __tablename__ = "investor_nps_days"
+
+    day = Column(Date, primary_key=True)
+    responses_count = Column(Integer, nullable=False, default=0)
+    promoters_count = Column(Integer, nullable=False, default=0)
+    passives_count = Column(Integer, nullable=False, default=0)
+    detractors_count = Column(Integer, nullable=False, default=0)
+
+
+class InvestorInvoiceMonth(Base):
+    __tablename__ = "investor_invoice_months"
+
+    month_start = Column(Date, primary_key=True)
+    mrr_gbp = Column(Float, nullable=False, default=0.0)
+    active_invoice_count = Column(Integer, nullable=False, default=0)
+    paid_invoice_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,198 @@
+"""
+Lease-based reminder scheduling shared by calendar and invoice reminders.
+
+Rows carry a ``next_fire_at`` due time. Each pass claims a batch of due rows
+with a short lease (``SELECT ... FOR UPDATE SKIP LOCKED`` on Postgres), so
+replicas share the work instead of repeating it. Claimed rows are processed
+concurrently, and channel dispatches go through per-provider token buckets.
+A crashed worker's rows become claimable again once the lease expires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+ResultT = TypeVar("ResultT")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class ProviderRateLimiter:
+    """Token bucket: at most ``rate_per_second`` acquisitions per second, bursting up to ``burst``."""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = float(burst if burst is not None else max(1, int(rate_per_second)))
+        self._tokens = self.burst
+        self._clock = clock
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        if self.rate_per_second <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimiterRegistry:
+    """One limiter per provider key such as ``email:sendgrid``; rates fall back to the channel prefix."""
+
+    def __init__(self, rates_per_second: Dict[str, float], default_rate_per_second: float) -> None:
+        self._rates = rates_per_second
+        self._default_rate = default_rate_per_second
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+
+    def get(self, provider: str) -> ProviderRateLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            channel = provider.split(":", 1)[0]
+            limiter = ProviderRateLimiter(self._rates.get(provider, self._rates.get(channel, self._default_rate)))
+            self._limiters[provider] = limiter
+        return limiter
+
+    async def run(self, provider: str, dispatch: Callable[[], Awaitable[T]]) -> T:
+        await self.get(provider).acquire()
+        return await dispatch()
+
+
+@dataclass
+class ReminderSchedulerStats:
+    kind: str
+    passes: int = 0
+    claimed_total: int = 0
+    processed_total: int = 0
+    failed_total: int = 0
+    reminders_total: int = 0
+    last_pass_at: Optional[datetime.datetime] = None
+    last_pass_duration_seconds: float = 0.0
+    last_pass_claimed: int = 0
+    last_pass_max_lag_seconds: float = 0.0
+    last_pass_avg_lag_seconds: float = 0.0
+    last_pass_throughput_per_second: float = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "passes": self.passes,
+            "claimed_total": self.claimed_total,
+            "processed_total": self.processed_total,
+            "failed_total": self.failed_total,
+            "reminders_total": self.reminders_total,
+            "last_pass_at": self.last_pass_at.isoformat() if self.last_pass_at else None,
+            "last_pass_duration_seconds": round(self.last_pass_duration_seconds, 4),
+            "last_pass_claimed": self.last_pass_claimed,
+            "last_pass_max_lag_seconds": round(self.last_pass_max_lag_seconds, 3),
+            "last_pass_avg_lag_seconds": round(self.last_pass_avg_lag_seconds, 3),
+            "last_pass_throughput_per_second": round(self.last_pass_throughput_per_second, 2),
+        }
+
+
+@dataclass
+class ReminderPassResult(Generic[ResultT]):
+    claimed: int
+    results: List[ResultT] = field(default_factory=list)
+    failed: int = 0
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(tzinfo=datetime.UTC) if value.tzinfo is None else value
+
+
+class LeaseReminderScheduler(Generic[ResultT]):
+    """Claims due rows via *claim* and runs *process* on each with bounded concurrency.
+
+    ``claim(now, lease_owner, limit)`` returns ``(row_id, next_fire_at)`` pairs
+    already leased to ``lease_owner``; ``process(row_id, lease_owner)`` sends the
+    reminder (or reschedules the row) and releases the lease.
+    """
+
+    def __init__(
+        self,
+        *,
+        kind: str,
+        claim: Callable[[datetime.datetime, str, int], Awaitable[List[tuple[str, datetime.datetime]]]],
+        process: Callable[[str, str], Awaitable[ResultT]],
+        worker_id: Optional[str] = None,
+        batch_size: int = 100,
+        concurrency: int = 10,
+    ) -> None:
+        self.kind = kind
+        self._claim = claim
+        self._process = process
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size
+        self.concurrency = max(concurrency, 1)
+        self.stats = ReminderSchedulerStats(kind=kind)
+
+    async def process_many(self, row_ids: Iterable[str]) -> ReminderPassResult[ResultT]:
+        """Process already-leased rows concurrently (used by manual runs as well)."""
+        ids = list(row_ids)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run(row_id: str) -> ResultT:
+            async with semaphore:
+                return await self._process(row_id, self.worker_id)
+
+        outcomes = await asyncio.gather(*(_run(row_id) for row_id in ids), return_exceptions=True)
+        result: ReminderPassResult[ResultT] = ReminderPassResult(claimed=len(ids))
+        for row_id, outcome in zip(ids, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, BaseException):
+                result.failed += 1
+                print(f"Reminder scheduler ({self.kind}) failed for {row_id}: {outcome}")
+            else:
+                result.results.append(outcome)
+        return result
+
+    async def run_pass(self, now: Optional[datetime.datetime] = None) -> ReminderPassResult[ResultT]:
+        """Claim and process due rows batch by batch until a short batch shows nothing is left."""
+        started = time.perf_counter()
+        now = now or datetime.datetime.now(datetime.UTC)
+        total: ReminderPassResult[ResultT] = ReminderPassResult(claimed=0)
+        lags: list[float] = []
+        while True:
+            claimed = await self._claim(now, self.worker_id, self.batch_size)
+            if not claimed:
+                break
+            lags.extend(max((now - _as_utc(fire_at)).total_seconds(), 0.0) for _, fire_at in claimed)
+            batch = await self.process_many(row_id for row_id, _ in claimed)
+            total.claimed += batch.claimed
+            total.failed += batch.failed
+            total.results.extend(batch.results)
+            if len(claimed) < self.batch_size:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        stats.passes += 1
+        stats.claimed_total += total.claimed
+        stats.failed_total += total.failed
+        stats.processed_total += total.claimed - total.failed
+        stats.last_pass_at = now
+        stats.last_pass_duration_seconds = elapsed
+        stats.last_pass_claimed = total.claimed
+        stats.last_pass_max_lag_seconds = max(lags, default=0.0)
+        stats.last_pass_avg_lag_seconds = sum(lags) / len(lags) if lags else 0.0
+        stats.last_pass_throughput_per_second = total.claimed / elapsed if total.claimed and elapsed > 0 else 0.0
+        return total
@@ -0,0 +1,205 @@
+"""
+Investor rollups: incremental per-user/day/month refreshes must agree with a
+full rebuild, and PMF reads scale with cohort days rather than lead volume.
+"""
+
+import asyncio
+import datetime
+import os
+import random
+import sys
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret")
+
+from app import investor_rollups, models
+from app.database import Base
+
+BASE = datetime.datetime(2026, 1, 5, 10, 0, tzinfo=datetime.UTC)
+
+
+async def _session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rollups.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+
+def _lead(user_id: str, created_days: int, updated_days: int, status: str) -> models.HandoffLead:
+    return models.HandoffLead(
+        user_id=user_id,
+        partner_id="partner-1",
+        status=status,
+        created_at=BASE + datetime.timedelta(days=created_days),
+        updated_at=BASE + datetime.timedelta(days=updated_days),
+    )
+
+
+async def _snapshot(session) -> dict[str, list[tuple]]:
+    async def rows(model, *columns):
+        result = await session.execute(select(*columns).order_by(*columns))
+        return [tuple(row) for row in result.all()]
+
+    cohort = models.InvestorPMFCohortDay
+    return {
+        "users": await rows(
+            models.InvestorUserActivityRollup,
+            models.InvestorUserActivityRollup.user_id,
+            models.InvestorUserActivityRollup.first_seen_date,
+            models.InvestorUserActivityRollup.activation_lag_days,
+            models.InvestorUserActivityRollup.retained_30d,
+            models.InvestorUserActivityRollup.retained_60d,
+            models.InvestorUserActivityRollup.retained_90d,
+        ),
+        "cohorts": [
+            row
+            for row in await rows(
+                cohort,
+                cohort.cohort_date,
+                cohort.activation_lag_days,
+                cohort.retained_30d,
+                cohort.retained_60d,
+                cohort.retained_90d,
+                cohort.users,
+            )
+            if row[-1] > 0
+        ],
+        "nps": await rows(
+            models.InvestorNPSDay,
+            models.InvestorNPSDay.day,
+            models.InvestorNPSDay.responses_count,
+            models.InvestorNPSDay.promoters_count,
+            models.InvestorNPSDay.passives_count,
+            models.InvestorNPSDay.detractors_count,
+        ),
+        "invoices": await rows(
+            models.InvestorInvoiceMonth,
+            models.InvestorInvoiceMonth.month_start,
+            models.InvestorInvoiceMonth.mrr_gbp,
+            models.InvestorInvoiceMonth.active_invoice_count,
+            models.InvestorInvoiceMonth.paid_invoice_count,
+        ),
+    }
+
+
+def test_compute_user_activity_lag_and_retention_windows():
+    state = investor_rollups.compute_user_activity(
+        [
+            (BASE, BASE, "initiated"),
+            (BASE + datetime.timedelta(days=3), BASE + datetime.timedelta(days=5), "qualified"),
+            (BASE + datetime.timedelta(days=40), BASE + datetime.timedelta(days=95), "rejected"),
+        ]
+    )
+    assert state is not None
+    assert state.first_seen_date == BASE.date()
+    assert state.activation_lag_days == 5
+    assert (state.retained_30d, state.retained_60d, state.retained_90d) == (1, 0, 1)
+
+    inactive = investor_rollups.compute_user_activity([(BASE, BASE, "initiated")])
+    assert inactive is not None and inactive.activation_lag_days == investor_rollups.NOT_ACTIVATED
+    assert investor_rollups.compute_user_activity([]) is None
+
+
+def test_incremental_refreshes_match_full_rebuild(tmp_path):
+    async def run():
+        engine, Session = await _session_factory(tmp_path)
+        rng = random.Random(11)
+        try:
+            async with Session() as session:
+                for index in range(60):
+                    created = rng.randrange(0, 120)
+                    session.add(
+                        _lead(
+                            f"user-{index % 15}",
+                            created,
+                            created + rng.randrange(0, 60),
+                            rng.choice(["initiated", "qualified", "rejected", "converted"]),
+                        )
+                    )
+                for index in range(25):
+                    session.add(
+                        models.NPSResponse(
+                            user_id=f"user-{index}",
+                            score=index % 11,
+                            created_at=BASE + datetime.timedelta(days=index % 4, minutes=index),
+                        )
+                    )
+                for index in range(8):
+                    session.add(
+                        models.BillingInvoice(
+                            invoice_number=f"INV-TEST-{index}",
+                            generated_by_user_id="admin",
+                            due_date=BASE.date(),
+                            statuses=["qualified"],
+                            total_amount_gbp=100.0 + index,
+                            status=["generated", "paid", "void"][index % 3],
+                            created_at=BASE + datetime.timedelta(days=20 * index),
+                        )
+                    )
+                await session.commit()
+
+                for index in range(15):
+                    await investor_rollups.refresh_user_activity(session, user_id=f"user-{index}")
+                for offset in range(4):
+                    await investor_rollups.refresh_nps_day(session, day=(BASE + datetime.timedelta(days=offset)).date())
+                await investor_rollups.refresh_investor_rollups_since(session, since=BASE - datetime.timedelta(days=1))
+
+                # Moving a user between cohort buckets and dropping another entirely.
+                await session.execute(
+                    update(models.HandoffLead)
+                    .where(models.HandoffLead.user_id == "user-3")
+                    .values(status="converted", updated_at=BASE + datetime.timedelta(days=200))
+                )
+                await session.execute(
+                    update(models.HandoffLead).where(models.HandoffLead.user_id == "user-4").values(user_id="user-99")
+                )
+                await session.commit()
+                for user_id in ("user-3", "user-4", "user-99"):
+                    await investor_rollups.refresh_user_activity(session, user_id=user_id)
+                # Refreshing twice must not double-count.
+                await investor_rollups.refresh_user_activity(session, user_id="user-3")
+                incremental = await _snapshot(session)
+
+                counts = await investor_rollups.rebuild_investor_rollups(session)
+                rebuilt = await _snapshot(session)
+            return incremental, rebuilt, counts
+        finally:
+            await engine.dispose()
+
+    incremental, rebuilt, counts = asyncio.run(run())
+    assert incremental == rebuilt
+    assert counts["users"] == 15
+    assert counts["nps_days"] == 4
+    assert sum(users for *_, users in rebuilt["cohorts"]) == 15
+    assert "user-4" not in {row[0] for row in rebuilt["users"]}
+    assert all(active > 0 for _, _, active, _ in rebuilt["invoices"])
+
+
+def test_pmf_cohort_reads_do_not_grow_with_lead_volume(tmp_path):
+    async def run():
+        engine, Session = await _session_factory(tmp_path)
+        try:
+            async with Session() as session:
+                session.add_all(
+                    _lead(f"user-{index}", index % 30, index % 30 + index % 50, "qualified")
+                    for index in range(3_000)
+                )
+                await session.commit()
+                await investor_rollups.rebuild_investor_rollups(session)
+                cohort_days = await investor_rollups.load_pmf_cohort_days(
+                    session,
+                    cohort_start=BASE.date(),
+                    as_of_date=(BASE + datetime.timedelta(days=365)).date(),
+                )
+            return cohort_days
+        finally:
+            await engine.dispose()
+
+    cohort_days = asyncio.run(run())
+    assert sum(row.users for row in cohort_days) == 3_000
+    assert len({row.cohort_date for row in cohort_days}) == 30
+    assert len(cohort_days) <= 30 * 50
@@ -0,0 +1,152 @@
+"""
+Invoice number allocation: seeding, rollback and a concurrency benchmark.
+
+The default run checks 400 invoices from 20 concurrent tasks are gap-free and
+unique. The full benchmark (10k invoices from 50 tasks, about a minute) runs
+only with RUN_SLOW_TESTS=1; add ``-s`` to see the throughput.
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import crud, models
+from app.database import Base
+
+ISSUE_DATE = datetime.date(2026, 3, 14)
+
+
+async def _session_factory(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'invoices.db'}",
+        connect_args={"timeout": 60},
+        # A few real connections so transactions genuinely overlap; SQLite still
+        # serialises writers, which keeps the benchmark deterministic enough.
+        pool_size=4,
+        max_overflow=0,
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _wal(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+
+async def _create_invoice(session: AsyncSession, user_id: str) -> str:
+    invoice = await crud.create_self_employed_invoice(
+        session,
+        user_id=user_id,
+        customer_name="Acme Ltd",
+        customer_email=None,
+        customer_phone=None,
+        customer_address=None,
+        issue_date=ISSUE_DATE,
+        due_date=ISSUE_DATE + datetime.timedelta(days=14),
+        currency="GBP",
+        tax_rate_percent=20.0,
+        notes=None,
+        payment_link_url=None,
+        payment_link_provider=None,
+        recurring_plan_id=None,
+        brand_business_name=None,
+        brand_logo_url=None,
+        brand_accent_color=None,
+        lines=[{"description": "Consulting", "quantity": 1, "unit_price_gbp": 100.0}],
+    )
+    return str(invoice.invoice_number)
+
+
+def test_counter_is_seeded_from_existing_numbers_and_rolls_back(tmp_path):
+    async def run():
+        engine, Session = await _session_factory(tmp_path)
+        try:
+            async with Session() as session:
+                session.add(
+                    models.BillingInvoice(
+                        invoice_number="INV-202603-000041",
+                        generated_by_user_id="admin",
+                        due_date=ISSUE_DATE,
+                        currency="GBP",
+                        total_amount_gbp=10.0,
+                        statuses=["qualified"],
+                        status="generated",
+                    )
+                )
+                await session.commit()
+
+            async with Session() as session:
+                first = await crud._next_invoice_number(session, invoice_date=ISSUE_DATE)
+                await session.commit()
+            async with Session() as session:
+                rolled_back = await crud._next_invoice_number(session, invoice_date=ISSUE_DATE)
+                await session.rollback()
+            async with Session() as session:
+                after_rollback = await crud._next_invoice_number(session, invoice_date=ISSUE_DATE)
+                next_month = await crud._next_invoice_number(session, invoice_date=datetime.date(2026, 4, 1))
+                await session.commit()
+            return first, rolled_back, after_rollback, next_month
+        finally:
+            await engine.dispose()
+
+    first, rolled_back, after_rollback, next_month = asyncio.run(run())
+    assert first == "INV-202603-000042"
+    assert rolled_back == after_rollback == "INV-202603-000043"
+    assert next_month == "INV-202604-000001"
+
+
+RUN_SLOW_TESTS = os.getenv("RUN_SLOW_TESTS", "").lower() in {"1", "true", "yes"}
+
+
+@pytest.mark.parametrize(
+    "tasks,per_task",
+    [
+        (20, 20),
+        pytest.param(
+            50, 200, marks=pytest.mark.skipif(not RUN_SLOW_TESTS, reason="set RUN_SLOW_TESTS=1 for the 10k benchmark")
+        ),
+    ],
+)
+def test_concurrent_allocation_is_gap_free_benchmark(tmp_path, tasks, per_task):
+    async def run():
+        engine, Session = await _session_factory(tmp_path)
+
+        async def worker(worker_id: int) -> list[str]:
+            numbers = []
+            for _ in range(per_task):
+                async with Session() as session:
+                    numbers.append(await _create_invoice(session, f"user-{worker_id}"))
+            return numbers
+
+        try:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(worker(i) for i in range(tasks)))
+            elapsed = time.perf_counter() - started
+            async with Session() as session:
+                stored = (await session.execute(select(models.SelfEmployedInvoice.invoice_number))).scalars().all()
+            return [n for batch in results for n in batch], list(stored), elapsed
+        finally:
+            await engine.dispose()
+
+    numbers, stored, elapsed = asyncio.run(run())
+    total = tasks * per_task
+    print(f"\ninvoice numbers: {total} invoices from {tasks} tasks in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+
+    assert len(numbers) == len(set(numbers)) == total
+    assert sorted(stored) == sorted(numbers)
+    sequences = sorted(int(n.rsplit("-", 1)[1]) for n in numbers)
+    assert sequences == list(range(1, total + 1))
@@ -18,7 +18,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 os.environ.setdefault("AUTH_SECRET_KEY", "test-secret")
 os.environ["AUTO_CREATE_SCHEMA"] = "true"
 
-from app import crud, models
+from app import crud, investor_rollups, models
 from app.database import Base, get_db
 from app.main import app
 
@@ -92,6 +92,8 @@ async def _set_lead_timestamps(
             update(models.HandoffLead).where(models.HandoffLead.id == lead_id).values(**values)
         )
         await session.commit()
+        # Direct table edits bypass the write paths that keep investor rollups current.
+        await investor_rollups.rebuild_investor_rollups(session)
 
 
 def patch_lead_timestamps(
@@ -120,6 +122,7 @@ async def _set_nps_timestamp(response_id: str, *, created_days_ago: int) -> None
             .values(created_at=now - datetime.timedelta(days=created_days_ago))
         )
         await session.commit()
+        await investor_rollups.rebuild_investor_rollups(session)
 
 
 def patch_nps_timestamp(response_id: str, *, created_days_ago: int) -> None:
@@ -145,6 +148,7 @@ async def _set_invoice_snapshot(
             )
         )
         await session.commit()
+        await investor_rollups.rebuild_investor_rollups(session)
 
 
 def patch_invoice_snapshot(
@@ -0,0 +1,186 @@
+"""
+Lease-based reminder scheduler: disjoint claims across workers, provider rate
+limits and a scheduled invoice pass that reschedules rows via next_fire_at.
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret")
+
+from app import crud, models
+from app import main as app_main
+from app.database import Base
+from app.reminder_scheduler import ProviderRateLimiter, RateLimiterRegistry
+
+NOW = datetime.datetime(2026, 3, 14, 9, 0, tzinfo=datetime.UTC)
+INVOICE_IDS = [str(uuid.UUID(int=number + 1)) for number in range(4)]
+
+
+async def _session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reminders.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+
+def _calendar_event(index: int, fire_at: datetime.datetime) -> models.SelfEmployedCalendarEvent:
+    return models.SelfEmployedCalendarEvent(
+        user_id=f"user-{index % 3}",
+        title=f"Event {index}",
+        starts_at=fire_at + datetime.timedelta(hours=1),
+        category="general",
+        notify_in_app=1,
+        notify_email=0,
+        notify_sms=0,
+        notify_before_minutes=60,
+        next_fire_at=fire_at,
+        status="scheduled",
+    )
+
+
+def test_workers_claim_disjoint_batches_until_leases_expire(tmp_path):
+    async def run():
+        engine, Session = await _session_factory(tmp_path)
+        try:
+            async with Session() as session:
+                session.add_all(_calendar_event(i, NOW - datetime.timedelta(minutes=i)) for i in range(30))
+                session.add(_calendar_event(99, NOW + datetime.timedelta(hours=2)))
+                await session.commit()
+
+            async def claim(owner: str) -> list[tuple[str, datetime.datetime]]:
+                async with Session() as session:
+                    return await crud.claim_due_reminder_rows(
+                        session,
+                        models.SelfEmployedCalendarEvent,
+                        statuses=["scheduled"],
+                        now=NOW,
+                        lease_owner=owner,
+                        lease_seconds=60,
+                        limit=20,
+                    )
+
+            first, second = await claim("worker-a"), await claim("worker-b")
+            third = await claim("worker-c")
+
+            async with Session() as session:
+                reclaimed = await crud.claim_due_reminder_rows(
+                    session,
+                    models.SelfEmployedCalendarEvent,
+                    statuses=["scheduled"],
+                    now=NOW + datetime.timedelta(seconds=61),
+                    lease_owner="worker-c",
+                    lease_seconds=60,
+                    limit=100,
+                )
+            return first, second, third, reclaimed
+        finally:
+            await engine.dispose()
+
+    first, second, third, reclaimed = asyncio.run(run())
+    first_ids = {row_id for row_id, _ in first}
+    second_ids = {row_id for row_id, _ in second}
+    assert len(first_ids) == 20 and len(second_ids) == 10
+    assert not first_ids & second_ids
+    assert third == []
+    # Oldest due rows are claimed first.
+    assert [fire_at for _, fire_at in first] == sorted(fire_at for _, fire_at in first)
+    # Expired leases make every due row claimable again; the future event never is.
+    assert {row_id for row_id, _ in reclaimed} == first_ids | second_ids
+
+
+def test_rate_limiter_spaces_dispatches_per_provider():
+    registry = RateLimiterRegistry({"email": 50.0, "sms": 5.0}, default_rate_per_second=1.0)
+    assert registry.get("email:sendgrid").rate_per_second == 50.0
+    assert registry.get("sms:twilio").rate_per_second == 5.0
+    assert registry.get("push:fcm").rate_per_second == 1.0
+    assert registry.get("email:sendgrid") is registry.get("email:sendgrid")
+
+    async def run() -> float:
+        limiter = ProviderRateLimiter(20.0, burst=1)
+        started = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(11)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.45  # ten refills at 20/s after the initial token
+
+
+def test_scheduled_invoice_pass_sends_once_and_reschedules(tmp_path, monkeypatch):
+    async def run():
+        engine, Session = await _session_factory(tmp_path)
+        monkeypatch.setattr(app_main, "AsyncSessionLocal", Session)
+        monkeypatch.setattr(app_main, "SELF_EMPLOYED_REMINDER_EMAIL_ENABLED", False)
+        monkeypatch.setattr(app_main, "SELF_EMPLOYED_REMINDER_SMS_ENABLED", False)
+        now = datetime.datetime.now(datetime.UTC)
+        today = now.date()
+        try:
+            async with Session() as session:
+                for number, (status, due_date) in enumerate(
+                    [
+                        ("issued", today + datetime.timedelta(days=1)),
+                        ("issued", today - datetime.timedelta(days=2)),
+                        ("issued", today + datetime.timedelta(days=20)),
+                        ("paid", today),
+                    ]
+                ):
+                    session.add(
+                        models.SelfEmployedInvoice(
+                            id=INVOICE_IDS[number],
+                            user_id="user-1",
+                            invoice_number=f"SE-TEST-{number}",
+                            customer_name="Acme Ltd",
+                            issue_date=today - datetime.timedelta(days=30),
+                            due_date=due_date,
+                            currency="GBP",
+                            subtotal_gbp=100.0,
+                            tax_rate_percent=0.0,
+                            tax_amount_gbp=0.0,
+                            total_amount_gbp=100.0,
+                            status=status,
+                            next_fire_at=now - datetime.timedelta(minutes=5),
+                        )
+                    )
+                await session.commit()
+
+            scheduler = app_main.invoice_reminder_scheduler
+            first = await scheduler.run_pass()
+            second = await scheduler.run_pass()
+
+            async with Session() as session:
+                invoices = {
+                    item.id: item for item in (await session.execute(select(models.SelfEmployedInvoice))).scalars()
+                }
+                total, events = await crud.list_invoice_reminder_events_for_user(
+                    session, user_id="user-1", limit=50, offset=0
+                )
+            return now, first, second, invoices, total, events
+        finally:
+            await engine.dispose()
+
+    now, first, second, invoices, total, events = asyncio.run(run())
+    assert first.claimed == 3  # the paid invoice is never claimed
+    assert first.failed == 0
+    assert second.claimed == 0
+    assert total == 2
+    assert {(event.invoice_id, event.reminder_type) for event in events} == {
+        (INVOICE_IDS[0], "due_soon"),
+        (INVOICE_IDS[1], "overdue"),
+    }
+    assert invoices[INVOICE_IDS[1]].status == "overdue"
+    for invoice_id in INVOICE_IDS[:2]:
+        invoice = invoices[invoice_id]
+        assert invoice.reminder_lease_owner is None
+        assert invoice.next_fire_at.replace(tzinfo=datetime.UTC) >= now + datetime.timedelta(hours=23)
+    # Not due yet: released back to the due-soon window without sending.
+    assert invoices[INVOICE_IDS[2]].next_fire_at.date() == invoices[INVOICE_IDS[2]].due_date - datetime.timedelta(days=3)
+    assert invoices[INVOICE_IDS[3]].next_fire_at is not None  # untouched, but never claimable while paid
@@ -1,6 +1,7 @@
 import os
+import tempfile
 os.environ["AUTH_SECRET_KEY"] = "test-secret"
-os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///test.db"
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="referral-tests-"), "test.db")
 os.environ["INTERNAL_SERVICE_SECRET"] = "referral-internal-test"
 
 from unittest.mock import AsyncMock, patch, MagicMock
@@ -23,6 +23,10 @@ Endpoints:
   POST /admin/regulatory/validate-ai-diff   — GPT plausibility on diff between two frozen tax years
   POST /rules/analyze-user                  — AI: personalised impact analysis
   GET  /rules/versions                      — rule file versions and status
+  POST /admin/regulatory/reload-rules       — re-read rule files, publish changed versions
+
+Rule documents are content-hashed: /rules/tax-year/{year} and /rules/active
+send the version as ETag (and X-Rules-Version) and answer If-None-Match with 304.
 """
 
 from __future__ import annotations
@@ -40,7 +44,7 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -52,6 +56,13 @@ for _rp in Path(__file__).resolve().parents:
         break
 
 from libs.shared_http.request_id import RequestIdMiddleware
+from libs.shared_rules.distribution import (
+    RULES_VERSION_HEADER,
+    RulesChangePublisher,
+    RulesDocument,
+    etag_matches,
+    quote_etag,
+)
 
 from app.collector import GOVUK_WATCH_SOURCES, check_govuk_sources_for_updates, fetch_and_extract_govuk_page
 from app.collector.govuk_scraper import fetch_html, scrape_and_parse
@@ -74,6 +85,7 @@ GOVUK_WATCH_STATE_PATH = DATA_DIR / "govuk_content_watch.json"
 RULES_CHANGELOG_PATH = DATA_DIR / "rules_changelog.json"
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 SKIP_EXTERNAL_GOVUK_WATCH = os.environ.get("REGULATORY_SKIP_EXTERNAL_WATCH", "").strip() in ("1", "true", "yes")
+REGULATORY_REDIS_URL = os.environ.get("REGULATORY_REDIS_URL", "").strip()
 
 # ── Tax year JSON files available ───────────────────────────────────────────
 _RULE_FILES: Dict[str, str] = {
@@ -82,7 +94,11 @@ _RULE_FILES: Dict[str, str] = {
     "2026-27": "uk_tax_2026_27.json",
 }
 
+# Parsed rules are shared by every endpoint and must be treated as read-only;
+# _rules_documents holds their serialised bytes and content version.
 _rules_cache: Dict[str, Dict[str, Any]] = {}
+_rules_documents: Dict[str, RulesDocument] = {}
+_rules_publisher = RulesChangePublisher(REGULATORY_REDIS_URL)
 
 # ── In-memory stores (reset on restart) ─────────────────────────────────────
 _audit_log: List[Dict[str, Any]] = []
@@ -112,6 +128,39 @@ def _load_rules(tax_year: str) -> Dict[str, Any]:
     return data
 
 
+def _rules_document(tax_year: str) -> RulesDocument:
+    doc = _rules_documents.get(tax_year)
+    if doc is None:
+        doc = RulesDocument.from_rules(tax_year, _load_rules(tax_year))
+        _rules_documents[tax_year] = doc
+    return doc
+
+
+def _conditional_json(body: bytes, etag: str, version: str, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": etag, RULES_VERSION_HEADER: version, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _reload_rules() -> Dict[str, Dict[str, Optional[str]]]:
+    """Re-read every rule file; publish a change notification for each new version."""
+    changes: Dict[str, Dict[str, Optional[str]]] = {}
+    for year in _RULE_FILES:
+        previous = _rules_documents.get(year)
+        _rules_cache.pop(year, None)
+        _rules_documents.pop(year, None)
+        try:
+            doc = _rules_document(year)
+        except HTTPException as exc:
+            logger.warning("regulatory: could not reload rules for %s: %s", year, exc.detail)
+            continue
+        if previous is None or previous.version != doc.version:
+            changes[year] = {"previous": previous.version if previous else None, "version": doc.version}
+            await _rules_publisher.publish(year, doc.version)
+    return changes
+
+
 def _tax_year_for_date(d: date) -> str:
     """Return the UK tax year string (e.g. '2025-26') for a given date."""
     if d >= date(d.year, 4, 6):
@@ -301,9 +350,17 @@ async def lifespan(app_instance: FastAPI):
         await _monitor_hmrc_changes()
     else:
         logger.info("REGULATORY_SKIP_EXTERNAL_WATCH set — GOV.UK RSS/Content API checks disabled")
+    # Announce the versions this instance serves so consumers holding rules from
+    # before a deploy drop them.
+    for y in _RULE_FILES:
+        try:
+            await _rules_publisher.publish(y, _rules_document(y).version)
+        except HTTPException:
+            pass
     yield
     if not SKIP_EXTERNAL_GOVUK_WATCH:
         _scheduler.shutdown(wait=False)
+    await _rules_publisher.close()
 
 
 app = FastAPI(
@@ -380,6 +437,7 @@ class RuleVersion(BaseModel):
     source: str
     effective_from: str
     effective_to: str
+    content_version: str = ""
 
 
 # ── Health ───────────────────────────────────────────────────────────────────
@@ -393,20 +451,28 @@ async def health():
 # ── REG.3: Full rules for a tax year ─────────────────────────────────────────
 
 @app.get("/rules/tax-year/{year}")
-async def get_tax_year_rules(year: str) -> Dict[str, Any]:
+async def get_tax_year_rules(
+    year: str,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
     """
     Return complete UK tax rules for a given tax year.
     Format: '2025-26', '2024-25', '2026-27'
+
+    The body is serialised once per rule version; send the ETag back as
+    If-None-Match to get a 304 when the rules have not changed.
     """
-    return _load_rules(year)
+    doc = _rules_document(year)
+    return _conditional_json(doc.body, doc.etag, doc.version, if_none_match)
 
 
 # ── REG.4: Rules active on a specific date ───────────────────────────────────
 
 @app.get("/rules/active")
 async def get_active_rules(
-    date_str: Optional[str] = Query(None, alias="date", description="ISO date e.g. 2026-04-06")
-) -> Dict[str, Any]:
+    date_str: Optional[str] = Query(None, alias="date", description="ISO date e.g. 2026-04-06"),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
     """Return the tax rules that are active on the given date (default: today)."""
     if date_str:
         try:
@@ -417,10 +483,14 @@ async def get_active_rules(
         d = date.today()
 
     tax_year = _tax_year_for_date(d)
-    rules = _load_rules(tax_year)
-    rules["_query_date"] = d.isoformat()
-    rules["_resolved_tax_year"] = tax_year
-    return rules
+    doc = _rules_document(tax_year)
+    etag = quote_etag(f"{doc.version}-{d.isoformat()}")
+    if etag_matches(if_none_match, etag):
+        return _conditional_json(b"", etag, doc.version, if_none_match)
+    # Copy, never annotate the shared cached rules in place.
+    rules = {**_load_rules(tax_year), "_query_date": d.isoformat(), "_resolved_tax_year": tax_year}
+    body = json.dumps(rules, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return _conditional_json(body, etag, doc.version, None)
 
 
 # ── REG.5: MTD obligation check ──────────────────────────────────────────────
@@ -481,6 +551,8 @@ async def get_deadlines(
     if type_filter:
         deadlines = [d for d in deadlines if d.get("type") == type_filter]
     today = date.today().isoformat()
+    # Annotate copies: the cached rules (and their content version) stay untouched.
+    deadlines = [dict(d) for d in deadlines]
     for dl in deadlines:
         dl_date = dl.get("date", "")
         if dl_date:
@@ -831,6 +903,7 @@ async def get_rule_versions() -> List[RuleVersion]:
                 source=rules.get("source", ""),
                 effective_from=rules.get("effective_from", ""),
                 effective_to=rules.get("effective_to", ""),
+                content_version=_rules_document(year).version,
             ))
         except Exception:
             pass
@@ -1203,6 +1276,24 @@ async def reject_rule_update(update_id: str, rejected_by: str = Query("owner"))
     return {"status": "rejected", "update_id": update_id}
 
 
+@app.post("/admin/regulatory/reload-rules")
+async def reload_rules(actor: str = Query("owner")) -> Dict[str, Any]:
+    """Re-read the rule files after an approved edit and notify consumers of changed versions."""
+    changes = await _reload_rules()
+    if changes:
+        _audit_log.append({
+            "id": str(uuid.uuid4()),
+            "event": "rules_reloaded",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "detail": f"Rule versions changed for {', '.join(sorted(changes))}",
+            "actor": actor,
+        })
+    return {
+        "changed": changes,
+        "versions": {year: doc.version for year, doc in _rules_documents.items()},
+    }
+
+
 # ── REG.14: User notification dispatch ───────────────────────────────────────
 
 class NotificationRequest(BaseModel):
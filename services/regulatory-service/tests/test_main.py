@@ -73,6 +73,51 @@ def test_get_active_rules_bad_date():
     assert resp.status_code == 400
 
 
+def test_tax_year_rules_etag_and_conditional_fetch():
+    resp = client.get("/rules/tax-year/2025-26")
+    etag = resp.headers["etag"]
+    assert etag == f'"{resp.headers["x-rules-version"]}"'
+
+    not_modified = client.get("/rules/tax-year/2025-26", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert client.get("/rules/tax-year/2025-26", headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert client.get("/rules/tax-year/2024-25").headers["etag"] != etag
+
+
+def test_active_rules_do_not_leak_into_cached_rules():
+    client.get("/rules/active?date=2026-04-10")
+    rules = client.get("/rules/tax-year/2026-27").json()
+    assert "_query_date" not in rules
+    assert "_resolved_tax_year" not in rules
+
+    resp = client.get("/rules/active?date=2026-04-10")
+    again = client.get("/rules/active?date=2026-04-10", headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+    assert client.get("/rules/active?date=2026-04-11").headers["etag"] != resp.headers["etag"]
+
+
+def test_reload_rules_publishes_only_changed_versions():
+    from app import main as app_main
+
+    before = client.get("/rules/tax-year/2025-26").headers["etag"]
+    published = []
+
+    async def _publish(year, version):
+        published.append((year, version))
+        return 1
+
+    with patch.object(app_main._rules_publisher, "publish", new=_publish):
+        client.post("/admin/regulatory/reload-rules")
+        published.clear()
+        assert client.post("/admin/regulatory/reload-rules").json()["changed"] == {}
+        app_main._rules_documents["2025-26"] = app_main.RulesDocument("2025-26", "old", b"{}")
+        resp = client.post("/admin/regulatory/reload-rules")
+
+    assert resp.json()["changed"] == {"2025-26": {"previous": "old", "version": before.strip('"')}}
+    assert published == [("2025-26", before.strip('"'))]
+
+
 def test_mtd_threshold_below():
     resp = client.get("/rules/mtd/threshold?income=30000&year=2025-26")
     assert resp.status_code == 200
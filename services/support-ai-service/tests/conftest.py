@@ -0,0 +1,10 @@
+"""
+Point the support ticket store at a temp directory before app.models is
+imported, so test runs never leave support.db in the service tree.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="support-ai-tests-")
+os.environ.setdefault("SUPPORT_DB_PATH", os.path.join(_db_dir, "support.db"))
@@ -0,0 +1,209 @@
+"""
+Vectorised tax engine for scenario sweeps ("what if I claim £X more expenses",
+pricing simulations, lender matrices).
+
+Each function evaluates N scenarios at once with NumPy and mirrors one scalar
+function operation for operation, so every element equals what the scalar
+path returns for that scenario (same IEEE operations in the same order):
+
+  self_employed_tax_batch   — calculators.calculate_self_employed_tax (unrounded)
+  income_tax_from_bands_batch — main._income_tax_from_bands
+  class4_nic_batch          — main._class4_nic_from_rates
+
+Rounding is left to the caller so the API can round exactly like the scalar
+response models do.
+"""
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .calculators import (
+    _BRT,
+    _BRT_LIMIT,
+    _ART,
+    _HRT,
+    _HRT_LIMIT,
+    _NI_C4_ADD,
+    _NI_C4_MAIN,
+    _NI_LPL,
+    _NI_UPL,
+    _PA,
+    _STUDENT_LOAN_PLANS,
+    _TRADING_ALLOWANCE,
+)
+
+_ADDITIONAL_BAND_NAMES = ("additional", "advanced", "top")
+
+# Field order of calculators.UKSelfEmployedTaxResult.
+SELF_EMPLOYED_RESULT_FIELDS = (
+    "gross_trading_income",
+    "trading_allowance_used",
+    "allowable_expenses_used",
+    "net_profit",
+    "losses_brought_forward_used",
+    "adjusted_profit",
+    "personal_allowance",
+    "pa_taper_reduction",
+    "marriage_allowance_received",
+    "taxable_income",
+    "basic_rate_tax",
+    "higher_rate_tax",
+    "additional_rate_tax",
+    "total_income_tax",
+    "ni_class2",
+    "ni_class4_main",
+    "ni_class4_additional",
+    "total_ni",
+    "student_loan_repayment",
+    "pension_tax_relief",
+    "total_tax_and_ni",
+    "payment_on_account_jan",
+    "payment_on_account_jul",
+    "net_take_home",
+    "effective_tax_rate_percent",
+)
+
+
+def _column(value: Any, n: int, dtype: Any = np.float64) -> np.ndarray:
+    arr = np.asarray(value, dtype=dtype)
+    if arr.ndim == 0:
+        return np.full(n, arr, dtype=dtype)
+    if arr.shape != (n,):
+        raise ValueError(f"expected {n} values, got {arr.shape[0]}")
+    return arr
+
+
+def personal_allowance_batch(total_income: np.ndarray) -> np.ndarray:
+    """calculators._personal_allowance: PA tapers £1 for every £2 over £100,000."""
+    taper_threshold = 100_000.0
+    reduction = (total_income - taper_threshold) / 2.0
+    return np.where(total_income <= taper_threshold, _PA, np.maximum(_PA - reduction, 0.0))
+
+
+def self_employed_tax_batch(
+    gross_trading_income: Sequence[float] | np.ndarray,
+    allowable_expenses: Sequence[float] | np.ndarray | float = 0.0,
+    pension_contributions: Sequence[float] | np.ndarray | float = 0.0,
+    student_loan_plan: Optional[str] = None,
+    marriage_allowance_received: Sequence[float] | np.ndarray | float = 0.0,
+    losses_brought_forward: Sequence[float] | np.ndarray | float = 0.0,
+    use_trading_allowance: Sequence[bool] | np.ndarray | bool = False,
+) -> dict[str, np.ndarray]:
+    """N scenarios of the 2025/26 self-employed calculation; scalars broadcast to every scenario."""
+    gross = np.asarray(gross_trading_income, dtype=np.float64).reshape(-1)
+    n = gross.shape[0]
+    expenses = _column(allowable_expenses, n)
+    pension = _column(pension_contributions, n)
+    marriage = _column(marriage_allowance_received, n)
+    losses = _column(losses_brought_forward, n)
+    use_ta = _column(use_trading_allowance, n, dtype=bool)
+
+    # 1. Net profit
+    ta_applies = use_ta & (expenses < _TRADING_ALLOWANCE)
+    trading_allowance_used = np.where(ta_applies, np.minimum(gross, _TRADING_ALLOWANCE), 0.0)
+    expenses_used = np.where(ta_applies, 0.0, expenses)
+    net_profit = np.maximum(gross - trading_allowance_used - expenses_used, 0.0)
+
+    # 2. Losses brought forward
+    loss_used = np.minimum(losses, net_profit)
+    adjusted_profit = net_profit - loss_used
+
+    # 3. Pension tax relief
+    pension_relief = pension * _BRT
+
+    # 4. Personal allowance
+    pa = personal_allowance_batch(adjusted_profit - pension)
+    pa_reduction = _PA - pa
+    effective_pa = np.minimum(pa + marriage, adjusted_profit)
+
+    # 5. Income tax
+    taxable = np.maximum(adjusted_profit - pension - effective_pa, 0.0)
+    basic = np.minimum(taxable, _BRT_LIMIT) * _BRT
+    higher = np.maximum(np.minimum(taxable, _HRT_LIMIT) - _BRT_LIMIT, 0) * _HRT
+    additional = np.maximum(taxable - _HRT_LIMIT, 0) * _ART
+    income_tax = basic + higher + additional
+
+    # 6/7. Class 2 (nil in-year cash) and Class 4 NI
+    ni_c2 = np.zeros(n)
+    ni_c4_main = np.maximum(np.minimum(adjusted_profit, _NI_UPL) - _NI_LPL, 0.0) * _NI_C4_MAIN
+    ni_c4_add = np.maximum(adjusted_profit - _NI_UPL, 0.0) * _NI_C4_ADD
+    total_ni = ni_c2 + ni_c4_main + ni_c4_add
+
+    # 8. Student loan
+    sl_repayment = np.zeros(n)
+    sl_key = (student_loan_plan or "").strip().lower().replace("-", "_")
+    if sl_key in _STUDENT_LOAN_PLANS:
+        threshold, rate = _STUDENT_LOAN_PLANS[sl_key]
+        sl_repayment = np.maximum(adjusted_profit - threshold, 0.0) * rate
+
+    # 9/10. Totals and payments on account (rounded by the caller)
+    total_tax_ni = income_tax + total_ni + sl_repayment
+    poa = (income_tax + total_ni) * 0.50
+    net_take_home = gross - expenses_used - total_tax_ni
+    effective_rate = np.zeros(n)
+    np.divide(total_tax_ni, gross, out=effective_rate, where=gross > 0)
+    effective_rate = np.where(gross > 0, effective_rate * 100, 0.0)
+
+    return {
+        "gross_trading_income": gross,
+        "trading_allowance_used": trading_allowance_used,
+        "allowable_expenses_used": expenses_used,
+        "net_profit": net_profit,
+        "losses_brought_forward_used": loss_used,
+        "adjusted_profit": adjusted_profit,
+        "personal_allowance": pa,
+        "pa_taper_reduction": pa_reduction,
+        "marriage_allowance_received": marriage,
+        "taxable_income": taxable,
+        "basic_rate_tax": basic,
+        "higher_rate_tax": higher,
+        "additional_rate_tax": additional,
+        "total_income_tax": income_tax,
+        "ni_class2": ni_c2,
+        "ni_class4_main": ni_c4_main,
+        "ni_class4_additional": ni_c4_add,
+        "total_ni": total_ni,
+        "student_loan_repayment": sl_repayment,
+        "pension_tax_relief": pension_relief,
+        "total_tax_and_ni": total_tax_ni,
+        "payment_on_account_jan": poa,
+        "payment_on_account_jul": poa,
+        "net_take_home": net_take_home,
+        "effective_tax_rate_percent": effective_rate,
+    }
+
+
+def income_tax_from_bands_batch(
+    taxable_after_pa: Sequence[float] | np.ndarray,
+    bands: Sequence[Mapping[str, Any]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(basic, higher, additional) tax for each taxable amount, band by band in ``from`` order."""
+    taxable = np.asarray(taxable_after_pa, dtype=np.float64).reshape(-1)
+    basic = np.zeros_like(taxable)
+    higher = np.zeros_like(taxable)
+    additional = np.zeros_like(taxable)
+    for band in sorted(bands, key=lambda b: float(b["from"])):
+        lo = float(band["from"])
+        hi = float(band["to"]) if band.get("to") is not None else float("inf")
+        rate = float(band["rate"])
+        chunk = np.maximum(0.0, np.minimum(taxable, hi) - lo)
+        amt = np.where(chunk > 0, chunk * rate, 0.0)
+        name = band.get("name", "")
+        if name == "higher":
+            higher += amt
+        elif name in _ADDITIONAL_BAND_NAMES:
+            additional += amt
+        else:
+            basic += amt
+    return basic, higher, additional
+
+
+def class4_nic_batch(taxable_profit: Sequence[float] | np.ndarray, rates: Mapping[str, Any]) -> np.ndarray:
+    profit = np.asarray(taxable_profit, dtype=np.float64).reshape(-1)
+    lpl = float(rates["class4_lpl"])
+    upl = float(rates["class4_upl"])
+    main_band = np.maximum(np.minimum(profit, upl) - lpl, 0.0) * float(rates["class4_main"])
+    add_band = np.maximum(profit - upl, 0.0) * float(rates["class4_add"])
+    return np.where(profit <= lpl, 0.0, main_band + add_band)
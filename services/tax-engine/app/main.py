@@ -1,3 +1,5 @@
+import asyncio
+import bisect
 import contextvars
 import datetime
 import logging
@@ -5,14 +7,16 @@ import os
 import sys
 import json
 import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, List, Optional, Literal
+from typing import Any, List, Mapping, Optional, Literal
 
 import httpx
 from fastapi import Depends, FastAPI, Header, HTTPException, Response, status
 from jose import jwt as jose_jwt
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, generate_latest
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 from .calculate_extended import (
     build_estimate_disclaimers,
@@ -23,12 +27,14 @@ from .calculate_extended import (
     rough_employee_class1_annual,
     student_loan_repayment_annual,
 )
+from .batch import SELF_EMPLOYED_RESULT_FIELDS, self_employed_tax_batch
 from .calculators import (
     UKSelfEmployedTaxResult,
     calculate_crypto_tax,
     calculate_dividend_tax,
     calculate_self_employed_tax,
 )
+from .result_cache import PeriodResultCache
 from .telemetry import setup_telemetry
 
 logger = logging.getLogger(__name__)
@@ -48,34 +54,89 @@ INTEGRATIONS_INTERNAL_BASE_URL = os.getenv(
     "http://integrations-service:80",
 ).strip().rstrip("/")
 COMPLIANCE_SERVICE_URL = (os.getenv("COMPLIANCE_SERVICE_URL") or "").strip()
+TAX_BATCH_MAX_SCENARIOS = int(os.getenv("TAX_BATCH_MAX_SCENARIOS", "10000"))
+TAX_RESULT_CACHE_TTL = float(os.getenv("TAX_RESULT_CACHE_TTL", "300"))
+TAX_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("TAX_RESULT_CACHE_MAX_ENTRIES", "5000"))
 
-# ── Regulatory rates: TTL cache from regulatory-service; merge with fallback. ─
-_REGULATORY_RULES_CACHE: dict[str, tuple[float, dict[str, Any]]] = {}
+_calculation_cache = PeriodResultCache(
+    max_entries=TAX_RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=TAX_RESULT_CACHE_TTL,
+)
+
+# ── Regulatory rates: compiled once per rule version, revalidated with ETags. ─
+# Each tax year's rules are merged with the fallback and frozen into a
+# CompiledRates the first time they are needed. With TAX_RULES_REDIS_URL set,
+# regulatory-service pushes version changes and a compiled entry is only
+# re-checked after TAX_REGULATORY_RULES_MAX_AGE; without it, it is revalidated
+# (If-None-Match, usually a body-less 304) every TAX_REGULATORY_RULES_CACHE_TTL.
 _REGULATORY_TTL_SEC = float(os.environ.get("TAX_REGULATORY_RULES_CACHE_TTL", "120"))
+_REGULATORY_MAX_AGE_SEC = float(os.environ.get("TAX_REGULATORY_RULES_MAX_AGE", "3600"))
+TAX_RULES_REDIS_URL = os.getenv("TAX_RULES_REDIS_URL", "").strip()
+
+
+@dataclass(frozen=True)
+class CompiledRates:
+    tax_year: str
+    version: str
+    rates: Mapping[str, Any]
+
+
+@dataclass
+class _RulesCacheEntry:
+    compiled: CompiledRates
+    etag: str
+    checked_at: float
+
 
+_REGULATORY_RULES_CACHE: dict[str, _RulesCacheEntry] = {}
 
-async def _fetch_regulatory_rules(tax_year: str = "2025-26") -> tuple[dict[str, Any], str]:
-    """Fetch tax rules from regulatory-service. Returns (rules, provenance) for client disclosure."""
+
+def _compile_rates(tax_year: str, rules: dict[str, Any], version: str = "") -> CompiledRates:
+    return CompiledRates(tax_year=tax_year, version=version, rates=freeze(_merge_rates_from_rules(rules)))
+
+
+async def _compiled_rates_for_year(tax_year: str = "2025-26") -> tuple[CompiledRates, str]:
+    """Compiled rates for a tax year and their provenance (for client disclosure)."""
     now = time.monotonic()
     ent = _REGULATORY_RULES_CACHE.get(tax_year)
-    if ent is not None and (now - ent[0]) < _REGULATORY_TTL_SEC and ent[1]:
-        return ent[1], "cache"
+    fresh_for = _REGULATORY_MAX_AGE_SEC if _rules_listener.subscribed else _REGULATORY_TTL_SEC
+    if ent is not None and (now - ent.checked_at) < fresh_for:
+        REGULATORY_RULES_LOOKUPS_TOTAL.labels(source="cache").inc()
+        return ent.compiled, "cache"
+    headers = {"If-None-Match": ent.etag} if ent is not None and ent.etag else None
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            resp = await client.get(f"{REGULATORY_SERVICE_URL}/rules/tax-year/{tax_year}")
-            if resp.is_success:
-                data = resp.json()
-                if not isinstance(data, dict):
-                    return {}, "invalid_response"
-                _REGULATORY_RULES_CACHE[tax_year] = (now, data)
-                if data:
-                    return data, "live"
-                return {}, "empty_response"
+        url = f"{REGULATORY_SERVICE_URL}/rules/tax-year/{tax_year}"
+        resp = await get_upstream_client(url).get(url, headers=headers, timeout=8.0)
+        if resp.status_code == 304 and ent is not None:
+            ent.checked_at = now
+            REGULATORY_RULES_LOOKUPS_TOTAL.labels(source="not_modified").inc()
+            return ent.compiled, "cache"
+        if resp.is_success:
+            data = resp.json()
+            if not isinstance(data, dict):
+                return _compile_rates(tax_year, {}), "invalid_response"
+            if not data:
+                return _compile_rates(tax_year, {}), "empty_response"
+            version = resp.headers.get(RULES_VERSION_HEADER) or rules_version(data)
+            if ent is not None and ent.compiled.version == version:
+                compiled = ent.compiled
+            else:
+                compiled = _compile_rates(tax_year, data, version)
+            _REGULATORY_RULES_CACHE[tax_year] = _RulesCacheEntry(compiled, resp.headers.get("etag", ""), now)
+            REGULATORY_RULES_LOOKUPS_TOTAL.labels(source="live").inc()
+            return compiled, "live"
     except Exception as exc:
         logger.warning("Could not reach regulatory-service (%s) — using cache or fallback.", exc)
-    if ent is not None and ent[1]:
-        return ent[1], "stale_cache"
-    return {}, "fallback_defaults"
+    if ent is not None:
+        return ent.compiled, "stale_cache"
+    return _compile_rates(tax_year, {}), "fallback_defaults"
+
+
+def _on_rules_changed(tax_year: str, version: str) -> None:
+    ent = _REGULATORY_RULES_CACHE.get(tax_year)
+    if ent is not None and ent.compiled.version != version:
+        _REGULATORY_RULES_CACHE.pop(tax_year, None)
+
 
 def _extract_rates(rules: dict[str, Any]) -> dict[str, Any]:
     """Extract flat rate values from regulatory-service response."""
@@ -157,25 +218,21 @@ def _uk_tax_year_label(d: datetime.date) -> str:
     return f"{y}-{str(y + 1)[2:]}"
 
 
-async def _rates_for_period_end(period_end: datetime.date) -> tuple[dict[str, Any], str]:
-    ty = _uk_tax_year_label(period_end)
-    rules, provenance = await _fetch_regulatory_rules(ty)
-    return _merge_rates_from_rules(rules), provenance
+async def _rates_for_period_end(period_end: datetime.date) -> tuple[Mapping[str, Any], str]:
+    compiled, provenance = await _compiled_rates_for_year(_uk_tax_year_label(period_end))
+    return compiled.rates, provenance
 
 
 async def _fetch_scottish_income_tax_bands(tax_year: str) -> list[dict[str, Any]] | None:
     try:
-        async with httpx.AsyncClient(timeout=6.0) as client:
-            resp = await client.get(
-                f"{REGULATORY_SERVICE_URL}/rules/rates/scotland",
-                params={"year": tax_year},
-            )
-            if not resp.is_success:
-                return None
-            data = resp.json()
-            sit = data.get("scotland_income_tax") or {}
-            bands = sit.get("bands")
-            return bands if isinstance(bands, list) and bands else None
+        url = f"{REGULATORY_SERVICE_URL}/rules/rates/scotland"
+        resp = await get_upstream_client(url).get(url, params={"year": tax_year}, timeout=6.0)
+        if not resp.is_success:
+            return None
+        data = resp.json()
+        sit = data.get("scotland_income_tax") or {}
+        bands = sit.get("bands")
+        return bands if isinstance(bands, list) and bands else None
     except Exception as exc:
         logger.warning("Scotland rates fetch failed (%s); falling back to rUK bands.", exc)
     return None
@@ -329,6 +386,11 @@ TAX_SUBMISSIONS_TOTAL = Counter(
     "Total tax submission attempts grouped by result.",
     labelnames=("result",),
 )
+REGULATORY_RULES_LOOKUPS_TOTAL = Counter(
+    "tax_regulatory_rules_lookups_total",
+    "Compiled regulatory rate lookups by source (cache, not_modified, live).",
+    labelnames=("source",),
+)
 
 for parent in Path(__file__).resolve().parents:
     if (parent / "libs").exists():
@@ -340,10 +402,17 @@ for parent in Path(__file__).resolve().parents:
 from libs.shared_auth.jwt_fastapi import build_jwt_auth_dependencies
 from libs.shared_auth.plan_limits import PlanLimits, get_plan_limits, plan_limits_from_payload
 from libs.shared_compliance.audit_client import post_audit_event
+from libs.shared_http.client import aclose_upstream_clients, get_upstream_client
 from libs.shared_http.retry import get_json_with_retry, post_json_with_retry
 from libs.shared_mtd import build_mtd_self_employment_period_summary
+from libs.shared_rules.distribution import RULES_VERSION_HEADER, RulesChangeListener, freeze, rules_version
 
 get_bearer_token, get_current_user_id = build_jwt_auth_dependencies()
+_rules_listener = RulesChangeListener(
+    TAX_RULES_REDIS_URL,
+    _on_rules_changed,
+    on_reconnect=_REGULATORY_RULES_CACHE.clear,
+)
 
 _CALCULATE_EMIT_COMPLIANCE_AUDIT: contextvars.ContextVar[bool] = contextvars.ContextVar(
     "tax_engine_calculate_emit_compliance_audit", default=True
@@ -369,10 +438,19 @@ async def _audit_tax_compliance_event(
     if not ok:
         logger.warning("compliance audit not recorded action=%s user=%s", action, user_id)
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    _rules_listener.start()
+    yield
+    await _rules_listener.stop()
+    await aclose_upstream_clients()
+
+
 app = FastAPI(
     title="Tax Engine Service",
     description="Calculates tax liabilities based on categorized transactions.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Instrument the app for OpenTelemetry
@@ -384,6 +462,10 @@ class Transaction(BaseModel):
     amount: float
     category: Optional[str] = None
 
+
+_TRANSACTIONS_ADAPTER = TypeAdapter(list[Transaction])
+
+
 class TaxCalculationRequest(BaseModel):
     start_date: datetime.date
     end_date: datetime.date
@@ -483,6 +565,10 @@ class InternalAutoDraftQuarterlyResponse(BaseModel):
     draft_id: str | None = None
 
 
+class InternalTransactionEventRequest(BaseModel):
+    user_id: str = Field(min_length=1, max_length=320)
+
+
 def _mint_finops_worker_bearer(user_id: str) -> str:
     now = datetime.datetime.now(datetime.UTC)
     exp = now + datetime.timedelta(minutes=15)
@@ -815,24 +901,16 @@ def _coverage_for_period(
     return effective_start, meta, status
 
 
-def _txn_dict_min_date(transactions: list[dict], min_d: datetime.date) -> list[dict]:
-    out: list[dict] = []
-    for t in transactions:
-        raw = t.get("date")
-        if raw is None:
-            continue
-        if isinstance(raw, str):
-            try:
-                td = datetime.date.fromisoformat(raw[:10])
-            except ValueError:
-                continue
-        elif isinstance(raw, datetime.date):
-            td = raw
-        else:
-            continue
-        if td >= min_d:
-            out.append(t)
-    return out
+def _txn_dict_date(t: dict) -> datetime.date | None:
+    raw = t.get("date")
+    if isinstance(raw, str):
+        try:
+            return datetime.date.fromisoformat(raw[:10])
+        except ValueError:
+            return None
+    if isinstance(raw, datetime.date):
+        return raw
+    return None
 
 
 class PublicSelfEmployedEstimateRequest(BaseModel):
@@ -879,6 +957,27 @@ async def metrics() -> Response:
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
+async def _audit_tax_calculation(
+    bearer_token: str,
+    user_id: str,
+    request: TaxCalculationRequest,
+    estimated_tax_due: float,
+) -> None:
+    if not _CALCULATE_EMIT_COMPLIANCE_AUDIT.get():
+        return
+    await _audit_tax_compliance_event(
+        bearer_token=bearer_token,
+        user_id=user_id,
+        action="tax_calculate",
+        details={
+            "start_date": request.start_date.isoformat(),
+            "end_date": request.end_date.isoformat(),
+            "jurisdiction": request.jurisdiction,
+            "estimated_tax_due": estimated_tax_due,
+        },
+    )
+
+
 @app.post("/calculate", response_model=TaxCalculationResult)
 async def calculate_tax(
     request: TaxCalculationRequest,
@@ -893,18 +992,41 @@ async def calculate_tax(
         TAX_CALCULATIONS_TOTAL.labels(result="validation_error").inc()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only 'UK' jurisdiction is supported.")
 
-    rates, regulatory_source = await _rates_for_period_end(request.end_date)
+    compiled, regulatory_source = await _compiled_rates_for_year(_uk_tax_year_label(request.end_date))
+    rates = compiled.rates
     deductible = _deductible_categories_for_rates(rates)
+    effective_start, coverage_meta, coverage_status = _coverage_for_period(
+        request.start_date,
+        request.end_date,
+        limits.transaction_history_months,
+    )
 
-    # 1. Fetch all transactions for the user from the transactions-service
+    # Same user, period, inputs and rules on the same day: reuse the result until
+    # transactions-service reports a change for this user.
+    cache_key = (
+        request.model_dump_json(),
+        effective_start,
+        compiled.version,
+        regulatory_source == "fallback_defaults",
+        datetime.date.today(),
+    )
+    data_version = _calculation_cache.data_version(user_id)
+    cached = _calculation_cache.get(user_id, cache_key)
+    if cached is not None:
+        TAX_CALCULATIONS_TOTAL.labels(result="success").inc()
+        await _audit_tax_calculation(bearer_token, user_id, request, cached.estimated_tax_due)
+        return cached.model_copy(deep=True)
+
+    # 1. Fetch only the transactions inside the covered window
     try:
         headers = {"Authorization": f"Bearer {bearer_token}"}
         transactions_data = await get_json_with_retry(
             TRANSACTIONS_SERVICE_URL,
             headers=headers,
+            params={"from_date": effective_start.isoformat(), "to_date": request.end_date.isoformat()},
             timeout=10.0,
         )
-        transactions = [Transaction(**t) for t in transactions_data]
+        transactions = _TRANSACTIONS_ADAPTER.validate_python(transactions_data)
     except httpx.HTTPError as exc:
         TAX_CALCULATIONS_TOTAL.labels(result="upstream_error").inc()
         raise HTTPException(
@@ -912,13 +1034,7 @@ async def calculate_tax(
             detail=f"Could not connect to transactions-service: {exc}",
         ) from exc
 
-    effective_start, coverage_meta, coverage_status = _coverage_for_period(
-        request.start_date,
-        request.end_date,
-        limits.transaction_history_months,
-    )
-
-    # 2. Filter transactions by date and calculate totals
+    # 2. Totals (the date check still guards against upstreams that ignore the window)
     total_income = 0.0
     total_expenses = 0.0
     summary_map = {}
@@ -971,7 +1087,8 @@ async def calculate_tax(
     pa_taper = pa_nominal - pa_eff
     personal_allowance_used = min(taper_income, pa_eff)
     taxable_amount_after_allowance = max(taper_income - pa_eff, 0.0)
-    bands: list[dict[str, Any]] = list(rates.get("income_tax_bands") or _default_income_tax_bands())
+    # Compiled bands are read-only; gift aid adjusts a per-request copy.
+    bands: list[dict[str, Any]] = [dict(b) for b in rates.get("income_tax_bands") or _default_income_tax_bands()]
     income_region: str = request.region
     scotland_fallback = False
     if request.region == "scotland":
@@ -1114,19 +1231,8 @@ async def calculate_tax(
         }
     )
     TAX_CALCULATIONS_TOTAL.labels(result="success").inc()
-    if _CALCULATE_EMIT_COMPLIANCE_AUDIT.get():
-        await _audit_tax_compliance_event(
-            bearer_token=bearer_token,
-            user_id=user_id,
-            action="tax_calculate",
-            details={
-                "start_date": request.start_date.isoformat(),
-                "end_date": request.end_date.isoformat(),
-                "jurisdiction": request.jurisdiction,
-                "estimated_tax_due": round(estimated_tax, 2),
-            },
-        )
-    return TaxCalculationResult(
+    await _audit_tax_calculation(bearer_token, user_id, request, round(estimated_tax, 2))
+    result = TaxCalculationResult(
         user_id=user_id,
         start_date=request.start_date,
         end_date=request.end_date,
@@ -1165,6 +1271,8 @@ async def calculate_tax(
         effective_allowable_expenses_gbp=round(effective_expenses, 2),
         breakdown=breakdown,
     )
+    _calculation_cache.put(user_id, cache_key, result.model_copy(deep=True), data_version=data_version)
+    return result
 
 
 @app.post("/mtd/prepare", response_model=MTDPrepareResponse)
@@ -1237,6 +1345,21 @@ async def mtd_prepare(
     )
 
 
+@app.post("/internal/transaction-events")
+async def internal_transaction_events(
+    body: InternalTransactionEventRequest,
+    x_internal_token: str | None = Header(default=None, alias="X-Internal-Token"),
+):
+    """Transactions-service: the user's transactions changed, drop their cached calculations."""
+    secret = os.getenv("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="internal_calls_not_configured")
+    if not x_internal_token or x_internal_token != secret:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
+    _calculation_cache.invalidate_user(body.user_id.strip())
+    return {"status": "invalidated", "user_id": body.user_id.strip()}
+
+
 @app.post("/internal/mtd/auto-draft-quarterly", response_model=InternalAutoDraftQuarterlyResponse)
 async def internal_mtd_auto_draft_quarterly(
     body: InternalAutoDraftQuarterlyRequest,
@@ -1301,12 +1424,12 @@ async def internal_mtd_auto_draft_quarterly(
 
     url = f"{INTEGRATIONS_INTERNAL_BASE_URL}/internal/hmrc/mtd/quarterly-update/draft"
     try:
-        async with httpx.AsyncClient(timeout=45.0) as client:
-            r = await client.post(
-                url,
-                headers={"X-Internal-Token": secret},
-                json={"user_id": uid, "report": report},
-            )
+        r = await get_upstream_client(url).post(
+            url,
+            headers={"X-Internal-Token": secret},
+            json={"user_id": uid, "report": report},
+            timeout=45.0,
+        )
     except httpx.HTTPError as exc:
         logger.warning("internal auto-draft integrations call failed: %s", exc)
         return InternalAutoDraftQuarterlyResponse(status="skipped", reason="integrations_unreachable")
@@ -1551,6 +1674,54 @@ async def self_employed_calculator(req: SelfEmployedCalcRequest):
     )
 
 
+class SelfEmployedBatchRequest(BaseModel):
+    """Columnar scenarios: lists are per scenario and must match ``gross_trading_income``; scalars apply to all."""
+
+    gross_trading_income: list[float] = Field(min_length=1, max_length=TAX_BATCH_MAX_SCENARIOS)
+    allowable_expenses: list[float] | float = 0.0
+    pension_contributions: list[float] | float = 0.0
+    marriage_allowance_received: list[float] | float = 0.0
+    losses_brought_forward: list[float] | float = 0.0
+    use_trading_allowance: list[bool] | bool = False
+    student_loan_plan: Optional[str] = None
+
+
+class SelfEmployedBatchResult(BaseModel):
+    count: int
+    results: dict[str, list[float]]
+
+
+@app.post("/calculate/batch", response_model=SelfEmployedBatchResult)
+def calculate_batch(
+    req: SelfEmployedBatchRequest,
+    _user_id: str = Depends(get_current_user_id),
+):
+    """
+    Self-employed calculator over many scenarios at once (expense sweeps, pricing
+    simulations). Results are columnar, one list per UKSelfEmployedTaxResult field,
+    and equal what /calculators/self-employed returns for each scenario.
+    """
+    try:
+        columns = self_employed_tax_batch(
+            req.gross_trading_income,
+            allowable_expenses=req.allowable_expenses,
+            pension_contributions=req.pension_contributions,
+            student_loan_plan=req.student_loan_plan,
+            marriage_allowance_received=req.marriage_allowance_received,
+            losses_brought_forward=req.losses_brought_forward,
+            use_trading_allowance=req.use_trading_allowance,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    TAX_CALCULATIONS_TOTAL.labels(result="batch").inc()
+    # Python's round() per element, exactly as the scalar response is rounded.
+    results = {
+        field: [round(v, 1 if field == "effective_tax_rate_percent" else 2) for v in columns[field].tolist()]
+        for field in SELF_EMPLOYED_RESULT_FIELDS
+    }
+    return SelfEmployedBatchResult(count=len(req.gross_trading_income), results=results)
+
+
 # === Auto-collect and prepare HMRC reports ===
 
 
@@ -1604,6 +1775,7 @@ class PreparedAnnualReport(BaseModel):
     message: str
     coverage_status: str = "complete"
     coverage: dict[str, Any] = Field(default_factory=dict)
+    timings_ms: dict[str, float] = Field(default_factory=dict)
 
 
 def _quarter_dates(tax_year_start_year: int) -> list[QuarterDates]:
@@ -1620,16 +1792,15 @@ def _quarter_dates(tax_year_start_year: int) -> list[QuarterDates]:
 async def _fetch_transactions(bearer_token: str, from_date: str, to_date: str) -> list[dict]:
     """Fetch user transactions for a date range."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                TRANSACTIONS_SERVICE_URL,
-                headers={"Authorization": f"Bearer {bearer_token}"},
-                params={"from_date": from_date, "to_date": to_date},
-                timeout=15.0,
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data if isinstance(data, list) else []
+        response = await get_upstream_client(TRANSACTIONS_SERVICE_URL).get(
+            TRANSACTIONS_SERVICE_URL,
+            headers={"Authorization": f"Bearer {bearer_token}"},
+            params={"from_date": from_date, "to_date": to_date},
+            timeout=15.0,
+        )
+        if response.status_code == 200:
+            data = response.json()
+            return data if isinstance(data, list) else []
     except Exception:
         pass
     return []
@@ -1638,43 +1809,75 @@ async def _fetch_transactions(bearer_token: str, from_date: str, to_date: str) -
 async def _fetch_invoice_income(bearer_token: str, from_date: str, to_date: str) -> dict:
     """Fetch invoice income summary for a date range."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{INVOICE_SERVICE_URL}/reports/summary",
-                headers={"Authorization": f"Bearer {bearer_token}"},
-                params={"start_date": from_date, "end_date": to_date},
-                timeout=15.0,
-            )
-            if response.status_code == 200:
-                return response.json()
+        url = f"{INVOICE_SERVICE_URL}/reports/summary"
+        response = await get_upstream_client(url).get(
+            url,
+            headers={"Authorization": f"Bearer {bearer_token}"},
+            params={"start_date": from_date, "end_date": to_date},
+            timeout=15.0,
+        )
+        if response.status_code == 200:
+            stats = response.json().get("stats") or {}
+            return {
+                "total_billed": float(stats.get("total_amount") or 0),
+                "total_collected": float(stats.get("paid_amount") or 0),
+                "invoice_count": int(stats.get("total_invoices") or 0),
+            }
     except Exception:
         pass
     return {"total_billed": 0, "total_collected": 0, "invoice_count": 0}
 
 
-def _categorize_transactions(transactions: list[dict]) -> AutoCollectedData:
-    """Categorize transactions into income and expenses with breakdowns."""
+def _aggregate_transactions(
+    transactions: list[dict],
+    quarters: list[QuarterDates] = (),
+    min_date: datetime.date | None = None,
+) -> tuple[AutoCollectedData, list[dict]]:
+    """
+    Categorize transactions into income and expenses with breakdowns, and
+    income/expense totals per quarter, in one pass over the rows. With ``min_date`` (plan retention), rows
+    dated before it or without a readable date are skipped.
+    """
     income_by_category: dict[str, float] = {}
     expense_by_category: dict[str, float] = {}
     total_income = 0.0
     total_expenses = 0.0
+    counted = 0
+    q_starts = [datetime.date.fromisoformat(q.period_start) for q in quarters]
+    q_ends = [datetime.date.fromisoformat(q.period_end) for q in quarters]
+    q_income = [0.0] * len(quarters)
+    q_expenses = [0.0] * len(quarters)
 
     for t in transactions:
+        td = _txn_dict_date(t)
+        if min_date is not None and (td is None or td < min_date):
+            continue
+        counted += 1
         amount = float(t.get("amount", 0))
         category = t.get("category", "uncategorized") or "uncategorized"
 
+        qi = -1
+        if td is not None and quarters:
+            qi = bisect.bisect_right(q_starts, td) - 1
+            if qi >= 0 and td > q_ends[qi]:
+                qi = -1
+
         if amount > 0:
             total_income += amount
             income_by_category[category] = income_by_category.get(category, 0) + amount
+            if qi >= 0:
+                q_income[qi] += amount
         elif amount < 0:
             abs_amount = abs(amount)
             total_expenses += abs_amount
             expense_by_category[category] = expense_by_category.get(category, 0) + abs_amount
+            if qi >= 0:
+                q_expenses[qi] += abs_amount
 
     income_breakdown = [{"category": k, "amount": round(v, 2)} for k, v in sorted(income_by_category.items(), key=lambda x: -x[1])]
     expense_breakdown = [{"category": k, "amount": round(v, 2)} for k, v in sorted(expense_by_category.items(), key=lambda x: -x[1])]
 
-    return AutoCollectedData(
+    collected = AutoCollectedData(
         period_start="",
         period_end="",
         total_income=round(total_income, 2),
@@ -1683,9 +1886,28 @@ def _categorize_transactions(transactions: list[dict]) -> AutoCollectedData:
         expense_breakdown=expense_breakdown,
         invoice_income=0,
         invoice_count=0,
-        transaction_count=len(transactions),
+        transaction_count=counted,
         net_profit=round(total_income - total_expenses, 2),
     )
+    quarter_summaries = [
+        {
+            "quarter": q.quarter,
+            "period": f"{q.period_start} to {q.period_end}",
+            "income": round(q_income[i], 2),
+            "expenses": round(q_expenses[i], 2),
+            "profit": round(q_income[i] - q_expenses[i], 2),
+        }
+        for i, q in enumerate(quarters)
+    ]
+    return collected, quarter_summaries
+
+
+async def _timed(timings: dict[str, float], stage: str, awaitable):
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 2)
 
 
 _HMRC_EXPENSE_MAP = {
@@ -1757,13 +1979,15 @@ async def prepare_quarterly_report(
     effective_start, cov_meta, cov_status = _coverage_for_period(
         ps, pe, limits.transaction_history_months
     )
-    transactions = await _fetch_transactions(bearer_token, q.period_start, q.period_end)
-    transactions = _txn_dict_min_date(transactions, effective_start)
-    collected = _categorize_transactions(transactions)
+    transactions, invoice_data, (rates, _) = await asyncio.gather(
+        _fetch_transactions(bearer_token, q.period_start, q.period_end),
+        _fetch_invoice_income(bearer_token, q.period_start, q.period_end),
+        _rates_for_period_end(pe),
+    )
+    collected, _ = _aggregate_transactions(transactions, min_date=effective_start)
     collected.period_start = q.period_start
     collected.period_end = q.period_end
 
-    invoice_data = await _fetch_invoice_income(bearer_token, q.period_start, q.period_end)
     collected.invoice_income = float(invoice_data.get("total_collected", 0))
     collected.invoice_count = int(invoice_data.get("invoice_count", 0))
 
@@ -1792,7 +2016,6 @@ async def prepare_quarterly_report(
         "periodExpenses": hmrc_expenses,
     }
 
-    rates, _ = await _rates_for_period_end(datetime.date.fromisoformat(q.period_end))
     annual_profit = max((turnover - collected.total_expenses) * 4, 0)
     pa = _personal_allowance_effective(annual_profit, rates)
     taxable = max(annual_profit - pa, 0)
@@ -1841,17 +2064,27 @@ async def prepare_annual_report(
     effective_start, cov_meta, cov_status = _coverage_for_period(
         ps, pe, limits.transaction_history_months
     )
-    transactions = await _fetch_transactions(bearer_token, start, end)
-    transactions = _txn_dict_min_date(transactions, effective_start)
-    collected = _categorize_transactions(transactions)
+    # The year is fetched once, concurrently with the invoice summary and rules;
+    # quarters are partitioned from the same rows in a single aggregation pass.
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    transactions, invoice_data, (rates, _) = await asyncio.gather(
+        _timed(timings, "fetch_transactions", _fetch_transactions(bearer_token, start, end)),
+        _timed(timings, "fetch_invoices", _fetch_invoice_income(bearer_token, start, end)),
+        _timed(timings, "fetch_rules", _rates_for_period_end(pe)),
+    )
+    timings["fetch"] = round((time.perf_counter() - started) * 1000, 2)
 
-    invoice_data = await _fetch_invoice_income(bearer_token, start, end)
+    aggregate_started = time.perf_counter()
+    collected, quarter_summaries = _aggregate_transactions(
+        transactions, _quarter_dates(tax_year), min_date=effective_start
+    )
+    timings["aggregate"] = round((time.perf_counter() - aggregate_started) * 1000, 2)
     invoice_income = float(invoice_data.get("total_collected", 0))
 
     total_income = max(collected.total_income, invoice_income)
     total_expenses = collected.total_expenses
 
-    rates, _ = await _rates_for_period_end(datetime.date.fromisoformat(end))
     profit = max(total_income - total_expenses, 0)
     pa = _personal_allowance_effective(profit, rates)
     taxable = max(profit - pa, 0)
@@ -1874,19 +2107,6 @@ async def prepare_annual_report(
         "declaration": "true_and_complete",
     }
 
-    quarter_summaries = []
-    for q in _quarter_dates(tax_year):
-        q_transactions = [t for t in transactions if q.period_start <= t.get("date", "") <= q.period_end]
-        q_income = sum(float(t.get("amount", 0)) for t in q_transactions if float(t.get("amount", 0)) > 0)
-        q_expenses = sum(abs(float(t.get("amount", 0))) for t in q_transactions if float(t.get("amount", 0)) < 0)
-        quarter_summaries.append({
-            "quarter": q.quarter,
-            "period": f"{q.period_start} to {q.period_end}",
-            "income": round(q_income, 2),
-            "expenses": round(q_expenses, 2),
-            "profit": round(q_income - q_expenses, 2),
-        })
-
     msg_tail = ""
     if cov_status == "partial":
         msg_tail = (
@@ -1913,4 +2133,5 @@ async def prepare_annual_report(
                 f"Review and confirm to submit to HMRC as Final Declaration.{msg_tail}",
         coverage_status=cov_status,
         coverage=cov_meta,
+        timings_ms={**timings, "total": round((time.perf_counter() - started) * 1000, 2)},
     )
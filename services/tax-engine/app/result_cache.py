@@ -0,0 +1,94 @@
+"""
+Per-user, per-period cache of tax calculation results.
+
+Keys are built by the caller from (user, period, request parameters, rules
+version); the cache adds the user's *data version*, which transactions-service
+bumps through POST /internal/transaction-events whenever the user's
+transactions change. Bumping the version drops that user's entries at once, so
+repeated dashboard/orchestrator calls for an unchanged period are served from
+memory and never see data older than the last change event.
+
+Entries also expire after ``ttl_seconds``: change events reach only the replica
+that receives them, so the TTL bounds staleness on the others.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from prometheus_client import Counter
+
+RESULT_CACHE_LOOKUPS_TOTAL = Counter(
+    "tax_result_cache_lookups_total",
+    "Per-period calculation cache lookups by outcome (hit, miss).",
+    labelnames=("outcome",),
+)
+RESULT_CACHE_INVALIDATIONS_TOTAL = Counter(
+    "tax_result_cache_invalidations_total",
+    "Users whose cached calculations were dropped after a transaction change event.",
+)
+
+
+class PeriodResultCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 5_000,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._data_versions: dict[str, int] = {}
+
+    def data_version(self, user_id: str) -> int:
+        return self._data_versions.get(user_id, 0)
+
+    def _key(self, user_id: str, key: Hashable) -> tuple:
+        return (user_id, self.data_version(user_id), key)
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        if self.max_entries <= 0:
+            return None
+        full_key = self._key(user_id, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(full_key)
+                RESULT_CACHE_LOOKUPS_TOTAL.labels(outcome="hit").inc()
+                return entry[1]
+            if entry is not None:
+                del self._entries[full_key]
+        RESULT_CACHE_LOOKUPS_TOTAL.labels(outcome="miss").inc()
+        return None
+
+    def put(self, user_id: str, key: Hashable, value: Any, *, data_version: Optional[int] = None) -> None:
+        """Store *value*; pass the ``data_version`` read before computing it so a
+        result built from data that changed mid-computation is not kept."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if data_version is not None and data_version != self.data_version(user_id):
+                return
+            full_key = self._key(user_id, key)
+            self._entries[full_key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            self._data_versions[user_id] = self.data_version(user_id) + 1
+            for full_key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[full_key]
+        RESULT_CACHE_INVALIDATIONS_TOTAL.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._data_versions.clear()
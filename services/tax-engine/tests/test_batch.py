@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from jose import jwt
+
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import main as app_main  # noqa: E402
+from app.batch import (  # noqa: E402
+    SELF_EMPLOYED_RESULT_FIELDS,
+    class4_nic_batch,
+    income_tax_from_bands_batch,
+    self_employed_tax_batch,
+)
+from app.calculators import UKSelfEmployedTaxResult, calculate_self_employed_tax  # noqa: E402
+
+client = TestClient(app_main.app)
+
+_money = st.floats(min_value=0, max_value=1_000_000, allow_nan=False, allow_infinity=False)
+_small = st.floats(min_value=0, max_value=60_000, allow_nan=False, allow_infinity=False)
+_scenario = st.fixed_dictionaries(
+    {
+        "gross_trading_income": _money,
+        "allowable_expenses": st.one_of(_small, st.sampled_from([0.0, 999.99, 1000.0])),
+        "pension_contributions": _small,
+        "marriage_allowance_received": st.sampled_from([0.0, 1260.0]),
+        "losses_brought_forward": _small,
+        "use_trading_allowance": st.booleans(),
+    }
+)
+_SCOTTISH_BANDS = [
+    {"name": "starter", "rate": 0.19, "from": 0, "to": 2306},
+    {"name": "basic", "rate": 0.20, "from": 2306, "to": 13991},
+    {"name": "intermediate", "rate": 0.21, "from": 13991, "to": 31092},
+    {"name": "higher", "rate": 0.42, "from": 31092, "to": 62430},
+    {"name": "advanced", "rate": 0.45, "from": 62430, "to": 125140},
+    {"name": "top", "rate": 0.48, "from": 125140, "to": None},
+]
+
+
+def _auth_headers() -> dict[str, str]:
+    token = jwt.encode({"sub": "batch@example.com"}, os.environ["AUTH_SECRET_KEY"], algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _rounded(columns: dict[str, np.ndarray], i: int) -> dict[str, float]:
+    return {
+        field: round(float(columns[field][i]), 1 if field == "effective_tax_rate_percent" else 2)
+        for field in SELF_EMPLOYED_RESULT_FIELDS
+    }
+
+
+def test_result_fields_match_scalar_model():
+    assert tuple(UKSelfEmployedTaxResult.model_fields) == SELF_EMPLOYED_RESULT_FIELDS
+
+
+@settings(max_examples=150, deadline=None)
+@given(
+    scenarios=st.lists(_scenario, min_size=1, max_size=40),
+    plan=st.sampled_from([None, "plan_1", "plan2", "postgrad", "unknown"]),
+)
+def test_self_employed_batch_equals_scalar(scenarios, plan):
+    columns = self_employed_tax_batch(
+        [s["gross_trading_income"] for s in scenarios],
+        allowable_expenses=[s["allowable_expenses"] for s in scenarios],
+        pension_contributions=[s["pension_contributions"] for s in scenarios],
+        student_loan_plan=plan,
+        marriage_allowance_received=[s["marriage_allowance_received"] for s in scenarios],
+        losses_brought_forward=[s["losses_brought_forward"] for s in scenarios],
+        use_trading_allowance=[s["use_trading_allowance"] for s in scenarios],
+    )
+    for i, scenario in enumerate(scenarios):
+        expected = calculate_self_employed_tax(**scenario, student_loan_plan=plan)
+        assert _rounded(columns, i) == expected.model_dump()
+
+
+@settings(max_examples=150, deadline=None)
+@given(
+    taxable=st.lists(_money, min_size=1, max_size=40),
+    bands=st.sampled_from([app_main._default_income_tax_bands(), _SCOTTISH_BANDS]),
+)
+def test_band_engine_and_class4_equal_scalar(taxable, bands):
+    basic, higher, additional = income_tax_from_bands_batch(taxable, bands)
+    class4 = class4_nic_batch(taxable, app_main._FALLBACK_RATES)
+    for i, amount in enumerate(taxable):
+        assert (basic[i], higher[i], additional[i]) == app_main._income_tax_from_bands(amount, bands)
+        assert class4[i] == app_main._class4_nic_from_rates(amount, app_main._FALLBACK_RATES)
+
+
+def test_calculate_batch_endpoint_broadcasts_scalars():
+    incomes = [0.0, 800.0, 30_000.0, 60_000.0, 150_000.0]
+    response = client.post(
+        "/calculate/batch",
+        headers=_auth_headers(),
+        json={"gross_trading_income": incomes, "allowable_expenses": 500.0, "use_trading_allowance": True},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == len(incomes)
+    for i, income in enumerate(incomes):
+        expected = calculate_self_employed_tax(income, allowable_expenses=500.0, use_trading_allowance=True)
+        assert {field: body["results"][field][i] for field in SELF_EMPLOYED_RESULT_FIELDS} == expected.model_dump()
+
+    mismatched = client.post(
+        "/calculate/batch",
+        headers=_auth_headers(),
+        json={"gross_trading_income": [1.0, 2.0], "allowable_expenses": [1.0]},
+    )
+    assert mismatched.status_code == 422
+    assert client.post("/calculate/batch", json={"gross_trading_income": [1.0]}).status_code == 401
+
+
+def test_batch_benchmark_100k_scenarios():
+    rng = np.random.default_rng(2025)
+    n = 100_000
+    incomes = rng.uniform(0, 250_000, n)
+    expenses = rng.uniform(0, 20_000, n)
+
+    started = time.perf_counter()
+    columns = self_employed_tax_batch(incomes, allowable_expenses=expenses)
+    vector_seconds = time.perf_counter() - started
+
+    sample = 2_000
+    started = time.perf_counter()
+    for i in range(sample):
+        calculate_self_employed_tax(float(incomes[i]), allowable_expenses=float(expenses[i]))
+    scalar_seconds = (time.perf_counter() - started) * n / sample
+
+    print(
+        f"\n100k self-employed scenarios: vectorised {vector_seconds * 1000:.1f} ms, "
+        f"scalar (extrapolated) {scalar_seconds * 1000:.0f} ms"
+    )
+    assert columns["total_tax_and_ni"].shape == (n,)
+    assert vector_seconds < scalar_seconds
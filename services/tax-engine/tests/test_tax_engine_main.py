@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from contextlib import contextmanager
@@ -19,10 +20,12 @@ from app.main import app
 
 @pytest.fixture(autouse=True)
 def _clear_regulatory_rules_cache():
-    """Per-test isolation: in-memory TTL cache would otherwise pin the first mocked rules per tax year."""
+    """Per-test isolation: in-memory TTL caches would otherwise pin the first mocked rules and results."""
     app_main._REGULATORY_RULES_CACHE.clear()
+    app_main._calculation_cache.clear()
     yield
     app_main._REGULATORY_RULES_CACHE.clear()
+    app_main._calculation_cache.clear()
 
 client = TestClient(app)
 AUTH_SECRET_KEY = os.environ["AUTH_SECRET_KEY"]
@@ -544,6 +547,37 @@ def test_calculate_tax_scotland_bands_from_regulatory_service():
     assert sc["estimated_income_tax_due"] != ew["estimated_income_tax_due"]
 
 
+def test_compiled_rates_revalidate_with_etag_and_drop_on_change(monkeypatch):
+    reg = _minimal_regulatory_rules()
+    seen_headers = []
+
+    async def _route(url, *args, **kwargs):
+        seen_headers.append(kwargs.get("headers"))
+        request = httpx.Request("GET", str(url))
+        if kwargs.get("headers"):
+            return httpx.Response(304, headers={"ETag": '"v1"'}, request=request)
+        return httpx.Response(200, json=reg, headers={"ETag": '"v1"', "X-Rules-Version": "v1"}, request=request)
+
+    with patch("httpx.AsyncClient.get", new=AsyncMock(side_effect=_route)):
+        compiled, source = asyncio.run(app_main._compiled_rates_for_year("2025-26"))
+        assert (compiled.version, source) == ("v1", "live")
+        with pytest.raises(TypeError):
+            compiled.rates["basic_rate"] = 0.5  # shared between requests, so read-only
+
+        assert asyncio.run(app_main._compiled_rates_for_year("2025-26")) == (compiled, "cache")
+        assert len(seen_headers) == 1
+
+        monkeypatch.setattr(app_main, "_REGULATORY_TTL_SEC", 0.0)
+        revalidated, source = asyncio.run(app_main._compiled_rates_for_year("2025-26"))
+        assert revalidated is compiled and source == "cache"
+        assert seen_headers[-1] == {"If-None-Match": '"v1"'}
+
+        app_main._on_rules_changed("2025-26", "v1")
+        assert "2025-26" in app_main._REGULATORY_RULES_CACHE
+        app_main._on_rules_changed("2025-26", "v2")
+        assert "2025-26" not in app_main._REGULATORY_RULES_CACHE
+
+
 def test_calculate_tax_flags_quarterly_reporting_when_income_exceeds_50000():
     mock_transactions = [
         {"date": "2026-05-10", "amount": 60000.0, "category": "income"},
@@ -585,6 +619,33 @@ def test_calculate_tax_service_unavailable():
     assert "Could not connect to transactions-service" in response.json()["detail"]
 
 
+def test_calculate_fetches_window_and_caches_until_transaction_event(monkeypatch):
+    monkeypatch.setenv("INTERNAL_SERVICE_SECRET", "test-internal-secret")
+    payload = {"start_date": "2023-04-06", "end_date": "2024-04-05", "jurisdiction": "UK"}
+    first = [{"date": "2023-05-10", "amount": 3000.0, "category": "income"}]
+    with _httpx_get_router(transactions=first, regulatory={}) as mock_get:
+        assert client.post("/calculate", headers=get_auth_headers(), json=payload).json()["total_income"] == 3000.0
+        assert client.post("/calculate", headers=get_auth_headers(), json=payload).json()["total_income"] == 3000.0
+    transaction_calls = [c for c in mock_get.call_args_list if "/rules/" not in str(c.args[0])]
+    assert len(transaction_calls) == 1
+    assert transaction_calls[0].kwargs["params"] == {"from_date": "2023-04-06", "to_date": "2024-04-05"}
+
+    forbidden = client.post(
+        "/internal/transaction-events", json={"user_id": TEST_USER_ID}, headers={"X-Internal-Token": "wrong"}
+    )
+    assert forbidden.status_code == 403
+    resp = client.post(
+        "/internal/transaction-events",
+        json={"user_id": TEST_USER_ID},
+        headers={"X-Internal-Token": "test-internal-secret"},
+    )
+    assert resp.status_code == 200
+
+    second = first + [{"date": "2023-06-01", "amount": 500.0, "category": "income"}]
+    with _httpx_get_router(transactions=second, regulatory={}):
+        assert client.post("/calculate", headers=get_auth_headers(), json=payload).json()["total_income"] == 3500.0
+
+
 def test_calculate_and_submit_returns_mtd_obligation_and_creates_quarterly_reminders():
     mock_transactions = [
         {"date": "2026-05-10", "amount": 60000.0, "category": "income"},
@@ -708,3 +769,39 @@ def test_internal_mtd_auto_draft_forbidden_without_valid_token(monkeypatch):
         json={"user_id": "u@example.com", "tax_year_start_year": 2026, "quarter": "Q1"},
     )
     assert response.status_code == 403
+
+
+def test_prepare_annual_fetches_concurrently_and_partitions_quarters():
+    transactions = [
+        {"date": "2025-04-06", "amount": 1000.0, "category": "income"},
+        {"date": "2025-07-05", "amount": -100.0, "category": "travel"},
+        {"date": "2025-07-06", "amount": 2000.0, "category": "income"},
+        {"date": "2026-01-06", "amount": -50.0, "category": "office_costs"},
+        {"date": "2026-04-05", "amount": 500.0, "category": "income"},
+        {"date": "not-a-date", "amount": 999.0, "category": "income"},
+    ]
+
+    async def _slow(result, *_args):
+        await asyncio.sleep(0.2)
+        return result
+
+    with patch.object(app_main, "_fetch_transactions", new=lambda *a: _slow(transactions)), patch.object(
+        app_main, "_fetch_invoice_income", new=lambda *a: _slow({"total_collected": 0, "invoice_count": 0})
+    ), patch.object(
+        app_main, "_rates_for_period_end", new=lambda *a: _slow((app_main._FALLBACK_RATES, "fallback_defaults"))
+    ):
+        response = client.post("/prepare/annual?tax_year=2025", headers=get_auth_headers())
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_income"] == 3500.0
+    assert data["total_expenses"] == 150.0
+    assert [(q["quarter"], q["income"], q["expenses"]) for q in data["quarters"]] == [
+        ("Q1", 1000.0, 100.0),
+        ("Q2", 2000.0, 0.0),
+        ("Q3", 0.0, 0.0),
+        ("Q4", 500.0, 50.0),
+    ]
+    timings = data["timings_ms"]
+    assert {"fetch_transactions", "fetch_invoices", "fetch_rules", "fetch", "aggregate", "total"} <= set(timings)
+    assert timings["fetch"] < 450
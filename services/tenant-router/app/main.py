@@ -1,18 +1,24 @@
 """
 Tenant Router Service - Динамическое управление базами данных клиентов
 """
+import asyncio
 import asyncpg  # type: ignore[import]
 import redis.asyncio as redis  # type: ignore[import]
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Optional, Any
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 import os
+import time
 from datetime import datetime
 
 # Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+LOCAL_CACHE_TTL_SECONDS = float(os.getenv("TENANT_LOCAL_CACHE_TTL_SECONDS", "60"))
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("TENANT_LOCAL_CACHE_MAX_ENTRIES", "50000"))
+INVALIDATION_CHANNEL = os.getenv("TENANT_INVALIDATION_CHANNEL", "tenant:invalidate")
+MAX_BULK_TENANTS = 500
 
 # Typed shard configuration
 ShardConfig = Dict[str, Any]
@@ -46,10 +52,63 @@ class TenantConfig(BaseModel):
     tier: str = "bronze"  # bronze, silver, gold
     region: str = "us-east-1"
 
+class TenantUpdateRequest(BaseModel):
+    """Изменение конфигурации tenant (например, после переноса БД на другой шард)"""
+    shard_id: Optional[str] = None
+    database_name: Optional[str] = None
+    tier: Optional[str] = None
+    region: Optional[str] = None
+
+class TenantDatabaseUrlsRequest(BaseModel):
+    tenant_ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_TENANTS)
+
+class LocalTenantCache:
+    """In-process TTL кэш TenantConfig перед Redis (первый уровень)"""
+
+    def __init__(self, ttl_seconds: float = LOCAL_CACHE_TTL_SECONDS, max_entries: int = LOCAL_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[TenantConfig, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tenant_id: str) -> Optional[TenantConfig]:
+        entry = self._entries.get(tenant_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[tenant_id]
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def set(self, config: TenantConfig) -> None:
+        if len(self._entries) >= self.max_entries and config.tenant_id not in self._entries:
+            # dict сохраняет порядок вставки — вытесняем самую старую запись
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[config.tenant_id] = (config, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, tenant_id: str) -> None:
+        self._entries.pop(tenant_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
 class TenantRouter:
     def __init__(self):
         self.redis_client: Optional[redis.Redis[str]] = None
         self.shard_pools: Dict[str, asyncpg.Pool] = {}
+        self.local_cache = LocalTenantCache()
+        self._invalidation_task: Optional["asyncio.Task[None]"] = None
 
     async def initialize(self):
         """Инициализация соединений с Redis и PostgreSQL шардами"""
@@ -72,16 +131,72 @@ class TenantRouter:
             except Exception as e:
                 logger.error(f"Failed to connect to shard {shard_id}: {e}")
 
-    async def get_tenant_database_url(self, tenant_id: str) -> str:
-        """Получить URL базы данных для конкретного клиента"""
-        # Проверяем кэш Redis
+        # Инвалидация локальных кэшей всех реплик через Redis pub/sub
+        self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+
+    async def shutdown(self):
+        """Остановка подписки на инвалидацию"""
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._invalidation_task = None
+
+    async def _listen_for_invalidations(self):
+        """Слушаем канал инвалидации; при потере подписки сбрасываем кэш целиком"""
+        while self.redis_client is not None:
+            try:
+                pubsub = self.redis_client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        tenant_id = message.get("data")
+                        if isinstance(tenant_id, bytes):
+                            tenant_id = tenant_id.decode()
+                        self.local_cache.invalidate(str(tenant_id))
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Пока подписки нет, инвалидации могли быть пропущены
+                logger.warning(f"Tenant invalidation subscription lost: {e}")
+                self.local_cache.clear()
+                await asyncio.sleep(1.0)
+
+    async def invalidate_tenant(self, tenant_id: str):
+        """Сбросить конфигурацию tenant в локальном кэше всех реплик (удаление/перенос)"""
+        self.local_cache.invalidate(tenant_id)
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.publish(INVALIDATION_CHANNEL, tenant_id)  # type: ignore[misc]
+            except Exception as e:
+                logger.warning(f"Failed to publish invalidation for tenant {tenant_id}: {e}")
+
+    async def get_tenant_config(self, tenant_id: str) -> Optional[TenantConfig]:
+        """Конфигурация tenant: локальный кэш, затем Redis"""
+        config = self.local_cache.get(tenant_id)
+        if config is not None:
+            return config
+
         if self.redis_client is None:
             raise HTTPException(status_code=503, detail="Redis not initialized")
 
         cached_config = await self.redis_client.get(f"tenant:{tenant_id}")
+        if not cached_config:
+            return None
+        config = TenantConfig.model_validate_json(cached_config)
+        self.local_cache.set(config)
+        return config
 
-        if cached_config:
-            config = TenantConfig.model_validate_json(cached_config)
+    async def get_tenant_database_url(self, tenant_id: str) -> str:
+        """Получить URL базы данных для конкретного клиента"""
+        config = await self.get_tenant_config(tenant_id)
+        if config is not None:
             return self._build_database_url(config)
 
         # Если нет в кэше, создаем новый tenant
@@ -113,20 +228,73 @@ class TenantRouter:
         )
 
         # Сохраняем в Redis
+        await self._save_tenant_config(config)
+
+        # Обновляем счетчик tenants в шарде
+        POSTGRES_SHARDS[shard_id]['current_tenants'] += 1
+        self.local_cache.set(config)
+
+        logger.info(f"Created new tenant {tenant_id} in shard {shard_id}")
+        return config
+
+    async def _save_tenant_config(self, config: TenantConfig) -> None:
         if self.redis_client is None:
             raise HTTPException(status_code=503, detail="Redis not initialized")
 
         await self.redis_client.set(
-            f"tenant:{tenant_id}",
+            f"tenant:{config.tenant_id}",
             config.model_dump_json(),
             ex=3600# 1 час кэширования
         )
 
-        # Обновляем счетчик tenants в шарде
-        POSTGRES_SHARDS[shard_id]['current_tenants'] += 1
+    async def update_tenant(self, tenant_id: str, changes: TenantUpdateRequest) -> Optional[TenantConfig]:
+        """Изменить конфигурацию tenant и сбросить ее во всех кэшах (реплики и TenantMiddleware)"""
+        if self.redis_client is None:
+            raise HTTPException(status_code=503, detail="Redis not initialized")
 
-        logger.info(f"Created new tenant {tenant_id} in shard {shard_id}")
-        return config
+        config_data = await self.redis_client.get(f"tenant:{tenant_id}")
+        if not config_data:
+            return None
+
+        updates = changes.model_dump(exclude_none=True)
+        if "shard_id" in updates and updates["shard_id"] not in POSTGRES_SHARDS:
+            raise HTTPException(status_code=400, detail="Unknown shard")
+
+        current = TenantConfig.model_validate_json(config_data)
+        updated = current.model_copy(update=updates)
+        await self._save_tenant_config(updated)
+        if updated.shard_id != current.shard_id:
+            POSTGRES_SHARDS[current.shard_id]['current_tenants'] -= 1
+            POSTGRES_SHARDS[updated.shard_id]['current_tenants'] += 1
+        await self.invalidate_tenant(tenant_id)
+
+        logger.info(f"Updated tenant {tenant_id}: {sorted(updates)}")
+        return updated
+
+    async def get_database_urls(self, tenant_ids: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Пакетное получение URL для прогрева кэшей (tenant не создаются)"""
+        found: Dict[str, str] = {}
+        misses: List[str] = []
+        for tenant_id in dict.fromkeys(tenant_ids):
+            config = self.local_cache.get(tenant_id)
+            if config is not None:
+                found[tenant_id] = self._build_database_url(config)
+            else:
+                misses.append(tenant_id)
+
+        missing: List[str] = []
+        if misses:
+            if self.redis_client is None:
+                raise HTTPException(status_code=503, detail="Redis not initialized")
+            values = await self.redis_client.mget([f"tenant:{tenant_id}" for tenant_id in misses])  # type: ignore[misc]
+            for tenant_id, raw in zip(misses, values):
+                if not raw:
+                    missing.append(tenant_id)
+                    continue
+                config = TenantConfig.model_validate_json(raw)
+                self.local_cache.set(config)
+                found[tenant_id] = self._build_database_url(config)
+        return found, missing
 
     async def _select_optimal_shard(self) -> Optional[str]:
         """Выбор оптимального шарда на основе загрузки"""
@@ -290,15 +458,11 @@ class TenantRouter:
 
     async def get_tenant_health(self, tenant_id: str) -> Dict[str, Any]:
         """Получение health метрик для конкретного tenant"""
-        if self.redis_client is None:
-            raise HTTPException(status_code=503, detail="Redis not initialized")
-
-        config_data = await self.redis_client.get(f"tenant:{tenant_id}")
+        config = await self.get_tenant_config(tenant_id)
 
-        if not config_data:
+        if config is None:
             raise HTTPException(status_code=404, detail="Tenant not found")
 
-        config = TenantConfig.model_validate_json(config_data)
         shard_config = POSTGRES_SHARDS[config.shard_id]
 
         try:
@@ -361,8 +525,9 @@ class TenantRouter:
             async with pool.acquire() as connection:  # type: ignore[misc]
                 await connection.execute(f'DROP DATABASE IF EXISTS "{config.database_name}"')  # type: ignore[misc]
 
-            # Удаляем из Redis
+            # Удаляем из Redis и из локальных кэшей всех реплик
             await self.redis_client.delete(f"tenant:{tenant_id}")  # type: ignore[misc]
+            await self.invalidate_tenant(tenant_id)
 
             # Уменьшаем счетчик
             POSTGRES_SHARDS[config.shard_id]['current_tenants'] -= 1
@@ -382,8 +547,8 @@ async def lifespan(app: FastAPI):
     await tenant_router.initialize()
     logger.info("Tenant Router Service started")
     yield
-    # Shutdown - cleanup if needed
-    pass
+    # Shutdown
+    await tenant_router.shutdown()
 
 # FastAPI app
 app = FastAPI(
@@ -402,11 +567,25 @@ async def get_tenant_database_url(tenant_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/tenants/database-urls")
+async def get_tenant_database_urls(request: TenantDatabaseUrlsRequest) -> Dict[str, Any]:
+    """Пакетный lookup URL БД для прогрева кэшей (неизвестные tenant не создаются)"""
+    database_urls, missing = await tenant_router.get_database_urls(request.tenant_ids)
+    return {"database_urls": database_urls, "missing": missing}
+
 @app.get("/tenant/{tenant_id}/health")
 async def get_tenant_health(tenant_id: str):
     """Получить health статус tenant"""
     return await tenant_router.get_tenant_health(tenant_id)
 
+@app.patch("/tenant/{tenant_id}")
+async def update_tenant(tenant_id: str, request: TenantUpdateRequest) -> Dict[str, Any]:
+    """Изменить конфигурацию tenant (перенос на другой шард, смена tier/region)"""
+    config = await tenant_router.update_tenant(tenant_id, request)
+    if config is None:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    return {"tenant_id": tenant_id, "database_url": tenant_router._build_database_url(config)}
+
 @app.delete("/tenant/{tenant_id}")
 async def delete_tenant(tenant_id: str):
     """Удалить tenant полностью (GDPR)"""
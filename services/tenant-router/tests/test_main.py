@@ -65,3 +65,131 @@ def test_tenant_health_with_mock():
     assert resp.status_code == 200
     data = resp.json()
     assert "status" in data
+
+
+# --- Two-tier tenant config cache ---
+
+def _config(tenant_id: str, shard_id: str = "shard_1"):
+    from app.main import TenantConfig
+
+    return TenantConfig(
+        tenant_id=tenant_id,
+        shard_id=shard_id,
+        database_name=f"tenant_{tenant_id}",
+        created_at="2025-01-01T00:00:00",
+    )
+
+
+def test_local_cache_serves_repeat_lookups_without_redis():
+    import asyncio
+
+    import fakeredis
+
+    from app.main import TenantRouter
+
+    async def run():
+        router = TenantRouter()
+        router.redis_client = fakeredis.aioredis.FakeRedis()
+        await router.redis_client.set("tenant:acme", _config("acme").model_dump_json())
+        first = await router.get_tenant_database_url("acme")
+        await router.redis_client.delete("tenant:acme")
+        second = await router.get_tenant_database_url("acme")  # served from the local tier
+        return first, second, router.local_cache.stats()
+
+    first, second, stats = asyncio.run(run())
+    assert first == second
+    assert first.endswith("/tenant_acme")
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_invalidation_is_broadcast_over_pubsub():
+    import asyncio
+
+    import fakeredis
+
+    from app.main import TenantRouter
+
+    async def run():
+        server = fakeredis.FakeServer()
+        replica_a, replica_b = TenantRouter(), TenantRouter()
+        for replica in (replica_a, replica_b):
+            replica.redis_client = fakeredis.aioredis.FakeRedis(server=server)
+            replica._invalidation_task = asyncio.create_task(replica._listen_for_invalidations())
+        await replica_a.redis_client.set("tenant:acme", _config("acme").model_dump_json())
+        await replica_a.get_tenant_config("acme")
+        await replica_b.get_tenant_config("acme")
+        await asyncio.sleep(0.05)
+
+        await replica_a.redis_client.set("tenant:acme", _config("acme", shard_id="shard_2").model_dump_json())
+        await replica_a.invalidate_tenant("acme")
+        for _ in range(50):
+            if replica_b.local_cache.get("acme") is None:
+                break
+            await asyncio.sleep(0.01)
+        moved = await replica_b.get_tenant_config("acme")
+        for replica in (replica_a, replica_b):
+            await replica.shutdown()
+        return moved
+
+    moved = asyncio.run(run())
+    assert moved is not None and moved.shard_id == "shard_2"
+
+
+def test_bulk_database_urls_endpoint():
+    with patch("app.main.tenant_router") as mock_router:
+        mock_router.get_database_urls = AsyncMock(
+            return_value=({"acme": "postgresql+asyncpg://u:p@shard-1:5432/tenant_acme"}, ["ghost"])
+        )
+        resp = client.post("/tenants/database-urls", json={"tenant_ids": ["acme", "ghost"]})
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "database_urls": {"acme": "postgresql+asyncpg://u:p@shard-1:5432/tenant_acme"},
+        "missing": ["ghost"],
+    }
+
+
+def test_bulk_lookup_uses_local_tier_then_mget():
+    import asyncio
+
+    import fakeredis
+
+    from app.main import TenantRouter
+
+    async def run():
+        router = TenantRouter()
+        router.redis_client = fakeredis.aioredis.FakeRedis()
+        router.local_cache.set(_config("cached"))
+        await router.redis_client.set("tenant:stored", _config("stored").model_dump_json())
+        return await router.get_database_urls(["cached", "stored", "ghost", "cached"])
+
+    found, missing = asyncio.run(run())
+    assert sorted(found) == ["cached", "stored"]
+    assert missing == ["ghost"]
+
+
+def test_tenant_update_publishes_invalidation():
+    import asyncio
+
+    import fakeredis
+
+    from app.main import TenantRouter, TenantUpdateRequest
+
+    async def run():
+        router = TenantRouter()
+        router.redis_client = fakeredis.aioredis.FakeRedis()
+        await router.redis_client.set("tenant:acme", _config("acme").model_dump_json())
+        await router.get_tenant_config("acme")
+
+        pubsub = router.redis_client.pubsub()
+        await pubsub.subscribe("tenant:invalidate")
+        await pubsub.get_message(timeout=1.0)  # subscribe confirmation
+        updated = await router.update_tenant("acme", TenantUpdateRequest(shard_id="shard_2"))
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        await pubsub.aclose()
+        return updated, message, await router.get_tenant_database_url("acme")
+
+    updated, message, url = asyncio.run(run())
+    assert updated is not None and updated.shard_id == "shard_2"
+    assert message is not None and message["data"] == b"acme"
+    assert ":5433/tenant_acme" in url
@@ -0,0 +1,49 @@
+"""transaction_sync_batches + provider id lookup index
+
+Revision ID: c3f5a7000005
+Revises: b7e1c2000004
+Create Date: 2026-05-02 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c3f5a7000005"
+down_revision: Union[str, None] = "b7e1c2000004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transaction_sync_batches",
+        sa.Column("idempotency_key", sa.String(length=128), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("idempotency_key"),
+    )
+    op.create_index(
+        "ix_transaction_sync_batches_user_id", "transaction_sync_batches", ["user_id"], unique=False
+    )
+    op.create_index(
+        "ix_transactions_user_business_provider_id",
+        "transactions",
+        ["user_id", "business_id", "provider_transaction_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_user_business_provider_id", table_name="transactions")
+    op.drop_index("ix_transaction_sync_batches_user_id", table_name="transaction_sync_batches")
+    op.drop_table("transaction_sync_batches")
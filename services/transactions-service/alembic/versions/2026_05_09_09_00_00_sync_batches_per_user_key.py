@@ -0,0 +1,50 @@
+"""scope transaction_sync_batches idempotency keys by user
+
+Revision ID: d4a6b8000006
+Revises: c3f5a7000005
+Create Date: 2026-05-09 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "d4a6b8000006"
+down_revision: Union[str, None] = "c3f5a7000005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_table(primary_key: Sequence[str]) -> None:
+    op.create_table(
+        "transaction_sync_batches",
+        sa.Column("idempotency_key", sa.String(length=128), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint(*primary_key),
+    )
+
+
+def upgrade() -> None:
+    # The table only holds replayable batch outcomes; recreating it loses at most
+    # the replay of a batch that is retried across the upgrade, which re-applies idempotently.
+    op.drop_index("ix_transaction_sync_batches_user_id", table_name="transaction_sync_batches")
+    op.drop_table("transaction_sync_batches")
+    _create_table(("user_id", "idempotency_key"))
+
+
+def downgrade() -> None:
+    op.drop_table("transaction_sync_batches")
+    _create_table(("idempotency_key",))
+    op.create_index(
+        "ix_transaction_sync_batches_user_id", "transaction_sync_batches", ["user_id"], unique=False
+    )
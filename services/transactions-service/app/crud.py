@@ -6,6 +6,7 @@ import uuid
 from typing import List
 
 import httpx
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
 from sqlalchemy.future import select
@@ -17,6 +18,9 @@ RECEIPT_DRAFT_ACCOUNT_NAMESPACE = uuid.UUID(
     os.getenv("RECEIPT_DRAFT_ACCOUNT_NAMESPACE", "f0b6e53b-0dd0-4f65-91d2-7bb272f8ea20")
 )
 RECEIPT_DRAFT_PREFIX = "receipt-draft-"
+SYNC_SOURCE_ACCOUNT_NAMESPACE = uuid.UUID(
+    os.getenv("SYNC_SOURCE_ACCOUNT_NAMESPACE", "5c1f3a9e-62d4-4b8e-9f0a-3d7c2e1b4a68")
+)
 _RECEIPT_VAT_TAIL = re.compile(r"\s*·\s*VAT £([0-9]+(?:\.[0-9]{1,2})?)\s*$", re.IGNORECASE)
 
 
@@ -323,6 +327,100 @@ async def create_transactions(
     return stats
 
 
+def _sync_source_account_id(user_id: str, source: str) -> uuid.UUID:
+    return uuid.uuid5(SYNC_SOURCE_ACCOUNT_NAMESPACE, f"{source}:{user_id}")
+
+
+async def _get_sync_batch(db: AsyncSession, *, user_id: str, idempotency_key: str) -> dict | None:
+    result = await db.execute(
+        select(models.TransactionSyncBatch).filter(
+            models.TransactionSyncBatch.idempotency_key == idempotency_key,
+            models.TransactionSyncBatch.user_id == user_id,
+        )
+    )
+    batch = result.scalars().first()
+    return {**batch.result, "replayed": True} if batch else None
+
+
+async def upsert_synced_transactions(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    business_id: uuid.UUID,
+    source: str,
+    idempotency_key: str,
+    items: List[schemas.TransactionSyncItem],
+) -> dict:
+    """
+    Applies a batch of transactions mirrored from another service in one commit.
+
+    Rows are matched on ``provider_transaction_id``, so re-sending an item updates
+    it in place. The batch outcome is stored under ``idempotency_key`` and a retry
+    with the same key returns it without touching the transactions again.
+    """
+    replay = await _get_sync_batch(db, user_id=user_id, idempotency_key=idempotency_key)
+    if replay is not None:
+        return replay
+
+    stats = {"idempotency_key": idempotency_key, "created_count": 0, "updated_count": 0, "unchanged_count": 0}
+    # Last write wins when the same provider id appears twice in one batch.
+    latest = {item.provider_transaction_id: item for item in items}
+    existing_result = await db.execute(
+        select(models.Transaction).filter(
+            models.Transaction.user_id == user_id,
+            models.Transaction.business_id == business_id,
+            models.Transaction.provider_transaction_id.in_(list(latest)),
+        )
+    )
+    existing = {row.provider_transaction_id: row for row in existing_result.scalars()}
+
+    for provider_transaction_id, item in latest.items():
+        values = {
+            "date": item.date,
+            "description": item.description,
+            "amount": item.amount,
+            "currency": item.currency.upper(),
+            "category": item.category,
+        }
+        row = existing.get(provider_transaction_id)
+        if row is None:
+            db.add(
+                models.Transaction(
+                    user_id=user_id,
+                    business_id=business_id,
+                    account_id=_sync_source_account_id(user_id, source),
+                    provider_transaction_id=provider_transaction_id,
+                    **values,
+                )
+            )
+            stats["created_count"] += 1
+        elif any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            stats["updated_count"] += 1
+        else:
+            stats["unchanged_count"] += 1
+
+    db.add(
+        models.TransactionSyncBatch(
+            idempotency_key=idempotency_key,
+            user_id=user_id,
+            source=source,
+            result=stats,
+        )
+    )
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry of the same batch committed first; report its outcome.
+        await db.rollback()
+        replay = await _get_sync_batch(db, user_id=user_id, idempotency_key=idempotency_key)
+        if replay is None:
+            raise
+        return replay
+    return {**stats, "replayed": False}
+
+
 def _receipt_draft_account_id(user_id: str) -> uuid.UUID:
     return uuid.uuid5(RECEIPT_DRAFT_ACCOUNT_NAMESPACE, user_id)
 
@@ -672,19 +770,28 @@ async def get_transactions_by_account(
     return result.scalars().all()
 
 async def get_transactions_by_user(
-    db: AsyncSession, user_id: str, business_id: uuid.UUID, skip: int = 0, limit: int = 50
+    db: AsyncSession,
+    user_id: str,
+    business_id: uuid.UUID,
+    skip: int = 0,
+    limit: int | None = 50,
+    from_date: datetime.date | None = None,
+    to_date: datetime.date | None = None,
 ):
-    """Fetches all transactions for a specific user across all their accounts."""
-    result = await db.execute(
-        select(models.Transaction)
-        .filter(
-            models.Transaction.user_id == user_id,
-            models.Transaction.business_id == business_id,
-        )
-        .order_by(models.Transaction.date.desc())
-        .offset(skip)
-        .limit(limit)
+    """Fetches transactions for a specific user across all their accounts, optionally within a date window."""
+    query = select(models.Transaction).filter(
+        models.Transaction.user_id == user_id,
+        models.Transaction.business_id == business_id,
     )
+    if from_date is not None:
+        query = query.filter(models.Transaction.date >= from_date)
+    if to_date is not None:
+        query = query.filter(models.Transaction.date <= to_date)
+    # id breaks date ties so offset pages neither skip nor repeat rows.
+    query = query.order_by(models.Transaction.date.desc(), models.Transaction.id).offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
     return result.scalars().all()
 
 async def update_transaction(
@@ -40,6 +40,7 @@ from libs.shared_auth.plan_enforcement_log import log_plan_enforcement_denial
 from libs.shared_auth.plan_limits import PlanLimits, get_plan_limits
 from libs.shared_cis.audit_actions import CISAuditAction
 from libs.shared_compliance.audit_client import post_audit_event
+from libs.shared_http.client import aclose_upstream_clients, get_upstream_client
 from libs.shared_http.request_id import RequestIdMiddleware, get_request_id
 
 from . import (
@@ -60,12 +61,22 @@ app = FastAPI(
     version="1.0.0"
 )
 
+
+@app.on_event("shutdown")
+async def close_upstream_clients() -> None:
+    await aclose_upstream_clients()
+
+
 app.add_middleware(RequestIdMiddleware)
 
 KAFKA_ENABLED: bool = os.getenv("KAFKA_ENABLED", "false").lower() == "true"
 logger = logging.getLogger(__name__)
 
 FINOPS_MONITOR_URL = os.getenv("FINOPS_MONITOR_URL", "http://finops-monitor:8021").rstrip("/")
+FRAUD_DETECTION_URL = os.getenv("FRAUD_DETECTION_URL", "http://fraud-detection:80").rstrip("/")
+TAX_ENGINE_URL = os.getenv("TAX_ENGINE_URL", "http://tax-engine:80").rstrip("/")
+# Matches fraud-detection's TransactionEventBatch.events max_length.
+FRAUD_EVENT_BATCH_SIZE = 5000
 
 
 async def _notify_finops_dashboard_transaction(user_id: str) -> None:
@@ -82,6 +93,60 @@ async def _notify_finops_dashboard_transaction(user_id: str) -> None:
     except Exception as exc:
         logger.warning("finops dashboard notify failed: %s", exc)
 
+
+async def _publish_fraud_transaction_events(user_id: str, transactions: List[schemas.TransactionBase]) -> None:
+    """Feed transaction-created events to fraud-detection's streaming feature engine."""
+    secret = os.environ.get("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret or not FRAUD_DETECTION_URL:
+        return
+    url = f"{FRAUD_DETECTION_URL}/internal/transaction-events"
+    # Oldest first across chunks too: fraud-detection's velocity windows only move forward.
+    events = [
+        {
+            "user_id": user_id,
+            "transaction_id": t.provider_transaction_id,
+            "amount": t.amount,
+            "date": t.date.isoformat(),
+            "description": t.description,
+        }
+        for t in sorted(transactions, key=lambda t: t.date)
+    ]
+    client = get_upstream_client(url)
+    for start in range(0, len(events), FRAUD_EVENT_BATCH_SIZE):
+        chunk = events[start:start + FRAUD_EVENT_BATCH_SIZE]
+        try:
+            response = await client.post(
+                url,
+                json={"events": chunk},
+                headers={"X-Internal-Token": secret},
+                timeout=8.0,
+            )
+        except Exception as exc:
+            logger.warning("fraud transaction events publish failed (%s events): %s", len(chunk), exc)
+            continue
+        if response.status_code >= 400:
+            logger.warning(
+                "fraud transaction events publish rejected (%s events): HTTP %s",
+                len(chunk),
+                response.status_code,
+            )
+
+async def _notify_tax_engine_transactions_changed(user_id: str) -> None:
+    """Tell tax-engine to drop cached calculations built from this user's transactions."""
+    secret = os.environ.get("INTERNAL_SERVICE_SECRET", "").strip()
+    if not secret or not TAX_ENGINE_URL:
+        return
+    url = f"{TAX_ENGINE_URL}/internal/transaction-events"
+    try:
+        await get_upstream_client(url).post(
+            url,
+            json={"user_id": user_id},
+            headers={"X-Internal-Token": secret},
+            timeout=8.0,
+        )
+    except Exception as exc:
+        logger.warning("tax-engine transaction change notify failed: %s", exc)
+
 # Instrument the app for OpenTelemetry
 setup_telemetry(app)
 
@@ -220,6 +285,8 @@ async def import_transactions(
         except Exception as exc:
             logger.warning("cis_suspect_scan failed: %s", exc)
         background_tasks.add_task(_notify_finops_dashboard_transaction, user_id)
+        background_tasks.add_task(_publish_fraud_transaction_events, user_id, request.transactions)
+        background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return schemas.TransactionImportResponse(
         message="Import request accepted",
         imported_count=import_result["imported_count"],
@@ -228,6 +295,29 @@ async def import_transactions(
         skipped_duplicates=import_result["skipped_duplicates"],
     )
 
+@app.post("/transactions/sync-batch", response_model=schemas.TransactionSyncBatchResponse)
+async def sync_transactions_batch(
+    request: schemas.TransactionSyncBatchRequest,
+    background_tasks: BackgroundTasks,
+    idempotency_key: str = Header(..., alias="Idempotency-Key", min_length=8, max_length=128),
+    user_id: str = Depends(get_current_user_id),
+    business_id: uuid.UUID = Depends(get_active_business_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Upserts transactions mirrored from another service (e.g. invoices); retries with the same key are no-ops."""
+    result = await crud.upsert_synced_transactions(
+        db,
+        user_id=user_id,
+        business_id=business_id,
+        source=request.source,
+        idempotency_key=idempotency_key,
+        items=request.transactions,
+    )
+    if not result["replayed"] and (result["created_count"] or result["updated_count"]):
+        background_tasks.add_task(_notify_finops_dashboard_transaction, user_id)
+        background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
+    return schemas.TransactionSyncBatchResponse(**result)
+
 @app.get("/accounts/{account_id}/transactions", response_model=List[schemas.Transaction])
 async def get_transactions_for_account(
     account_id: uuid.UUID,
@@ -262,12 +352,32 @@ async def get_transactions_for_account(
 
 @app.get("/transactions/me", response_model=List[schemas.Transaction])
 async def get_all_my_transactions(
+    from_date: datetime.date | None = Query(default=None),
+    to_date: datetime.date | None = Query(default=None),
+    offset: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=5000),
     user_id: str = Depends(get_current_user_id),
     business_id: uuid.UUID = Depends(get_active_business_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Retrieves all transactions for the authenticated user across all accounts."""
-    transactions = await crud.get_transactions_by_user(db, user_id=user_id, business_id=business_id)
+    """Retrieves transactions for the authenticated user across all accounts.
+
+    With ``from_date``/``to_date`` only that (inclusive) window is returned, in full;
+    tax-engine uses this to avoid pulling the whole history for one period.
+    ``offset``/``limit`` page through the result in a stable order (analytics jobs).
+    """
+    windowed = from_date is not None or to_date is not None
+    if limit is None:
+        limit = None if windowed else 50
+    transactions = await crud.get_transactions_by_user(
+        db,
+        user_id=user_id,
+        business_id=business_id,
+        skip=offset,
+        limit=limit,
+        from_date=from_date,
+        to_date=to_date,
+    )
 
     # Emit analytics event for comprehensive transaction access
     if KAFKA_ENABLED and hasattr(app, 'emit_event') and transactions:
@@ -495,6 +605,7 @@ async def get_tax_reserve(
 async def update_transaction_category(
     transaction_id: uuid.UUID,
     update_request: schemas.TransactionUpdateRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
@@ -507,6 +618,7 @@ async def update_transaction_category(
     )
     if not updated_transaction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+    background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
 
     # Emit transaction update event
     if KAFKA_ENABLED and hasattr(app, 'emit_event'):
@@ -553,6 +665,7 @@ async def update_transaction_category(
 async def update_receipt_draft_transaction(
     draft_transaction_id: uuid.UUID,
     payload: schemas.ReceiptDraftUpdateRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     business_id: uuid.UUID = Depends(get_active_business_id),
     db: AsyncSession = Depends(get_db),
@@ -567,12 +680,14 @@ async def update_receipt_draft_transaction(
     )
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="receipt_draft_not_found")
+    background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return updated
 
 
 @app.post("/transactions/receipt-drafts", response_model=schemas.ReceiptDraftCreateResponse)
 async def create_receipt_draft_transaction(
     payload: schemas.ReceiptDraftCreateRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_user_id_for_receipt_draft_create),
     db: AsyncSession = Depends(get_db),
 ):
@@ -585,6 +700,8 @@ async def create_receipt_draft_transaction(
         business_id=default_id,
         payload=payload,
     )
+    if not duplicated:
+        background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return schemas.ReceiptDraftCreateResponse(transaction=transaction, duplicated=duplicated)
 
 
@@ -661,6 +778,7 @@ async def get_receipt_draft_candidates(
 async def ignore_receipt_draft_candidate(
     draft_transaction_id: uuid.UUID,
     payload: schemas.ReceiptDraftIgnoreCandidateRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     business_id: uuid.UUID = Depends(get_active_business_id),
     db: AsyncSession = Depends(get_db),
@@ -678,6 +796,7 @@ async def ignore_receipt_draft_candidate(
         if detail in {"draft_not_found", "target_not_found"}:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail) from exc
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail) from exc
+    background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return schemas.ReceiptDraftStateUpdateResponse(draft_transaction=draft_transaction)
 
 
@@ -687,6 +806,7 @@ async def ignore_receipt_draft_candidate(
 )
 async def ignore_receipt_draft(
     draft_transaction_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     business_id: uuid.UUID = Depends(get_active_business_id),
     db: AsyncSession = Depends(get_db),
@@ -704,6 +824,7 @@ async def ignore_receipt_draft(
         if detail == "draft_not_found":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail) from exc
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail) from exc
+    background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return schemas.ReceiptDraftStateUpdateResponse(draft_transaction=draft_transaction)
 
 
@@ -713,6 +834,7 @@ async def ignore_receipt_draft(
 )
 async def reopen_receipt_draft(
     draft_transaction_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     business_id: uuid.UUID = Depends(get_active_business_id),
     db: AsyncSession = Depends(get_db),
@@ -730,6 +852,7 @@ async def reopen_receipt_draft(
         if detail == "draft_not_found":
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail) from exc
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail) from exc
+    background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return schemas.ReceiptDraftStateUpdateResponse(draft_transaction=draft_transaction)
 
 
@@ -740,6 +863,7 @@ async def reopen_receipt_draft(
 async def manual_reconcile_receipt_draft(
     draft_transaction_id: uuid.UUID,
     payload: schemas.ReceiptDraftManualReconcileRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     business_id: uuid.UUID = Depends(get_active_business_id),
     db: AsyncSession = Depends(get_db),
@@ -760,6 +884,7 @@ async def manual_reconcile_receipt_draft(
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=message) from exc
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message) from exc
 
+    background_tasks.add_task(_notify_tax_engine_transactions_changed, user_id)
     return schemas.ReceiptDraftManualReconcileResponse(
         reconciled_transaction=reconciled,
         removed_transaction_id=removed_id,
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, JSON, String, Uuid
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Index, JSON, String, Uuid
 from sqlalchemy.sql import func
 
 from .database import Base
@@ -17,6 +17,9 @@ class UserBusiness(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_user_business_provider_id", "user_id", "business_id", "provider_transaction_id"),
+    )
 
     id = Column(Uuid(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
     user_id = Column(String, nullable=False, index=True)
@@ -38,6 +41,19 @@ class Transaction(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class TransactionSyncBatch(Base):
+    """Outcome of an applied sync batch, replayed when the same Idempotency-Key is retried."""
+
+    __tablename__ = "transaction_sync_batches"
+
+    # Keys are chosen by clients, so they are only unique per user.
+    user_id = Column(String, primary_key=True)
+    idempotency_key = Column(String(128), primary_key=True)
+    source = Column(String(64), nullable=False)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class CISRecord(Base):
     __tablename__ = "cis_records"
 
@@ -94,6 +94,28 @@ class TransactionImportResponse(BaseModel):
     skipped_duplicates: int
 
 
+class TransactionSyncItem(BaseModel):
+    provider_transaction_id: str = Field(min_length=1, max_length=255)
+    date: datetime.date
+    description: str
+    amount: float
+    currency: str = Field(min_length=3, max_length=3)
+    category: Optional[str] = None
+
+
+class TransactionSyncBatchRequest(BaseModel):
+    source: str = Field(min_length=1, max_length=64)
+    transactions: List[TransactionSyncItem] = Field(max_length=1000)
+
+
+class TransactionSyncBatchResponse(BaseModel):
+    idempotency_key: str
+    created_count: int
+    updated_count: int
+    unchanged_count: int
+    replayed: bool = False
+
+
 class TransactionUpdateRequest(BaseModel):
     category: Optional[str] = None
     tax_category: Optional[str] = None
@@ -0,0 +1,105 @@
+"""Batch sync upsert: create, update in place and idempotent replay by key."""
+
+import asyncio
+import datetime
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import Base
+
+BUSINESS_ID = uuid.uuid4()
+
+
+def _items(amount: float, count: int = 3) -> list[schemas.TransactionSyncItem]:
+    return [
+        schemas.TransactionSyncItem(
+            provider_transaction_id=f"invoice-{n}",
+            date=datetime.date(2026, 4, 1 + n),
+            description=f"Invoice INV-{n}",
+            amount=amount,
+            currency="gbp",
+            category="Business Income",
+        )
+        for n in range(count)
+    ]
+
+
+def test_sync_batch_upserts_and_replays_by_idempotency_key(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def upsert(key: str, items):
+            async with Session() as db:
+                return await crud.upsert_synced_transactions(
+                    db,
+                    user_id="user-1",
+                    business_id=BUSINESS_ID,
+                    source="invoice_service",
+                    idempotency_key=key,
+                    items=items,
+                )
+
+        first = await upsert("batch-0001", _items(120.0))
+        replay = await upsert("batch-0001", _items(999.0))
+        changed = await upsert("batch-0002", _items(150.0, count=2) + _items(120.0)[2:])
+
+        async with Session() as db:
+            rows = (
+                await db.execute(select(models.Transaction).order_by(models.Transaction.provider_transaction_id))
+            ).scalars().all()
+            batches = (await db.execute(select(func.count()).select_from(models.TransactionSyncBatch))).scalar_one()
+        await engine.dispose()
+        return first, replay, changed, rows, batches
+
+    first, replay, changed, rows, batches = asyncio.run(scenario())
+
+    assert (first["created_count"], first["updated_count"], first["replayed"]) == (3, 0, False)
+    # A retried key returns the stored outcome and leaves rows untouched.
+    assert replay == {**first, "replayed": True}
+    assert (changed["created_count"], changed["updated_count"], changed["unchanged_count"]) == (0, 2, 1)
+
+    assert [row.amount for row in rows] == [150.0, 150.0, 120.0]
+    assert {row.currency for row in rows} == {"GBP"}
+    assert len({row.account_id for row in rows}) == 1
+    assert batches == 2
+
+
+def test_sync_batch_keys_are_scoped_per_user(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        outcomes = []
+        for user_id in ("user-1", "user-2"):
+            async with Session() as db:
+                outcomes.append(
+                    await crud.upsert_synced_transactions(
+                        db,
+                        user_id=user_id,
+                        business_id=BUSINESS_ID,
+                        source="invoice_service",
+                        idempotency_key="batch-0001",
+                        items=_items(120.0),
+                    )
+                )
+        await engine.dispose()
+        return outcomes
+
+    first, second = asyncio.run(scenario())
+
+    # The same client-chosen key from another user is a new batch, not a replay or a conflict.
+    assert (first["created_count"], first["replayed"]) == (3, False)
+    assert (second["created_count"], second["replayed"]) == (3, False)
@@ -875,3 +875,88 @@ def test_accountant_delegation_create_list_revoke(db_session):
 
     empty = client.get("/accountant/delegations", headers=get_auth_headers()).json()
     assert empty == []
+
+
+def test_fraud_events_are_published_in_bounded_chunks(monkeypatch):
+    from app import main as main_module
+
+    batch_size = main_module.FRAUD_EVENT_BATCH_SIZE
+    client = AsyncMock()
+    client.post.side_effect = [
+        type("Resp", (), {"status_code": 503})(),
+        type("Resp", (), {"status_code": 200})(),
+        type("Resp", (), {"status_code": 200})(),
+    ]
+    monkeypatch.setattr(main_module, "get_upstream_client", lambda url: client)
+    transactions = [
+        schemas.TransactionBase(
+            provider_transaction_id=f"t-{i}",
+            date=date(2026, 4, 1),
+            description="CARD PAYMENT",
+            amount=-1.0,
+            currency="GBP",
+        )
+        for i in range(batch_size * 2 + 1)
+    ]
+
+    asyncio.run(main_module._publish_fraud_transaction_events(TEST_USER_ID, transactions))
+
+    # A rejected chunk is logged and does not stop the rest from being sent.
+    sizes = [len(call.kwargs["json"]["events"]) for call in client.post.await_args_list]
+    assert sizes == [batch_size, batch_size, 1]
+
+
+def test_fraud_events_are_published_oldest_first(monkeypatch):
+    from app import main as main_module
+
+    client = AsyncMock()
+    client.post.return_value = type("Resp", (), {"status_code": 200})()
+    monkeypatch.setattr(main_module, "get_upstream_client", lambda url: client)
+    transactions = [
+        schemas.TransactionBase(
+            provider_transaction_id=f"t-{day}",
+            date=date(2026, 4, day),
+            description="CARD PAYMENT",
+            amount=-1.0,
+            currency="GBP",
+        )
+        for day in (3, 1, 2)
+    ]
+
+    asyncio.run(main_module._publish_fraud_transaction_events(TEST_USER_ID, transactions))
+
+    events = client.post.await_args.kwargs["json"]["events"]
+    assert [event["transaction_id"] for event in events] == ["t-1", "t-2", "t-3"]
+
+
+def test_receipt_draft_writes_notify_tax_engine(db_session, monkeypatch):
+    from app import main as main_module
+
+    notify = AsyncMock()
+    monkeypatch.setattr(main_module, "_notify_tax_engine_transactions_changed", notify)
+    payload = {
+        "document_id": str(uuid.uuid4()),
+        "filename": "notify_receipt.pdf",
+        "transaction_date": "2026-02-11",
+        "total_amount": 12.0,
+        "currency": "GBP",
+        "vendor_name": "Staples",
+        "suggested_category": "office",
+    }
+
+    draft_id = client.post("/transactions/receipt-drafts", headers=get_auth_headers(), json=payload).json()["transaction"]["id"]
+    duplicate = client.post("/transactions/receipt-drafts", headers=get_auth_headers(), json=payload)
+    assert duplicate.json()["duplicated"] is True
+    assert notify.await_count == 1
+
+    updated = client.patch(
+        f"/transactions/receipt-drafts/{draft_id}",
+        headers=get_auth_headers(),
+        json={"total_amount": 15.0},
+    )
+    assert updated.status_code == 200
+    assert client.post(f"/transactions/receipt-drafts/{draft_id}/ignore", headers=get_auth_headers()).status_code == 200
+    assert client.post(f"/transactions/receipt-drafts/{draft_id}/reopen", headers=get_auth_headers()).status_code == 200
+
+    assert notify.await_count == 4
+    assert {call.args[0] for call in notify.await_args_list} == {TEST_USER_ID}
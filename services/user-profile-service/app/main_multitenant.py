@@ -32,7 +32,8 @@ try:
         get_tenant_context,
         get_tenant_db_session,
         TenantContext,
-        check_tenant_routing_health
+        check_tenant_routing_health,
+        tenant_database,
     )
     tenant_enabled = True  # Use lowercase variable
     logger.info("Tenant middleware loaded successfully")
@@ -57,12 +58,16 @@ async def lifespan(app: FastAPI):
     # Startup
     if TENANT_ENABLED:
         logger.info("🏗️ Multi-Tenant User Profile Service starting...")
+        await tenant_middleware.start_invalidation_listener()  # type: ignore[possibly-unbound]
     else:
         logger.warning("⚠️ Running in single-tenant mode")
 
     yield
 
     # Shutdown
+    if TENANT_ENABLED:
+        await tenant_middleware.stop_invalidation_listener()  # type: ignore[possibly-unbound]
+        await tenant_database.aclose()  # type: ignore[possibly-unbound]
     logger.info("👋 User Profile Service shutting down...")
 
 # FastAPI app with multi-tenant support
@@ -0,0 +1,230 @@
+"""Tests for the tenant engine pool manager and tenant URL cache."""
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "libs", "common-types")))
+
+from tenant_middleware import (  # noqa: E402
+    TenantContext,
+    TenantDatabase,
+    TenantMiddleware,
+    TenantPoolSettings,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _settings(**overrides) -> TenantPoolSettings:
+    base = dict(
+        max_engines=2,
+        idle_seconds=60.0,
+        pool_size=1,
+        max_overflow=0,
+        global_connection_budget=10,
+        shard_connection_budget=10,
+        acquire_timeout_seconds=0.05,
+    )
+    base.update(overrides)
+    return TenantPoolSettings(**base)
+
+
+def _ctx(tenant_id: str, tmp_path) -> TenantContext:
+    return TenantContext(tenant_id, f"sqlite+aiosqlite:///{tmp_path / tenant_id}.db")
+
+
+async def _use(db: TenantDatabase, ctx: TenantContext) -> None:
+    async for _session in db.get_tenant_session(ctx):
+        pass
+
+
+def test_lru_evicts_least_recently_used_engine(tmp_path):
+    async def run():
+        db = TenantDatabase(_settings())
+        await _use(db, _ctx("tenant-a", tmp_path))
+        await _use(db, _ctx("tenant-b", tmp_path))
+        await _use(db, _ctx("tenant-a", tmp_path))  # a becomes most recent
+        await _use(db, _ctx("tenant-c", tmp_path))
+        stats = db.stats()
+        names = list(db.connection_pools)
+        await db.aclose()
+        return names, stats
+
+    names, stats = asyncio.run(run())
+    assert names == ["tenant-a", "tenant-c"]
+    assert stats["open_engines"] == 2
+    assert stats["engines_created"] == 3
+    assert stats["engines_evicted"]["lru"] == 1
+
+
+def test_idle_engines_are_closed(tmp_path):
+    clock = _Clock()
+
+    async def run():
+        db = TenantDatabase(_settings(max_engines=10), clock=clock)
+        await _use(db, _ctx("tenant-a", tmp_path))
+        clock.now += 30
+        await _use(db, _ctx("tenant-b", tmp_path))
+        clock.now += 45
+        closed = await db.close_idle(force=True)
+        names = list(db.connection_pools)
+        await db.aclose()
+        return closed, names
+
+    closed, names = asyncio.run(run())
+    assert closed == 1
+    assert names == ["tenant-b"]
+
+
+def test_global_budget_caps_concurrent_sessions(tmp_path):
+    async def run():
+        db = TenantDatabase(_settings(max_engines=10, global_connection_budget=1))
+        holder = db.get_tenant_session(_ctx("tenant-a", tmp_path))
+        await holder.__anext__()
+        try:
+            with pytest.raises(HTTPException) as exc:
+                await _use(db, _ctx("tenant-b", tmp_path))
+            assert exc.value.status_code == 503
+        finally:
+            await holder.aclose()
+        await _use(db, _ctx("tenant-b", tmp_path))  # budget released
+        await db.aclose()
+
+    asyncio.run(run())
+
+
+def test_cold_tenant_lookups_are_coalesced():
+    calls = {"n": 0}
+
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return {"database_url": "postgresql+asyncpg://u:p@shard-1:5432/tenant_acme"}
+
+    class _Client:
+        async def get(self, url, timeout):
+            calls["n"] += 1
+            await asyncio.sleep(0.02)
+            return _Response()
+
+    async def run():
+        middleware = TenantMiddleware()
+        middleware.http_client = _Client()  # type: ignore[assignment]
+        urls = await asyncio.gather(*(middleware._get_tenant_database_url("acme") for _ in range(20)))
+        await middleware._get_tenant_database_url("acme")
+        return urls, middleware.cache_stats()
+
+    urls, stats = asyncio.run(run())
+    assert len(set(urls)) == 1
+    assert calls["n"] == 1
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 19
+    assert stats["hits"] == 1
+
+
+def test_cancelled_leader_lookup_does_not_fail_joined_requests():
+    calls = {"n": 0}
+
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return {"database_url": "postgresql+asyncpg://u:p@shard-1:5432/tenant_acme"}
+
+    class _Client:
+        async def get(self, url, timeout):
+            calls["n"] += 1
+            await asyncio.sleep(0.02)
+            return _Response()
+
+    async def run():
+        middleware = TenantMiddleware()
+        middleware.http_client = _Client()  # type: ignore[assignment]
+        leader = asyncio.create_task(middleware._get_tenant_database_url("acme"))
+        await asyncio.sleep(0.005)
+        joiners = [asyncio.create_task(middleware._get_tenant_database_url("acme")) for _ in range(3)]
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        urls = await asyncio.gather(*joiners)
+        return leader, urls
+
+    leader, urls = asyncio.run(run())
+    assert leader.cancelled()
+    assert urls == ["postgresql+asyncpg://u:p@shard-1:5432/tenant_acme"] * 3
+    assert calls["n"] == 2
+
+
+def test_url_change_with_active_session_uses_new_pool_and_drains_old(tmp_path):
+    async def run():
+        db = TenantDatabase(_settings())
+        old_ctx = _ctx("tenant-a", tmp_path)
+        holder = db.get_tenant_session(old_ctx)
+        await holder.__anext__()
+        old_pool = db.connection_pools["tenant-a"]
+
+        moved = TenantContext("tenant-a", f"sqlite+aiosqlite:///{tmp_path / 'tenant-a-moved'}.db")
+        new_pool = await db._checkout_pool("tenant-a", moved.database_url)
+        during = db.stats()
+        await db._release_pool("tenant-a", new_pool)
+        await holder.aclose()
+        after = db.stats()
+        await db.aclose()
+        return old_pool, new_pool, moved.database_url, during, after
+
+    old_pool, new_pool, moved_url, during, after = asyncio.run(run())
+    assert new_pool is not old_pool
+    assert new_pool.database_url == moved_url
+    assert during["draining_engines"] == 1 and during["engines_evicted"]["url_changed"] == 0
+    assert after["draining_engines"] == 0 and after["engines_evicted"]["url_changed"] == 1
+
+
+def test_lru_never_evicts_the_pool_being_checked_out(tmp_path):
+    async def run():
+        db = TenantDatabase(_settings(max_engines=1))
+        holder = db.get_tenant_session(_ctx("tenant-a", tmp_path))
+        await holder.__anext__()
+        pool = await db._checkout_pool("tenant-b", _ctx("tenant-b", tmp_path).database_url)
+        names = list(db.connection_pools)
+        evicted = db.stats()["engines_evicted"]["lru"]
+        await db._release_pool("tenant-b", pool)
+        await holder.aclose()
+        await db.aclose()
+        return names, evicted
+
+    names, evicted = asyncio.run(run())
+    # Both pools are in use, so neither is evicted even though the cap is 1.
+    assert names == ["tenant-a", "tenant-b"]
+    assert evicted == 0
+
+
+def test_middleware_cache_drops_tenants_published_on_invalidation_channel():
+    import fakeredis
+
+    async def run():
+        redis_client = fakeredis.aioredis.FakeRedis()
+        middleware = TenantMiddleware()
+        middleware._cache_database_url("acme", "postgresql+asyncpg://u:p@shard-1:5432/tenant_acme")
+        middleware._cache_database_url("other", "postgresql+asyncpg://u:p@shard-1:5432/tenant_other")
+        assert await middleware.start_invalidation_listener(redis_client)
+        await asyncio.sleep(0.05)  # let the subscription register
+
+        await redis_client.publish("tenant:invalidate", "acme")
+        for _ in range(50):
+            if "acme" not in middleware.tenant_cache:
+                break
+            await asyncio.sleep(0.01)
+        remaining = list(middleware.tenant_cache)
+        await middleware.stop_invalidation_listener()
+        return remaining
+
+    assert asyncio.run(run()) == ["other"]
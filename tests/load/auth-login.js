@@ -0,0 +1,89 @@
+import http from 'k6/http';
+import { check } from 'k6';
+import { Counter, Rate, Trend } from 'k6/metrics';
+
+const errorRate = new Rate('errors');
+const shedLogins = new Counter('logins_shed');
+const healthDuration = new Trend('health_during_logins_duration');
+const BASE_URL = __ENV.BASE_URL || 'http://localhost:8000/api';
+// Raise LOGIN_RATE until the p99 threshold breaks; the last passing rate is
+// the service's logins/second at that p99.
+const LOGIN_RATE = parseInt(__ENV.LOGIN_RATE || '40', 10);
+const USERS = 50;
+const PASSWORD = 'LoadT3st!Passw0rd';
+
+export const options = {
+  scenarios: {
+    logins: {
+      executor: 'constant-arrival-rate',
+      rate: LOGIN_RATE,
+      timeUnit: '1s',
+      duration: '3m',
+      preAllocatedVUs: 100,
+      maxVUs: 400,
+    },
+    api_key_exchanges: {
+      executor: 'constant-arrival-rate',
+      exec: 'exchangeApiKey',
+      rate: 200,
+      timeUnit: '1s',
+      duration: '3m',
+      preAllocatedVUs: 20,
+    },
+    // Hashing is off the event loop, so cheap requests stay fast under login load.
+    health: {
+      executor: 'constant-arrival-rate',
+      exec: 'health',
+      rate: 20,
+      timeUnit: '1s',
+      duration: '3m',
+      preAllocatedVUs: 5,
+    },
+  },
+  thresholds: {
+    'http_req_duration{scenario:logins}': ['p(99)<500'],
+    'http_req_duration{scenario:api_key_exchanges}': ['p(99)<50'],
+    health_during_logins_duration: ['p(99)<50'],
+    errors: ['rate<0.01'],
+  },
+};
+
+export function setup() {
+  const emails = [];
+  for (let i = 0; i < USERS; i++) {
+    const email = `load-login-${i}@example.com`;
+    http.post(`${BASE_URL}/auth/register`, JSON.stringify({ email, password: PASSWORD, plan: 'pro' }), {
+      headers: { 'Content-Type': 'application/json' },
+    });
+    emails.push(email);
+  }
+  const login = http.post(`${BASE_URL}/auth/token`, { username: emails[0], password: PASSWORD });
+  const created = http.post(`${BASE_URL}/auth/api-keys`, JSON.stringify({ label: 'load' }), {
+    headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${login.json('access_token')}` },
+  });
+  return { emails, apiKey: created.json('api_key') };
+}
+
+export default function (data) {
+  const email = data.emails[Math.floor(Math.random() * data.emails.length)];
+  const response = http.post(`${BASE_URL}/auth/token`, { username: email, password: PASSWORD });
+  if (response.status === 503) {
+    // Admission control shed the request; it is not an error, but it counts.
+    shedLogins.add(1);
+    return;
+  }
+  check(response, { 'login status is 200': (r) => r.status === 200 }) || errorRate.add(1);
+}
+
+export function exchangeApiKey(data) {
+  const response = http.post(`${BASE_URL}/auth/token/api-key`, JSON.stringify({ api_key: data.apiKey }), {
+    headers: { 'Content-Type': 'application/json' },
+  });
+  check(response, { 'api key exchange status is 200': (r) => r.status === 200 }) || errorRate.add(1);
+}
+
+export function health() {
+  const response = http.get(`${BASE_URL}/auth/health`);
+  healthDuration.add(response.timings.duration);
+  check(response, { 'health status is 200': (r) => r.status === 200 }) || errorRate.add(1);
+}
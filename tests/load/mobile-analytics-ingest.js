@@ -0,0 +1,73 @@
+import http from 'k6/http';
+import { check } from 'k6';
+import { Rate, Trend } from 'k6/metrics';
+
+const errorRate = new Rate('errors');
+const funnelDuration = new Trend('funnel_read_duration');
+const BASE_URL = __ENV.BASE_URL || 'http://localhost:8000/api';
+const API_KEY = __ENV.MOBILE_ANALYTICS_INGEST_API_KEY || '';
+const TOTAL_EVENTS = parseInt(__ENV.TOTAL_EVENTS || '1000000', 10);
+
+const EVENTS = [
+  'mobile.splash.impression',
+  'mobile.onboarding.impression',
+  'mobile.onboarding.cta_tapped',
+  'mobile.onboarding.completed',
+  'mobile.biometric.gate_shown',
+  'mobile.biometric.challenge_succeeded',
+  'mobile.push.permission_prompted',
+  'mobile.push.permission_granted',
+];
+const VARIANTS = ['velocity', 'security', 'control'];
+
+export const options = {
+  scenarios: {
+    ingest: {
+      executor: 'shared-iterations',
+      vus: 200,
+      iterations: TOTAL_EVENTS,   // 1M events by default
+      maxDuration: '60m',
+    },
+    // Reports must stay flat while the counters grow.
+    funnel_reads: {
+      executor: 'constant-arrival-rate',
+      exec: 'readFunnel',
+      rate: 5,
+      timeUnit: '1s',
+      duration: '10m',
+      preAllocatedVUs: 10,
+    },
+  },
+  thresholds: {
+    'http_req_duration{scenario:ingest}': ['p(95)<100'],
+    funnel_read_duration: ['p(95)<200'],
+    http_req_failed: ['rate<0.01'],
+    errors: ['rate<0.01'],
+  },
+};
+
+const headers = { 'Content-Type': 'application/json', 'X-Api-Key': API_KEY };
+
+export default function () {
+  const n = Math.floor(Math.random() * 1e9);
+  const daysAgo = n % 14;
+  const payload = JSON.stringify({
+    event: EVENTS[n % EVENTS.length],
+    source: 'mobile-app',
+    platform: n % 2 ? 'ios' : 'android',
+    occurred_at: new Date(Date.now() - daysAgo * 86400000).toISOString(),
+    metadata: {
+      installation_id: `load-install-${n % 50000}`,
+      onboarding_variant: VARIANTS[n % VARIANTS.length],
+    },
+  });
+
+  const response = http.post(`${BASE_URL}/analytics/mobile/analytics/events`, payload, { headers });
+  check(response, { 'event accepted': (r) => r.status === 202 }) || errorRate.add(1);
+}
+
+export function readFunnel() {
+  const response = http.get(`${BASE_URL}/analytics/mobile/analytics/funnel?days=14`, { headers });
+  funnelDuration.add(response.timings.duration);
+  check(response, { 'funnel status is 200': (r) => r.status === 200 }) || errorRate.add(1);
+}